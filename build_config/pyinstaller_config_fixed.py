@@ -146,6 +146,20 @@ PYINSTALLER_CONFIG = {
         'barcode',
         'qrcode',
         'tkcalendar',
+        # Formularios que main_window importa por nombre (LazyRegistry) y
+        # servicios importados en el primer uso
+        'ui.forms.category_form',
+        'ui.forms.product_form',
+        'ui.forms.client_form',
+        'ui.forms.sales_form',
+        'ui.forms.movement_form',
+        'ui.forms.label_generator_form',
+        'ui.forms.reports_form',
+        'ui.forms.ticket_preview_form',
+        'ui.forms.company_config_form',
+        'services.export_service',
+        'services.label_service',
+        'services.barcode_service',
     ],
     
     # Módulos a excluir (reducir tamaño)
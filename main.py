@@ -19,11 +19,12 @@ log_dir = os.path.join(os.path.dirname(__file__), 'logs')
 if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
-logging.basicConfig(
-    filename=os.path.join(log_dir, 'inventario_sistema.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging asíncrono: los servicios encolan y un hilo aparte escribe los archivos
+from helpers.async_logging import async_logging
+
+async_logging.iniciar()
+async_logging.agregar_archivo(os.path.join(log_dir, 'inventario_sistema.log'),
+                              nivel=logging.INFO, formato='texto')
 logger = logging.getLogger(__name__)
 
 # Importar módulos necesarios con paths corregidos
@@ -31,8 +32,11 @@ logger = logging.getLogger(__name__)
 try:
     from db.database import get_database_connection, initialize_database
     from ui.auth.login_window import LoginWindow
-    from ui.main.main_window import start_main_window
     from services.service_container import setup_default_container, cleanup_container
+    from db.query_metrics import query_metrics
+    from db.storage_profiles import storage_profiles
+    from db.wal_checkpoint import checkpoint_manager
+    from db.change_notifier import change_notifier
     
     logger.info("Módulos importados correctamente")
 except ImportError as e:
@@ -62,7 +66,8 @@ def setup_configuration():
             'db_name': 'inventario.db',
             'db_host': 'localhost',
             'db_user': 'root',
-            'db_password': ''
+            'db_password': '',
+            'storage_profile': 'pos-safe'
         }
         config['paths'] = {
             'reports': './data/reports/'
@@ -72,6 +77,50 @@ def setup_configuration():
             'decimal_places': '2',
             'use_locale': 'True'
         }
+        config['logging'] = {
+            'queue_size': '10000',
+            'drop_policy': 'descartar_nuevo',
+            'debug_sample_rate': '1',
+            'block_timeout_ms': '50'
+        }
+        config['metrics'] = {
+            'enabled': 'False',
+            'slow_query_ms': '100',
+            'explain_slow': 'True',
+            'slow_log_size': '200',
+            'http_port': '0',
+            'export_path': ''
+        }
+        config['checkpoint'] = {
+            'enabled': 'True',
+            'interval_ms': '250',
+            'idle_ms': '100',
+            'max_interval_s': '5',
+            'forced_threshold_kb': '65536',
+            'truncate_threshold_kb': '16384',
+            'truncate_wait_ms': '0',
+            'autocheckpoint_pages': '1000',
+            'journal_size_limit_kb': '16384',
+            'long_reader_warning_s': '30'
+        }
+        config['integrity'] = {
+            'enabled': 'True',
+            'delay_seconds': '30',
+            'full_check_days': '7',
+            'max_issues': '100'
+        }
+        config['sync'] = {
+            'enabled': 'False',
+            'peers': '',
+            'interval_s': '60',
+            'batch_size': '500',
+            'compact_hours': '24'
+        }
+        config['notifications'] = {
+            'enabled': 'True',
+            'poll_interval_ms': '200',
+            'history_size': '1000'
+        }
         
         with open(config_path, 'w') as configfile:
             config.write(configfile)
@@ -94,6 +143,23 @@ def setup_configuration():
         'decimal_places': config.getint('monetary', 'decimal_places', fallback=2),
         'use_locale': config.getboolean('monetary', 'use_locale', fallback=True)
     }
+    
+    # Cola del logging asíncrono (política de descarte y muestreo de DEBUG)
+    async_logging.configurar_desde_ini(config)
+    
+    # Instrumentación y perfiles de SQLite (antes de abrir cualquier conexión)
+    query_metrics.configurar_desde_ini(config)
+    storage_profiles.configurar_desde_ini(config)
+    checkpoint_manager.configurar_desde_ini(config)
+    change_notifier.configurar_desde_ini(config)
+    
+    # Verificaciones de integridad diferidas (claves foráneas, quick_check, stock)
+    from services.integrity_service import IntegrityService
+    IntegrityService.configurar_desde_ini(config)
+    
+    # Sincronización con otras terminales (registro de cambios)
+    from services.sync_service import SyncService
+    SyncService.configurar_desde_ini(config)
 
     return db_config, monetary_config
 
@@ -117,8 +183,12 @@ def initialize_system():
         else:
             logger.info(f"Conectando a base de datos existente: {db_path}")
             db_connection = get_database_connection(db_path)
+            
+            # Aplicar migraciones de schema pendientes (se omite si la huella del schema no cambió)
+            db_connection.create_tables()
         
-        # Verificar integridad de la base de datos
+        # Verificar que existan las tablas; claves foráneas, quick_check y stock
+        # se verifican en background después del login (IntegrityService)
         if not db_connection.verify_schema_integrity():
             logger.warning("Problemas de integridad en la base de datos")
             messagebox.showwarning("Advertencia", 
@@ -133,6 +203,41 @@ def initialize_system():
                            f"No se pudo inicializar el sistema: {e}")
         raise
 
+def start_background_services(container):
+    """
+    Iniciar servicios de segundo plano después del login.
+    
+    Args:
+        container: Service Container configurado
+    """
+    try:
+        # Checkpoints del WAL en ventanas de inactividad (fuera de los commits de caja)
+        if container.is_registered('database'):
+            checkpoint_manager.iniciar(container.get('database').db_path)
+            
+            # Cambios de stock y precio hechos por otros procesos (API, otras instancias)
+            change_notifier.iniciar(container.get('database').db_path)
+        
+        # Retomar PDFs de tickets que quedaron pendientes en la sesión anterior
+        if container.is_registered('ticket_render_service'):
+            container.get('ticket_render_service').start(recuperar_pendientes=True)
+        
+        # Crear en background los cierres mensuales de inventario pendientes
+        if container.is_registered('inventory_snapshot_service'):
+            container.get('inventory_snapshot_service').iniciar_cierres_automaticos()
+        
+        # Verificación de integridad incremental (completa cada full_check_days)
+        if container.is_registered('integrity_service'):
+            container.get('integrity_service').iniciar_verificacion_en_segundo_plano()
+        
+        # Registro de cambios solo con [sync] enabled; traer cambios de [sync] peers
+        if container.is_registered('sync_service'):
+            sync_service = container.get('sync_service')
+            sync_service.configurar_registro()
+            sync_service.iniciar_sincronizacion_en_segundo_plano()
+    except Exception as e:
+        logger.error(f"Error iniciando servicios de segundo plano: {e}")
+
 def main():
     """
     Función principal que inicia la aplicación.
@@ -154,6 +259,14 @@ def main():
             messagebox.showerror("Error", f"Error configurando servicios del sistema: {e}")
             return
         
+        # Instrumentación de consultas: trazas por acción y endpoint local /metrics
+        if query_metrics.habilitado:
+            from ui.utils.action_trace import instalar_trazas_tkinter
+            instalar_trazas_tkinter()
+            if query_metrics.puerto_http:
+                from infrastructure.metrics_server import iniciar_servidor_metricas
+                iniciar_servidor_metricas(query_metrics.puerto_http)
+        
         # Mostrar ventana de login
         login_window = LoginWindow()
         login_success = login_window.show()
@@ -161,8 +274,13 @@ def main():
         if login_success:
             logger.info("Login exitoso, iniciando ventana principal")
             
+            # Tareas de fondo diferidas hasta después del login (no retrasan la ventana de acceso)
+            start_background_services(container)
+            
             # Iniciar ventana principal (MainWindow maneja su propia instancia de Tk)
+            # Importada aquí: la cadena de formularios no se carga antes del login
             try:
+                from ui.main.main_window import start_main_window
                 main_window = start_main_window()
                 logger.info("Aplicación iniciada correctamente")
             finally:
@@ -179,6 +297,14 @@ def main():
         messagebox.showerror("Error Crítico", 
                            f"Error crítico en la aplicación: {e}")
         sys.exit(1)
+    finally:
+        # Volcar métricas de consultas de la sesión
+        if query_metrics.habilitado and query_metrics.ruta_exportacion:
+            try:
+                query_metrics.exportar_json(query_metrics.ruta_exportacion)
+                logger.info(f"Métricas de consultas exportadas a {query_metrics.ruta_exportacion}")
+            except OSError as e:
+                logger.error(f"No se pudieron exportar las métricas: {e}")
 
 if __name__ == "__main__":
     main()
@@ -7,11 +7,19 @@ Punto de entrada principal para la API REST del sistema de inventario.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import configparser
 import logging
+import os
 
 # Importar routers
 from api.routes.categories import router as categories_router
 from api.routes.products import router as products_router
+from api.routes.metrics import router as metrics_router
+from api.routes.sync import router as sync_router
+from api.routes.events import router as events_router
+from db.change_notifier import change_notifier
+from db.database import get_database_connection
+from services.sync_service import SyncService
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -48,6 +56,42 @@ app.include_router(
     tags=["productos"]
 )
 
+app.include_router(
+    sync_router,
+    prefix="/api/v1",
+    tags=["sincronizacion"]
+)
+
+app.include_router(
+    events_router,
+    prefix="/api/v1",
+    tags=["notificaciones"]
+)
+
+# Métricas de consultas SQL del proceso de la API
+app.include_router(metrics_router)
+
+@app.on_event("startup")
+async def load_sync_configuration():
+    """Leer [sync] de config.ini: pares permitidos en POST /sync/pull y registro de cambios."""
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.ini'), encoding='utf-8')
+    SyncService.configurar_desde_ini(config)
+    SyncService(get_database_connection("inventario.db")).configurar_registro()
+
+
+@app.on_event("startup")
+async def start_change_notifications():
+    """Detectar commits de la aplicación de escritorio y otras terminales (PRAGMA data_version)."""
+    change_notifier.iniciar(get_database_connection("inventario.db").db_path)
+
+
+@app.on_event("shutdown")
+async def stop_change_notifications():
+    """Detener el sondeo de cambios."""
+    change_notifier.detener()
+
+
 # Endpoint de salud
 @app.get("/health")
 async def health_check():
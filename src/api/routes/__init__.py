@@ -7,8 +7,14 @@ Exportación centralizada de todas las rutas de la API.
 
 from .categories import router as categories_router
 from .products import router as products_router
+from .metrics import router as metrics_router
+from .sync import router as sync_router
+from .events import router as events_router
 
 __all__ = [
     'categories_router',
-    'products_router'
+    'products_router',
+    'metrics_router',
+    'sync_router',
+    'events_router'
 ]
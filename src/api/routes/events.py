@@ -0,0 +1,119 @@
+"""
+Rutas de la API REST para Notificaciones de cambios de productos
+Sistema de Inventario v2.0
+
+Los clientes reciben los cambios de stock, precio y estado en lugar de
+volver a consultar el catálogo (db.change_notifier):
+- GET /events/stream   Server-Sent Events; reanuda con Last-Event-ID o since
+- GET /events          eventos posteriores a una versión (clientes sin SSE)
+
+Cada evento trae version, tipo ('producto' o 'eliminado'), id_producto,
+campos cambiados y nombre/stock/precio/activo. Si el historial del
+servidor ya no cubre la versión pedida se envía un reset: el cliente
+recarga el catálogo (GET /products) y sigue desde la versión indicada.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+import logging
+
+from db.change_notifier import change_notifier
+
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear router de notificaciones
+router = APIRouter(
+    prefix="/events",
+    tags=["Notificaciones"]
+)
+
+# Comentario SSE enviado sin eventos para mantener viva la conexión (proxies)
+KEEPALIVE_SECONDS = 15
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Formatear un mensaje Server-Sent Events."""
+    cabecera = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{cabecera}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("")
+async def get_events(
+    since: int = Query(0, ge=0, description="Última versión recibida")
+):
+    """Obtener los eventos posteriores a `since` (reset=True si hay que recargar el catálogo)."""
+    eventos = change_notifier.eventos_desde(since)
+    return {
+        "status": "success",
+        "data": {
+            "instancia": change_notifier.instancia,
+            "version": change_notifier.version,
+            "reset": eventos is None,
+            "eventos": eventos or []
+        }
+    }
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Última versión recibida (o cabecera Last-Event-ID)")
+):
+    """
+    Flujo Server-Sent Events de cambios de productos.
+
+    Envía 'hello' con la instancia y versión actuales, luego los eventos
+    pendientes desde `since` (o 'reset'), y después cada cambio como evento
+    'producto' o 'eliminado' con id = versión.
+    """
+    ultimo_id = request.headers.get("last-event-id")
+    if since is None and ultimo_id and ultimo_id.isdigit():
+        since = int(ultimo_id)
+
+    loop = asyncio.get_running_loop()
+    cola: asyncio.Queue = asyncio.Queue()
+
+    def encolar(evento: Dict[str, Any]) -> None:
+        # Se llama en el hilo que escribió: solo pasar el evento al loop
+        loop.call_soon_threadsafe(cola.put_nowait, evento)
+
+    async def generar():
+        # Suscribirse antes de leer el historial: lo intermedio llega por la cola
+        suscripcion = change_notifier.suscribir(encolar)
+        try:
+            enviado = change_notifier.version if since is None else since
+            yield _sse("hello", {"instancia": change_notifier.instancia, "version": change_notifier.version})
+            if since is not None:
+                pendientes = change_notifier.eventos_desde(since)
+                if pendientes is None:
+                    enviado = change_notifier.version
+                    yield _sse("reset", {"version": enviado}, enviado)
+                else:
+                    for evento in pendientes:
+                        enviado = evento['version']
+                        yield _sse(evento['tipo'], evento, enviado)
+
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(cola.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if evento['version'] <= enviado:
+                    continue
+                enviado = evento['version']
+                yield _sse(evento['tipo'], evento, enviado)
+        finally:
+            change_notifier.desuscribir(suscripcion)
+
+    return StreamingResponse(
+        generar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
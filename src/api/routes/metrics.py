@@ -0,0 +1,11 @@
+"""
+Rutas de métricas de consultas SQL
+Sistema de Inventario v2.0
+
+El router vive en infrastructure.metrics_server para que la aplicación de
+escritorio pueda servirlo sin cargar el resto de la API.
+"""
+
+from infrastructure.metrics_server import router
+
+__all__ = ['router']
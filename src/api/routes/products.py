@@ -37,6 +37,13 @@ def get_product_service() -> ProductService:
     return ProductService(db_connection)
 
 
+# Columnas que serializa el listado (proyección de ProductService.list_products)
+LISTADO_COLUMNAS = (
+    'id_producto', 'nombre', 'descripcion', 'precio', 'stock', 'stock_minimo',
+    'id_categoria', 'categoria_nombre', 'activo', 'fecha_creacion'
+)
+
+
 def serialize_product(product) -> dict:
     """
     Serializar producto para respuesta JSON - Compatible con tests.
@@ -189,7 +196,7 @@ async def get_all_products(
 ):
     """Obtener todos los productos - Compatible con tests."""
     try:
-        products = product_service.get_all_products()
+        products = product_service.list_products(LISTADO_COLUMNAS)
         products_data = [serialize_product(prod) for prod in products if prod]
         
         return {
@@ -0,0 +1,134 @@
+"""
+Rutas de la API REST para Sincronización entre terminales
+Sistema de Inventario v2.0
+
+Protocolo pull sobre el registro de cambios (services.sync_service):
+- GET  /sync/info      nodo, versión y pares conocidos
+- GET  /sync/changes   cambios posteriores a una versión (since), solo lectura
+- POST /sync/ack       un par confirma hasta qué versión aplicó los cambios
+- POST /sync/pull      traer y aplicar los cambios de un par configurado o conocido
+- POST /sync/compact   compactar el registro de cambios
+"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
+from typing import Optional
+import logging
+
+from api.schemas.sync_schemas import SyncAckRequest, SyncPullRequest
+from services.sync_service import ClienteSyncHttp, SyncService
+from db.database import DatabaseConnection, get_database_connection
+
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear router de sincronización
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sincronización"]
+)
+
+
+def get_sync_service() -> SyncService:
+    """Obtener instancia del servicio de sincronización."""
+    db_connection = get_database_connection("inventario.db")
+    return SyncService(db_connection)
+
+
+def error_response(status_code: int, message: str) -> JSONResponse:
+    """Respuesta de error con el formato de la API."""
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "error",
+            "message": message
+        }
+    )
+
+
+@router.get("/info")
+async def get_sync_info(
+    sync_service: SyncService = Depends(get_sync_service)
+):
+    """Obtener nodo, versión del registro de cambios y pares conocidos."""
+    return {
+        "status": "success",
+        "data": sync_service.info()
+    }
+
+
+@router.get("/changes")
+async def get_changes(
+    since: int = Query(0, ge=0, description="Última versión de este nodo ya aplicada"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Máximo de cambios"),
+    node: Optional[str] = Query(None, description="Nodo que pide los cambios"),
+    sync_service: SyncService = Depends(get_sync_service)
+):
+    """Obtener los cambios posteriores a `since` (excluye los originados en `node`)."""
+    try:
+        return {
+            "status": "success",
+            "data": sync_service.obtener_cambios(since, limit, node)
+        }
+    except ValueError as ve:
+        return error_response(400, str(ve))
+
+
+@router.post("/ack")
+async def acknowledge_changes(
+    request: SyncAckRequest,
+    sync_service: SyncService = Depends(get_sync_service)
+):
+    """Registrar que el nodo `nodo` ya aplicó los cambios hasta `hasta`."""
+    try:
+        return {
+            "status": "success",
+            "data": sync_service.confirmar_recibido(request.nodo, request.hasta)
+        }
+    except ValueError as ve:
+        return error_response(400, str(ve))
+
+
+@router.post("/pull")
+def pull_changes(request: SyncPullRequest):
+    """
+    Traer y aplicar todos los cambios pendientes de otro nodo.
+    
+    Síncrona (se ejecuta en el pool de hilos) y con conexión propia: dos
+    instancias pueden pedirse cambios mutuamente sin bloquearse.
+    
+    Solo acepta URLs de [sync] peers o de nodos ya registrados en sync_pares.
+    """
+    db_connection = DatabaseConnection(get_database_connection("inventario.db").db_path)
+    try:
+        sync_service = SyncService(db_connection)
+        if not sync_service.par_permitido(request.url):
+            return error_response(400, f"{request.url} no es un par de sincronización configurado ([sync] peers)")
+        if request.limite:
+            sync_service.tamano_lote = request.limite
+        resumen = sync_service.sincronizar(ClienteSyncHttp(request.url), url=request.url)
+        return {
+            "status": "success",
+            "data": resumen,
+            "message": "Sincronización completada"
+        }
+    except ValueError as ve:
+        return error_response(400, str(ve))
+    except OSError as e:
+        logger.error(f"Error sincronizando con {request.url}: {e}")
+        return error_response(502, f"No se pudo contactar a {request.url}")
+    finally:
+        db_connection.close()
+
+
+@router.post("/compact")
+async def compact_changes(
+    sync_service: SyncService = Depends(get_sync_service)
+):
+    """Compactar el registro de cambios."""
+    return {
+        "status": "success",
+        "data": sync_service.compactar(),
+        "message": "Registro de cambios compactado"
+    }
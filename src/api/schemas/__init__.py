@@ -30,6 +30,9 @@ from .product_schemas import (
     ProductStatsResponse
 )
 
+# Schemas de Sincronización
+from .sync_schemas import SyncPullRequest
+
 # Schemas compartidos
 from .category_schemas import ErrorResponse, SuccessResponse
 
@@ -55,6 +58,9 @@ __all__ = [
     'LowStockListResponse',
     'ProductStatsResponse',
     
+    # Sincronización
+    'SyncPullRequest',
+    
     # Compartidos
     'ErrorResponse',
     'SuccessResponse'
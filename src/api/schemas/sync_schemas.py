@@ -0,0 +1,38 @@
+"""
+Schemas de Pydantic para la API REST - Sincronización
+Sistema de Inventario v2.0
+
+Solicitudes de los endpoints /sync (registro de cambios entre terminales).
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class SyncPullRequest(BaseModel):
+    """Schema para traer los cambios de otro nodo."""
+    url: str = Field(
+        ...,
+        min_length=1,
+        description="URL base de la API del par (p.ej. http://127.0.0.1:8001)"
+    )
+    limite: Optional[int] = Field(
+        None,
+        ge=1,
+        le=5000,
+        description="Cambios por lote (por defecto batch_size de [sync])"
+    )
+
+
+class SyncAckRequest(BaseModel):
+    """Schema para confirmar los cambios que un par ya aplicó."""
+    nodo: str = Field(
+        ...,
+        min_length=1,
+        description="Nodo del par que aplicó los cambios"
+    )
+    hasta: int = Field(
+        ...,
+        ge=0,
+        description="Última versión de este nodo aplicada por el par"
+    )
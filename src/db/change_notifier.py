@@ -0,0 +1,357 @@
+"""
+Notificaciones de cambios de productos (stock, precio, estado).
+
+En lugar de que cada ventana o cliente de la API vuelva a consultar el
+catálogo completo, los cambios se empujan a los suscriptores:
+
+- Dentro del proceso: los servicios que escriben productos y movimientos
+  llaman a publicar_productos() después del commit. El notificador relee
+  la fila (una búsqueda por clave primaria) y emite un evento solo si
+  cambió algo respecto del último estado publicado.
+- Entre procesos: un hilo daemon con conexión propia consulta PRAGMA
+  data_version (no lee la base: solo cambia cuando otra conexión hizo
+  commit) y, si cambió, lee las filas nuevas del registro de cambios
+  (tabla cambios) de productos y movimientos para saber qué productos
+  releer. Los commits del propio proceso también se ven por esta vía y
+  se descartan porque su estado ya se publicó.
+
+Cada evento lleva una versión creciente del proceso; los últimos
+history_size quedan en memoria para que un cliente que se reconecta pida
+los posteriores a la última versión que vio (o reciba un reset si ya no
+están). La sección [notifications] de config.ini los configura.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+# Campos del producto que viajan en cada evento
+CAMPOS_PRODUCTO = ('nombre', 'stock', 'precio', 'activo')
+
+# Tamaño de los IN (...) al releer productos
+LOTE_IN = 500
+
+# Estado publicado de un producto que ya no existe
+ELIMINADO = ()
+
+
+class ChangeNotifier:
+    """
+    Publicador de cambios de productos del proceso.
+
+    Thread-safe: se publica desde los hilos que escriben y desde el hilo de
+    sondeo. La relectura y la notificación se serializan, así un estado
+    viejo leído por un hilo nunca se publica después de uno más nuevo. Los
+    suscriptores se llaman en el hilo que publicó y deben devolver el
+    control enseguida (encolar, no dibujar).
+    """
+
+    def __init__(self):
+        self.habilitado = True
+        self.intervalo = 0.2
+        self.tamano_historial = 1000
+        self.instancia = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._publicando = threading.RLock()
+        self._detener = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ruta: Optional[str] = None
+        self._suscriptores: Dict[int, Callable[[Dict[str, Any]], None]] = {}
+        self._siguiente_suscriptor = 0
+        self._version = 0
+        self._historial: Deque[Dict[str, Any]] = deque(maxlen=self.tamano_historial)
+        self._estado: Dict[int, Tuple[Any, ...]] = {}
+        self._logger = logging.getLogger(__name__)
+        self._stats = self._stats_vacias()
+
+    def configurar(self, habilitado: bool = True, intervalo_ms: float = 200, historial: int = 1000) -> None:
+        """
+        Configurar el notificador.
+
+        Args:
+            habilitado: Publicar cambios (deshabilitado, publicar_productos no consulta nada)
+            intervalo_ms: Cada cuánto el hilo de sondeo consulta PRAGMA data_version
+            historial: Eventos recientes que se conservan para reconexiones
+        """
+        with self._lock:
+            self.habilitado = habilitado
+            self.intervalo = max(0.01, intervalo_ms / 1000)
+            self.tamano_historial = max(1, int(historial))
+            self._historial = deque(self._historial, maxlen=self.tamano_historial)
+
+    def configurar_desde_ini(self, config) -> None:
+        """
+        Configurar desde la sección [notifications] de un ConfigParser.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        self.configurar(
+            habilitado=config.getboolean('notifications', 'enabled', fallback=True),
+            intervalo_ms=config.getfloat('notifications', 'poll_interval_ms', fallback=200),
+            historial=config.getint('notifications', 'history_size', fallback=1000)
+        )
+
+    # ------------------------------------------------------------------
+    # Suscripciones
+    # ------------------------------------------------------------------
+    def suscribir(self, callback: Callable[[Dict[str, Any]], None]) -> int:
+        """
+        Registrar un suscriptor.
+
+        Args:
+            callback: Función que recibe cada evento (dict con version, tipo,
+                      id_producto, campos cambiados y CAMPOS_PRODUCTO)
+
+        Returns:
+            Identificador para desuscribir
+        """
+        with self._lock:
+            self._siguiente_suscriptor += 1
+            self._suscriptores[self._siguiente_suscriptor] = callback
+            return self._siguiente_suscriptor
+
+    def desuscribir(self, identificador: int) -> None:
+        """
+        Quitar un suscriptor (sin efecto si ya no existe).
+
+        Args:
+            identificador: Valor devuelto por suscribir()
+        """
+        with self._lock:
+            self._suscriptores.pop(identificador, None)
+
+    @property
+    def version(self) -> int:
+        """Versión del último evento publicado."""
+        return self._version
+
+    def eventos_desde(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Eventos posteriores a una versión, para reconexiones.
+
+        Args:
+            version: Última versión que recibió el cliente
+
+        Returns:
+            Eventos en orden, o None si el historial ya no los cubre o la
+            versión es posterior a la actual (el proceso se reinició): el
+            cliente debe recargar su caché completa
+        """
+        with self._lock:
+            if version > self._version:
+                return None
+            if version == self._version:
+                return []
+            if not self._historial or self._historial[0]['version'] > version + 1:
+                return None
+            return [evento for evento in self._historial if evento['version'] > version]
+
+    # ------------------------------------------------------------------
+    # Publicación
+    # ------------------------------------------------------------------
+    def publicar_productos(self, conexion, ids: Iterable[int]) -> int:
+        """
+        Releer productos recién modificados y publicar los que cambiaron.
+
+        Llamar después del commit (leer antes publicaría cambios que un
+        rollback podría deshacer). Un error de lectura no se propaga: la
+        escritura del llamador ya está confirmada.
+
+        Args:
+            conexion: Conexión SQLite (o DatabaseConnection) del llamador
+            ids: IDs de productos escritos
+
+        Returns:
+            Cantidad de eventos publicados
+        """
+        if not self.habilitado:
+            return 0
+        ids = list(dict.fromkeys(int(id_producto) for id_producto in ids if id_producto is not None))
+        if not ids:
+            return 0
+        if hasattr(conexion, 'get_connection'):
+            conexion = conexion.get_connection()
+
+        with self._publicando:
+            filas = {}
+            try:
+                for inicio in range(0, len(ids), LOTE_IN):
+                    lote = ids[inicio:inicio + LOTE_IN]
+                    marcas = ', '.join('?' * len(lote))
+                    for fila in conexion.execute(
+                        f"SELECT id_producto, nombre, stock, precio, activo FROM productos "
+                        f"WHERE id_producto IN ({marcas})", lote
+                    ):
+                        filas[fila[0]] = (fila[1], fila[2], fila[3], bool(fila[4]))
+            except sqlite3.Error as e:
+                # El cambio ya está confirmado: el sondeo lo publicará en el próximo ciclo
+                self._logger.warning(f"No se pudieron releer productos para notificar: {e}")
+                return 0
+            return self._emitir(ids, filas)
+
+    def _emitir(self, ids: List[int], filas: Dict[int, Tuple[Any, ...]]) -> int:
+        """Comparar con el último estado publicado, versionar y notificar."""
+        eventos = []
+        with self._lock:
+            for id_producto in ids:
+                actual = filas.get(id_producto, ELIMINADO)
+                previo = self._estado.get(id_producto)
+                if actual == previo:
+                    self._stats['suprimidos'] += 1
+                    continue
+                self._estado[id_producto] = actual
+                if actual == ELIMINADO:
+                    evento = {'tipo': 'eliminado', 'id_producto': id_producto, 'campos': []}
+                else:
+                    campos = [
+                        campo for indice, campo in enumerate(CAMPOS_PRODUCTO)
+                        if not previo or previo[indice] != actual[indice]
+                    ]
+                    evento = {'tipo': 'producto', 'id_producto': id_producto, 'campos': campos}
+                    evento.update(zip(CAMPOS_PRODUCTO, actual))
+                self._version += 1
+                evento['version'] = self._version
+                evento['fecha'] = time.time()
+                self._historial.append(evento)
+                eventos.append(evento)
+            self._stats['publicados'] += len(eventos)
+            suscriptores = list(self._suscriptores.values())
+
+        for evento in eventos:
+            for callback in suscriptores:
+                try:
+                    callback(evento)
+                except Exception as e:
+                    self._logger.error(f"Error notificando cambio de producto {evento['id_producto']}: {e}")
+        return len(eventos)
+
+    # ------------------------------------------------------------------
+    # Hilo de sondeo (cambios de otros procesos)
+    # ------------------------------------------------------------------
+    def iniciar(self, ruta: str) -> Optional[threading.Thread]:
+        """
+        Iniciar el hilo que detecta commits de otros procesos.
+
+        Args:
+            ruta: Archivo de la base de datos
+
+        Returns:
+            Hilo iniciado, o None si está deshabilitado o ya en curso
+        """
+        if not self.habilitado or ruta in (None, '', ':memory:'):
+            return None
+        if self._thread is not None and self._thread.is_alive():
+            return None
+
+        self._ruta = os.path.abspath(ruta)
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._worker, name="ChangeNotifierWorker", daemon=True)
+        self._thread.start()
+        self._logger.info(f"Notificaciones de cambios iniciadas para {self._ruta}")
+        return self._thread
+
+    def detener(self, timeout: float = 2.0) -> None:
+        """
+        Detener el hilo de sondeo.
+
+        Args:
+            timeout: Segundos máximos de espera
+        """
+        self._detener.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Métricas del notificador.
+
+        Returns:
+            Eventos publicados y suprimidos (sin cambios), sondeos de
+            data_version, sondeos con commits ajenos, filas del registro de
+            cambios leídas, suscriptores, versión e historial
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['suscriptores'] = len(self._suscriptores)
+            stats['historial'] = len(self._historial)
+        stats['version'] = self._version
+        stats['instancia'] = self.instancia
+        stats['habilitado'] = self.habilitado
+        stats['activo'] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+    def reiniciar_estadisticas(self) -> None:
+        """Descartar las métricas acumuladas."""
+        with self._lock:
+            self._stats = self._stats_vacias()
+
+    @staticmethod
+    def _stats_vacias() -> Dict[str, Any]:
+        return {
+            'publicados': 0,
+            'suprimidos': 0,
+            'sondeos': 0,
+            'sondeos_con_cambios': 0,
+            'cambios_leidos': 0,
+        }
+
+    def _worker(self) -> None:
+        """Sondear PRAGMA data_version y publicar los productos del registro de cambios."""
+        try:
+            conexion = sqlite3.connect(self._ruta, isolation_level=None)
+            conexion.execute("PRAGMA query_only = 1")
+            conexion.execute("PRAGMA busy_timeout = 1000")
+            ultimo_cambio = conexion.execute("SELECT COALESCE(MAX(id_cambio), 0) FROM cambios").fetchone()[0]
+            version_datos = conexion.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            self._logger.error(f"No se pudo iniciar el sondeo de cambios: {e}")
+            return
+
+        try:
+            while not self._detener.wait(self.intervalo):
+                actual = conexion.execute("PRAGMA data_version").fetchone()[0]
+                with self._lock:
+                    self._stats['sondeos'] += 1
+                if actual == version_datos:
+                    continue
+                version_datos = actual
+
+                try:
+                    filas = conexion.execute("""
+                        SELECT id_cambio,
+                               CASE tabla WHEN 'productos' THEN id_fila
+                                          WHEN 'movimientos' THEN json_extract(datos, '$.id_producto') END
+                        FROM cambios
+                        WHERE id_cambio > ?
+                        ORDER BY id_cambio
+                    """, (ultimo_cambio,)).fetchall()
+                    if not filas:
+                        continue
+                    ultimo_cambio = filas[-1][0]
+                    ids = [fila[1] for fila in filas if fila[1] is not None]
+                    if not ids:
+                        continue
+                    with self._lock:
+                        self._stats['sondeos_con_cambios'] += 1
+                        self._stats['cambios_leidos'] += len(filas)
+                    self.publicar_productos(conexion, ids)
+                except sqlite3.OperationalError as e:
+                    # Base ocupada: el próximo commit vuelve a cambiar data_version
+                    self._logger.debug(f"Lectura de cambios pospuesta: {e}")
+                    version_datos = None
+        except Exception as e:
+            self._logger.error(f"Error en el sondeo de cambios: {e}")
+        finally:
+            conexion.close()
+
+
+# Notificador global del proceso
+change_notifier = ChangeNotifier()
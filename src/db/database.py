@@ -5,9 +5,58 @@ Implementado siguiendo metodología TDD - debe satisfacer todos los tests.
 
 import sqlite3
 import os
+import hashlib
 import logging
-from typing import Optional
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
 from src.infrastructure.security.password_hasher import PasswordHasher
+from .query_metrics import query_metrics
+from .storage_profiles import storage_profiles
+from .wal_checkpoint import checkpoint_manager
+
+# Catálogos con sello de versión (tabla versiones_catalogo, schema v10)
+CATALOGOS_VERSIONADOS = ('productos', 'clientes', 'categorias')
+
+# Tablas con claves foráneas (hijas o referenciadas) que también llevan
+# contador de escrituras, para verificar solo lo que cambió (schema v11)
+TABLAS_CON_VERSION = CATALOGOS_VERSIONADOS + (
+    'ventas', 'detalle_ventas', 'tickets',
+    'inventario_cierres', 'inventario_snapshot', 'reposicion_sugerida'
+)
+
+# Libros que se escriben en cada cambio de stock: sin contador (schema v14),
+# la verificación incremental los revisa cuando crece su rowid máximo
+TABLAS_POR_ROWID = ('movimientos', 'capas_costo')
+
+# Tablas con registro de cambios para sincronizar entre terminales (schema v12)
+TABLAS_SINCRONIZADAS = ('categorias', 'clientes', 'productos', 'ventas', 'movimientos')
+
+# Columnas que cada terminal deriva de su libro de movimientos: un UPDATE
+# que solo las cambia no se registra y no se copian de otros nodos
+COLUMNAS_DERIVADAS = {'productos': ('stock', 'costo_promedio')}
+
+# Sello de fecha que se actualiza junto con las columnas derivadas: no
+# convierte un UPDATE de stock en un cambio del catálogo (schema v16)
+COLUMNAS_SELLO = ('fecha_modificacion',)
+
+# Columnas monetarias y su escala entera (schema v13): centavos para precios
+# y totales, diezmilésimas para costos (models.money.Money y Cost)
+COLUMNAS_MONETARIAS = {
+    'productos': {'precio': 100, 'costo': 10000, 'costo_promedio': 10000},
+    'ventas': {'subtotal': 100, 'impuestos': 100, 'total': 100},
+    'detalle_ventas': {'precio_unitario': 100, 'subtotal_item': 100, 'impuesto_item': 100,
+                       'descuento': 100, 'costo_unitario': 10000, 'costo_total': 10000},
+    'movimientos': {'costo_unitario': 10000},
+    'capas_costo': {'costo_unitario': 10000},
+    'inventario_cierres': {'valor_total': 100},
+    'inventario_snapshot': {'costo': 10000, 'valor': 100},
+    'resumen_ventas_mensual': {'ingresos': 100, 'impuestos': 100, 'costo': 10000},
+    'resumen_movimientos_mensual': {'costo': 10000},
+}
+
+# Versión que dejan create_tables y las migraciones
+SCHEMA_VERSION = 16
 
 
 class DatabaseConnection:
@@ -16,23 +65,28 @@ class DatabaseConnection:
     Implementa el patrón Singleton para la conexión.
     """
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, profile: Optional[str] = None):
         """
         Inicializar conexión de base de datos.
         
         Args:
             db_path: Ruta al archivo de base de datos SQLite
+            profile: Perfil de almacenamiento (None = storage_profile de config.ini)
         """
         self.db_path = db_path
+        self.profile = profile or storage_profiles.perfil_por_defecto
         self._connection: Optional[sqlite3.Connection] = None
         self._logger = logging.getLogger(__name__)
         self._initialize_connection()
     
     def _initialize_connection(self):
         """Inicializar la conexión con configuraciones optimizadas."""
+        settings = storage_profiles.obtener(self.profile)
         self._connection = sqlite3.connect(
             self.db_path,
-            check_same_thread=False  # Permitir uso en múltiples threads si es necesario
+            check_same_thread=False,  # Permitir uso en múltiples threads si es necesario
+            cached_statements=settings['cached_statements'],
+            factory=query_metrics.connection_factory()  # Instrumentada solo si [metrics] enabled
         )
         self._connection.row_factory = sqlite3.Row  # Acceso por nombre de columna
         
@@ -42,8 +96,88 @@ class DatabaseConnection:
         # Configurar journal mode para mejor concurrencia
         self._connection.execute("PRAGMA journal_mode = WAL")
         
+        # synchronous, caché, mmap, busy_timeout y checkpoints según el perfil
+        storage_profiles.aplicar(self._connection, self.profile)
+        
+        # Con el gestor de checkpoints activo, los checkpoints no caen en los commits
+        checkpoint_manager.configurar_conexion(self._connection)
+        
         self._connection.commit()
     
+    def apply_profile(self, profile: str):
+        """
+        Cambiar el perfil de almacenamiento de la conexión abierta.
+        
+        Debe llamarse fuera de una transacción (SQLite no permite cambiar
+        synchronous dentro de una). cached_statements conserva el valor con
+        que se abrió la conexión.
+        
+        Args:
+            profile: Nombre del perfil (pos-safe, bulk-load, reporting, ...)
+        """
+        storage_profiles.aplicar(self.get_connection(), profile)
+        checkpoint_manager.configurar_conexion(self.get_connection())
+        self.profile = profile
+    
+    @contextmanager
+    def use_profile(self, profile: str):
+        """
+        Usar temporalmente otro perfil (por ejemplo, bulk-load en una carga masiva).
+        
+        El bloque debe confirmar sus cambios; si termina con una excepción
+        y una transacción abierta, se revierte antes de restaurar el perfil.
+        
+        Args:
+            profile: Nombre del perfil durante el bloque
+        """
+        previous = self.profile
+        self.apply_profile(profile)
+        try:
+            yield self
+        except BaseException:
+            if self._connection is not None and self._connection.in_transaction:
+                self._connection.rollback()
+            raise
+        finally:
+            self.apply_profile(previous)
+    
+    @contextmanager
+    def read_connection(self, descripcion: str,
+                        preparar: Optional[Callable[[sqlite3.Connection], Any]] = None):
+        """
+        Abrir una conexión de solo lectura registrada para lecturas largas (reportes).
+        
+        La lectura usa su propia conexión con el perfil reporting, fuera de
+        la conexión de caja, y queda registrada en el gestor de checkpoints
+        mientras dura. Cada consulta toma su propio snapshot: un snapshot
+        fijo para todo el reporte retiene el WAL hasta que termina y, con
+        reportes seguidos, impide reiniciarlo. Con una base en memoria se
+        usa la conexión compartida.
+        
+        Args:
+            descripcion: Nombre de la lectura para métricas y advertencias
+            preparar: Función (conexión) ejecutada antes de activar query_only
+                (p.ej. ATTACH del archivo y sus vistas temporales)
+        
+        Yields:
+            DatabaseConnection de la lectura
+        """
+        if self.db_path in (None, '', ':memory:'):
+            with checkpoint_manager.lector_largo(descripcion):
+                yield self
+            return
+        
+        lectura = DatabaseConnection(self.db_path, profile='reporting')
+        try:
+            conn = lectura.get_connection()
+            if preparar is not None:
+                preparar(conn)
+            conn.execute("PRAGMA query_only = ON")
+            with checkpoint_manager.lector_largo(descripcion):
+                yield lectura
+        finally:
+            lectura.close()
+    
     def migrate_legacy_passwords(self) -> dict:
         """
         Migrar passwords legacy al formato PasswordHasher.
@@ -146,7 +280,13 @@ class DatabaseConnection:
         """
         Crear todas las tablas necesarias del sistema.
         Schema basado en los requerimientos del sistema de inventario.
+        
+        Si user_version y la huella de sqlite_master coinciden con lo que
+        dejó la última ejecución, no hay nada que migrar y se omite el schema.
         """
+        if self.schema_is_current():
+            return
+        
         schema_sql = """
         -- Tabla de usuarios del sistema
         CREATE TABLE IF NOT EXISTS usuarios (
@@ -182,6 +322,7 @@ class DatabaseConnection:
             activo BOOLEAN DEFAULT 1,
             fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
             fecha_modificacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+            costo_promedio DECIMAL(10,4),
             FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria) ON DELETE RESTRICT
         );
 
@@ -195,7 +336,8 @@ class DatabaseConnection:
             email VARCHAR(100),
             direccion TEXT,
             activo BOOLEAN DEFAULT 1,
-            fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP
+            fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+            nombre_normalizado VARCHAR(60)
         );
 
         -- Tabla de ventas (cabecera)
@@ -223,6 +365,8 @@ class DatabaseConnection:
             subtotal_item DECIMAL(10,2) NOT NULL,
             impuesto_item DECIMAL(10,2) DEFAULT 0,
             descuento DECIMAL(10,2) DEFAULT 0,
+            costo_unitario DECIMAL(10,4),
+            costo_total DECIMAL(12,4),
             FOREIGN KEY (id_venta) REFERENCES ventas(id_venta) ON DELETE CASCADE,
             FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE RESTRICT
         );
@@ -283,6 +427,88 @@ class DatabaseConnection:
             FOREIGN KEY (id_movimiento) REFERENCES movimientos(id_movimiento) ON DELETE SET NULL
         );
 
+        -- Sugerencias de reposición calculadas por ReplenishmentService
+        CREATE TABLE IF NOT EXISTS reposicion_sugerida (
+            id_producto INTEGER PRIMARY KEY,
+            demanda_diaria REAL NOT NULL DEFAULT 0,
+            desviacion_diaria REAL NOT NULL DEFAULT 0,
+            stock_seguridad INTEGER NOT NULL DEFAULT 0,
+            punto_reorden INTEGER NOT NULL DEFAULT 0,
+            stock_minimo_sugerido INTEGER NOT NULL DEFAULT 0,
+            cantidad_reorden INTEGER NOT NULL DEFAULT 0,
+            metodo VARCHAR(20) NOT NULL,
+            dias_historia INTEGER NOT NULL,
+            fecha_calculo DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE CASCADE
+        );
+
+        -- Cierres de inventario (stock por producto a una fecha de corte)
+        CREATE TABLE IF NOT EXISTS inventario_cierres (
+            id_cierre INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_corte DATE NOT NULL UNIQUE,
+            total_productos INTEGER DEFAULT 0,
+            total_unidades INTEGER DEFAULT 0,
+            valor_total DECIMAL(14,2) DEFAULT 0,
+            responsable VARCHAR(60),
+            fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS inventario_snapshot (
+            id_cierre INTEGER NOT NULL,
+            id_producto INTEGER NOT NULL,
+            stock INTEGER NOT NULL,
+            costo DECIMAL(10,4) DEFAULT 0,
+            valor DECIMAL(14,2) DEFAULT 0,
+            PRIMARY KEY (id_cierre, id_producto),
+            FOREIGN KEY (id_cierre) REFERENCES inventario_cierres(id_cierre) ON DELETE CASCADE,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+
+        -- Capas de costo de inventario (CostService): una por entrada, consumidas en orden FIFO
+        CREATE TABLE IF NOT EXISTS capas_costo (
+            id_capa INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_producto INTEGER NOT NULL,
+            id_movimiento INTEGER,
+            origen VARCHAR(20) NOT NULL CHECK (origen IN ('APERTURA', 'ENTRADA', 'AJUSTE')),
+            cantidad_inicial INTEGER NOT NULL,
+            cantidad_restante INTEGER NOT NULL,
+            costo_unitario DECIMAL(10,4) NOT NULL DEFAULT 0,
+            fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (id_producto) REFERENCES productos(id_producto) ON DELETE CASCADE
+        );
+
+        -- Archivado de períodos cerrados (ArchiveService): cortes y resúmenes mensuales
+        CREATE TABLE IF NOT EXISTS archivo_periodos (
+            id_archivo INTEGER PRIMARY KEY AUTOINCREMENT,
+            hasta DATE NOT NULL UNIQUE,
+            ventas INTEGER DEFAULT 0,
+            detalles INTEGER DEFAULT 0,
+            movimientos INTEGER DEFAULT 0,
+            responsable VARCHAR(60),
+            fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS resumen_ventas_mensual (
+            periodo VARCHAR(7) NOT NULL,
+            id_producto INTEGER NOT NULL,
+            lineas INTEGER NOT NULL DEFAULT 0,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            ingresos DECIMAL(14,2) NOT NULL DEFAULT 0,
+            impuestos DECIMAL(14,2) NOT NULL DEFAULT 0,
+            costo DECIMAL(14,4) NOT NULL DEFAULT 0,
+            PRIMARY KEY (periodo, id_producto)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS resumen_movimientos_mensual (
+            periodo VARCHAR(7) NOT NULL,
+            id_producto INTEGER NOT NULL,
+            tipo_movimiento VARCHAR(20) NOT NULL,
+            movimientos INTEGER NOT NULL DEFAULT 0,
+            unidades INTEGER NOT NULL DEFAULT 0,
+            costo DECIMAL(14,4) NOT NULL DEFAULT 0,
+            PRIMARY KEY (periodo, id_producto, tipo_movimiento)
+        ) WITHOUT ROWID;
+
         -- Tabla para control de versiones de base de datos
         CREATE TABLE IF NOT EXISTS db_version (
             version INTEGER PRIMARY KEY,
@@ -315,8 +541,418 @@ class DatabaseConnection:
         # Establecer versión inicial de base de datos
         self._set_database_version(3, "Schema con sistema de tickets - FASE 3")
         
+        # Migraciones incrementales sobre bases de datos existentes
+        self._apply_migrations()
+        
+        self._store_schema_fingerprint()
         self._connection.commit()
     
+    def _column_exists(self, table: str, column: str) -> bool:
+        """
+        Verificar si una columna existe en una tabla.
+        
+        Args:
+            table: Nombre de la tabla
+            column: Nombre de la columna
+            
+        Returns:
+            True si la columna existe
+        """
+        cursor = self._connection.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+    
+    def _add_column_if_missing(self, table: str, column: str, definition: str) -> bool:
+        """
+        Agregar una columna si no existe (ALTER TABLE idempotente).
+        
+        Args:
+            table: Nombre de la tabla
+            column: Nombre de la columna
+            definition: Tipo y restricciones de la columna
+            
+        Returns:
+            True si la columna fue agregada
+        """
+        if self._column_exists(table, column):
+            return False
+        self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+    
+    def _apply_migrations(self):
+        """
+        Aplicar migraciones de schema posteriores a la versión 3.
+        
+        Cada paso es idempotente para poder ejecutarse en cada arranque.
+        """
+        # Versión 4: búsqueda indexada de clientes por nombre normalizado
+        self._add_column_if_missing('clientes', 'nombre_normalizado', 'VARCHAR(60)')
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_clientes_nombre_normalizado "
+            "ON clientes(nombre_normalizado) WHERE activo = 1"
+        )
+        self._set_database_version(4, "Búsqueda indexada de clientes por nombre normalizado")
+        
+        # Versión 5: demanda diaria por tipo de movimiento para reposición (índice cubriente)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movimientos_tipo_fecha "
+            "ON movimientos(tipo_movimiento, fecha_movimiento, id_producto, cantidad)"
+        )
+        self._set_database_version(5, "Sugerencias de reposición y demanda por tipo de movimiento")
+        
+        # Versión 6: cierres de inventario (tablas creadas en el schema base)
+        self._set_database_version(6, "Cierres periódicos de inventario para consultas a fecha de corte")
+        
+        # Versión 7: costo de venta registrado por línea (capas de costo y costo promedio)
+        self._add_column_if_missing('productos', 'costo_promedio', 'DECIMAL(10,4)')
+        self._add_column_if_missing('detalle_ventas', 'costo_unitario', 'DECIMAL(10,4)')
+        self._add_column_if_missing('detalle_ventas', 'costo_total', 'DECIMAL(12,4)')
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_capas_costo_abiertas "
+            "ON capas_costo(id_producto, id_capa) WHERE cantidad_restante > 0"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_detalle_ventas_rentabilidad "
+            "ON detalle_ventas(id_venta, id_producto, cantidad, subtotal_item, costo_total)"
+        )
+        if not self._version_applied(7):
+            # Existencias actuales como capa de apertura al costo del producto;
+            # los movimientos anteriores quedan fuera del costeo
+            self._connection.execute(
+                "UPDATE productos SET costo_promedio = COALESCE(costo, 0) WHERE costo_promedio IS NULL"
+            )
+            self._connection.execute("""
+                INSERT INTO capas_costo (
+                    id_producto, id_movimiento, origen, cantidad_inicial, cantidad_restante, costo_unitario
+                )
+                SELECT p.id_producto,
+                       (SELECT COALESCE(MAX(id_movimiento), 0) FROM movimientos),
+                       'APERTURA', p.stock, p.stock, COALESCE(p.costo, 0)
+                FROM productos p
+                JOIN categorias c ON c.id_categoria = p.id_categoria
+                WHERE c.tipo = 'MATERIAL' AND p.stock > 0
+            """)
+        self._set_database_version(7, "Costo de venta por línea con capas de costo")
+        
+        # Versión 8: archivado de períodos cerrados (tablas creadas en el schema base)
+        self._set_database_version(8, "Archivado de períodos cerrados y resúmenes mensuales")
+
+        # Versión 9: historial de movimientos paginado por (fecha, id) con filtros indexados
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movimientos_responsable "
+            "ON movimientos(responsable COLLATE NOCASE, fecha_movimiento)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_movimientos_producto_fecha "
+            "ON movimientos(id_producto, fecha_movimiento)"
+        )
+        self._set_database_version(9, "Historial de movimientos paginado con filtros indexados")
+
+        # Versión 10: sello de versión por catálogo (productos, clientes, categorías)
+        # para que las ventanas reutilizadas recarguen solo lo que cambió
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS versiones_catalogo (
+                catalogo TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        for catalogo in CATALOGOS_VERSIONADOS:
+            self._create_version_triggers(catalogo)
+        self._set_database_version(10, "Versión por catálogo para refrescar ventanas reutilizadas")
+
+        # Versión 11: verificaciones de integridad en background, incrementales por tabla
+        for tabla in TABLAS_CON_VERSION:
+            self._create_version_triggers(tabla)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS estado_integridad (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            )
+        """)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS verificaciones_integridad (
+                id_verificacion INTEGER PRIMARY KEY AUTOINCREMENT,
+                fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+                tipo VARCHAR(20) NOT NULL
+                    CHECK (tipo IN ('CLAVES_FORANEAS', 'QUICK_CHECK', 'CONCILIACION_STOCK')),
+                alcance VARCHAR(12) NOT NULL CHECK (alcance IN ('COMPLETA', 'INCREMENTAL')),
+                tablas TEXT,
+                problemas INTEGER NOT NULL DEFAULT 0,
+                duracion_ms REAL,
+                detalle TEXT
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_verificaciones_tipo "
+            "ON verificaciones_integridad(tipo, id_verificacion)"
+        )
+        self._set_database_version(11, "Verificaciones de integridad incrementales en background")
+
+        # Versión 12: registro de cambios (CDC) para sincronizar terminales.
+        # sync_contexto tiene una sola fila: el nodo local y, mientras se
+        # aplican cambios de otro nodo, su origen y fecha originales
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS cambios (
+                id_cambio INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla VARCHAR(30) NOT NULL,
+                id_fila INTEGER NOT NULL,
+                operacion VARCHAR(6) NOT NULL CHECK (operacion IN ('INSERT', 'UPDATE', 'DELETE')),
+                origen VARCHAR(32) NOT NULL,
+                fecha VARCHAR(24) NOT NULL,
+                datos TEXT
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cambios_fila ON cambios(tabla, id_fila, id_cambio)"
+        )
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS sync_contexto (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                nodo VARCHAR(32) NOT NULL,
+                origen VARCHAR(32),
+                fecha VARCHAR(24),
+                registrar INTEGER NOT NULL DEFAULT 1,
+                habilitado INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._connection.execute(
+            "INSERT OR IGNORE INTO sync_contexto (id, nodo) VALUES (1, ?)", (uuid.uuid4().hex,)
+        )
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS sync_identidades (
+                tabla VARCHAR(30) NOT NULL,
+                nodo VARCHAR(32) NOT NULL,
+                id_origen INTEGER NOT NULL,
+                id_local INTEGER NOT NULL,
+                creada INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (tabla, nodo, id_origen)
+            ) WITHOUT ROWID
+        """)
+        # creada = 1: la fila local nació de esa identidad remota (una por fila);
+        # creada = 0: alias de una fila local con la misma clave natural
+        self._connection.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_identidades_local "
+            "ON sync_identidades(tabla, id_local) WHERE creada = 1"
+        )
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS sync_pares (
+                nodo VARCHAR(32) PRIMARY KEY,
+                url TEXT,
+                recibido_hasta INTEGER NOT NULL DEFAULT 0,
+                entregado_hasta INTEGER NOT NULL DEFAULT 0,
+                fecha_sync DATETIME
+            )
+        """)
+        # Bases creadas antes de la v15: el registro seguía activo sin [sync]
+        if self._add_column_if_missing('sync_contexto', 'habilitado', 'INTEGER NOT NULL DEFAULT 0'):
+            self._connection.execute("UPDATE sync_contexto SET habilitado = 1")
+        for tabla in TABLAS_SINCRONIZADAS:
+            self._create_change_triggers(tabla)
+        self._set_database_version(12, "Registro de cambios para sincronización entre terminales")
+        
+        # Versión 13: montos guardados en centavos (diezmilésimas para costos)
+        # exactos, para que las sumas enteras en SQL (Money.sql) no cambien
+        # ningún valor. Es una normalización local: cada nodo la aplica al
+        # migrar y no se registra en cambios
+        if not self._version_applied(13):
+            self._connection.execute("UPDATE sync_contexto SET registrar = 0")
+            for tabla, columnas in COLUMNAS_MONETARIAS.items():
+                for columna, escala in columnas.items():
+                    if not self._column_exists(tabla, columna):
+                        continue
+                    exacto = f"CAST(ROUND({columna} * {escala}) AS INTEGER) / {escala}.0"
+                    self._connection.execute(
+                        f"UPDATE {tabla} SET {columna} = {exacto} WHERE {columna} <> {exacto}"
+                    )
+            self._connection.execute("UPDATE sync_contexto SET registrar = 1")
+        self._set_database_version(13, "Montos en centavos exactos para sumas enteras")
+
+        # Versión 14: los contadores de versión no cuentan los UPDATE de stock
+        # ni las escrituras de los libros (movimientos, capas_costo), que la
+        # verificación incremental detecta por rowid
+        if not self._version_applied(14):
+            for catalogo in COLUMNAS_DERIVADAS:
+                if catalogo in TABLAS_CON_VERSION:
+                    self._connection.execute(f"DROP TRIGGER IF EXISTS trg_version_{catalogo}_update")
+                    self._create_version_triggers(catalogo)
+            for tabla in TABLAS_POR_ROWID:
+                for operacion in ('insert', 'update', 'delete'):
+                    self._connection.execute(f"DROP TRIGGER IF EXISTS trg_version_{tabla}_{operacion}")
+                self._connection.execute("DELETE FROM versiones_catalogo WHERE catalogo = ?", (tabla,))
+        self._set_database_version(14, "Contadores de versión sin stock ni libros de movimientos")
+
+        # Versión 15: sin registro de cambios mientras [sync] está
+        # deshabilitado (sync_contexto.habilitado, ver set_change_logging)
+        if not self._version_applied(15):
+            for tabla in TABLAS_SINCRONIZADAS:
+                for operacion in ('insert', 'update', 'delete'):
+                    self._connection.execute(f"DROP TRIGGER IF EXISTS trg_cambios_{tabla}_{operacion}")
+                self._create_change_triggers(tabla)
+        self._set_database_version(15, "Registro de cambios solo con sincronización habilitada")
+
+        # Versión 16: un UPDATE de stock con su fecha_modificacion no cuenta
+        # como cambio del catálogo ni se registra (COLUMNAS_SELLO)
+        if not self._version_applied(16):
+            for tabla in COLUMNAS_DERIVADAS:
+                self._connection.execute(f"DROP TRIGGER IF EXISTS trg_cambios_{tabla}_update")
+                self._create_change_triggers(tabla)
+                if tabla in TABLAS_CON_VERSION:
+                    self._connection.execute(f"DROP TRIGGER IF EXISTS trg_version_{tabla}_update")
+                    self._create_version_triggers(tabla)
+        self._set_database_version(16, "Actualizaciones de stock con su sello de fecha fuera del catálogo")
+
+    def _change_payload(self, tabla: str, alias: str):
+        """
+        Columna clave y expresión json_object con la fila completa de una tabla.
+        
+        Args:
+            tabla: Tabla sincronizada
+            alias: NEW, OLD o alias de la tabla en un SELECT
+            
+        Returns:
+            Tupla (columna clave primaria, expresión SQL del JSON)
+        """
+        columnas = self._connection.execute(f"PRAGMA table_info({tabla})").fetchall()
+        clave = next(col[1] for col in columnas if col[5] == 1)
+        pares = ', '.join(f"'{col[1]}', {alias}.{col[1]}" for col in columnas)
+        return clave, f"json_object({pares})"
+
+    def _create_change_triggers(self, tabla: str):
+        """
+        Crear los triggers que registran los cambios de una tabla en cambios.
+        
+        Registran el origen y la fecha de sync_contexto si se están aplicando
+        cambios de otro nodo, o el nodo local y la hora actual. No registran
+        nada con sync_contexto.habilitado = 0 (sincronización deshabilitada)
+        o registrar = 0 (archivado de períodos), ni los UPDATE que solo
+        cambian COLUMNAS_DERIVADAS.
+        
+        Args:
+            tabla: Tabla de TABLAS_SINCRONIZADAS
+        """
+        clave, datos = self._change_payload(tabla, 'NEW')
+        cambio_propio = self._own_change_condition(tabla)
+        if cambio_propio:
+            cambio_propio = f" AND {cambio_propio}"
+        registrar = "(SELECT habilitado AND registrar FROM sync_contexto WHERE id = 1)"
+        origen = "COALESCE(c.origen, c.nodo), COALESCE(c.fecha, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+        for operacion, fila, condicion, carga in (
+            ('INSERT', 'NEW', '', datos),
+            ('UPDATE', 'NEW', cambio_propio, datos),
+            ('DELETE', 'OLD', '', 'NULL'),
+        ):
+            self._connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_cambios_{tabla}_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                WHEN {registrar}{condicion}
+                BEGIN
+                    INSERT INTO cambios (tabla, id_fila, operacion, origen, fecha, datos)
+                    SELECT '{tabla}', {fila}.{clave}, '{operacion}', {origen}, {carga}
+                    FROM sync_contexto c WHERE c.id = 1;
+                END
+            """)
+
+    def set_change_logging(self, habilitado: bool) -> bool:
+        """
+        Activar o desactivar el registro de cambios para sincronizar.
+        
+        Al activarlo se registran las filas existentes como INSERT inicial
+        (los movimientos anteriores ya están reflejados en el stock de cada
+        producto y no se registran); al desactivarlo se vacía cambios, que
+        nadie va a pedir. Los id_cambio no se reutilizan (AUTOINCREMENT): los
+        pares retoman desde su última versión y reciben el INSERT inicial.
+        
+        Args:
+            habilitado: [sync] enabled
+            
+        Returns:
+            True si el estado cambió
+        """
+        conn = self.get_connection()
+        actual = conn.execute("SELECT habilitado FROM sync_contexto WHERE id = 1").fetchone()[0]
+        if bool(actual) == habilitado:
+            return False
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if habilitado:
+                for tabla in TABLAS_SINCRONIZADAS:
+                    if tabla == 'movimientos':
+                        continue
+                    clave, datos = self._change_payload(tabla, 'fila')
+                    conn.execute(f"""
+                        INSERT INTO cambios (tabla, id_fila, operacion, origen, fecha, datos)
+                        SELECT '{tabla}', fila.{clave}, 'INSERT', c.nodo,
+                               strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), {datos}
+                        FROM {tabla} AS fila, sync_contexto c WHERE c.id = 1
+                        ORDER BY fila.{clave}
+                    """)
+            else:
+                conn.execute("DELETE FROM cambios")
+            conn.execute("UPDATE sync_contexto SET habilitado = ? WHERE id = 1", (int(habilitado),))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return True
+
+    def _own_change_condition(self, tabla: str) -> str:
+        """
+        Condición de trigger UPDATE que excluye los cambios de COLUMNAS_DERIVADAS
+        (y de COLUMNAS_SELLO, que se actualizan con ellas).
+        
+        Args:
+            tabla: Tabla del trigger
+            
+        Returns:
+            "NOT (...)" si la tabla tiene columnas derivadas, o cadena vacía
+        """
+        derivadas = COLUMNAS_DERIVADAS.get(tabla, ())
+        if not derivadas:
+            return ''
+        columnas = [col[1] for col in self._connection.execute(f"PRAGMA table_info({tabla})")]
+        ignoradas = derivadas + COLUMNAS_SELLO
+        iguales = ' AND '.join(f"NEW.{col} IS OLD.{col}" for col in columnas if col not in ignoradas)
+        return f"NOT ({iguales})"
+
+    def _create_version_triggers(self, tabla: str):
+        """
+        Crear los triggers que incrementan el contador de escrituras de una tabla.
+        
+        Los UPDATE que solo cambian COLUMNAS_DERIVADAS (el stock que mueve
+        cada venta) no cuentan: no cambian lo que muestra el catálogo.
+        
+        Args:
+            tabla: Tabla con fila en versiones_catalogo
+        """
+        self._connection.execute(
+            "INSERT OR IGNORE INTO versiones_catalogo (catalogo, version) VALUES (?, 0)", (tabla,)
+        )
+        for operacion in ('INSERT', 'UPDATE', 'DELETE'):
+            condicion = self._own_change_condition(tabla) if operacion == 'UPDATE' else ''
+            cuando = f"WHEN {condicion}" if condicion else ''
+            self._connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_version_{tabla}_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                {cuando}
+                BEGIN
+                    UPDATE versiones_catalogo SET version = version + 1 WHERE catalogo = '{tabla}';
+                END
+            """)
+
+    def _version_applied(self, version: int) -> bool:
+        """
+        Verificar si una versión ya fue registrada en db_version.
+        
+        Args:
+            version: Número de versión
+            
+        Returns:
+            True si la versión ya fue aplicada
+        """
+        cursor = self._connection.execute("SELECT 1 FROM db_version WHERE version = ?", (version,))
+        return cursor.fetchone() is not None
+    
     def initialize_default_data(self):
         """
         Insertar datos iniciales necesarios para el funcionamiento del sistema.
@@ -324,13 +960,19 @@ class DatabaseConnection:
         """
         cursor = self._connection.cursor()
         
-        # Verificar si ya existe el usuario admin
-        cursor.execute(
-            "SELECT COUNT(*) FROM usuarios WHERE nombre_usuario = ? AND rol = ?",
-            ("admin", "ADMIN")
-        )
+        # Una sola consulta para saber qué datos iniciales ya existen
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM usuarios WHERE nombre_usuario = 'admin' AND rol = 'ADMIN'),
+                (SELECT COUNT(*) FROM company_config),
+                (SELECT group_concat(nombre || '|' || tipo, char(30)) FROM categorias),
+                (SELECT group_concat(ticket_type, char(30)) FROM ticket_numbering)
+        """)
+        admin_count, company_count, categories_found, ticket_types_found = cursor.fetchone()
+        existing_categories = set((categories_found or '').split('\x1e'))
+        existing_ticket_types = set((ticket_types_found or '').split('\x1e'))
         
-        if cursor.fetchone()[0] == 0:
+        if admin_count == 0:
             # Crear hash del password por defecto usando PasswordHasher
             default_password = "admin123"  # En producción debería ser más seguro
             password_hasher = PasswordHasher()
@@ -351,20 +993,14 @@ class DatabaseConnection:
         ]
         
         for nombre, tipo, descripcion in default_categories:
-            cursor.execute(
-                "SELECT COUNT(*) FROM categorias WHERE nombre = ? AND tipo = ?",
-                (nombre, tipo)
-            )
-            
-            if cursor.fetchone()[0] == 0:
+            if f"{nombre}|{tipo}" not in existing_categories:
                 cursor.execute("""
                     INSERT INTO categorias (nombre, tipo, descripcion)
                     VALUES (?, ?, ?)
                 """, (nombre, tipo, descripcion))
         
         # Insertar configuración inicial de empresa (FASE 3)
-        cursor.execute("SELECT COUNT(*) FROM company_config")
-        if cursor.fetchone()[0] == 0:
+        if company_count == 0:
             cursor.execute("""
                 INSERT INTO company_config (
                     id, nombre, ruc, direccion, telefono, email, itbms_rate, moneda
@@ -386,12 +1022,7 @@ class DatabaseConnection:
         ]
         
         for ticket_type, prefix, suffix in ticket_types:
-            cursor.execute(
-                "SELECT COUNT(*) FROM ticket_numbering WHERE ticket_type = ?",
-                (ticket_type,)
-            )
-            
-            if cursor.fetchone()[0] == 0:
+            if ticket_type not in existing_ticket_types:
                 cursor.execute("""
                     INSERT INTO ticket_numbering (ticket_type, last_number, prefix, suffix)
                     VALUES (?, ?, ?, ?)
@@ -421,6 +1052,24 @@ class DatabaseConnection:
         # Establecer versión en PRAGMA para compatibilidad
         cursor.execute(f"PRAGMA user_version = {version}")
     
+    def get_catalog_versions(self) -> Dict[str, int]:
+        """
+        Obtener el sello de versión de cada catálogo.
+        
+        Los triggers del schema v10 incrementan la versión en cada INSERT,
+        UPDATE o DELETE del catálogo, venga de cualquier conexión, salvo los
+        UPDATE de COLUMNAS_DERIVADAS (v14). Desde v11 incluye también el
+        resto de TABLAS_CON_VERSION.
+        
+        Returns:
+            Diccionario catálogo -> versión (vacío si el schema es anterior a v10)
+        """
+        try:
+            cursor = self.get_connection().execute("SELECT catalogo, version FROM versiones_catalogo")
+            return {catalogo: version for catalogo, version in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            return {}
+    
     def get_database_version(self) -> int:
         """
         Obtener versión actual de base de datos.
@@ -432,10 +1081,62 @@ class DatabaseConnection:
         cursor.execute("PRAGMA user_version")
         return cursor.fetchone()[0]
     
-    def verify_schema_integrity(self) -> bool:
+    def get_schema_fingerprint(self) -> str:
+        """
+        Calcular la huella del schema (hash del contenido de sqlite_master).
+        
+        Las tablas internas sqlite_* (p.ej. sqlite_stat1 tras ANALYZE) no
+        forman parte de la huella.
+        
+        Returns:
+            Hash SHA-256 en hexadecimal
+        """
+        cursor = self.get_connection().execute(
+            "SELECT type, name, tbl_name, COALESCE(sql, '') FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        )
+        digest = hashlib.sha256()
+        for row in cursor.fetchall():
+            digest.update('\x1f'.join(row).encode('utf-8'))
+            digest.update(b'\x1e')
+        return digest.hexdigest()
+    
+    def schema_is_current(self) -> bool:
+        """
+        Verificación rápida del schema para el arranque.
+        
+        Returns:
+            True si user_version es SCHEMA_VERSION y la huella de sqlite_master
+            coincide con la guardada por create_tables
+        """
+        try:
+            if self.get_database_version() != SCHEMA_VERSION:
+                return False
+            row = self.get_connection().execute(
+                "SELECT valor FROM estado_integridad WHERE clave = 'huella_schema'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return False
+        return row is not None and row[0] == self.get_schema_fingerprint()
+    
+    def _store_schema_fingerprint(self):
+        """Guardar la huella del schema tras crear tablas y migrar."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO estado_integridad (clave, valor) VALUES ('huella_schema', ?)",
+            (self.get_schema_fingerprint(),)
+        )
+    
+    def verify_schema_integrity(self, check_foreign_keys: bool = False) -> bool:
         """
         Verificar integridad del schema de base de datos.
         
+        Solo comprueba que existan las tablas principales (una consulta a
+        sqlite_master). PRAGMA foreign_key_check recorre la base completa, por
+        eso en el arranque queda a cargo de IntegrityService en background.
+        
+        Args:
+            check_foreign_keys: Ejecutar también PRAGMA foreign_key_check completo
+        
         Returns:
             True si el schema es válido, False en caso contrario
         """
@@ -446,16 +1147,22 @@ class DatabaseConnection:
             expected_tables = [
                 'usuarios', 'categorias', 'productos', 'clientes', 
                 'ventas', 'detalle_ventas', 'movimientos', 'db_version',
-                'company_config', 'ticket_numbering', 'tickets'  # FASE 3
+                'company_config', 'ticket_numbering', 'tickets',  # FASE 3
+                'inventario_cierres', 'inventario_snapshot', 'capas_costo',
+                'archivo_periodos', 'resumen_ventas_mensual', 'resumen_movimientos_mensual',
+                'versiones_catalogo', 'estado_integridad', 'verificaciones_integridad',
+                'cambios', 'sync_contexto', 'sync_identidades', 'sync_pares'
             ]
             
-            for table in expected_tables:
-                cursor.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name=?", 
-                    (table,)
-                )
-                if not cursor.fetchone():
-                    return False
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            existing_tables = {row[0] for row in cursor.fetchall()}
+            missing_tables = [table for table in expected_tables if table not in existing_tables]
+            if missing_tables:
+                self._logger.warning(f"Tablas faltantes en el schema: {', '.join(missing_tables)}")
+                return False
+            
+            if not check_foreign_keys:
+                return True
             
             # Verificar integridad de foreign keys
             cursor.execute("PRAGMA foreign_key_check")
@@ -480,6 +1187,8 @@ class DatabaseConnection:
             backup_conn = sqlite3.connect(backup_path)
             self._connection.backup(backup_conn)
             backup_conn.close()
+            # Todo el WAL quedó respaldado: truncarlo cuando no haya lectores largos
+            checkpoint_manager.solicitar_truncate()
             return True
         except Exception:
             return False
@@ -0,0 +1,448 @@
+"""
+Instrumentación de consultas SQL.
+
+Mide cada sentencia ejecutada sobre las conexiones de DatabaseConnection:
+latencia por SQL normalizado (histograma por rangos), filas devueltas o
+afectadas, registro de consultas lentas con su EXPLAIN QUERY PLAN e
+identificador de traza por acción de usuario.
+
+Se activa desde la sección [metrics] de config/config.ini. Desactivada,
+las conexiones se abren con sqlite3.Connection sin ninguna envoltura, por
+lo que no tiene costo; las conexiones abiertas antes de activarla no se
+instrumentan.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# Límites superiores de los rangos del histograma (ms); el último es abierto
+RANGOS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_traza_actual: ContextVar[Optional[Dict[str, Any]]] = ContextVar('traza_sql', default=None)
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql: str) -> str:
+    """
+    Normalizar una sentencia para agrupar sus métricas.
+
+    Reemplaza literales por ?, colapsa listas IN (?, ?, ...) y espacios.
+
+    Args:
+        sql: Sentencia SQL tal como se ejecutó
+
+    Returns:
+        Sentencia normalizada
+    """
+    normalizada = _LITERAL_TEXTO.sub('?', sql)
+    normalizada = _LITERAL_NUMERO.sub('?', normalizada)
+    normalizada = _ESPACIOS.sub(' ', normalizada).strip()
+    return _LISTA_PARAMETROS.sub('(?...)', normalizada)
+
+
+class _EstadisticaSentencia:
+    """Acumulado de una sentencia normalizada."""
+
+    __slots__ = ('ejecuciones', 'errores', 'tiempo_total', 'tiempo_max',
+                 'tiempo_fetch', 'filas', 'rangos', 'plan')
+
+    def __init__(self):
+        self.ejecuciones = 0
+        self.errores = 0
+        self.tiempo_total = 0.0
+        self.tiempo_max = 0.0
+        self.tiempo_fetch = 0.0
+        self.filas = 0
+        self.rangos = [0] * (len(RANGOS_MS) + 1)
+        self.plan: Optional[List[str]] = None
+
+    def percentil(self, fraccion: float) -> Optional[float]:
+        """Estimar un percentil (ms) con el límite superior de su rango."""
+        if not self.ejecuciones:
+            return None
+        objetivo = fraccion * self.ejecuciones
+        acumulado = 0
+        for indice, cantidad in enumerate(self.rangos):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return RANGOS_MS[indice] if indice < len(RANGOS_MS) else round(self.tiempo_max, 3)
+        return round(self.tiempo_max, 3)
+
+
+class QueryMetrics:
+    """
+    Registro de métricas de consultas del proceso.
+
+    Thread-safe: las conexiones de los hilos de trabajo registran en la
+    misma instancia (query_metrics) que la conexión de la interfaz.
+    """
+
+    def __init__(self):
+        self.habilitado = False
+        self.umbral_lento_ms = 100.0
+        self.explicar_lentas = True
+        self.puerto_http = 0
+        self.ruta_exportacion: Optional[str] = None
+        self._lock = threading.Lock()
+        self._sentencias: Dict[str, _EstadisticaSentencia] = {}
+        self._lentas: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self._trazas: Deque[Dict[str, Any]] = deque(maxlen=200)
+        self._desde = datetime.now()
+        self._logger = logging.getLogger(__name__)
+
+    def configurar(self, habilitado: bool = False, umbral_lento_ms: float = 100.0,
+                   explicar_lentas: bool = True, tamano_registro: int = 200,
+                   puerto_http: int = 0, ruta_exportacion: Optional[str] = None) -> None:
+        """
+        Configurar la instrumentación.
+
+        Args:
+            habilitado: Instrumentar las conexiones que se abran desde ahora
+            umbral_lento_ms: Latencia a partir de la cual se registra la consulta como lenta
+            explicar_lentas: Capturar EXPLAIN QUERY PLAN de las consultas lentas
+            tamano_registro: Entradas conservadas de consultas lentas y de trazas
+            puerto_http: Puerto local del endpoint /metrics (0 = sin servidor)
+            ruta_exportacion: Archivo JSON donde volcar las métricas al cerrar
+        """
+        with self._lock:
+            self.habilitado = habilitado
+            self.umbral_lento_ms = float(umbral_lento_ms)
+            self.explicar_lentas = explicar_lentas
+            self.puerto_http = int(puerto_http)
+            self.ruta_exportacion = ruta_exportacion or None
+            self._lentas = deque(self._lentas, maxlen=tamano_registro)
+            self._trazas = deque(self._trazas, maxlen=tamano_registro)
+
+    def configurar_desde_ini(self, config) -> None:
+        """
+        Configurar desde la sección [metrics] de un ConfigParser.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        self.configurar(
+            habilitado=config.getboolean('metrics', 'enabled', fallback=False),
+            umbral_lento_ms=config.getfloat('metrics', 'slow_query_ms', fallback=100.0),
+            explicar_lentas=config.getboolean('metrics', 'explain_slow', fallback=True),
+            tamano_registro=config.getint('metrics', 'slow_log_size', fallback=200),
+            puerto_http=config.getint('metrics', 'http_port', fallback=0),
+            ruta_exportacion=config.get('metrics', 'export_path', fallback=None)
+        )
+
+    def connection_factory(self):
+        """
+        Clase de conexión para sqlite3.connect según el estado actual.
+
+        Returns:
+            InstrumentedConnection si está habilitado, sqlite3.Connection si no
+        """
+        return InstrumentedConnection if self.habilitado else sqlite3.Connection
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def registrar(self, conexion: sqlite3.Connection, sql: str, parametros: Any,
+                  duracion_ms: float, filas: int, error: bool = False,
+                  lote: bool = False) -> str:
+        """
+        Registrar la ejecución de una sentencia.
+
+        Args:
+            conexion: Conexión que ejecutó la sentencia (para EXPLAIN)
+            sql: Sentencia ejecutada
+            parametros: Parámetros usados (solo para EXPLAIN, no se guardan)
+            duracion_ms: Latencia de execute en milisegundos
+            filas: Filas afectadas (DML) o 0 para consultas
+            error: Si la sentencia falló
+            lote: Si se ejecutó con executemany (sin EXPLAIN)
+
+        Returns:
+            Clave normalizada de la sentencia
+        """
+        clave = normalizar_sql(sql)
+        traza = _traza_actual.get()
+        capturar_plan = False
+
+        with self._lock:
+            estadistica = self._sentencias.get(clave)
+            if estadistica is None:
+                estadistica = self._sentencias[clave] = _EstadisticaSentencia()
+            estadistica.ejecuciones += 1
+            estadistica.tiempo_total += duracion_ms
+            if duracion_ms > estadistica.tiempo_max:
+                estadistica.tiempo_max = duracion_ms
+            if filas > 0:
+                estadistica.filas += filas
+            if error:
+                estadistica.errores += 1
+            indice = 0
+            while indice < len(RANGOS_MS) and duracion_ms > RANGOS_MS[indice]:
+                indice += 1
+            estadistica.rangos[indice] += 1
+
+            if traza is not None:
+                traza['sentencias'] += 1
+                traza['tiempo_sql_ms'] += duracion_ms
+
+            lenta = duracion_ms >= self.umbral_lento_ms
+            capturar_plan = (lenta and not lote and not error and self.explicar_lentas
+                             and estadistica.plan is None
+                             and clave.split(' ', 1)[0].upper() in ('SELECT', 'WITH'))
+
+        if capturar_plan:
+            estadistica.plan = self._explicar(conexion, sql, parametros)
+
+        if lenta:
+            entrada = {
+                'fecha': datetime.now().isoformat(timespec='milliseconds'),
+                'sql': clave,
+                'duracion_ms': round(duracion_ms, 3),
+                'traza': traza['id'] if traza else None,
+                'accion': traza['accion'] if traza else None,
+                'plan': estadistica.plan,
+            }
+            with self._lock:
+                self._lentas.append(entrada)
+            self._logger.warning(f"Consulta lenta ({duracion_ms:.1f} ms) "
+                                 f"[{entrada['accion'] or '-'}]: {clave[:200]}")
+        return clave
+
+    def registrar_lectura(self, clave: str, filas: int, duracion_ms: float) -> None:
+        """
+        Sumar filas leídas y tiempo de fetch a una sentencia ya registrada.
+
+        Args:
+            clave: Clave devuelta por registrar
+            filas: Filas leídas
+            duracion_ms: Tiempo de lectura en milisegundos
+        """
+        with self._lock:
+            estadistica = self._sentencias.get(clave)
+            if estadistica is not None:
+                estadistica.filas += filas
+                estadistica.tiempo_fetch += duracion_ms
+            traza = _traza_actual.get()
+            if traza is not None:
+                traza['tiempo_sql_ms'] += duracion_ms
+
+    def _explicar(self, conexion: sqlite3.Connection, sql: str, parametros: Any) -> Optional[List[str]]:
+        """Obtener EXPLAIN QUERY PLAN sin pasar por la instrumentación."""
+        try:
+            cursor = sqlite3.Cursor(conexion)
+            filas = sqlite3.Cursor.execute(cursor, f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()
+            return [fila[3] for fila in filas]
+        except sqlite3.Error as e:
+            return [f"(sin plan: {e})"]
+
+    # ------------------------------------------------------------------
+    # Trazas por acción de usuario
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def traza(self, accion: str) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Asociar las sentencias ejecutadas dentro del bloque a una acción.
+
+        Si ya hay una traza activa se reutiliza (las acciones anidadas
+        cuentan para la acción exterior). Solo se conservan trazas que
+        ejecutaron al menos una sentencia.
+
+        Args:
+            accion: Nombre de la acción (por ejemplo, el callback de la UI)
+
+        Yields:
+            Diccionario de la traza activa, o None si está deshabilitado
+        """
+        if not self.habilitado or _traza_actual.get() is not None:
+            yield _traza_actual.get()
+            return
+
+        traza = {'id': uuid.uuid4().hex[:12], 'accion': accion,
+                 'inicio': datetime.now().isoformat(timespec='milliseconds'),
+                 'sentencias': 0, 'tiempo_sql_ms': 0.0}
+        token = _traza_actual.set(traza)
+        inicio = time.perf_counter()
+        try:
+            yield traza
+        finally:
+            _traza_actual.reset(token)
+            if traza['sentencias']:
+                traza['duracion_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+                traza['tiempo_sql_ms'] = round(traza['tiempo_sql_ms'], 3)
+                with self._lock:
+                    self._trazas.append(traza)
+
+    @staticmethod
+    def traza_actual() -> Optional[str]:
+        """Identificador de la traza activa en este contexto (o None)."""
+        traza = _traza_actual.get()
+        return traza['id'] if traza else None
+
+    # ------------------------------------------------------------------
+    # Exportación
+    # ------------------------------------------------------------------
+
+    def exportar(self) -> Dict[str, Any]:
+        """
+        Obtener todas las métricas como diccionario serializable.
+
+        Returns:
+            Dict con configuración, sentencias (ordenadas por tiempo total),
+            consultas lentas y trazas recientes
+        """
+        with self._lock:
+            sentencias = []
+            for clave, e in self._sentencias.items():
+                sentencias.append({
+                    'sql': clave,
+                    'ejecuciones': e.ejecuciones,
+                    'errores': e.errores,
+                    'filas': e.filas,
+                    'tiempo_total_ms': round(e.tiempo_total, 3),
+                    'tiempo_fetch_ms': round(e.tiempo_fetch, 3),
+                    'tiempo_medio_ms': round(e.tiempo_total / e.ejecuciones, 3),
+                    'tiempo_max_ms': round(e.tiempo_max, 3),
+                    'p50_ms': e.percentil(0.5),
+                    'p95_ms': e.percentil(0.95),
+                    'p99_ms': e.percentil(0.99),
+                    'histograma': {
+                        (f"<={limite}" if i < len(RANGOS_MS) else f">{RANGOS_MS[-1]}"): cantidad
+                        for i, (limite, cantidad) in enumerate(zip(RANGOS_MS + (None,), e.rangos))
+                        if cantidad
+                    },
+                    'plan': e.plan,
+                })
+            lentas = list(self._lentas)
+            trazas = list(self._trazas)
+
+        sentencias.sort(key=lambda s: s['tiempo_total_ms'] + s['tiempo_fetch_ms'], reverse=True)
+        return {
+            'habilitado': self.habilitado,
+            'desde': self._desde.isoformat(timespec='seconds'),
+            'generado': datetime.now().isoformat(timespec='seconds'),
+            'umbral_lento_ms': self.umbral_lento_ms,
+            'rangos_ms': list(RANGOS_MS),
+            'sentencias': sentencias,
+            'consultas_lentas': lentas,
+            'trazas': trazas,
+        }
+
+    def exportar_json(self, ruta: Optional[str] = None) -> str:
+        """
+        Exportar las métricas a JSON.
+
+        Args:
+            ruta: Archivo de destino (opcional)
+
+        Returns:
+            Texto JSON (también escrito en ruta si se indicó)
+        """
+        texto = json.dumps(self.exportar(), ensure_ascii=False, indent=2)
+        if ruta:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(texto)
+        return texto
+
+    def reiniciar(self) -> None:
+        """Descartar las métricas acumuladas."""
+        with self._lock:
+            self._sentencias.clear()
+            self._lentas.clear()
+            self._trazas.clear()
+            self._desde = datetime.now()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que registra latencia y filas de cada sentencia en query_metrics."""
+
+    _clave_metrica: Optional[str] = None
+
+    def execute(self, sql, parameters=()):
+        inicio = time.perf_counter()
+        try:
+            resultado = super().execute(sql, parameters)
+        except Exception:
+            query_metrics.registrar(self.connection, sql, parameters,
+                                    (time.perf_counter() - inicio) * 1000, 0, error=True)
+            raise
+        self._clave_metrica = query_metrics.registrar(
+            self.connection, sql, parameters, (time.perf_counter() - inicio) * 1000, self.rowcount
+        )
+        return resultado
+
+    def executemany(self, sql, seq_of_parameters):
+        inicio = time.perf_counter()
+        try:
+            resultado = super().executemany(sql, seq_of_parameters)
+        except Exception:
+            query_metrics.registrar(self.connection, sql, None,
+                                    (time.perf_counter() - inicio) * 1000, 0, error=True, lote=True)
+            raise
+        self._clave_metrica = query_metrics.registrar(
+            self.connection, sql, None, (time.perf_counter() - inicio) * 1000, self.rowcount, lote=True
+        )
+        return resultado
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = super().fetchone()
+        if self._clave_metrica is not None:
+            query_metrics.registrar_lectura(self._clave_metrica, 0 if fila is None else 1,
+                                            (time.perf_counter() - inicio) * 1000)
+        return fila
+
+    def fetchmany(self, size=None):
+        inicio = time.perf_counter()
+        filas = super().fetchmany(self.arraysize if size is None else size)
+        if self._clave_metrica is not None:
+            query_metrics.registrar_lectura(self._clave_metrica, len(filas),
+                                            (time.perf_counter() - inicio) * 1000)
+        return filas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = super().fetchall()
+        if self._clave_metrica is not None:
+            query_metrics.registrar_lectura(self._clave_metrica, len(filas),
+                                            (time.perf_counter() - inicio) * 1000)
+        return filas
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    Conexión cuyos cursores son InstrumentedCursor.
+
+    Connection.execute/executemany crean internamente un sqlite3.Cursor,
+    por eso se redefinen para usar cursor().
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Registro global del proceso
+query_metrics = QueryMetrics()
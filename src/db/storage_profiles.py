@@ -0,0 +1,179 @@
+"""
+Perfiles de almacenamiento de SQLite.
+
+Cada perfil agrupa los PRAGMA de rendimiento de una conexión
+(synchronous, cache_size, mmap_size, temp_store, busy_timeout,
+wal_autocheckpoint) y el tamaño de la caché de sentencias de sqlite3
+(cached_statements):
+
+- pos-safe: caja y operación diaria; cada commit llega a disco.
+- bulk-load: cargas y archivado; commits sin fsync (WAL + NORMAL sigue
+  siendo a prueba de corrupción) y checkpoints espaciados.
+- reporting: consultas pesadas; caché y mmap grandes.
+
+El perfil por defecto y los ajustes de cada perfil se leen de config.ini
+([database] storage_profile y secciones [storage:<perfil>]).
+"""
+
+import logging
+import sqlite3
+from copy import deepcopy
+from typing import Any, Dict, Optional
+
+
+# Valores base de cada perfil (cache_size negativo = KiB, mmap_size en bytes)
+PERFILES: Dict[str, Dict[str, Any]] = {
+    'pos-safe': {
+        'synchronous': 'FULL',
+        'cache_size': -16384,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 1000,
+        'cached_statements': 256,
+    },
+    'bulk-load': {
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+        'wal_autocheckpoint': 10000,
+        'cached_statements': 128,
+    },
+    'reporting': {
+        'synchronous': 'NORMAL',
+        'cache_size': -131072,
+        'mmap_size': 512 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+        'wal_autocheckpoint': 1000,
+        'cached_statements': 512,
+    },
+}
+
+PERFIL_POR_DEFECTO = 'pos-safe'
+
+# PRAGMA que se aplican por conexión, en este orden
+PRAGMAS = ('busy_timeout', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'wal_autocheckpoint')
+
+_VALORES_TEXTO = {
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+
+
+class StorageProfiles:
+    """Registro de perfiles de almacenamiento del proceso."""
+
+    def __init__(self):
+        self.perfil_por_defecto = PERFIL_POR_DEFECTO
+        self._perfiles = deepcopy(PERFILES)
+        self._logger = logging.getLogger(__name__)
+
+    def nombres(self):
+        """Nombres de los perfiles disponibles."""
+        return tuple(self._perfiles)
+
+    def obtener(self, nombre: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Obtener los ajustes de un perfil.
+
+        Args:
+            nombre: Nombre del perfil (None = perfil por defecto)
+
+        Returns:
+            Copia del diccionario de ajustes
+
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        nombre = nombre or self.perfil_por_defecto
+        if nombre not in self._perfiles:
+            raise ValueError(f"Perfil de almacenamiento desconocido: {nombre} "
+                             f"(disponibles: {', '.join(self._perfiles)})")
+        return dict(self._perfiles[nombre])
+
+    def configurar_desde_ini(self, config) -> None:
+        """
+        Configurar perfiles desde un ConfigParser.
+
+        [database] storage_profile elige el perfil por defecto; cada sección
+        [storage:<perfil>] sobrescribe ajustes de ese perfil. Los valores
+        inválidos se ignoran con una advertencia.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        for seccion in config.sections():
+            if not seccion.startswith('storage:'):
+                continue
+            nombre = seccion.split(':', 1)[1].strip()
+            ajustes = self._perfiles.setdefault(nombre, deepcopy(PERFILES[PERFIL_POR_DEFECTO]))
+            for clave, valor in config.items(seccion):
+                try:
+                    ajustes[clave] = self._validar(clave, valor)
+                except ValueError as e:
+                    self._logger.warning(f"[{seccion}] {clave} ignorado: {e}")
+
+        perfil = config.get('database', 'storage_profile', fallback=PERFIL_POR_DEFECTO).strip()
+        if perfil in self._perfiles:
+            self.perfil_por_defecto = perfil
+        else:
+            self._logger.warning(f"storage_profile '{perfil}' desconocido; se usa {PERFIL_POR_DEFECTO}")
+            self.perfil_por_defecto = PERFIL_POR_DEFECTO
+
+    def aplicar(self, conexion: sqlite3.Connection, nombre: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aplicar los PRAGMA de un perfil a una conexión abierta.
+
+        cached_statements no se puede cambiar después de abrir la conexión,
+        por lo que solo se usa en DatabaseConnection al conectarse.
+
+        Args:
+            conexion: Conexión SQLite
+            nombre: Nombre del perfil (None = perfil por defecto)
+
+        Returns:
+            Ajustes aplicados
+        """
+        ajustes = self.obtener(nombre)
+        for pragma in PRAGMAS:
+            conexion.execute(f"PRAGMA {pragma} = {ajustes[pragma]}")
+        return ajustes
+
+    @staticmethod
+    def leer(conexion: sqlite3.Connection) -> Dict[str, Any]:
+        """
+        Leer los valores actuales de los PRAGMA de perfil.
+
+        Args:
+            conexion: Conexión SQLite
+
+        Returns:
+            Diccionario pragma -> valor (synchronous y temp_store como texto)
+        """
+        valores = {}
+        for pragma in PRAGMAS:
+            valor = conexion.execute(f"PRAGMA {pragma}").fetchone()[0]
+            if pragma in _VALORES_TEXTO:
+                opciones = _VALORES_TEXTO[pragma]
+                valor = opciones[valor] if isinstance(valor, int) and valor < len(opciones) else valor
+            valores[pragma] = valor
+        return valores
+
+    @staticmethod
+    def _validar(clave: str, valor: str) -> Any:
+        """Convertir y validar un ajuste leído de config.ini."""
+        if clave in _VALORES_TEXTO:
+            valor = valor.strip().upper()
+            if valor not in _VALORES_TEXTO[clave]:
+                raise ValueError(f"'{valor}' no es uno de {', '.join(_VALORES_TEXTO[clave])}")
+            return valor
+        if clave in PRAGMAS or clave == 'cached_statements':
+            return int(valor)
+        raise ValueError("ajuste desconocido")
+
+
+# Registro global del proceso
+storage_profiles = StorageProfiles()
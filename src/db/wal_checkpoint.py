@@ -0,0 +1,444 @@
+"""
+Gestión de checkpoints del WAL de SQLite.
+
+Con el checkpoint automático (wal_autocheckpoint) el commit que cruza el
+umbral copia el WAL a la base dentro de la transacción de quien escribe:
+una venta de caja paga el costo de todo lo escrito antes. Además, una
+lectura larga mantiene su snapshot y el WAL crece sin límite mientras dura.
+
+Con el gestor habilitado ([checkpoint] en config.ini):
+
+- Las conexiones de DatabaseConnection conservan un wal_autocheckpoint
+  moderado (como máximo autocheckpoint_pages, nunca más que el del perfil)
+  y limitan el tamaño del WAL en disco (journal_size_limit). El
+  autocheckpoint queda como red de seguridad si el hilo se atrasa.
+- Un hilo daemon con conexión propia vigila el archivo -wal y ejecuta
+  checkpoints PASSIVE en ventanas de inactividad (sin escrituras durante
+  idle_ms), o sin esperar si pasaron max_interval_s o el WAL superó
+  forced_threshold_kb. PASSIVE no bloquea a quien escribe ni a quien lee.
+- El reinicio del WAL se decide con el resultado de wal_checkpoint (busy,
+  log, checkpointed), que también ve a los lectores de otros procesos: si
+  un checkpoint no pudo copiar todo (un lector retiene el WAL), en cuanto
+  un PASSIVE lo copia completo se fuerza RESTART, o TRUNCATE si el WAL
+  superó truncate_threshold_kb o hubo un respaldo. Solo en ventanas de
+  inactividad; se reintenta mientras devuelva busy, esperando como máximo
+  truncate_wait_ms.
+- Los reportes leen en una conexión propia registrada como lector largo
+  (DatabaseConnection.read_connection): el gestor avisa si una lectura
+  supera long_reader_warning_s y hace un checkpoint en cuanto terminan.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# Modos de PRAGMA wal_checkpoint admitidos
+MODOS_CHECKPOINT = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+class CheckpointManager:
+    """
+    Gestor de checkpoints del proceso.
+
+    Thread-safe: los lectores largos se registran desde cualquier hilo; los
+    checkpoints en background usan una conexión del hilo del gestor.
+    """
+
+    def __init__(self):
+        self.habilitado = False
+        self.intervalo = 0.25
+        self.ventana_inactiva = 0.1
+        self.max_sin_checkpoint = 5.0
+        self.umbral_forzado = 64 * 1024 * 1024
+        self.umbral_truncar = 16 * 1024 * 1024
+        self.espera_truncar_ms = 0
+        self.autocheckpoint_paginas = 1000
+        self.limite_wal = 16 * 1024 * 1024
+        self.aviso_lector = 30.0
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ruta: Optional[str] = None
+        self._lectores: Dict[int, Tuple[str, float]] = {}
+        self._lectores_avisados: set = set()
+        self._siguiente_lector = 0
+        self._truncar_pendiente = False
+        self._logger = logging.getLogger(__name__)
+        self._stats = self._stats_vacias()
+
+    def configurar(self, habilitado: bool = False, intervalo_ms: float = 250, inactividad_ms: float = 100,
+                   max_sin_checkpoint_s: float = 5.0, umbral_forzado_kb: int = 65536,
+                   umbral_truncar_kb: int = 16384, espera_truncar_ms: int = 0,
+                   autocheckpoint_paginas: int = 1000, limite_wal_kb: int = 16384,
+                   aviso_lector_s: float = 30.0) -> None:
+        """
+        Configurar el gestor.
+
+        Args:
+            habilitado: Gestionar checkpoints (las conexiones abiertas desde ahora ceden el autocheckpoint)
+            intervalo_ms: Cada cuánto se revisa el archivo -wal
+            inactividad_ms: Tiempo sin escrituras para considerar una ventana inactiva
+            max_sin_checkpoint_s: Checkpoint aunque no haya ventana inactiva tras este tiempo
+            umbral_forzado_kb: Tamaño del WAL que dispara un checkpoint inmediato
+            umbral_truncar_kb: Tamaño del WAL a partir del cual se trunca al quedar copiado
+            espera_truncar_ms: busy_timeout de RESTART/TRUNCATE (espera máxima de quien escribe)
+            autocheckpoint_paginas: Tope de wal_autocheckpoint en las conexiones (0 = el del perfil)
+            limite_wal_kb: journal_size_limit de las conexiones
+            aviso_lector_s: Duración de lectura a partir de la cual se registra una advertencia
+        """
+        with self._lock:
+            self.habilitado = habilitado
+            self.intervalo = max(0.01, intervalo_ms / 1000)
+            self.ventana_inactiva = max(0.0, inactividad_ms / 1000)
+            self.max_sin_checkpoint = max(self.intervalo, float(max_sin_checkpoint_s))
+            self.umbral_forzado = int(umbral_forzado_kb) * 1024
+            self.umbral_truncar = int(umbral_truncar_kb) * 1024
+            self.espera_truncar_ms = max(0, int(espera_truncar_ms))
+            self.autocheckpoint_paginas = max(0, int(autocheckpoint_paginas))
+            self.limite_wal = int(limite_wal_kb) * 1024
+            self.aviso_lector = float(aviso_lector_s)
+
+    def configurar_desde_ini(self, config) -> None:
+        """
+        Configurar desde la sección [checkpoint] de un ConfigParser.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        self.configurar(
+            habilitado=config.getboolean('checkpoint', 'enabled', fallback=False),
+            intervalo_ms=config.getfloat('checkpoint', 'interval_ms', fallback=250),
+            inactividad_ms=config.getfloat('checkpoint', 'idle_ms', fallback=100),
+            max_sin_checkpoint_s=config.getfloat('checkpoint', 'max_interval_s', fallback=5.0),
+            umbral_forzado_kb=config.getint('checkpoint', 'forced_threshold_kb', fallback=65536),
+            umbral_truncar_kb=config.getint('checkpoint', 'truncate_threshold_kb', fallback=16384),
+            espera_truncar_ms=config.getint('checkpoint', 'truncate_wait_ms', fallback=0),
+            autocheckpoint_paginas=config.getint('checkpoint', 'autocheckpoint_pages', fallback=1000),
+            limite_wal_kb=config.getint('checkpoint', 'journal_size_limit_kb', fallback=16384),
+            aviso_lector_s=config.getfloat('checkpoint', 'long_reader_warning_s', fallback=30.0)
+        )
+
+    def configurar_conexion(self, conexion: sqlite3.Connection) -> None:
+        """
+        Limitar el autocheckpoint y el WAL de una conexión (sin efecto si está deshabilitado).
+
+        Se llama después de aplicar el perfil de almacenamiento, que fija
+        su propio wal_autocheckpoint: solo se baja al tope, nunca se sube.
+        Un autocheckpoint alto deja crecer el WAL mientras un reporte
+        retiene su snapshot y hace más lento cada checkpoint posterior.
+
+        Args:
+            conexion: Conexión SQLite en modo WAL
+        """
+        if not self.habilitado:
+            return
+        if self.autocheckpoint_paginas:
+            actual = conexion.execute("PRAGMA wal_autocheckpoint").fetchone()[0]
+            if actual <= 0 or actual > self.autocheckpoint_paginas:
+                conexion.execute(f"PRAGMA wal_autocheckpoint = {self.autocheckpoint_paginas}")
+        conexion.execute(f"PRAGMA journal_size_limit = {self.limite_wal}")
+
+    # ------------------------------------------------------------------
+    # Hilo de checkpoints
+    # ------------------------------------------------------------------
+    def iniciar(self, ruta: str) -> Optional[threading.Thread]:
+        """
+        Iniciar el hilo de checkpoints de una base de datos.
+
+        Args:
+            ruta: Archivo de la base de datos
+
+        Returns:
+            Hilo iniciado, o None si está deshabilitado o ya en curso
+        """
+        if not self.habilitado or ruta in (None, '', ':memory:'):
+            return None
+        if self._thread is not None and self._thread.is_alive():
+            return None
+
+        self._ruta = os.path.abspath(ruta)
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._worker, name="WalCheckpointWorker", daemon=True)
+        self._thread.start()
+        self._logger.info(f"Gestor de checkpoints iniciado para {self._ruta}")
+        return self._thread
+
+    def detener(self, timeout: float = 2.0) -> None:
+        """
+        Detener el hilo de checkpoints (el checkpoint en curso termina).
+
+        Args:
+            timeout: Segundos máximos de espera
+        """
+        self._detener.set()
+        self._despertar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def solicitar_truncate(self) -> None:
+        """Pedir un checkpoint TRUNCATE en cuanto el WAL quede copiado y sin lectores (p.ej. tras un respaldo)."""
+        with self._lock:
+            self._truncar_pendiente = True
+        self._despertar.set()
+
+    @contextmanager
+    def lector_largo(self, descripcion: str) -> Iterator[None]:
+        """
+        Registrar una lectura larga (reportes, exportaciones).
+
+        Usable como bloque with o como decorador. Solo sirve para métricas y
+        advertencias (el reinicio del WAL se decide con el resultado de
+        wal_checkpoint); al terminar la última, dispara un checkpoint.
+
+        Args:
+            descripcion: Nombre de la lectura para métricas y advertencias
+        """
+        with self._lock:
+            self._siguiente_lector += 1
+            identificador = self._siguiente_lector
+            self._lectores[identificador] = (descripcion, time.monotonic())
+        try:
+            yield
+        finally:
+            with self._lock:
+                _, inicio = self._lectores.pop(identificador)
+                self._lectores_avisados.discard(identificador)
+                duracion = time.monotonic() - inicio
+                self._stats['lecturas_largas'] += 1
+                self._stats['lectura_max_s'] = max(self._stats['lectura_max_s'], round(duracion, 3))
+                ultimo = not self._lectores
+            if ultimo:
+                self._despertar.set()
+
+    def checkpoint(self, modo: str = 'PASSIVE', ruta: Optional[str] = None,
+                   motivo: str = 'manual') -> Dict[str, Any]:
+        """
+        Ejecutar un checkpoint sincrónico con una conexión temporal.
+
+        Args:
+            modo: PASSIVE, FULL, RESTART o TRUNCATE
+            ruta: Archivo de la base (None = la del hilo del gestor)
+            motivo: Etiqueta para las métricas
+
+        Returns:
+            Resultado {modo, ocupado, paginas_wal, paginas_copiadas, duracion_ms}
+
+        Raises:
+            ValueError: Si el modo no es válido o no hay ruta
+        """
+        ruta = ruta or self._ruta
+        if not ruta:
+            raise ValueError("No hay base de datos para el checkpoint")
+        conexion = sqlite3.connect(ruta, isolation_level=None)
+        try:
+            conexion.execute("PRAGMA busy_timeout = 5000")
+            return self._ejecutar(conexion, modo, motivo)
+        finally:
+            conexion.close()
+
+    @staticmethod
+    def tamano_wal(ruta: str) -> int:
+        """
+        Tamaño en bytes del archivo -wal de una base (0 si no existe).
+
+        Args:
+            ruta: Archivo de la base de datos
+        """
+        try:
+            return os.stat(f"{ruta}-wal").st_size
+        except OSError:
+            return 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Métricas del WAL y de los checkpoints.
+
+        Returns:
+            Tamaño actual y máximo del WAL, checkpoints por modo y motivo,
+            páginas copiadas, duraciones, checkpoints incompletos (WAL
+            retenido por lectores), lectores largos activos y último resultado
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            stats = {clave: (dict(valor) if isinstance(valor, dict) else valor)
+                     for clave, valor in self._stats.items()}
+            stats['lectores_activos'] = [
+                {'descripcion': descripcion, 'segundos': round(ahora - inicio, 3)}
+                for descripcion, inicio in self._lectores.values()
+            ]
+            stats['truncate_pendiente'] = self._truncar_pendiente
+        stats['habilitado'] = self.habilitado
+        stats['activo'] = self._thread is not None and self._thread.is_alive()
+        stats['ruta'] = self._ruta
+        if self._ruta:
+            stats['wal_bytes'] = self.tamano_wal(self._ruta)
+        return stats
+
+    def reiniciar_estadisticas(self) -> None:
+        """Descartar las métricas acumuladas."""
+        with self._lock:
+            self._stats = self._stats_vacias()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _stats_vacias() -> Dict[str, Any]:
+        return {
+            'wal_bytes': 0,
+            'wal_max_bytes': 0,
+            'checkpoints': {},
+            'paginas_copiadas': 0,
+            'duracion_total_ms': 0.0,
+            'duracion_max_ms': 0.0,
+            'incompletos': 0,
+            'ocupados': 0,
+            'lecturas_largas': 0,
+            'lectura_max_s': 0.0,
+            'ultimo': None,
+        }
+
+    def _ejecutar(self, conexion: sqlite3.Connection, modo: str, motivo: str) -> Dict[str, Any]:
+        """Ejecutar PRAGMA wal_checkpoint y acumular sus métricas."""
+        modo = modo.upper()
+        if modo not in MODOS_CHECKPOINT:
+            raise ValueError(f"Modo de checkpoint inválido: {modo}")
+
+        inicio = time.perf_counter()
+        ocupado, paginas_wal, copiadas = conexion.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+        duracion = (time.perf_counter() - inicio) * 1000
+        resultado = {
+            'modo': modo,
+            'motivo': motivo,
+            'ocupado': bool(ocupado),
+            'paginas_wal': paginas_wal,
+            'paginas_copiadas': copiadas,
+            'duracion_ms': round(duracion, 3),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            clave = f"{modo}:{motivo}"
+            self._stats['checkpoints'][clave] = self._stats['checkpoints'].get(clave, 0) + 1
+            self._stats['paginas_copiadas'] += max(0, copiadas)
+            self._stats['duracion_total_ms'] += duracion
+            self._stats['duracion_max_ms'] = max(self._stats['duracion_max_ms'], round(duracion, 3))
+            self._stats['ocupados'] += 1 if ocupado else 0
+            self._stats['incompletos'] += 1 if 0 <= copiadas < paginas_wal else 0
+            self._stats['ultimo'] = resultado
+        return resultado
+
+    @staticmethod
+    def _completo(resultado: Dict[str, Any]) -> bool:
+        """Indicar si un checkpoint copió todo el WAL sin encontrarse con lectores (busy)."""
+        return not resultado['ocupado'] and resultado['paginas_copiadas'] >= resultado['paginas_wal']
+
+    def _worker(self) -> None:
+        """Vigilar el WAL y ejecutar checkpoints en las ventanas adecuadas."""
+        conexion = sqlite3.connect(self._ruta, isolation_level=None, check_same_thread=False)
+        conexion.execute(f"PRAGMA busy_timeout = {self.espera_truncar_ms}")
+        firma_previa: Optional[Tuple[int, int]] = None
+        ultimo_checkpoint = time.monotonic()
+        pendiente = False  # Hubo escrituras desde el último checkpoint completo
+        copiado = True     # El último checkpoint copió todo el WAL
+        retenido = False   # Un checkpoint quedó incompleto: reiniciar el WAL cuando se libere
+        incompletos = 0    # Checkpoints seguidos que no pudieron copiar todo
+
+        try:
+            while not self._detener.is_set():
+                self._despertar.wait(self.intervalo)
+                self._despertar.clear()
+                if self._detener.is_set():
+                    break
+
+                ahora = time.monotonic()
+                try:
+                    estado = os.stat(f"{self._ruta}-wal")
+                    tamano, firma = estado.st_size, (estado.st_size, estado.st_mtime_ns)
+                    # Antigüedad de la última escritura según el mtime, no según el sondeo
+                    quieto = max(0.0, time.time() - estado.st_mtime_ns / 1e9)
+                except OSError:
+                    tamano, firma, quieto = 0, (0, 0), float('inf')
+                if firma != firma_previa:
+                    firma_previa = firma
+                    pendiente = True
+
+                with self._lock:
+                    self._stats['wal_bytes'] = tamano
+                    self._stats['wal_max_bytes'] = max(self._stats['wal_max_bytes'], tamano)
+                    truncar = self._truncar_pendiente
+                self._avisar_lectores_largos(ahora)
+
+                inactiva = quieto >= self.ventana_inactiva
+                resultado = None
+                try:
+                    if pendiente and (inactiva or tamano >= self.umbral_forzado
+                                      or ahora - ultimo_checkpoint >= self.max_sin_checkpoint):
+                        motivo = 'inactividad' if inactiva else 'forzado'
+                        resultado = self._ejecutar(conexion, 'PASSIVE', motivo)
+                        ultimo_checkpoint = time.monotonic()
+                        copiado = self._completo(resultado)
+                        pendiente = not copiado
+                        retenido = retenido or not copiado
+
+                    # Todo copiado: reiniciar el WAL si lo retuvo un lector, si creció o tras un respaldo
+                    if copiado and inactiva and (retenido or truncar or tamano >= self.umbral_truncar):
+                        if truncar or tamano >= self.umbral_truncar:
+                            modo, motivo = 'TRUNCATE', ('respaldo' if truncar else 'tamano')
+                        else:
+                            modo, motivo = 'RESTART', 'lector liberado'
+                        resultado = self._ejecutar(conexion, modo, motivo)
+                        if self._completo(resultado):
+                            retenido = False
+                            if modo == 'TRUNCATE':
+                                with self._lock:
+                                    self._truncar_pendiente = False
+                            # El reinicio modifica el -wal: no contarlo como escritura
+                            try:
+                                estado = os.stat(f"{self._ruta}-wal")
+                                firma_previa = (estado.st_size, estado.st_mtime_ns)
+                            except OSError:
+                                firma_previa = (0, 0)
+                except sqlite3.OperationalError as e:
+                    # SQLITE_BUSY/LOCKED: se reintenta en el próximo ciclo
+                    self._logger.debug(f"Checkpoint pospuesto: {e}")
+                    continue
+                if resultado is None:
+                    continue
+
+                incompletos = 0 if self._completo(resultado) else incompletos + 1
+                if incompletos == 3 and tamano >= self.umbral_forzado:
+                    with self._lock:
+                        activos = ', '.join(descripcion for descripcion, _ in self._lectores.values())
+                    self._logger.warning(
+                        f"WAL de {tamano // 1024} KB sin copiar en 3 checkpoints seguidos "
+                        f"({resultado['paginas_copiadas']}/{resultado['paginas_wal']} páginas); "
+                        f"lectores largos en este proceso: {activos or 'ninguno registrado'}"
+                    )
+        except Exception as e:
+            self._logger.error(f"Error en el gestor de checkpoints: {e}")
+        finally:
+            conexion.close()
+
+    def _avisar_lectores_largos(self, ahora: float) -> None:
+        """Registrar una advertencia por cada lectura que supera aviso_lector."""
+        with self._lock:
+            largos = [
+                (identificador, descripcion, ahora - inicio)
+                for identificador, (descripcion, inicio) in self._lectores.items()
+                if ahora - inicio >= self.aviso_lector and identificador not in self._lectores_avisados
+            ]
+            self._lectores_avisados.update(identificador for identificador, _, _ in largos)
+        for _, descripcion, segundos in largos:
+            self._logger.warning(f"Lectura larga '{descripcion}' activa hace {segundos:.0f} s: el WAL no se puede truncar")
+
+
+# Gestor global del proceso
+checkpoint_manager = CheckpointManager()
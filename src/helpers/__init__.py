@@ -5,6 +5,7 @@ Este módulo contiene helpers especializados que implementan el patrón FASE 3:
 - DatabaseHelper: Operaciones de base de datos optimizadas y seguras
 - ValidationHelper: Validaciones de datos robustas y reutilizables  
 - LoggingHelper: Sistema de logging estructurado y centralizado
+- async_logging: Pipeline de logging asíncrono (cola acotada + hilo escritor)
 
 ARQUITECTURA FASE 3:
 Los servicios optimizados utilizan estos helpers para:
@@ -27,12 +28,15 @@ class OptimizedService:
 from .database_helper import DatabaseHelper
 from .validation_helper import ValidationHelper
 from .logging_helper import LoggingHelper, LoggingContext
+from .async_logging import AsyncLogging, async_logging
 
 __all__ = [
     'DatabaseHelper',
     'ValidationHelper', 
     'LoggingHelper',
-    'LoggingContext'
+    'LoggingContext',
+    'AsyncLogging',
+    'async_logging'
 ]
 
 # Configurar logging automáticamente al importar helpers
@@ -0,0 +1,410 @@
+"""
+Pipeline de logging asíncrono.
+
+Los loggers del proceso escriben en una cola acotada (QueueHandler) y un
+único hilo (QueueListener) formatea y escribe en los archivos con rotación,
+de modo que un disco lento o una carpeta de red no se suman a la latencia
+del commit de una venta.
+
+- Cola acotada con política de descarte explícita y contadores.
+- Registros estructurados en JSON lines (JsonLinesFormatter).
+- Muestreo de eventos DEBUG de alto volumen por punto de llamada.
+- Vaciado de la cola al cerrar (detener(), llamado desde cleanup_container);
+  después los handlers quedan en el logger raíz en modo síncrono.
+
+La configuración se lee de la sección [logging] de config.ini.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+# Políticas cuando la cola está llena:
+# - descartar_nuevo: se pierde el registro que llega
+# - descartar_antiguo: se pierde el registro más viejo de la cola
+# - bloquear: el hilo que registra espera hasta espera_bloqueo segundos
+POLITICAS = ('descartar_nuevo', 'descartar_antiguo', 'bloquear')
+
+CAPACIDAD_POR_DEFECTO = 10000
+ESPERA_BLOQUEO = 0.05
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatear cada registro como un objeto JSON en una línea.
+
+    Los atributos 'evento' y 'datos' (pasados con extra=) se incluyen como
+    campos propios en lugar de dentro del mensaje.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entrada = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'funcion': record.funcName,
+            'linea': record.lineno,
+            'hilo': record.threadName,
+        }
+        evento = getattr(record, 'evento', None)
+        if evento:
+            entrada['evento'] = evento
+        datos = getattr(record, 'datos', None)
+        if datos:
+            entrada['datos'] = datos
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entrada['excepcion'] = record.exc_text
+        if record.stack_info:
+            entrada['pila'] = record.stack_info
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class TextoConDatosFormatter(logging.Formatter):
+    """Formato de texto que agrega el JSON de 'datos' al final de la línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        datos = getattr(record, 'datos', None)
+        if datos:
+            texto = f"{texto} | {json.dumps(datos, ensure_ascii=False, default=str)}"
+        return texto
+
+
+class MuestreoDebugFilter(logging.Filter):
+    """
+    Dejar pasar 1 de cada `tasa` registros DEBUG por punto de llamada.
+
+    La clave es (logger, línea): los mensajes con f-string de un mismo
+    punto de llamada comparten cuota aunque su texto cambie.
+    """
+
+    def __init__(self, tasa: int = 1):
+        super().__init__()
+        self.tasa = max(1, int(tasa))
+        self.muestreados = 0
+        self._vistos: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.tasa <= 1 or record.levelno > logging.DEBUG:
+            return True
+        clave = (record.name, record.lineno)
+        with self._lock:
+            visto = self._vistos.get(clave, 0)
+            self._vistos[clave] = visto + 1
+            if visto % self.tasa == 0:
+                return True
+            self.muestreados += 1
+        return False
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler sobre una cola acotada con política de descarte.
+
+    Los registros ERROR o superiores nunca se descartan sin antes esperar
+    espera_bloqueo segundos, sea cual sea la política.
+    """
+
+    def __init__(self, cola: queue.Queue, politica: str = 'descartar_nuevo',
+                 espera_bloqueo: float = ESPERA_BLOQUEO):
+        super().__init__(cola)
+        self.politica = politica
+        self.espera_bloqueo = espera_bloqueo
+        self.encolados = 0
+        self.descartados = 0
+        self.descartados_por_nivel: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._formatter_excepciones = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Fijar mensaje y traza en el hilo que registra.
+
+        A diferencia del QueueHandler estándar no aplica el formato completo:
+        eso (y la serialización JSON) queda para el hilo del listener.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formatter_excepciones.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if not self._encolar_con_cola_llena(record):
+                self._contar_descarte(record)
+                return
+        with self._lock:
+            self.encolados += 1
+
+    def _encolar_con_cola_llena(self, record: logging.LogRecord) -> bool:
+        """Aplicar la política de descarte; devuelve True si el registro entró."""
+        if self.politica == 'descartar_antiguo':
+            try:
+                antiguo = self.queue.get_nowait()
+                if antiguo is not None:
+                    self._contar_descarte(antiguo)
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return True
+            except queue.Full:
+                pass
+
+        if self.politica == 'bloquear' or record.levelno >= logging.ERROR:
+            try:
+                self.queue.put(record, timeout=self.espera_bloqueo)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _contar_descarte(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            self.descartados += 1
+            self.descartados_por_nivel[record.levelname] = self.descartados_por_nivel.get(record.levelname, 0) + 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener cuyo centinela de cierre espera lugar en una cola llena."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class AsyncLogging:
+    """
+    Pipeline de logging del proceso (cola acotada + hilo escritor).
+
+    Uso:
+        async_logging.iniciar()
+        async_logging.agregar_archivo('logs/inventory_system.jsonl')
+        ...
+        async_logging.detener()  # vacía la cola
+    """
+
+    def __init__(self):
+        self.capacidad = CAPACIDAD_POR_DEFECTO
+        self.politica = 'descartar_nuevo'
+        self.espera_bloqueo = ESPERA_BLOQUEO
+        self.muestreo = MuestreoDebugFilter(1)
+        self._handlers: List[logging.Handler] = []
+        self._cola: Optional[queue.Queue] = None
+        self._queue_handler: Optional[BoundedQueueHandler] = None
+        self._listener: Optional[_QueueListener] = None
+        self._lock = threading.RLock()
+        self._atexit_registrado = False
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def activo(self) -> bool:
+        """Indicar si el hilo escritor está en marcha."""
+        return self._listener is not None
+
+    def configurar(self, capacidad_cola: Optional[int] = None, politica: Optional[str] = None,
+                   muestreo_debug: Optional[int] = None, espera_bloqueo: Optional[float] = None) -> None:
+        """
+        Ajustar la cola, la política de descarte y el muestreo.
+
+        Puede llamarse con el pipeline en marcha.
+
+        Args:
+            capacidad_cola: Registros máximos en cola
+            politica: Una de POLITICAS
+            muestreo_debug: Dejar pasar 1 de cada N registros DEBUG por punto de llamada
+            espera_bloqueo: Segundos de espera con cola llena ('bloquear' y errores)
+
+        Raises:
+            ValueError: Si la política o la capacidad no son válidas
+        """
+        with self._lock:
+            if politica is not None:
+                if politica not in POLITICAS:
+                    raise ValueError(f"Política desconocida: {politica} (disponibles: {', '.join(POLITICAS)})")
+                self.politica = politica
+            if capacidad_cola is not None:
+                if capacidad_cola < 1:
+                    raise ValueError("La capacidad de la cola debe ser positiva")
+                self.capacidad = int(capacidad_cola)
+            if muestreo_debug is not None:
+                self.muestreo.tasa = max(1, int(muestreo_debug))
+            if espera_bloqueo is not None:
+                self.espera_bloqueo = float(espera_bloqueo)
+
+            if self._queue_handler is not None:
+                self._queue_handler.politica = self.politica
+                self._queue_handler.espera_bloqueo = self.espera_bloqueo
+                self._cola.maxsize = self.capacidad
+
+    def configurar_desde_ini(self, config) -> None:
+        """
+        Configurar desde un ConfigParser (sección [logging]).
+
+        Claves: queue_size, drop_policy, debug_sample_rate, block_timeout_ms.
+        Los valores inválidos se ignoran con una advertencia.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        if not config.has_section('logging'):
+            return
+        try:
+            self.configurar(
+                capacidad_cola=config.getint('logging', 'queue_size', fallback=self.capacidad),
+                politica=config.get('logging', 'drop_policy', fallback=self.politica).strip(),
+                muestreo_debug=config.getint('logging', 'debug_sample_rate', fallback=self.muestreo.tasa),
+                espera_bloqueo=config.getfloat('logging', 'block_timeout_ms',
+                                               fallback=self.espera_bloqueo * 1000) / 1000
+            )
+        except ValueError as e:
+            self._logger.warning(f"Configuración [logging] ignorada: {e}")
+
+    def iniciar(self) -> None:
+        """
+        Instalar el QueueHandler en el logger raíz y arrancar el hilo escritor.
+
+        Idempotente. Si el pipeline se había detenido, los handlers vuelven
+        del logger raíz al hilo escritor.
+        """
+        with self._lock:
+            if self._listener is not None:
+                return
+
+            raiz = logging.getLogger()
+            for handler in self._handlers:
+                raiz.removeHandler(handler)
+
+            self._cola = queue.Queue(maxsize=self.capacidad)
+            self._queue_handler = BoundedQueueHandler(self._cola, self.politica, self.espera_bloqueo)
+            self._queue_handler.addFilter(self.muestreo)
+            self._listener = _QueueListener(self._cola, *self._handlers, respect_handler_level=True)
+            self._listener.start()
+            raiz.addHandler(self._queue_handler)
+
+            if not self._atexit_registrado:
+                atexit.register(self.detener)
+                self._atexit_registrado = True
+
+    def agregar_handler(self, handler: logging.Handler) -> logging.Handler:
+        """
+        Agregar un handler de salida al hilo escritor.
+
+        Un segundo handler de archivo con la misma ruta se ignora.
+
+        Args:
+            handler: Handler ya configurado (formato y nivel)
+
+        Returns:
+            Handler registrado (el existente si la ruta ya estaba)
+        """
+        with self._lock:
+            ruta = getattr(handler, 'baseFilename', None)
+            for existente in self._handlers:
+                if ruta and getattr(existente, 'baseFilename', None) == ruta:
+                    handler.close()
+                    return existente
+
+            self._handlers.append(handler)
+            if self._listener is not None:
+                self._listener.handlers = tuple(self._handlers)
+            else:
+                logging.getLogger().addHandler(handler)
+            return handler
+
+    def agregar_archivo(self, ruta: str, nivel: int = logging.DEBUG, formato: str = 'json',
+                        max_bytes: int = 10 * 1024 * 1024, backups: int = 5) -> logging.Handler:
+        """
+        Agregar un archivo de log con rotación.
+
+        Args:
+            ruta: Ruta del archivo
+            nivel: Nivel mínimo del archivo
+            formato: 'json' (JSON lines) o 'texto'
+            max_bytes: Tamaño máximo antes de rotar
+            backups: Archivos rotados a conservar
+
+        Returns:
+            Handler registrado
+        """
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        handler = logging.handlers.RotatingFileHandler(
+            filename=ruta, maxBytes=max_bytes, backupCount=backups, encoding='utf-8'
+        )
+        if formato == 'json':
+            handler.setFormatter(JsonLinesFormatter())
+        else:
+            handler.setFormatter(TextoConDatosFormatter(FORMATO_TEXTO, datefmt=FORMATO_FECHA))
+        handler.setLevel(nivel)
+        return self.agregar_handler(handler)
+
+    def detener(self) -> None:
+        """
+        Vaciar la cola, detener el hilo escritor y pasar a modo síncrono.
+
+        Los registros posteriores (mensajes de cierre) se escriben
+        directamente desde el logger raíz.
+        """
+        with self._lock:
+            if self._listener is None:
+                return
+
+            raiz = logging.getLogger()
+            raiz.removeHandler(self._queue_handler)
+            self._listener.stop()  # Procesa los registros pendientes antes de terminar
+            self._listener = None
+
+            for handler in self._handlers:
+                handler.flush()
+                raiz.addHandler(handler)
+
+            estadisticas = self.estadisticas()
+        if estadisticas['descartados'] or estadisticas['muestreados']:
+            self._logger.info(f"Logging asíncrono detenido: {estadisticas['encolados']} registros, "
+                              f"{estadisticas['descartados']} descartados, "
+                              f"{estadisticas['muestreados']} omitidos por muestreo")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Obtener contadores del pipeline.
+
+        Returns:
+            Dict con encolados, descartados (total y por nivel), omitidos por
+            muestreo, pendientes en cola, capacidad y política
+        """
+        handler = self._queue_handler
+        return {
+            'activo': self.activo,
+            'encolados': handler.encolados if handler else 0,
+            'descartados': handler.descartados if handler else 0,
+            'descartados_por_nivel': dict(handler.descartados_por_nivel) if handler else {},
+            'muestreados': self.muestreo.muestreados,
+            'pendientes': self._cola.qsize() if self._cola is not None and self.activo else 0,
+            'capacidad': self.capacidad,
+            'politica': self.politica,
+            'muestreo_debug': self.muestreo.tasa,
+        }
+
+
+# Pipeline global del proceso
+async_logging = AsyncLogging()
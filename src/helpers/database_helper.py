@@ -64,6 +64,31 @@ class DatabaseHelper:
             self.logger.error(f"Error ejecutando query: {query[:100]}... - Error: {e}")
             return None
             
+    def fetch_rows(self, query: str, params: tuple = None, row_type: Optional[type] = None) -> List[tuple]:
+        """
+        Ejecutar un SELECT y devolver filas compactas, sin convertir a dict.
+        
+        Para listados grandes: evita crear un sqlite3.Row y un dict por fila.
+        
+        Args:
+            query: Query SQL a ejecutar
+            params: Parámetros para la query
+            row_type: Tipo de fila con _make (models.filas.tipo_fila); None para tuplas
+            
+        Returns:
+            Lista de filas (vacía si hay error)
+        """
+        try:
+            cursor = self.db_connection.get_connection().cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+            return list(map(row_type._make, rows)) if row_type else rows
+            
+        except Exception as e:
+            self.logger.error(f"Error ejecutando query: {query[:100]}... - Error: {e}")
+            return []
+            
     def safe_execute_with_commit(self, query: str, params: tuple = None) -> Optional[int]:
         """
         Ejecutar query con commit automático.
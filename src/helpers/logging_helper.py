@@ -7,6 +7,7 @@ RESPONSABILIDADES:
 - Loggers específicos por servicio
 - Formateo estandarizado de mensajes
 - Rotación automática de archivos de log
+- Escritura asíncrona en JSON lines (ver helpers.async_logging)
 """
 
 import logging
@@ -14,7 +15,8 @@ import logging.handlers
 import os
 from datetime import datetime
 from typing import Optional, Dict, Any
-import json
+
+from .async_logging import async_logging
 
 
 class LoggingHelper:
@@ -31,6 +33,9 @@ class LoggingHelper:
         """
         Configurar el sistema de logging globalmente.
         
+        Los handlers se registran en el pipeline asíncrono: los servicios
+        solo encolan el registro y un hilo aparte escribe los archivos.
+        
         Args:
             log_level: Nivel de logging ('DEBUG', 'INFO', 'WARNING', 'ERROR')
             log_dir: Directorio para archivos de log
@@ -47,30 +52,25 @@ class LoggingHelper:
         root_logger = logging.getLogger()
         root_logger.setLevel(getattr(logging, log_level.upper()))
         
-        # Formato para logs
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        async_logging.iniciar()
         
-        # Handler para archivo con rotación
-        file_handler = logging.handlers.RotatingFileHandler(
-            filename=os.path.join(log_dir, 'inventory_system.log'),
-            maxBytes=max_file_size,
-            backupCount=backup_count,
-            encoding='utf-8'
+        # Archivo estructurado (JSON lines) con rotación
+        async_logging.agregar_archivo(
+            os.path.join(log_dir, 'inventory_system.jsonl'),
+            nivel=getattr(logging, log_level.upper()),
+            formato='json',
+            max_bytes=max_file_size,
+            backups=backup_count
         )
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(getattr(logging, log_level.upper()))
         
         # Handler para consola
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
         console_handler.setLevel(logging.WARNING)  # Solo warnings y errores en consola
-        
-        # Agregar handlers
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
+        async_logging.agregar_handler(console_handler)
         
         cls._configured = True
         
@@ -155,11 +155,10 @@ class LoggingHelper:
         log_data = {
             'user_id': user_id,
             'action': action,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
-        logger.info(f"USER_ACTION: {json.dumps(log_data, ensure_ascii=False)}")
+        logger.info(f"USER_ACTION: {action}", extra={'evento': 'USER_ACTION', 'datos': log_data})
         
     @classmethod
     def log_authentication_attempt(cls, username: str, success: bool, 
@@ -177,17 +176,16 @@ class LoggingHelper:
         log_data = {
             'username': username,
             'success': success,
-            'ip_address': ip_address,
-            'timestamp': datetime.now().isoformat()
+            'ip_address': ip_address
         }
         
-        level = 'INFO' if success else 'WARNING'
-        message = f"AUTH_ATTEMPT: {json.dumps(log_data, ensure_ascii=False)}"
+        message = f"AUTH_ATTEMPT: {username}"
+        extra = {'evento': 'AUTH_ATTEMPT', 'datos': log_data}
         
         if success:
-            logger.info(message)
+            logger.info(message, extra=extra)
         else:
-            logger.warning(message)
+            logger.warning(message, extra=extra)
             
     @classmethod
     def log_database_operation(cls, table: str, operation: str, 
@@ -208,11 +206,10 @@ class LoggingHelper:
             'table': table,
             'operation': operation,
             'record_id': record_id,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
-        logger.info(f"DB_OPERATION: {json.dumps(log_data, ensure_ascii=False)}")
+        logger.info(f"DB_OPERATION: {operation} {table}", extra={'evento': 'DB_OPERATION', 'datos': log_data})
         
     @classmethod
     def log_error_with_context(cls, logger: logging.Logger, error: Exception,
@@ -228,11 +225,11 @@ class LoggingHelper:
         error_data = {
             'error_type': type(error).__name__,
             'error_message': str(error),
-            'timestamp': datetime.now().isoformat(),
             'context': context or {}
         }
         
-        logger.error(f"ERROR_WITH_CONTEXT: {json.dumps(error_data, ensure_ascii=False)}")
+        logger.error(f"ERROR_WITH_CONTEXT: {type(error).__name__}: {error}",
+                     extra={'evento': 'ERROR_WITH_CONTEXT', 'datos': error_data})
         
     @classmethod
     def log_performance_metrics(cls, operation: str, duration: float,
@@ -250,15 +247,16 @@ class LoggingHelper:
         metrics_data = {
             'operation': operation,
             'duration_seconds': round(duration, 4),
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
         # Log como WARNING si la operación toma más de 1 segundo
         if duration > 1.0:
-            logger.warning(f"SLOW_OPERATION: {json.dumps(metrics_data, ensure_ascii=False)}")
+            logger.warning(f"SLOW_OPERATION: {operation} ({duration:.4f}s)",
+                           extra={'evento': 'SLOW_OPERATION', 'datos': metrics_data})
         else:
-            logger.debug(f"PERFORMANCE: {json.dumps(metrics_data, ensure_ascii=False)}")
+            logger.debug(f"PERFORMANCE: {operation} ({duration:.4f}s)",
+                         extra={'evento': 'PERFORMANCE', 'datos': metrics_data})
             
     @classmethod
     def log_business_rule_violation(cls, rule: str, details: Dict[str, Any] = None):
@@ -273,11 +271,11 @@ class LoggingHelper:
         
         violation_data = {
             'rule': rule,
-            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
-        logger.warning(f"BUSINESS_RULE_VIOLATION: {json.dumps(violation_data, ensure_ascii=False)}")
+        logger.warning(f"BUSINESS_RULE_VIOLATION: {rule}",
+                       extra={'evento': 'BUSINESS_RULE_VIOLATION', 'datos': violation_data})
         
     @classmethod
     def configure_for_production(cls):
@@ -311,6 +309,7 @@ class LoggingHelper:
             'configured': cls._configured,
             'active_loggers': len(cls._loggers),
             'logger_names': list(cls._loggers.keys()),
+            'pipeline': async_logging.estadisticas(),
             'timestamp': datetime.now().isoformat()
         }
         
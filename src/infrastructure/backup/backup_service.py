@@ -336,6 +336,16 @@ class BackupService:
         Raises:
             BackupCreationException: Si falla la creación
         """
+        # Se copia solo el archivo principal: pasar antes el WAL a la base
+        # (TRUNCATE) para que el respaldo incluya las últimas transacciones
+        try:
+            from db.wal_checkpoint import checkpoint_manager
+            resultado = checkpoint_manager.checkpoint('TRUNCATE', str(self.config.source_db_path), motivo='respaldo')
+            if resultado['ocupado']:
+                self.logger.warning("Checkpoint previo al respaldo incompleto: el WAL sigue en uso")
+        except (ImportError, sqlite3.Error) as e:
+            self.logger.warning(f"No se pudo hacer checkpoint antes del respaldo: {e}")
+        
         try:
             with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                 # Agregar base de datos principal
@@ -69,6 +69,9 @@ class PDFExporter:
     - Strategy Pattern: Diferentes layouts según tipo de reporte
     """
     
+    # Hoja de estilos compartida entre instancias
+    _shared_styles = None
+    
     def __init__(self):
         """
         Inicializar exportador PDF con configuración corporativa.
@@ -118,7 +121,16 @@ class PDFExporter:
         logger.info("PDFExporter inicializado con configuración corporativa")
     
     def _setup_text_styles(self):
-        """Configurar estilos de texto corporativos."""
+        """
+        Configurar estilos de texto corporativos.
+        
+        Los colores corporativos son constantes, por lo que la hoja de
+        estilos se crea una vez y se comparte entre instancias.
+        """
+        if PDFExporter._shared_styles is not None:
+            self.styles = PDFExporter._shared_styles
+            return
+        
         self.styles = getSampleStyleSheet()
         
         # Estilo para título principal
@@ -171,6 +183,8 @@ class PDFExporter:
             textColor=self.colors['dark_gray'],
             fontName='Helvetica'
         ))
+        
+        PDFExporter._shared_styles = self.styles
     
     def create_movements_pdf(self, template_data: Dict[str, Any], file_path: str) -> None:
         """
@@ -849,36 +863,49 @@ class PDFExporter:
         """
         Agregar header del ticket al documento.
         
+        El encabezado corporativo se toma precompilado del motor de
+        plantillas; solo el título depende del ticket.
+        
         Args:
             story: Lista de elementos del documento
             template_data: Datos del ticket
         """
-        # Información de la empresa
-        empresa = template_data.get('empresa', self.company_info)
-        
-        # Nombre de la empresa
-        company_name = Paragraph(
-            f"<b>{empresa.get('nombre', 'Copy Point S.A.')}</b>",
-            self.styles['CorporateTitle']
-        )
-        story.append(company_name)
-        
-        # Dirección y contacto
-        company_details = Paragraph(
-            f"{empresa.get('direccion', 'Las Lajas, Las Cumbres, Panamá')}<br/>"
-            f"Tel: {empresa.get('telefono', '6342-9218')} | Email: {empresa.get('email', 'tus_amigos@copypoint.online')}",
-            self.styles['CompanyInfo']
-        )
-        story.append(company_details)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Título del ticket
-        ticket_title = Paragraph(
+        story.extend(self._ticket_header_flowables(
             f"<b>{template_data.get('title', 'Ticket de Entrada')}</b>",
-            self.styles['CorporateSubtitle']
-        )
-        story.append(ticket_title)
-        story.append(Spacer(1, 0.2*inch))
+            template_data.get('empresa')
+        ))
+    
+    def _ticket_header_flowables(self, title_markup: str,
+                                 empresa: Optional[Dict[str, Any]] = None) -> List:
+        """
+        Obtener los flowables del encabezado corporativo de tickets.
+        
+        Args:
+            title_markup: Marcado del título del ticket
+            empresa: Datos de empresa explícitos (opcional, por defecto CompanyService)
+            
+        Returns:
+            Lista de flowables listos para agregar al documento
+        """
+        try:
+            from reports.ticket_templates import get_ticket_template_engine
+            return get_ticket_template_engine().encabezado_exportador(
+                self.styles, title_markup, empresa
+            )
+        except ImportError:
+            empresa = empresa or self.company_info
+            return [
+                Paragraph(f"<b>{empresa.get('nombre', 'Copy Point S.A.')}</b>",
+                          self.styles['CorporateTitle']),
+                Paragraph(
+                    f"{empresa.get('direccion', 'Las Lajas, Las Cumbres, Panamá')}<br/>"
+                    f"Tel: {empresa.get('telefono', '6342-9218')} | Email: {empresa.get('email', 'tus_amigos@copypoint.online')}",
+                    self.styles['CompanyInfo']
+                ),
+                Spacer(1, 0.3*inch),
+                Paragraph(title_markup, self.styles['CorporateSubtitle']),
+                Spacer(1, 0.2*inch)
+            ]
     
     def _add_ticket_info(self, story: List, ticket_info: Dict[str, Any]) -> None:
         """
@@ -1172,32 +1199,11 @@ class PDFExporter:
             story: Lista de elementos del documento
             template_data: Datos del ticket
         """
-        # Información de la empresa
-        empresa = template_data.get('empresa', self.company_info)
-        
-        # Nombre de la empresa
-        company_name = Paragraph(
-            f"<b>{empresa.get('nombre', 'Copy Point S.A.')}</b>",
-            self.styles['CorporateTitle']
-        )
-        story.append(company_name)
-        
-        # Dirección y contacto
-        company_details = Paragraph(
-            f"{empresa.get('direccion', 'Las Lajas, Las Cumbres, Panamá')}<br/>"
-            f"Tel: {empresa.get('telefono', '6342-9218')} | Email: {empresa.get('email', 'tus_amigos@copypoint.online')}",
-            self.styles['CompanyInfo']
-        )
-        story.append(company_details)
-        story.append(Spacer(1, 0.3*inch))
-        
         # Título del ticket con color distintivo para ajustes
-        ticket_title = Paragraph(
+        story.extend(self._ticket_header_flowables(
             f"<b><font color='#C55A11'>{template_data.get('title', 'Ticket de Ajuste')}</font></b>",
-            self.styles['CorporateSubtitle']
-        )
-        story.append(ticket_title)
-        story.append(Spacer(1, 0.2*inch))
+            template_data.get('empresa')
+        ))
     
     def _add_adjustment_ticket_info(self, story: List, ticket_info: Dict[str, Any]) -> None:
         """
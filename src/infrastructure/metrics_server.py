@@ -0,0 +1,88 @@
+"""
+Servidor local de métricas de consultas SQL.
+
+Router FastAPI sobre el registro de db.query_metrics del proceso:
+latencias por sentencia normalizada, consultas lentas con su plan,
+trazas por acción y estado del WAL y sus checkpoints (/metrics/wal). La API lo incluye en /metrics y la aplicación de
+escritorio lo sirve en un puerto local (iniciar_servidor_metricas) sin
+importar el paquete api.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, FastAPI
+
+from db.query_metrics import query_metrics
+from db.wal_checkpoint import checkpoint_manager
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear router de métricas (sin prefijo de versión: /metrics)
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Métricas"]
+)
+
+
+@router.get("")
+async def get_metrics(limite: int = 100):
+    """Obtener métricas de consultas, ordenadas por tiempo total."""
+    metricas = query_metrics.exportar()
+    metricas['sentencias'] = metricas['sentencias'][:limite]
+    return metricas
+
+
+@router.get("/slow")
+async def get_slow_queries():
+    """Obtener el registro de consultas lentas."""
+    return {
+        "umbral_lento_ms": query_metrics.umbral_lento_ms,
+        "consultas_lentas": query_metrics.exportar()['consultas_lentas']
+    }
+
+
+@router.get("/wal")
+async def get_wal_metrics():
+    """Obtener tamaño del WAL, checkpoints y lectores largos activos."""
+    return checkpoint_manager.estadisticas()
+
+
+@router.delete("")
+async def reset_metrics():
+    """Descartar las métricas acumuladas."""
+    query_metrics.reiniciar()
+    checkpoint_manager.reiniciar_estadisticas()
+    return {"status": "success", "message": "Métricas reiniciadas"}
+
+
+def iniciar_servidor_metricas(puerto: int, host: str = "127.0.0.1") -> Optional[threading.Thread]:
+    """
+    Servir /metrics en un hilo daemon del proceso actual.
+
+    Solo escucha en la interfaz local; las métricas son las del proceso
+    que lo llama (la aplicación de escritorio).
+
+    Args:
+        puerto: Puerto TCP local
+        host: Interfaz de escucha
+
+    Returns:
+        Hilo del servidor, o None si uvicorn no está disponible
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        logger.warning("uvicorn no está instalado; endpoint /metrics deshabilitado")
+        return None
+
+    app = FastAPI(title="Métricas del Sistema de Inventario", docs_url=None, redoc_url=None)
+    app.include_router(router)
+    servidor = uvicorn.Server(uvicorn.Config(app, host=host, port=puerto, log_level="warning"))
+
+    hilo = threading.Thread(target=servidor.run, name="MetricsServer", daemon=True)
+    hilo.start()
+    logger.info(f"Endpoint de métricas en http://{host}:{puerto}/metrics")
+    return hilo
@@ -11,6 +11,8 @@ Modelos disponibles:
 - Usuario: Usuarios con autenticación
 - Venta: Transacciones de venta
 - Movimiento: Movimientos de inventario
+- Money, Cost: Montos en centavos y costos en diezmilésimas (enteros)
+- ProductoFila, tipo_fila: Filas compactas (namedtuple) para listados
 """
 
 # Importar todas las clases de modelos
@@ -20,6 +22,8 @@ from .cliente import Cliente
 from .usuario import Usuario
 from .venta import Venta
 from .movimiento import Movimiento
+from .money import Money, Cost
+from .filas import ProductoFila, tipo_fila
 
 # Definir qué se exporta cuando se hace "from models import *"
 __all__ = [
@@ -28,7 +32,11 @@ __all__ = [
     'Cliente',
     'Usuario',
     'Venta',
-    'Movimiento'
+    'Movimiento',
+    'Money',
+    'Cost',
+    'ProductoFila',
+    'tipo_fila'
 ]
 
 # Metadatos del módulo
@@ -13,6 +13,7 @@ Fecha: 2025-05-26
 
 from typing import Optional
 import re
+import unicodedata
 
 
 class Cliente:
@@ -111,6 +112,25 @@ class Cliente:
         patron = r'^[\d\-]{8,20}$'
         return bool(re.match(patron, self.ruc))
     
+    @staticmethod
+    def normalizar_nombre(nombre: Optional[str]) -> str:
+        """
+        Normalizar un nombre para búsqueda: minúsculas, sin acentos
+        y con espacios simples.
+        
+        Args:
+            nombre: Nombre o texto de búsqueda
+            
+        Returns:
+            Texto normalizado ("José  PÉREZ" -> "jose perez")
+        """
+        if not nombre:
+            return ""
+        
+        descompuesto = unicodedata.normalize('NFKD', nombre)
+        sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+        return ' '.join(sin_acentos.lower().split())
+    
     def obtener_nombre_corto(self, max_length: int = 25) -> str:
         """
         Obtener versión corta del nombre para mostrar en interfaces.
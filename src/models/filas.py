@@ -0,0 +1,58 @@
+"""
+Filas compactas para listados (catálogo de productos).
+
+Un listado de miles de productos no necesita un objeto Producto por fila
+(atributos en __dict__ y cuatro Decimal) ni un dict intermedio por cada
+sqlite3.Row: basta una tupla con nombres. Los tipos de fila son
+namedtuple sin __dict__ (__slots__ = ()), con las columnas que pidió la
+consulta, y se leen igual que un Producto (fila.nombre, fila.precio).
+
+Los montos quedan como vienen de SQLite (float); para calcular con ellos
+usar Money.desde(fila.precio).
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+
+class _FilaMixin:
+    """Métodos comunes de las filas: acceso tipo dict para código que espera diccionarios."""
+
+    __slots__ = ()
+
+    def get(self, campo: str, defecto: Any = None) -> Any:
+        """Valor de una columna, o defecto si la fila no la incluye."""
+        return getattr(self, campo, defecto)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fila como diccionario columna -> valor."""
+        return dict(zip(self._fields, self))
+
+
+@lru_cache(maxsize=None)
+def tipo_fila(nombre: str, columnas: Tuple[str, ...]) -> type:
+    """
+    Tipo de fila (namedtuple compacto) para una proyección de columnas.
+
+    El tipo se crea una vez por combinación de nombre y columnas, así las
+    filas de la misma consulta comparten clase.
+
+    Args:
+        nombre: Nombre de la clase (p.ej. 'ProductoFila')
+        columnas: Nombres de las columnas, en el orden del SELECT
+
+    Returns:
+        Clase con _make(tupla) para construir filas
+    """
+    base = namedtuple(nombre, columnas)
+    return type(nombre, (base, _FilaMixin), {'__slots__': ()})
+
+
+# Columnas de los listados del catálogo (formularios, filtros, etiquetas, API)
+COLUMNAS_PRODUCTO_LISTADO = (
+    'id_producto', 'nombre', 'id_categoria', 'stock', 'costo', 'precio',
+    'tasa_impuesto', 'activo', 'categoria_nombre', 'categoria_tipo'
+)
+
+ProductoFila = tipo_fila('ProductoFila', COLUMNAS_PRODUCTO_LISTADO)
@@ -0,0 +1,198 @@
+"""
+Montos como enteros: centavos para precios y totales, diezmilésimas para costos.
+
+Las columnas DECIMAL de SQLite se guardan como REAL: sumar REAL acumula
+error binario y convertir cada fila con Decimal(str(valor)) es costoso en
+los bucles de reportes. Con montos enteros:
+
+- En SQL, Money.sql('v.total') convierte cada valor a centavos exactos
+  (CAST(ROUND(v.total * 100) AS INTEGER)) y SUM suma enteros sin error.
+  La migración 13 deja los valores guardados en centavos (o diezmilésimas
+  para costos) exactos, así ese redondeo nunca cambia un monto.
+- En Python, Money y Cost son enteros con escala: sumar, restar y
+  multiplicar por cantidades es aritmética entera; solo el porcentaje
+  redondea (mitad hacia arriba, como ROUND_HALF_UP de Decimal).
+
+Los servicios siguen entregando Decimal o float en su interfaz pública
+(Money.decimal(), float(Money)).
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from functools import total_ordering
+from typing import Union
+
+
+Numero = Union[int, float, Decimal, str]
+
+
+def _dividir_redondeando(numerador: int, divisor: int) -> int:
+    """División entera con redondeo mitad hacia arriba (lejos de cero), divisor > 0."""
+    cociente, resto = divmod(abs(numerador), divisor)
+    if resto * 2 >= divisor:
+        cociente += 1
+    return cociente if numerador >= 0 else -cociente
+
+
+@total_ordering
+class Money:
+    """
+    Monto en centavos (entero).
+
+    Inmutable y hasheable. Se suma y resta con otros Money de la misma
+    escala y con 0 (para sum()); se multiplica por enteros (cantidades).
+    """
+
+    __slots__ = ('unidades',)
+
+    ESCALA = 100
+    DECIMALES = 2
+
+    def __init__(self, unidades: int = 0):
+        """
+        Crear un monto a partir de unidades enteras de la escala.
+
+        Args:
+            unidades: Centavos (o diezmilésimas en Cost)
+        """
+        self.unidades = int(unidades)
+
+    # ------------------------------------------------------------------
+    # Conversión
+    # ------------------------------------------------------------------
+    @classmethod
+    def desde(cls, valor: Union['Money', Numero, None]) -> 'Money':
+        """
+        Convertir un valor decimal al entero más cercano de la escala.
+
+        Los float se convierten por su representación decimal más corta
+        (repr), igual que Decimal(str(valor)): 1.005 es 1.01, no 1.00.
+
+        Args:
+            valor: Money, int, float, Decimal, str o None (cero)
+
+        Returns:
+            Monto redondeado mitad hacia arriba a la escala
+        """
+        if valor is None:
+            return cls(0)
+        if isinstance(valor, Money):
+            if valor.ESCALA == cls.ESCALA:
+                return cls(valor.unidades)
+            if valor.ESCALA > cls.ESCALA:
+                return cls(_dividir_redondeando(valor.unidades, valor.ESCALA // cls.ESCALA))
+            return cls(valor.unidades * (cls.ESCALA // valor.ESCALA))
+        if isinstance(valor, int):
+            return cls(valor * cls.ESCALA)
+        decimal = valor if isinstance(valor, Decimal) else Decimal(repr(valor) if isinstance(valor, float) else valor)
+        return cls(int((decimal * cls.ESCALA).to_integral_value(rounding=ROUND_HALF_UP)))
+
+    @classmethod
+    def sql(cls, expresion: str) -> str:
+        """
+        Expresión SQL que convierte una columna REAL a unidades enteras.
+
+        Args:
+            expresion: Columna o expresión SQL (p.ej. 'v.total')
+
+        Returns:
+            Expresión SQL de tipo INTEGER (NULL se mantiene NULL)
+        """
+        return f"CAST(ROUND(({expresion}) * {cls.ESCALA}) AS INTEGER)"
+
+    def decimal(self) -> Decimal:
+        """Monto como Decimal con DECIMALES posiciones."""
+        return Decimal(self.unidades).scaleb(-self.DECIMALES)
+
+    def __float__(self) -> float:
+        return self.unidades / self.ESCALA
+
+    def __int__(self) -> int:
+        return self.unidades
+
+    # ------------------------------------------------------------------
+    # Aritmética
+    # ------------------------------------------------------------------
+    def _unidades_de(self, otro) -> int:
+        if isinstance(otro, Money) and otro.ESCALA == self.ESCALA:
+            return otro.unidades
+        if isinstance(otro, int) and otro == 0:
+            return 0
+        raise TypeError(f"No se puede operar {type(self).__name__} con {type(otro).__name__}")
+
+    def __add__(self, otro) -> 'Money':
+        return type(self)(self.unidades + self._unidades_de(otro))
+
+    __radd__ = __add__
+
+    def __sub__(self, otro) -> 'Money':
+        return type(self)(self.unidades - self._unidades_de(otro))
+
+    def __rsub__(self, otro) -> 'Money':
+        return type(self)(self._unidades_de(otro) - self.unidades)
+
+    def __neg__(self) -> 'Money':
+        return type(self)(-self.unidades)
+
+    def __abs__(self) -> 'Money':
+        return type(self)(abs(self.unidades))
+
+    def __mul__(self, cantidad: int) -> 'Money':
+        if not isinstance(cantidad, int) or isinstance(cantidad, bool):
+            raise TypeError("Money solo se multiplica por cantidades enteras (usar porcentaje() para tasas)")
+        return type(self)(self.unidades * cantidad)
+
+    __rmul__ = __mul__
+
+    def porcentaje(self, tasa: Numero) -> 'Money':
+        """
+        Porcentaje del monto, redondeado mitad hacia arriba a la escala.
+
+        Args:
+            tasa: Porcentaje (7 o Decimal('7.00') para 7 %); hasta 4 decimales
+
+        Returns:
+            Monto * tasa / 100
+        """
+        if isinstance(tasa, int):
+            return type(self)(_dividir_redondeando(self.unidades * tasa, 100))
+        tasa_e4 = int((Decimal(repr(tasa) if isinstance(tasa, float) else tasa) * 10000).to_integral_value(
+            rounding=ROUND_HALF_UP))
+        return type(self)(_dividir_redondeando(self.unidades * tasa_e4, 1000000))
+
+    def a_centavos(self) -> 'Money':
+        """Monto redondeado a centavos (Money)."""
+        return Money.desde(self)
+
+    # ------------------------------------------------------------------
+    # Comparación y representación
+    # ------------------------------------------------------------------
+    def __eq__(self, otro) -> bool:
+        if isinstance(otro, Money):
+            return self.ESCALA == otro.ESCALA and self.unidades == otro.unidades
+        if isinstance(otro, int) and otro == 0:
+            return self.unidades == 0
+        return NotImplemented
+
+    def __lt__(self, otro) -> bool:
+        return self.unidades < self._unidades_de(otro)
+
+    def __hash__(self) -> int:
+        return hash((self.ESCALA, self.unidades))
+
+    def __bool__(self) -> bool:
+        return self.unidades != 0
+
+    def __str__(self) -> str:
+        return str(self.decimal())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}('{self.decimal()}')"
+
+
+class Cost(Money):
+    """Costo unitario o acumulado en diezmilésimas (columnas DECIMAL(10,4))."""
+
+    __slots__ = ()
+
+    ESCALA = 10000
+    DECIMALES = 4
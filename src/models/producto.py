@@ -14,6 +14,8 @@ Fecha: 2025-05-26
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, Union
 
+from .money import Money
+
 
 class Producto:
     """
@@ -66,11 +68,9 @@ class Producto:
             cantidad: Cantidad de productos
             
         Returns:
-            Monto del impuesto calculado
+            Monto del impuesto calculado (sobre el subtotal en centavos)
         """
-        subtotal = self.precio * Decimal(str(cantidad))
-        impuesto = (subtotal * self.tasa_impuesto) / Decimal('100')
-        return impuesto.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return (Money.desde(self.precio) * cantidad).porcentaje(self.tasa_impuesto).decimal()
     
     def calcular_subtotal(self, cantidad: int) -> Decimal:
         """
@@ -80,10 +80,9 @@ class Producto:
             cantidad: Cantidad de productos
             
         Returns:
-            Subtotal (precio * cantidad)
+            Subtotal (precio en centavos * cantidad)
         """
-        subtotal = self.precio * Decimal(str(cantidad))
-        return subtotal.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return (Money.desde(self.precio) * cantidad).decimal()
     
     def calcular_total(self, cantidad: int) -> Decimal:
         """
@@ -95,10 +94,8 @@ class Producto:
         Returns:
             Total (subtotal + impuesto)
         """
-        subtotal = self.calcular_subtotal(cantidad)
-        impuesto = self.calcular_impuesto(cantidad)
-        total = subtotal + impuesto
-        return total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        subtotal = Money.desde(self.precio) * cantidad
+        return (subtotal + subtotal.porcentaje(self.tasa_impuesto)).decimal()
     
     def tiene_stock_suficiente(self, cantidad: int) -> bool:
         """
@@ -23,10 +23,8 @@ try:
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import letter, A4
     from reportlab.lib.units import mm, inch
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
@@ -40,6 +38,7 @@ except ImportError:
 
 from models.ticket import Ticket
 from models.company_config import CompanyConfig
+from reports.ticket_templates import get_ticket_template_engine
 from services.company_service import CompanyService
 from services.sales_service import SalesService
 from services.movement_service import MovementService
@@ -89,59 +88,12 @@ class TicketGenerator:
     def _setup_styles(self):
         """
         Configurar estilos de texto para los PDFs.
-        """
-        self.styles = getSampleStyleSheet()
-        
-        # Estilo para encabezado de empresa
-        self.styles.add(ParagraphStyle(
-            name='EmpresaHeader',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            textColor=colors.black
-        ))
-        
-        # Estilo para datos de empresa
-        self.styles.add(ParagraphStyle(
-            name='EmpresaInfo',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            spaceAfter=3,
-            alignment=TA_CENTER,
-            textColor=colors.black
-        ))
-        
-        # Estilo para título de ticket
-        self.styles.add(ParagraphStyle(
-            name='TituloTicket',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            spaceAfter=8,
-            spaceBefore=8,
-            alignment=TA_CENTER,
-            textColor=colors.black
-        ))
-        
-        # Estilo para datos del ticket
-        self.styles.add(ParagraphStyle(
-            name='DatosTicket',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            spaceAfter=2,
-            alignment=TA_LEFT,
-            textColor=colors.black
-        ))
         
-        # Estilo para totales
-        self.styles.add(ParagraphStyle(
-            name='Totales',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=2,
-            alignment=TA_RIGHT,
-            textColor=colors.black
-        ))
+        Los estilos y el encabezado corporativo se precompilan una sola vez
+        en el motor de plantillas y se comparten entre tickets.
+        """
+        self.template_engine = get_ticket_template_engine()
+        self.styles = self.template_engine.estilos_ticket()
     
     def _obtener_datos_empresa(self) -> Dict[str, Any]:
         """
@@ -150,7 +102,7 @@ class TicketGenerator:
         Returns:
             Diccionario con datos de empresa
         """
-        return self.company_service.obtener_encabezado_documentos()
+        return self.template_engine.datos_empresa()
     
     def _generar_codigo_qr(self, datos: str) -> Optional[bytes]:
         """
@@ -256,7 +208,6 @@ class TicketGenerator:
             raise ValueError("El ticket debe tener id_venta asociado")
         
         # Obtener datos necesarios
-        datos_empresa = self._obtener_datos_empresa()
         datos_venta = self._obtener_datos_venta(ticket.id_venta)
         
         # Configurar documento
@@ -279,14 +230,8 @@ class TicketGenerator:
             # Construir contenido
             story = []
             
-            # Encabezado de empresa
-            story.append(Paragraph(datos_empresa['nombre'], self.styles['EmpresaHeader']))
-            story.append(Paragraph(datos_empresa['ruc'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['direccion'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['telefono'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['email'], self.styles['EmpresaInfo']))
-            
-            story.append(Spacer(1, 10*mm))
+            # Encabezado de empresa (precompilado)
+            story.extend(self.template_engine.encabezado_ticket())
             
             # Título del ticket
             story.append(Paragraph("TICKET DE VENTA", self.styles['TituloTicket']))
@@ -396,7 +341,6 @@ class TicketGenerator:
             raise ValueError("El ticket debe tener id_movimiento asociado")
         
         # Obtener datos necesarios
-        datos_empresa = self._obtener_datos_empresa()
         datos_movimiento = self._obtener_datos_movimiento(ticket.id_movimiento)
         
         # Configurar documento
@@ -419,14 +363,8 @@ class TicketGenerator:
             # Construir contenido
             story = []
             
-            # Encabezado de empresa
-            story.append(Paragraph(datos_empresa['nombre'], self.styles['EmpresaHeader']))
-            story.append(Paragraph(datos_empresa['ruc'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['direccion'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['telefono'], self.styles['EmpresaInfo']))
-            story.append(Paragraph(datos_empresa['email'], self.styles['EmpresaInfo']))
-            
-            story.append(Spacer(1, 10*mm))
+            # Encabezado de empresa (precompilado)
+            story.extend(self.template_engine.encabezado_ticket())
             
             # Título del ticket
             story.append(Paragraph("TICKET DE ENTRADA DE INVENTARIO", self.styles['TituloTicket']))
@@ -0,0 +1,358 @@
+"""
+Plantillas precompiladas para tickets.
+Mantiene en memoria las partes estáticas de los tickets PDF.
+
+Este módulo maneja:
+- Estilos de texto de tickets creados una sola vez
+- Encabezado corporativo construido desde CompanyService
+- Logo de la empresa decodificado una sola vez
+- Invalidación automática cuando cambia la configuración de empresa
+
+Cada ticket recibe copias superficiales de los flowables precompilados,
+de modo que el trabajo por ticket se limita a los datos variables.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-21
+"""
+
+import copy
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import mm, inch
+    from reportlab.platypus import Image, Paragraph, Spacer
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+
+# Datos usados si CompanyService no está disponible
+DATOS_EMPRESA_DEFECTO = {
+    'nombre': 'Copy Point S.A.',
+    'ruc': '888-888-8888',
+    'direccion': 'Las Lajas, Las Cumbres, Panamá',
+    'telefono': '6666-6666',
+    'email': 'copy.point@gmail.com',
+    'logo_path': None
+}
+
+# Alto máximo del logo en el encabezado
+ALTO_LOGO_MM = 18
+
+
+def crear_estilos_ticket():
+    """
+    Crear la hoja de estilos usada por TicketGenerator.
+
+    Returns:
+        StyleSheet1 con los estilos de ticket
+    """
+    styles = getSampleStyleSheet()
+
+    # Estilo para encabezado de empresa
+    styles.add(ParagraphStyle(
+        name='EmpresaHeader',
+        parent=styles['Heading1'],
+        fontSize=14,
+        spaceAfter=6,
+        alignment=TA_CENTER,
+        textColor=colors.black
+    ))
+
+    # Estilo para datos de empresa
+    styles.add(ParagraphStyle(
+        name='EmpresaInfo',
+        parent=styles['Normal'],
+        fontSize=9,
+        spaceAfter=3,
+        alignment=TA_CENTER,
+        textColor=colors.black
+    ))
+
+    # Estilo para título de ticket
+    styles.add(ParagraphStyle(
+        name='TituloTicket',
+        parent=styles['Heading2'],
+        fontSize=12,
+        spaceAfter=8,
+        spaceBefore=8,
+        alignment=TA_CENTER,
+        textColor=colors.black
+    ))
+
+    # Estilo para datos del ticket
+    styles.add(ParagraphStyle(
+        name='DatosTicket',
+        parent=styles['Normal'],
+        fontSize=8,
+        spaceAfter=2,
+        alignment=TA_LEFT,
+        textColor=colors.black
+    ))
+
+    # Estilo para totales
+    styles.add(ParagraphStyle(
+        name='Totales',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=2,
+        alignment=TA_RIGHT,
+        textColor=colors.black
+    ))
+
+    return styles
+
+
+class TicketTemplateEngine:
+    """
+    Motor de plantillas de tickets con partes estáticas precompiladas.
+
+    Los estilos no dependen de la empresa y se conservan durante toda la
+    sesión. El encabezado y el logo se reconstruyen solo cuando
+    CompanyService notifica un cambio de configuración.
+    """
+
+    def __init__(self, company_service=None):
+        """
+        Inicializar el motor de plantillas.
+
+        Args:
+            company_service: Servicio de empresa (opcional). Si no se indica
+                se usa la instancia Singleton de CompanyService.
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise ImportError(
+                "reportlab es requerido para las plantillas de tickets. "
+                "Instalar con: pip install reportlab"
+            )
+
+        self._company_service = company_service
+        self._lock = threading.RLock()
+        self._logger = logging.getLogger(__name__)
+
+        self._estilos_ticket = None
+        self._datos_empresa: Optional[Dict[str, Any]] = None
+        self._logo = None
+        self._logo_cargado = False
+        self._encabezados: Dict[Tuple, List] = {}
+
+        # Estadísticas
+        self.aciertos = 0
+        self.compilaciones = 0
+        self.invalidaciones = 0
+
+        self._registrar_invalidacion()
+
+    def _registrar_invalidacion(self) -> None:
+        """Suscribirse a los cambios de configuración de empresa."""
+        try:
+            from services.company_service import CompanyService
+            CompanyService.registrar_listener_cambios(self.invalidar)
+        except ImportError:
+            self._logger.debug("CompanyService no disponible, sin invalidación automática")
+
+    def _obtener_company_service(self):
+        """Obtener CompanyService de forma lazy."""
+        if self._company_service is None:
+            from services.company_service import CompanyService
+            self._company_service = CompanyService()
+        return self._company_service
+
+    def invalidar(self) -> None:
+        """Descartar encabezado y logo precompilados."""
+        with self._lock:
+            self._datos_empresa = None
+            self._logo = None
+            self._logo_cargado = False
+            self._encabezados.clear()
+            self.invalidaciones += 1
+
+        self._logger.debug("Plantillas de tickets invalidadas por cambio de empresa")
+
+    def estilos_ticket(self):
+        """
+        Obtener la hoja de estilos de tickets.
+
+        Returns:
+            StyleSheet1 compartida (no debe modificarse)
+        """
+        with self._lock:
+            if self._estilos_ticket is None:
+                self._estilos_ticket = crear_estilos_ticket()
+            return self._estilos_ticket
+
+    def datos_empresa(self) -> Dict[str, Any]:
+        """
+        Obtener los datos de encabezado de la empresa.
+
+        Returns:
+            Diccionario con nombre, ruc, direccion, telefono, email y logo_path
+        """
+        with self._lock:
+            if self._datos_empresa is None:
+                try:
+                    datos = self._obtener_company_service().obtener_encabezado_documentos()
+                except Exception as e:
+                    self._logger.warning(f"No se pudo leer la empresa, usando datos por defecto: {e}")
+                    datos = {}
+                self._datos_empresa = {**DATOS_EMPRESA_DEFECTO, **(datos or {})}
+            return self._datos_empresa
+
+    def logo(self):
+        """
+        Obtener el logo de la empresa decodificado.
+
+        Returns:
+            Flowable Image nuevo que comparte la imagen decodificada, o None
+        """
+        with self._lock:
+            if not self._logo_cargado:
+                self._logo = self._cargar_logo(self.datos_empresa().get('logo_path'))
+                self._logo_cargado = True
+            return copy.copy(self._logo) if self._logo is not None else None
+
+    def _cargar_logo(self, logo_path: Optional[str]):
+        """
+        Leer y decodificar el logo una sola vez.
+
+        Args:
+            logo_path: Ruta del archivo de logo
+
+        Returns:
+            Image escalada al alto del encabezado o None
+        """
+        if not logo_path or not os.path.exists(logo_path):
+            return None
+
+        try:
+            logo = Image(logo_path, lazy=0)
+            escala = (ALTO_LOGO_MM * mm) / float(logo.imageHeight)
+            logo.drawHeight = ALTO_LOGO_MM * mm
+            logo.drawWidth = logo.imageWidth * escala
+            return logo
+        except Exception as e:
+            self._logger.warning(f"No se pudo cargar el logo {logo_path}: {e}")
+            return None
+
+    def _compilar(self, clave: Tuple, constructor) -> List:
+        """
+        Obtener flowables precompilados, construyéndolos si no existen.
+
+        Args:
+            clave: Clave de cache de la plantilla
+            constructor: Función que devuelve la lista de flowables
+
+        Returns:
+            Copias de los flowables listas para agregar a un story
+        """
+        with self._lock:
+            plantilla = self._encabezados.get(clave)
+            if plantilla is None:
+                plantilla = constructor()
+                self._encabezados[clave] = plantilla
+                self.compilaciones += 1
+            else:
+                self.aciertos += 1
+            return [copy.copy(flowable) for flowable in plantilla]
+
+    def encabezado_ticket(self) -> List:
+        """
+        Obtener el encabezado corporativo de TicketGenerator.
+
+        Returns:
+            Lista de flowables con logo, datos de empresa y separación
+        """
+        def construir():
+            styles = self.estilos_ticket()
+            empresa = self.datos_empresa()
+
+            story = []
+            logo = self.logo()
+            if logo is not None:
+                story.append(logo)
+            story.append(Paragraph(empresa['nombre'], styles['EmpresaHeader']))
+            for campo in ('ruc', 'direccion', 'telefono', 'email'):
+                story.append(Paragraph(empresa[campo] or '', styles['EmpresaInfo']))
+            story.append(Spacer(1, 10*mm))
+            return story
+
+        return self._compilar(('generador',), construir)
+
+    def encabezado_exportador(self, styles, titulo: str,
+                              empresa: Optional[Dict[str, Any]] = None) -> List:
+        """
+        Obtener el encabezado corporativo de los tickets de PDFExporter.
+
+        Args:
+            styles: Hoja de estilos del exportador (CorporateTitle, CompanyInfo, CorporateSubtitle)
+            titulo: Marcado del título del ticket
+            empresa: Datos de empresa explícitos (opcional, por defecto CompanyService)
+
+        Returns:
+            Lista de flowables con logo, empresa y título del ticket
+        """
+        datos = empresa or self.datos_empresa()
+        clave = ('exportador', id(styles), titulo,
+                 tuple(sorted((k, str(v)) for k, v in datos.items())))
+
+        def construir():
+            story = []
+            logo = self.logo()
+            if logo is not None:
+                story.append(logo)
+            story.append(Paragraph(
+                f"<b>{datos.get('nombre', DATOS_EMPRESA_DEFECTO['nombre'])}</b>",
+                styles['CorporateTitle']
+            ))
+            story.append(Paragraph(
+                f"{datos.get('direccion', DATOS_EMPRESA_DEFECTO['direccion'])}<br/>"
+                f"Tel: {datos.get('telefono', DATOS_EMPRESA_DEFECTO['telefono'])} | "
+                f"Email: {datos.get('email', DATOS_EMPRESA_DEFECTO['email'])}",
+                styles['CompanyInfo']
+            ))
+            story.append(Spacer(1, 0.3*inch))
+            story.append(Paragraph(titulo, styles['CorporateSubtitle']))
+            story.append(Spacer(1, 0.2*inch))
+            return story
+
+        return self._compilar(clave, construir)
+
+    def obtener_estadisticas(self) -> Dict[str, int]:
+        """
+        Obtener estadísticas de uso de las plantillas.
+
+        Returns:
+            Diccionario con aciertos, compilaciones e invalidaciones
+        """
+        with self._lock:
+            return {
+                'plantillas': len(self._encabezados),
+                'aciertos': self.aciertos,
+                'compilaciones': self.compilaciones,
+                'invalidaciones': self.invalidaciones
+            }
+
+
+_global_engine: Optional[TicketTemplateEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_ticket_template_engine() -> TicketTemplateEngine:
+    """
+    Obtener el motor de plantillas global (patrón Singleton).
+
+    Returns:
+        Instancia de TicketTemplateEngine
+    """
+    global _global_engine
+
+    with _engine_lock:
+        if _global_engine is None:
+            _global_engine = TicketTemplateEngine()
+        return _global_engine
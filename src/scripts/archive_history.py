@@ -0,0 +1,68 @@
+"""
+Archivado de períodos cerrados de la base de datos.
+
+Mueve ventas, detalle de ventas y movimientos anteriores a la fecha de
+corte a la base de archivo (<base>_archivo.db) y muestra el tamaño de
+ambas bases. Sin --hasta archiva los años cerrados dejando
+ArchiveService.ANIOS_EN_CALIENTE años completos en la base caliente.
+
+Uso:
+    python src/scripts/archive_history.py [--db inventario.db] [--hasta 2024-01-01] [--sin-vacuum]
+    python src/scripts/archive_history.py --estadisticas
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection
+from services.archive_service import ArchiveService
+
+
+def mostrar_estadisticas(service: ArchiveService) -> None:
+    """Imprimir filas y tamaño de la base caliente y del archivo."""
+    datos = service.estadisticas()
+    print(f"Fecha de corte: {datos['fecha_corte'] or 'sin archivar'}")
+    for tabla, filas in datos['filas'].items():
+        print(f"  {tabla:16s} caliente {filas['caliente']:>10,}  archivo {filas['archivo']:>10,}")
+    print(f"Base caliente: {datos['tamano_caliente'] / 1024 / 1024:8.2f} MB")
+    print(f"Archivo:       {datos['tamano_archivo'] / 1024 / 1024:8.2f} MB ({datos['ruta_archivo']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivado de períodos cerrados")
+    parser.add_argument('--db', default='inventario.db', help="Base de datos caliente")
+    parser.add_argument('--hasta', type=date.fromisoformat, help="Fecha de corte (primer día de mes)")
+    parser.add_argument('--sin-vacuum', action='store_true', help="No compactar la base caliente")
+    parser.add_argument('--estadisticas', action='store_true', help="Solo mostrar estadísticas")
+    args = parser.parse_args()
+
+    db = DatabaseConnection(args.db)
+    db.create_tables()
+    service = ArchiveService(db)
+
+    try:
+        if not args.estadisticas:
+            if args.hasta:
+                resultado = service.archivar_hasta(args.hasta, compactar=not args.sin_vacuum)
+            else:
+                resultado = service.archivar_periodos_cerrados(compactar=not args.sin_vacuum)
+
+            if resultado:
+                print(f"Archivado hasta {resultado['fecha_corte']}: {resultado['ventas']} ventas, "
+                      f"{resultado['detalles']} detalles, {resultado['movimientos']} movimientos")
+            else:
+                print("No hay períodos cerrados pendientes de archivar")
+
+        mostrar_estadisticas(service)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
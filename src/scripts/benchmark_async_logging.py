@@ -0,0 +1,116 @@
+"""
+Benchmark del logging síncrono frente al pipeline asíncrono.
+
+Simula un disco lento (cada escritura espera --latencia-ms) y mide la
+latencia por llamada de un registro estructurado (como
+LoggingHelper.log_database_operation) en ráfagas, primero con el handler en
+el hilo que registra y luego con la cola acotada de helpers.async_logging
+para cada política de descarte.
+
+Uso:
+    python src/scripts/benchmark_async_logging.py [--registros 2000] [--rafaga 200] [--latencia-ms 2] [--cola 500]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from helpers.async_logging import POLITICAS, AsyncLogging, JsonLinesFormatter, async_logging
+
+
+class DiscoLentoHandler(logging.FileHandler):
+    """FileHandler que espera `latencia` segundos por escritura."""
+
+    def __init__(self, ruta: str, latencia: float):
+        super().__init__(ruta, encoding='utf-8')
+        self.latencia = latencia
+        self.escritos = 0
+
+    def emit(self, record):
+        time.sleep(self.latencia)
+        super().emit(record)
+        self.escritos += 1
+
+
+def limpiar_raiz():
+    """Quitar los handlers del logger raíz (incluido el pipeline global)."""
+    async_logging.detener()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.setLevel(logging.INFO)
+
+
+def carga(registros: int, rafaga: int, pausa: float):
+    """Registrar en ráfagas; devuelve las latencias por llamada en µs."""
+    logger = logging.getLogger('inventory.services.benchmark')
+    latencias = []
+    for i in range(registros):
+        datos = {'table': 'movimientos', 'operation': 'INSERT', 'record_id': i, 'details': {'cantidad': 1}}
+        t0 = time.perf_counter()
+        logger.info("DB_OPERATION: INSERT movimientos", extra={'evento': 'DB_OPERATION', 'datos': datos})
+        latencias.append((time.perf_counter() - t0) * 1e6)
+        if (i + 1) % rafaga == 0:
+            time.sleep(pausa)
+    return latencias
+
+
+def resumen(nombre: str, latencias, extra: str = ""):
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[int(len(ordenadas) * 0.99) - 1]
+    print(f"{nombre:<24} {statistics.median(ordenadas):9.1f} {p99:10.1f} {ordenadas[-1]:10.1f}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging síncrono vs asíncrono con disco lento")
+    parser.add_argument('--registros', type=int, default=2000, help="Registros por modo")
+    parser.add_argument('--rafaga', type=int, default=200, help="Registros por ráfaga")
+    parser.add_argument('--pausa-ms', type=float, default=100, help="Pausa entre ráfagas")
+    parser.add_argument('--latencia-ms', type=float, default=2.0, help="Latencia simulada por escritura")
+    parser.add_argument('--cola', type=int, default=500, help="Capacidad de la cola asíncrona")
+    args = parser.parse_args()
+
+    latencia = args.latencia_ms / 1000
+    pausa = args.pausa_ms / 1000
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"{'Modo':<24} {'p50 (µs)':>9} {'p99 (µs)':>10} {'max (µs)':>10}")
+
+        limpiar_raiz()
+        disco = DiscoLentoHandler(os.path.join(directorio, 'sincrono.jsonl'), latencia)
+        disco.setFormatter(JsonLinesFormatter())
+        logging.getLogger().addHandler(disco)
+        resumen('síncrono', carga(args.registros, args.rafaga, pausa), f"{disco.escritos} escritos")
+        logging.getLogger().removeHandler(disco)
+        disco.close()
+
+        for politica in POLITICAS:
+            limpiar_raiz()
+            pipeline = AsyncLogging()
+            pipeline.configurar(capacidad_cola=args.cola, politica=politica)
+            pipeline.iniciar()
+            disco = DiscoLentoHandler(os.path.join(directorio, f'{politica}.jsonl'), latencia)
+            disco.setFormatter(JsonLinesFormatter())
+            pipeline.agregar_handler(disco)
+
+            latencias = carga(args.registros, args.rafaga, pausa)
+            t0 = time.perf_counter()
+            pipeline.detener()
+            vaciado = (time.perf_counter() - t0) * 1000
+            stats = pipeline.estadisticas()
+            resumen(f'async {politica}', latencias,
+                    f"{disco.escritos} escritos, {stats['descartados']} descartados, vaciado {vaciado:.0f} ms")
+            logging.getLogger().removeHandler(disco)
+            disco.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark de reapertura de ventanas con y sin pool de formularios.
+
+Crea una base con clientes y productos, y abre/cierra repetidamente las
+ventanas de ventas, clientes y productos mediante
+WindowManager.open_pooled, primero con el pool deshabilitado (cada
+apertura reconstruye el formulario) y luego habilitado (las reaperturas
+muestran la ventana oculta). Antes de la última apertura se inserta un
+cliente para medir también la reapertura con refresco de catálogo.
+
+Requiere display (tkinter).
+
+Uso:
+    python src/scripts/benchmark_form_reopen.py [--aperturas 10] [--clientes 2000] [--productos 5000]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+import tkinter as tk
+
+from db.database import get_database_connection, initialize_database
+from services.service_container import setup_default_container
+from ui.utils.window_manager import DEFAULT_POOL_BUDGET_BYTES, window_manager
+
+VENTANAS = {
+    'sales': ('ui.forms.sales_form', 'SalesWindow'),
+    'clients': ('ui.forms.client_form', 'ClientWindow'),
+    'products': ('ui.forms.product_form', 'ProductWindow'),
+}
+
+
+def preparar_base_datos(ruta: str, clientes: int, productos: int) -> None:
+    """Crear base con clientes y productos de prueba."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO clientes (nombre, ruc) VALUES (?, ?)",
+        [(f"Cliente {i + 1}", f"{10000000 + i}") for i in range(clientes)]
+    )
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 100, 5, 5, 10, 16)",
+        [(f"Producto {i + 1}",) for i in range(productos)]
+    )
+    conn.commit()
+    db.close()
+
+
+def medir(raiz: tk.Tk, nombre: str, clase, aperturas: int, db) -> None:
+    """Abrir y cerrar la ventana `aperturas` veces; la última tras insertar un cliente."""
+    for i in range(aperturas):
+        if i == aperturas - 1:
+            conn = db.get_connection()
+            conn.execute("INSERT INTO clientes (nombre) VALUES (?)", (f"Cliente nuevo {time.time_ns()}",))
+            conn.commit()
+        form = window_manager.open_pooled(nombre, lambda: clase(raiz))
+        raiz.update()
+        form._close_or_hide()
+        raiz.update()
+
+
+def imprimir(titulo: str) -> None:
+    stats = window_manager.get_pool_stats()
+    print(f"\n{titulo} (pool ~{stats['pooled_bytes'] // 1024} KB de {stats['budget_bytes'] // 1024} KB)")
+    print(f"  {'Ventana':<10} {'nuevas':>7} {'ms':>9} {'reusadas':>9} {'ms':>9} {'última':>9}")
+    for nombre, datos in stats['opens'].items():
+        print(f"  {nombre:<10} {datos['cold']:7d} {datos['cold_ms']:9.1f} {datos['warm']:9d} "
+              f"{datos['warm_ms']:9.1f} {datos['last_ms']:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reapertura de ventanas con y sin pool")
+    parser.add_argument('--aperturas', type=int, default=10, help="Aperturas por ventana y modo")
+    parser.add_argument('--clientes', type=int, default=2000, help="Clientes en la base")
+    parser.add_argument('--productos', type=int, default=5000, help="Productos en la base")
+    parser.add_argument('--ventanas', nargs='+', default=list(VENTANAS), choices=list(VENTANAS))
+    args = parser.parse_args()
+
+    try:
+        raiz = tk.Tk()
+    except tk.TclError as e:
+        print(f"Se requiere display para este benchmark: {e}")
+        sys.exit(1)
+    raiz.withdraw()
+
+    clases = {nombre: getattr(importlib.import_module(modulo), clase)
+              for nombre, (modulo, clase) in VENTANAS.items() if nombre in args.ventanas}
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'ventanas.db')
+        preparar_base_datos(ruta, args.clientes, args.productos)
+        db = get_database_connection(ruta)
+        setup_default_container()
+        window_manager.configure_pool(catalog_versions=db.get_catalog_versions)
+
+        for presupuesto, titulo in ((0, "Sin pool"), (DEFAULT_POOL_BUDGET_BYTES, "Con pool")):
+            window_manager.clear_pool()
+            window_manager._open_stats.clear()
+            window_manager.configure_pool(budget_bytes=presupuesto)
+            for nombre, clase in clases.items():
+                medir(raiz, nombre, clase, args.aperturas, db)
+            imprimir(titulo)
+
+        print("\nLa última apertura de cada ventana ocurre tras insertar un cliente "
+              "(refresco de catálogo en ventas y clientes).")
+        window_manager.clear_pool()
+        db.close()
+    raiz.destroy()
+
+
+if __name__ == '__main__':
+    main()
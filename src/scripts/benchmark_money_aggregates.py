@@ -0,0 +1,176 @@
+"""
+Benchmark de agregados de montos: REAL + Decimal por fila frente a centavos enteros.
+
+Genera ventas sintéticas con montos calculados en float (como los guardaba
+el código anterior: 10.7 + 0.75 = 11.450000000000001) y mide:
+
+- Migración 13: canonicalizar los montos guardados a centavos exactos.
+- Totales del reporte de ventas: antes leyendo REAL y sumando
+  Decimal(str(valor)) fila por fila; después sumando los centavos enteros
+  que entrega la consulta (Money.sql).
+- Agregado en SQL: SUM sobre REAL (rápido, pero acumula error binario)
+  frente a SUM de centavos enteros (exacto).
+- ReportService.generate_sales_report y generate_profitability_report
+  completos sobre la base migrada.
+
+Uso:
+    python src/scripts/benchmark_money_aggregates.py [--ventas 200000] [--lineas 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection, initialize_database
+from models.money import Money
+from services.report_service import ReportService
+
+
+def preparar_base_datos(ruta: str, ventas: int, lineas: int):
+    """Crear base con ventas cuyos montos se calcularon en float, sin redondear."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    rng = random.Random(7)
+    conn.execute("UPDATE sync_contexto SET registrar = 0")
+
+    precios = [round(rng.uniform(0.25, 80), 2) for _ in range(500)]
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 0, ?, ?, ?, 7)",
+        [(f"Producto {i + 1}", p * 0.6, p * 0.6, p) for i, p in enumerate(precios)]
+    )
+
+    inicio = date.today() - timedelta(days=365)
+    cabeceras, detalle = [], []
+    for id_venta in range(1, ventas + 1):
+        subtotal = impuestos = 0.0
+        for _ in range(lineas):
+            id_producto = rng.randint(1, len(precios))
+            cantidad = rng.randint(1, 5)
+            precio = precios[id_producto - 1]
+            subtotal_item = precio * cantidad
+            impuesto_item = subtotal_item * 0.07
+            subtotal += subtotal_item
+            impuestos += impuesto_item
+            detalle.append((id_venta, id_producto, cantidad, precio, subtotal_item, impuesto_item,
+                            precio * 0.6, precio * 0.6 * cantidad))
+        fecha = inicio + timedelta(days=id_venta * 365 // ventas)
+        cabeceras.append((id_venta, f"{fecha.isoformat()} 12:00:00", subtotal, impuestos, subtotal + impuestos))
+
+    conn.executemany(
+        "INSERT INTO ventas (id_venta, fecha_venta, subtotal, impuestos, total, responsable) "
+        "VALUES (?, ?, ?, ?, ?, 'bench')", cabeceras
+    )
+    conn.executemany(
+        "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item, "
+        "impuesto_item, costo_unitario, costo_total) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", detalle
+    )
+    conn.execute("UPDATE sync_contexto SET registrar = 1")
+    conn.commit()
+    return db, inicio
+
+
+def medir(funcion, repeticiones: int = 3):
+    """Mejor tiempo (ms) de varias ejecuciones y el último resultado."""
+    mejor, resultado = float('inf'), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, (time.perf_counter() - t0) * 1000)
+    return mejor, resultado
+
+
+def migrar(db: DatabaseConnection) -> float:
+    """Volver a aplicar la migración 13 sobre los montos sin redondear (ms)."""
+    conn = db.get_connection()
+    conn.execute("DELETE FROM db_version WHERE version = 13")
+    conn.execute("PRAGMA user_version = 12")
+    conn.commit()
+    t0 = time.perf_counter()
+    db.create_tables()
+    return (time.perf_counter() - t0) * 1000
+
+
+def totales_decimal(conn):
+    """Antes: leer REAL y acumular Decimal(str(valor)) por fila."""
+    subtotal = impuestos = total = Decimal('0')
+    for fila in conn.execute("SELECT subtotal, impuestos, total FROM ventas"):
+        subtotal += Decimal(str(fila[0]))
+        impuestos += Decimal(str(fila[1]))
+        total += Decimal(str(fila[2]))
+    return float(subtotal), float(impuestos), float(total)
+
+
+def totales_centavos(conn):
+    """Después: la consulta entrega centavos enteros y se suman como int."""
+    subtotal = impuestos = total = 0
+    for fila in conn.execute(
+        f"SELECT {Money.sql('subtotal')}, {Money.sql('impuestos')}, {Money.sql('total')} FROM ventas"
+    ):
+        subtotal += fila[0]
+        impuestos += fila[1]
+        total += fila[2]
+    return float(Money(subtotal)), float(Money(impuestos)), float(Money(total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de agregados de montos")
+    parser.add_argument('--ventas', type=int, default=200000, help="Ventas a generar")
+    parser.add_argument('--lineas', type=int, default=3, help="Líneas por venta")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'montos.db')
+        print(f"Generando {args.ventas} ventas con {args.lineas} líneas...")
+        db, inicio = preparar_base_datos(ruta, args.ventas, args.lineas)
+        conn = db.get_connection()
+
+        suma_real_antes = conn.execute("SELECT SUM(total) FROM ventas").fetchone()[0]
+        sin_redondear = conn.execute(
+            "SELECT COUNT(*) FROM ventas WHERE total <> ROUND(total, 2)"
+        ).fetchone()[0]
+        print(f"\nMigración 13 ({sin_redondear} ventas con total fuera de centavos):")
+        print(f"  {migrar(db):.0f} ms")
+        conn = db.get_connection()
+
+        print("\nTotales del reporte de ventas (Python):")
+        antes_ms, antes = medir(lambda: totales_decimal(conn))
+        despues_ms, despues = medir(lambda: totales_centavos(conn))
+        print(f"  REAL + Decimal(str()) por fila: {antes_ms:8.1f} ms  total={antes[2]:.2f}")
+        print(f"  centavos enteros:               {despues_ms:8.1f} ms  total={despues[2]:.2f}  "
+              f"({antes_ms / despues_ms:.1f}x)")
+
+        print("\nAgregado en SQL:")
+        real_ms, (suma_real,) = medir(lambda: conn.execute("SELECT SUM(total) FROM ventas").fetchone())
+        enteros_ms, (suma_centavos,) = medir(
+            lambda: conn.execute(f"SELECT SUM({Money.sql('total')}) FROM ventas").fetchone()
+        )
+        exacto = Money(suma_centavos)
+        print(f"  SUM(total) REAL:     {real_ms:8.1f} ms  {suma_real!r}")
+        print(f"  SUM de centavos:     {enteros_ms:8.1f} ms  {exacto}")
+        print(f"  error de SUM REAL: {Decimal(repr(suma_real)) - exacto.decimal()} "
+              f"(sin migrar: {Decimal(repr(suma_real_antes)) - exacto.decimal()})")
+
+        servicio = ReportService(db)
+        fin = date.today()
+        print("\nReportes completos:")
+        ventas_ms, reporte = medir(lambda: servicio.generate_sales_report(inicio, fin))
+        print(f"  generate_sales_report:         {ventas_ms:8.1f} ms  "
+              f"gran_total={reporte['totals']['gran_total']:.2f}")
+        rentabilidad_ms, reporte = medir(lambda: servicio.generate_profitability_report(inicio, fin))
+        print(f"  generate_profitability_report: {rentabilidad_ms:8.1f} ms  "
+              f"ganancia={reporte['totals']['total_ganancia']:.2f}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark del historial de movimientos: Treeview completo frente a DataGrid virtual.
+
+Crea una base con movimientos, los lee por páginas con
+MovementService.get_movements_page (como el historial al desplazarse y al
+exportar) y mide el bloqueo del hilo de Tk (hasta update_idletasks) de:
+
+- Antes: un item de Treeview por movimiento, agregado página a página, y
+  el borrado item por item al iniciar otra búsqueda.
+- Después: DataGrid(virtual=True) con append_rows por página (solo se
+  materializan las filas visibles) y clear_data.
+
+Se informa la peor página (bloqueo al llegar al final del scroll), el
+total de cargar todas las páginas (exportación) y el tiempo de limpiar.
+
+Requiere display (tkinter).
+
+Uso:
+    python src/scripts/benchmark_movement_history_grid.py [--movimientos 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+import tkinter as tk
+from tkinter import ttk
+
+from db.database import initialize_database
+from services.movement_service import MovementService
+from ui.widgets.data_grid import DataGrid
+
+COLUMNAS = ('ID', 'Fecha/Hora', 'Tipo', 'Ticket', 'Producto', 'Cantidad', 'Responsable', 'Observaciones')
+
+
+def preparar_base_datos(ruta: str, movimientos: int):
+    """Crear base con productos y movimientos repartidos en un año."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    rng = random.Random(29)
+    conn.execute("UPDATE sync_contexto SET registrar = 0")
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 0, 1, 1, 2, 7)",
+        [(f"Producto {i + 1}",) for i in range(200)]
+    )
+    inicio = datetime.now() - timedelta(days=360)
+    conn.executemany(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((rng.randint(1, 200), rng.choice(('ENTRADA', 'VENTA', 'AJUSTE')), rng.randint(1, 10),
+          rng.choice(('admin', 'caja1', 'caja2')),
+          (inicio + timedelta(seconds=i * 360 * 86400 // movimientos)).strftime('%Y-%m-%d %H:%M:%S'))
+         for i in range(movimientos))
+    )
+    conn.execute("UPDATE sync_contexto SET registrar = 1")
+    conn.commit()
+    return db, inicio
+
+
+def leer_paginas(servicio: MovementService, filtros: dict):
+    """Todas las páginas del historial convertidas en filas de la tabla."""
+    paginas, cursor = [], None
+    while True:
+        pagina = servicio.get_movements_page(filtros, cursor=cursor)
+        paginas.append([
+            [m.get('id_movimiento', ''), m.get('fecha_movimiento', ''), m.get('tipo_movimiento', ''),
+             m.get('id_venta') or '', m.get('producto_nombre', ''), m.get('cantidad', ''),
+             m.get('responsable', ''), m.get('observaciones') or '']
+            for m in pagina['movements']
+        ])
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            return paginas
+
+
+def bloqueo(raiz: tk.Tk, funcion) -> float:
+    """Tiempo (ms) de la llamada más el repintado pendiente."""
+    t0 = time.perf_counter()
+    funcion()
+    raiz.update_idletasks()
+    return (time.perf_counter() - t0) * 1000
+
+
+def medir_treeview(raiz: tk.Tk, paginas):
+    """Antes: un item de Treeview por movimiento."""
+    marco = ttk.Frame(raiz)
+    marco.pack(fill=tk.BOTH, expand=True)
+    arbol = ttk.Treeview(marco, columns=COLUMNAS, show='headings', height=15)
+    arbol.pack(fill=tk.BOTH, expand=True)
+
+    def agregar(filas):
+        for fila in filas:
+            arbol.insert('', 'end', values=fila)
+
+    tiempos = [bloqueo(raiz, lambda p=pagina: agregar(p)) for pagina in paginas]
+    limpiar = bloqueo(raiz, lambda: [arbol.delete(item) for item in arbol.get_children()])
+    marco.destroy()
+    return tiempos, limpiar
+
+
+def medir_data_grid(raiz: tk.Tk, paginas):
+    """Después: DataGrid virtual con append_rows por página."""
+    grilla = DataGrid(raiz, [(c, c, 100) for c in COLUMNAS], show_search=False, virtual=True)
+    grilla.pack(fill=tk.BOTH, expand=True)
+    raiz.update_idletasks()
+
+    tiempos = [bloqueo(raiz, lambda: grilla.set_data(paginas[0]))]
+    tiempos += [bloqueo(raiz, lambda p=pagina: grilla.append_rows(p)) for pagina in paginas[1:]]
+    limpiar = bloqueo(raiz, grilla.clear_data)
+    grilla.destroy()
+    return tiempos, limpiar
+
+
+def imprimir(nombre: str, tiempos, limpiar: float) -> None:
+    print(f"  {nombre:<22} peor página {max(tiempos):8.1f} ms   todas {sum(tiempos):9.1f} ms   "
+          f"limpiar {limpiar:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historial de movimientos: Treeview frente a DataGrid virtual")
+    parser.add_argument('--movimientos', type=int, default=100000, help="Movimientos en la base")
+    args = parser.parse_args()
+
+    try:
+        raiz = tk.Tk()
+    except tk.TclError as e:
+        print(f"Se requiere display para este benchmark: {e}")
+        sys.exit(1)
+    raiz.geometry('1000x400')
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db, inicio = preparar_base_datos(os.path.join(directorio, 'historial.db'), args.movimientos)
+        paginas = leer_paginas(MovementService(db), {'start_date': inicio})
+        filas = sum(len(p) for p in paginas)
+        print(f"{filas} movimientos en {len(paginas)} páginas (bloqueo del hilo de Tk):")
+        imprimir("Treeview (antes)", *medir_treeview(raiz, paginas))
+        imprimir("DataGrid virtual", *medir_data_grid(raiz, paginas))
+        db.close()
+    raiz.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark de listados del catálogo: Producto por fila frente a filas compactas.
+
+Crea un catálogo de productos y mide tiempo y memoria retenida
+(tracemalloc) de:
+
+- Antes: SELECT con DatabaseHelper.safe_execute (dict por sqlite3.Row) y
+  un Producto con cuatro Decimal por fila, como hacían get_all_products y
+  get_products_by_status.
+- Después: ProductService.list_products con las columnas del listado
+  (ProductoFila), con las proyecciones de la API y del generador de
+  etiquetas y con una proyección mínima (ID, nombre, stock, precio).
+- Búsqueda del widget: Producto -> dict -> dict (normalización doble)
+  frente a ProductoFila -> dict.
+
+Uso:
+    python src/scripts/benchmark_product_listing.py [--productos 100000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import initialize_database
+from models.producto import Producto
+from services.product_service import ProductService
+
+# Proyecciones de los llamadores (api/routes/products.py y LabelGeneratorForm)
+LISTADO_API = ('id_producto', 'nombre', 'descripcion', 'precio', 'stock', 'stock_minimo',
+               'id_categoria', 'categoria_nombre', 'activo', 'fecha_creacion')
+LISTADO_ETIQUETAS = ('id_producto', 'nombre', 'id_categoria', 'precio', 'stock', 'categoria_nombre')
+
+
+def preparar_base_datos(ruta: str, productos: int):
+    """Crear base con un catálogo de productos activos."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    conn.execute("UPDATE sync_contexto SET registrar = 0")
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, ?, ?, ?, ?, 7)",
+        [(f"Producto de catálogo {i + 1:06d}", i % 500, 3.25 + i % 97, 3.25 + i % 97, 5.5 + i % 97)
+         for i in range(productos)]
+    )
+    conn.execute("UPDATE sync_contexto SET registrar = 1")
+    conn.commit()
+    return db
+
+
+def listado_producto(servicio: ProductService):
+    """Antes: dict por fila y Producto con Decimal."""
+    filas = servicio.db_helper.safe_execute("""
+        SELECT p.id_producto, p.nombre, p.descripcion, p.precio, p.costo,
+               p.stock, p.stock_minimo, p.id_categoria, c.nombre as categoria_nombre,
+               c.tipo AS categoria_tipo,
+               p.tasa_impuesto, p.activo, p.fecha_creacion
+        FROM productos p
+        LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
+        WHERE p.activo = 1 ORDER BY p.nombre
+    """, None, 'all')
+    return [
+        Producto(
+            id_producto=row['id_producto'],
+            nombre=row['nombre'],
+            id_categoria=row['id_categoria'],
+            categoria_tipo=row['categoria_tipo'],
+            stock=row['stock'] if row['stock'] is not None else 0,
+            costo=Decimal(str(row['costo'])) if row['costo'] is not None else Decimal('0'),
+            precio=Decimal(str(row['precio'])) if row['precio'] is not None else Decimal('0'),
+            tasa_impuesto=Decimal(str(row['tasa_impuesto'])) if row['tasa_impuesto'] is not None else Decimal('0'),
+            activo=bool(row['activo']) if row['activo'] is not None else True
+        )
+        for row in filas
+    ]
+
+
+def normalizar_producto(product) -> dict:
+    """Antes: conversión del widget de Producto a dict y de nuevo a dict."""
+    normalizado = {
+        'id': product.id_producto, 'id_producto': product.id_producto, 'nombre': product.nombre,
+        'stock': product.stock, 'categoria_tipo': product.categoria_tipo,
+        'precio': float(product.precio), 'activo': product.activo, 'costo': float(product.costo),
+        'tasa_impuesto': float(product.tasa_impuesto), 'id_categoria': product.id_categoria
+    }
+    copia = {
+        'id': normalizado['id'], 'nombre': normalizado['nombre'], 'stock': normalizado['stock'],
+        'categoria_tipo': normalizado['categoria_tipo'], 'precio': normalizado['precio'],
+        'activo': normalizado['activo']
+    }
+    copia.update(normalizado)
+    return copia
+
+
+def normalizar_fila(fila) -> dict:
+    """Después: ProductoFila a dict en un paso."""
+    normalizado = fila.to_dict()
+    normalizado['id'] = normalizado['id_producto']
+    return normalizado
+
+
+def medir(nombre: str, funcion, base_ms: float = None, base_bytes: int = None):
+    """Tiempo (mejor de 3) y memoria retenida por el resultado."""
+    mejor = float('inf')
+    for _ in range(3):
+        gc.collect()
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, (time.perf_counter() - t0) * 1000)
+        del resultado
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion()
+    gc.collect()
+    retenido, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    comparacion = ""
+    if base_ms is not None:
+        comparacion = f"  ({base_ms / mejor:.1f}x tiempo, {base_bytes / retenido:.1f}x memoria)"
+    print(f"  {nombre:<42} {mejor:8.1f} ms  {retenido / 1024 / 1024:7.1f} MiB"
+          f"  {len(resultado)} filas{comparacion}")
+    return mejor, retenido
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de listados del catálogo")
+    parser.add_argument('--productos', type=int, default=100000, help="Productos del catálogo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = preparar_base_datos(os.path.join(directorio, 'catalogo.db'), args.productos)
+        servicio = ProductService(db)
+
+        print(f"Listado de {args.productos} productos:")
+        base_ms, base_bytes = medir("Producto + Decimal (antes)", lambda: listado_producto(servicio))
+        medir("list_products (listado)", servicio.list_products, base_ms, base_bytes)
+        medir("list_products (ID, nombre, stock, precio)",
+              lambda: servicio.list_products(('id_producto', 'nombre', 'stock', 'precio')),
+              base_ms, base_bytes)
+        medir("list_products (API /products)",
+              lambda: servicio.list_products(LISTADO_API), base_ms, base_bytes)
+        medir("list_products (etiquetas)",
+              lambda: servicio.list_products(LISTADO_ETIQUETAS), base_ms, base_bytes)
+
+        print("\nResultados normalizados para el widget de búsqueda:")
+        productos = listado_producto(servicio)
+        filas = servicio.list_products(ProductService.SEARCH_COLUMNS)
+        base_ms, base_bytes = medir("Producto -> dict -> dict (antes)",
+                                    lambda: [normalizar_producto(p) for p in productos])
+        medir("ProductoFila -> dict", lambda: [normalizar_fila(f) for f in filas], base_ms, base_bytes)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark del costo de la instrumentación de consultas.
+
+Ejecuta la misma carga de servicios (historial paginado de movimientos,
+reporte de movimientos y búsquedas por producto) con la instrumentación
+apagada y encendida en rondas alternadas y compara el mejor tiempo de
+cada modo. Muestra las sentencias más costosas y las consultas lentas
+capturadas, y opcionalmente exporta el JSON completo.
+
+Uso:
+    python src/scripts/benchmark_query_metrics.py [--movimientos 100000] [--repeticiones 20] [--rondas 3] [--json metricas.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection, initialize_database
+from db.query_metrics import query_metrics
+from services.movement_service import MovementService
+from services.report_service import ReportService
+
+
+def preparar_base_datos(ruta: str, movimientos: int) -> None:
+    """Crear base con 200 productos y movimientos repartidos en un año."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, precio) VALUES (?, 1, 100, 5, 10)",
+        [(f"Producto {i + 1}",) for i in range(200)]
+    )
+    inicio = datetime.now() - timedelta(days=365)
+    fechas = sorted(inicio + timedelta(seconds=rng.randint(0, 365 * 86400)) for _ in range(movimientos))
+    conn.executemany(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((rng.randint(1, 200), rng.choice(('ENTRADA', 'VENTA', 'AJUSTE')), rng.randint(1, 10),
+          rng.choice(('admin', 'caja1', 'caja2')), f.strftime('%Y-%m-%d %H:%M:%S')) for f in fechas)
+    )
+    conn.commit()
+    db.close()
+
+
+def carga(ruta: str, repeticiones: int) -> float:
+    """Ejecutar la carga de servicios y devolver el tiempo total en segundos."""
+    db = DatabaseConnection(ruta)
+    movimientos = MovementService(db)
+    reportes = ReportService(db)
+    hasta = date.today()
+    desde = hasta - timedelta(days=90)
+    filtros = {'start_date': datetime.combine(desde, datetime.min.time()),
+               'end_date': datetime.combine(hasta, datetime.min.time())}
+
+    t0 = time.perf_counter()
+    for i in range(repeticiones):
+        with query_metrics.traza('historial_movimientos'):
+            pagina = movimientos.get_movements_page(filtros)
+            while pagina['next_cursor'] is not None and len(pagina['movements']) < 1000:
+                pagina = movimientos.get_movements_page(filtros, cursor=pagina['next_cursor'])
+            movimientos.count_movements(filtros)
+        with query_metrics.traza('reporte_movimientos'):
+            reportes.generate_movements_report(desde, hasta)
+        with query_metrics.traza('consulta_producto'):
+            for id_producto in range(1 + i, 200, 20):
+                movimientos.get_movements_page({'product_id': id_producto}, page_size=50)
+    transcurrido = time.perf_counter() - t0
+    db.close()
+    return transcurrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de la instrumentación de consultas")
+    parser.add_argument('--movimientos', type=int, default=100000, help="Movimientos sintéticos")
+    parser.add_argument('--repeticiones', type=int, default=20, help="Repeticiones de la carga")
+    parser.add_argument('--rondas', type=int, default=3, help="Rondas alternadas por modo")
+    parser.add_argument('--lenta-ms', type=float, default=20.0, help="Umbral de consulta lenta")
+    parser.add_argument('--json', help="Exportar métricas completas a este archivo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'benchmark.db')
+        preparar_base_datos(ruta, args.movimientos)
+
+        carga(ruta, 2)  # Calentar caché de páginas
+        # Rondas alternadas, mejor tiempo de cada modo (reduce el ruido del sistema)
+        apagado = encendido = float('inf')
+        for _ in range(args.rondas):
+            query_metrics.configurar(habilitado=False)
+            apagado = min(apagado, carga(ruta, args.repeticiones))
+            query_metrics.configurar(habilitado=True, umbral_lento_ms=args.lenta_ms)
+            query_metrics.reiniciar()
+            encendido = min(encendido, carga(ruta, args.repeticiones))
+        query_metrics.configurar(habilitado=False, umbral_lento_ms=args.lenta_ms)
+
+    metricas = query_metrics.exportar()
+    total = sum(s['ejecuciones'] for s in metricas['sentencias'])
+    print(f"Instrumentación apagada:   {apagado * 1000:9.1f} ms")
+    print(f"Instrumentación encendida: {encendido * 1000:9.1f} ms "
+          f"({(encendido / apagado - 1) * 100:+.1f}%, {total} sentencias, "
+          f"{(encendido - apagado) / max(total, 1) * 1e6:.1f} µs por sentencia)")
+
+    print("\nSentencias con mayor tiempo total:")
+    for sentencia in metricas['sentencias'][:5]:
+        print(f"  {sentencia['tiempo_total_ms'] + sentencia['tiempo_fetch_ms']:9.1f} ms "
+              f"x{sentencia['ejecuciones']:<5} p95 {sentencia['p95_ms']} ms  {sentencia['sql'][:90]}")
+
+    print(f"\nConsultas lentas (>= {args.lenta_ms} ms): {len(metricas['consultas_lentas'])}")
+    for lenta in metricas['consultas_lentas'][:3]:
+        print(f"  {lenta['duracion_ms']:8.1f} ms [{lenta['accion']}] {lenta['sql'][:80]}")
+        for paso in lenta['plan'] or []:
+            print(f"      {paso}")
+
+    if args.json:
+        query_metrics.exportar_json(args.json)
+        print(f"\nMétricas exportadas a {args.json}")
+
+
+if __name__ == '__main__':
+    main()
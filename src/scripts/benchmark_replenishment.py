@@ -0,0 +1,85 @@
+"""
+Benchmark del motor de reposición.
+
+Genera un catálogo de MATERIALES con historial de ventas diario y mide
+el tiempo de ReplenishmentService.recalcular_catalogo (consulta de
+demanda, cálculo vectorial y guardado de sugerencias).
+
+Uso:
+    python src/scripts/benchmark_replenishment.py [--productos 5000] [--dias 90] [--ventas-dia 500]
+
+Objetivo: recalcular el catálogo completo en menos de 1 segundo.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import initialize_database
+from services.replenishment_service import ReplenishmentService
+
+OBJETIVO_MS = 1000.0
+
+
+def preparar_base_datos(directorio: str, productos: int, dias: int, ventas_por_dia: int):
+    """Crear una base de datos temporal con productos y movimientos VENTA."""
+    db = initialize_database(os.path.join(directorio, 'benchmark.db'))
+    conn = db.get_connection()
+    random.seed(42)
+
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, stock_minimo, precio) VALUES (?, 1, ?, 5, 10)",
+        [(f"Producto {i + 1}", random.randint(0, 200)) for i in range(productos)]
+    )
+
+    hoy = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    filas = []
+    for dia in range(dias):
+        fecha = (hoy - timedelta(days=dia)).strftime('%Y-%m-%d %H:%M:%S')
+        for _ in range(ventas_por_dia):
+            filas.append((random.randint(1, productos), random.randint(1, 5), fecha))
+    conn.executemany(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+        "VALUES (?, 'VENTA', ?, 'bench', ?)",
+        filas
+    )
+    conn.commit()
+    return db, len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de reposición")
+    parser.add_argument('--productos', type=int, default=5000, help="Productos MATERIAL del catálogo")
+    parser.add_argument('--dias', type=int, default=90, help="Días de historial")
+    parser.add_argument('--ventas-dia', type=int, default=500, help="Movimientos VENTA por día")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Mediciones por método")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db, movimientos = preparar_base_datos(directorio, args.productos, args.dias, args.ventas_dia)
+        service = ReplenishmentService(db)
+
+        print(f"Catálogo: {args.productos} productos, {movimientos} movimientos VENTA en {args.dias} días")
+        for metodo in ReplenishmentService.METODOS:
+            tiempos = []
+            for _ in range(args.repeticiones):
+                inicio = time.perf_counter()
+                resultado = service.recalcular_catalogo(metodo=metodo, dias_historia=args.dias)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            mejor = min(tiempos)
+            estado = "OK" if mejor < OBJETIVO_MS else "FUERA DE OBJETIVO"
+            print(f"{metodo:12s} {mejor:8.1f} ms  (bajo mínimo: {resultado['productos_bajo_minimo']})  {estado}")
+
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark del arranque de la aplicación de escritorio.
+
+Mide, en un proceso nuevo por ronda, el camino hasta la ventana de login
+(imports de main.py, configuración e inicialización del contenedor de
+servicios) y usa `python -X importtime` para listar los módulos más
+costosos. También verifica que los módulos pesados (openpyxl, reportlab,
+PIL, barcode, qrcode, formularios) no se carguen antes del login.
+
+Uso:
+    python src/scripts/benchmark_startup.py [--rondas 5] [--top 15] [--presupuesto-ms 800] [--ventana]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Módulos que no deben cargarse antes de mostrar el login
+MODULOS_DIFERIDOS = ('openpyxl', 'reportlab', 'PIL', 'barcode', 'qrcode', 'pandas', 'numpy',
+                     'services.export_service', 'services.label_service', 'ui.forms',
+                     'ui.main.main_window')
+
+# Programa hijo: reproduce el camino de main.py hasta la ventana de login
+PROGRAMA = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path[:0] = [{src!r}, {root!r}]
+from db.database import initialize_database
+from ui.auth.login_window import LoginWindow
+from services.service_container import setup_default_container
+from db.query_metrics import query_metrics
+from db.storage_profiles import storage_profiles
+t_imports = time.perf_counter()
+initialize_database({db!r})
+setup_default_container()
+t_contenedor = time.perf_counter()
+t_ventana = None
+if {ventana!r}:
+    import tkinter as tk
+    try:
+        raiz = tk.Tk()
+        raiz.withdraw()
+        LoginWindow(raiz, lambda *a, **k: None)
+        raiz.update()
+        t_ventana = time.perf_counter()
+        raiz.destroy()
+    except tk.TclError:
+        pass
+cargados = [m for m in {diferidos!r} if any(n == m or n.startswith(m + '.') for n in sys.modules)]
+print(json.dumps({{
+    'imports_ms': (t_imports - t0) * 1000,
+    'contenedor_ms': (t_contenedor - t_imports) * 1000,
+    'ventana_ms': (t_ventana - t_contenedor) * 1000 if t_ventana else None,
+    'total_ms': ((t_ventana or t_contenedor) - t0) * 1000,
+    'diferidos_cargados': cargados,
+}}))
+"""
+
+
+def ejecutar(programa: str, importtime: bool = False):
+    """Ejecutar el programa en un intérprete nuevo; devuelve (resultado, stderr)."""
+    import json
+    comando = [sys.executable]
+    if importtime:
+        comando += ['-X', 'importtime']
+    comando += ['-c', programa]
+    proceso = subprocess.run(comando, capture_output=True, text=True, cwd=ROOT_DIR)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1] if proceso.stderr else "proceso fallido")
+    return json.loads(proceso.stdout.strip().splitlines()[-1]), proceso.stderr
+
+
+def modulos_costosos(salida_importtime: str, top: int):
+    """Parsear la salida de -X importtime; devuelve [(acumulado_us, propio_us, modulo)]."""
+    filas = []
+    for linea in salida_importtime.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        try:
+            propio, acumulado, modulo = linea[len('import time:'):].split('|', 2)
+            filas.append((int(acumulado), int(propio), modulo.rstrip()))
+        except ValueError:
+            continue
+    filas.sort(reverse=True)
+    return filas[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque hasta la ventana de login")
+    parser.add_argument('--rondas', type=int, default=5, help="Procesos medidos (se toma la mediana)")
+    parser.add_argument('--top', type=int, default=15, help="Módulos más costosos a mostrar")
+    parser.add_argument('--presupuesto-ms', type=float, default=None,
+                        help="Falla (código 1) si la mediana supera este tiempo")
+    parser.add_argument('--ventana', action='store_true', help="Construir también la ventana de login (requiere display)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        programa = PROGRAMA.format(src=os.path.join(ROOT_DIR, 'src'), root=ROOT_DIR,
+                                   db=os.path.join(directorio, 'arranque.db'),
+                                   ventana=args.ventana, diferidos=MODULOS_DIFERIDOS)
+
+        resultados = [ejecutar(programa)[0] for _ in range(args.rondas)]
+        _, importtime = ejecutar(programa, importtime=True)
+
+    resultados.sort(key=lambda r: r['total_ms'])
+    mediana = resultados[len(resultados) // 2]
+    print(f"Arranque hasta login (mediana de {args.rondas} procesos):")
+    print(f"  imports:    {mediana['imports_ms']:8.1f} ms")
+    print(f"  contenedor: {mediana['contenedor_ms']:8.1f} ms")
+    if mediana['ventana_ms'] is not None:
+        print(f"  ventana:    {mediana['ventana_ms']:8.1f} ms")
+    print(f"  total:      {mediana['total_ms']:8.1f} ms")
+
+    print("\nMódulos con mayor tiempo acumulado de importación:")
+    for acumulado, propio, modulo in modulos_costosos(importtime, args.top):
+        print(f"  {acumulado / 1000:8.1f} ms (propio {propio / 1000:6.1f} ms) {modulo}")
+
+    cargados = mediana['diferidos_cargados']
+    if cargados:
+        print(f"\nADVERTENCIA: módulos pesados cargados antes del login: {', '.join(cargados)}")
+    else:
+        print("\nNingún módulo pesado se carga antes del login")
+
+    if args.presupuesto_ms is not None and mediana['total_ms'] > args.presupuesto_ms:
+        print(f"\nPresupuesto excedido: {mediana['total_ms']:.1f} ms > {args.presupuesto_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark de perfiles de almacenamiento de SQLite.
+
+Crea una base con historial de ventas y, para cada perfil (pos-safe,
+bulk-load, reporting), trabaja sobre una copia midiendo:
+
+- Ventas confirmadas por segundo con SalesService (un commit por venta y
+  por línea, como en caja).
+- Carga masiva de movimientos por lotes (filas por segundo).
+- Tiempo de los reportes de ventas, rentabilidad y movimientos.
+
+Uso:
+    python src/scripts/benchmark_storage_profiles.py [--ventas 300] [--historial 200000] [--perfiles pos-safe reporting]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection, initialize_database
+from db.storage_profiles import storage_profiles
+from services.report_service import ReportService
+from services.sales_service import SalesService
+
+
+def preparar_base_datos(ruta: str, historial: int) -> None:
+    """Crear base con 500 productos y un año de ventas históricas."""
+    db = initialize_database(ruta)
+    db.apply_profile('bulk-load')
+    conn = db.get_connection()
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 1000000, 5, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(500)]
+    )
+    inicio = datetime.now() - timedelta(days=365)
+    lineas_por_venta = 4
+    for id_venta in range(1, historial // lineas_por_venta + 1):
+        fecha = (inicio + timedelta(seconds=id_venta * 365 * 86400 * lineas_por_venta // historial))
+        fecha = fecha.strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute(
+            "INSERT INTO ventas (id_venta, fecha_venta, responsable, subtotal, impuestos, total) "
+            "VALUES (?, ?, 'bench', 40, 2.8, 42.8)", (id_venta, fecha)
+        )
+        lineas = [(id_venta, rng.randint(1, 500)) for _ in range(lineas_por_venta)]
+        conn.executemany(
+            "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item, "
+            "impuesto_item, costo_unitario, costo_total) VALUES (?, ?, 1, 10, 10, 0.7, 5, 5)", lineas
+        )
+        conn.executemany(
+            "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, id_venta, "
+            "fecha_movimiento) VALUES (?, 'VENTA', 1, 'bench', ?, ?)",
+            [(id_producto, id_venta, fecha) for id_venta, id_producto in lineas]
+        )
+        if id_venta % 5000 == 0:
+            conn.commit()
+    conn.commit()
+    conn.execute("ANALYZE")
+    db.close()
+
+
+def medir_ventas(db: DatabaseConnection, ventas: int) -> float:
+    """Registrar ventas de 3 líneas; devuelve ventas por segundo."""
+    servicio = SalesService(db)
+    rng = random.Random(7)
+    t0 = time.perf_counter()
+    for _ in range(ventas):
+        venta = servicio.create_sale('bench')
+        for _ in range(3):
+            servicio.add_product_to_sale(venta.id_venta, rng.randint(1, 500), 1)
+    return ventas / (time.perf_counter() - t0)
+
+
+def medir_carga(db: DatabaseConnection, filas: int) -> float:
+    """Insertar movimientos en lotes de 1000 con commit por lote; devuelve filas por segundo."""
+    conn = db.get_connection()
+    fecha = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    t0 = time.perf_counter()
+    for inicio in range(0, filas, 1000):
+        conn.executemany(
+            "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+            "VALUES (?, 'ENTRADA', 1, 'bench', ?)",
+            [((i % 500) + 1, fecha) for i in range(inicio, min(inicio + 1000, filas))]
+        )
+        conn.commit()
+    return filas / (time.perf_counter() - t0)
+
+
+def medir_reportes(db: DatabaseConnection) -> float:
+    """Generar reportes de ventas, rentabilidad y movimientos del año; devuelve ms."""
+    reportes = ReportService(db)
+    hasta = date.today()
+    desde = hasta - timedelta(days=365)
+    t0 = time.perf_counter()
+    reportes.generate_sales_report(desde, hasta)
+    reportes.generate_profitability_report(desde, hasta, group_by='category')
+    reportes.generate_movements_report(desde, hasta)
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de perfiles de almacenamiento")
+    parser.add_argument('--ventas', type=int, default=300, help="Ventas de 3 líneas por perfil")
+    parser.add_argument('--carga', type=int, default=50000, help="Movimientos de la carga masiva")
+    parser.add_argument('--historial', type=int, default=200000, help="Líneas de venta históricas")
+    parser.add_argument('--perfiles', nargs='+', default=list(storage_profiles.nombres()),
+                        choices=storage_profiles.nombres(), help="Perfiles a comparar")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        plantilla = os.path.join(directorio, 'plantilla.db')
+        t0 = time.perf_counter()
+        preparar_base_datos(plantilla, args.historial)
+        print(f"Base de {args.historial} líneas de venta creada en {time.perf_counter() - t0:.1f} s\n")
+
+        print(f"{'Perfil':<11} {'ventas/s':>9} {'commits/s':>10} {'carga filas/s':>14} "
+              f"{'reportes frío':>14} {'reportes caliente':>18}")
+        for perfil in args.perfiles:
+            ruta = os.path.join(directorio, f'{perfil}.db')
+            shutil.copyfile(plantilla, ruta)
+            db = DatabaseConnection(ruta, profile=perfil)
+
+            frio = medir_reportes(db)
+            caliente = min(medir_reportes(db) for _ in range(3))
+            ventas = medir_ventas(db, args.ventas)
+            carga = medir_carga(db, args.carga)
+            db.close()
+
+            print(f"{perfil:<11} {ventas:9.1f} {ventas * 4:10.1f} {carga:14,.0f} "
+                  f"{frio:11.1f} ms {caliente:15.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de generación de PDFs de tickets.
+
+Mide el tiempo por ticket de TicketGenerator con las plantillas
+precompiladas (encabezado, logo y estilos en memoria) frente a
+reconstruir las plantillas en cada ticket.
+
+Uso:
+    python src/scripts/benchmark_ticket_render.py [--tickets 200] [--items 5]
+
+Objetivo: menos de 20 ms por ticket con plantillas precompiladas.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import initialize_database
+from models.ticket import Ticket
+from reports.ticket_generator import TicketGenerator
+from reports.ticket_templates import get_ticket_template_engine
+from services.company_service import CompanyService
+
+OBJETIVO_MS = 20.0
+
+
+def preparar_base_datos(directorio: str, items: int):
+    """Crear una base de datos temporal con una venta de ejemplo."""
+    db = initialize_database(os.path.join(directorio, 'benchmark.db'))
+    conn = db.get_connection()
+
+    conn.execute("INSERT INTO ventas (responsable, subtotal, impuestos, total) VALUES ('bench', 100, 7, 107)")
+    for i in range(items):
+        cursor = conn.execute(
+            "INSERT INTO productos (nombre, id_categoria, stock, precio) VALUES (?, 1, 100, 10)",
+            (f"Producto {i + 1}",)
+        )
+        conn.execute(
+            "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item) "
+            "VALUES (1, ?, 2, 10, 20)",
+            (cursor.lastrowid,)
+        )
+    conn.commit()
+
+    # Inicializar el Singleton de empresa sobre la base temporal
+    CompanyService(db)
+    return db
+
+
+def medir(generator: TicketGenerator, directorio: str, tickets: int, invalidar: bool) -> float:
+    """Renderizar tickets y devolver el tiempo promedio en milisegundos."""
+    engine = get_ticket_template_engine()
+    ticket = Ticket.crear_ticket_venta(ticket_number="V000001", id_venta=1, generated_by="bench")
+
+    # Ticket de calentamiento (fuentes e imports de reportlab)
+    generator.generar_ticket_pdf(ticket, os.path.join(directorio, 'warmup.pdf'), incluir_qr=False)
+
+    inicio = time.perf_counter()
+    for i in range(tickets):
+        if invalidar:
+            engine.invalidar()
+            generator._setup_styles()
+        generator.generar_ticket_pdf(ticket, os.path.join(directorio, f'ticket_{i}.pdf'), incluir_qr=False)
+    return (time.perf_counter() - inicio) * 1000 / tickets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de PDFs de tickets")
+    parser.add_argument('--tickets', type=int, default=200, help="Tickets a generar por escenario")
+    parser.add_argument('--items', type=int, default=5, help="Productos por venta")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db = preparar_base_datos(directorio, args.items)
+        generator = TicketGenerator(db)
+
+        sin_cache = medir(generator, directorio, args.tickets, invalidar=True)
+        con_cache = medir(generator, directorio, args.tickets, invalidar=False)
+
+        print(f"Tickets por escenario: {args.tickets} ({args.items} productos)")
+        print(f"Plantillas reconstruidas: {sin_cache:8.2f} ms/ticket")
+        print(f"Plantillas precompiladas: {con_cache:8.2f} ms/ticket")
+        print(f"Estadísticas plantillas:  {get_ticket_template_engine().obtener_estadisticas()}")
+        estado = "OK" if con_cache < OBJETIVO_MS else "FUERA DE OBJETIVO"
+        print(f"Objetivo < {OBJETIVO_MS:.0f} ms/ticket: {estado}")
+
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark del análisis de tendencias por lote.
+
+Genera ventas mensuales sintéticas (con tendencia, estacionalidad y ruido)
+y mide ReportService.generate_batch_trends_report sobre el catálogo
+completo, separando consulta agrupada y cálculo vectorial. Como
+referencia estima el costo de una llamada a
+generate_trends_analysis_report por producto.
+
+Uso:
+    python src/scripts/benchmark_trends.py [--productos 50000] [--meses 36] [--densidad 0.5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import initialize_database
+from services.report_service import ReportService
+
+
+def preparar_base_datos(directorio: str, productos: int, meses: int, densidad: float):
+    """Crear base temporal con una venta agregada por producto y mes (según densidad)."""
+    db = initialize_database(os.path.join(directorio, 'benchmark.db'))
+    conn = db.get_connection()
+    rng = np.random.default_rng(42)
+
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, precio) VALUES (?, 1, 100, 10)",
+        [(f"Producto {i + 1}",) for i in range(productos)]
+    )
+
+    hoy = date.today()
+    base = hoy.year * 12 + hoy.month - meses
+    fechas = [f"{(base + m) // 12}-{(base + m) % 12 + 1:02d}-15 10:00:00" for m in range(meses)]
+
+    # Demanda = nivel * (1 + tendencia * mes) * estacionalidad + ruido
+    nivel = rng.gamma(2.0, 10.0, productos)[:, None]
+    tendencia = rng.normal(0, 0.02, productos)[:, None]
+    estacional = 1 + 0.3 * np.sin(2 * np.pi * (np.arange(meses) % 12) / 12 + rng.uniform(0, 6, productos)[:, None])
+    demanda = nivel * np.clip(1 + tendencia * np.arange(meses), 0.05, None) * estacional
+    demanda = np.maximum(np.rint(demanda + rng.normal(0, 2, demanda.shape)), 1).astype(np.int64)
+    presente = rng.random(demanda.shape) < densidad
+
+    filas_producto, filas_mes = np.nonzero(presente)
+    conn.executemany(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+        "VALUES (?, 'VENTA', ?, 'bench', ?)",
+        ((int(p) + 1, int(demanda[p, m]), fechas[m]) for p, m in zip(filas_producto, filas_mes))
+    )
+    conn.commit()
+
+    inicio = date(base // 12, base % 12 + 1, 1)
+    return db, len(filas_producto), inicio, hoy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tendencias por lote")
+    parser.add_argument('--productos', type=int, default=50000, help="Productos con ventas")
+    parser.add_argument('--meses', type=int, default=36, help="Meses de historial")
+    parser.add_argument('--densidad', type=float, default=0.5, help="Fracción de meses con ventas por producto")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print("Generando datos...")
+        db, movimientos, inicio, fin = preparar_base_datos(
+            directorio, args.productos, args.meses, args.densidad
+        )
+        service = ReportService(db)
+        print(f"Catálogo: {args.productos} productos x {args.meses} meses, {movimientos} movimientos VENTA")
+
+        t0 = time.perf_counter()
+        ids, matriz, etiquetas = service._build_sales_matrix(inicio, fin, 'month')
+        t1 = time.perf_counter()
+        service._compute_trend_statistics(matriz, ReportService.SEASON_LENGTHS['month'])
+        t2 = time.perf_counter()
+        print(f"Matriz {matriz.shape[0]} x {matriz.shape[1]} (consulta agrupada): {(t1 - t0) * 1000:8.1f} ms")
+        print(f"Estadísticas vectoriales:                 {(t2 - t1) * 1000:8.1f} ms")
+
+        t0 = time.perf_counter()
+        reporte = service.generate_batch_trends_report(inicio, fin, 'month', top_n=10)
+        t1 = time.perf_counter()
+        print(f"generate_batch_trends_report completo:    {(t1 - t0) * 1000:8.1f} ms")
+
+        llamadas = min(50, len(ids))
+        t0 = time.perf_counter()
+        for producto_id in ids[:llamadas].tolist():
+            service.generate_trends_analysis_report(inicio, fin, 'month', producto_id=producto_id)
+        t1 = time.perf_counter()
+        estimado = (t1 - t0) / llamadas * len(ids)
+        print(f"Un reporte por producto (estimado):       {estimado:8.1f} s ({llamadas} llamadas medidas)")
+
+        print(f"Resumen: {reporte['summary']}")
+        for titulo, filas in (("Mayor crecimiento", reporte['top_risers'][:3]),
+                              ("Mayor caída", reporte['top_fallers'][:3])):
+            print(titulo)
+            for fila in filas:
+                print(f"  {fila['producto_nombre']:16s} pendiente {fila['slope']:8.3f} "
+                      f"r={fila['correlation_coefficient']:6.3f} estacionalidad {fila['seasonality_strength']:.2f}")
+
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
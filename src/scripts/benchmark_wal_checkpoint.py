@@ -0,0 +1,179 @@
+"""
+Benchmark de latencia de commits de venta durante un reporte largo.
+
+Crea una base con historial de ventas y, para cada escenario, registra
+ventas de caja con SalesService (un commit por venta y por línea) en un
+hilo mientras otro proceso genera reportes de ventas del año en bucle (en
+otro proceso para que la competencia por el GIL no tape el efecto de los
+checkpoints):
+
+- autocheckpoint: checkpoints automáticos de SQLite (wal_autocheckpoint del
+  perfil); el commit que cruza el umbral hace el checkpoint.
+- gestor: db.wal_checkpoint habilitado; los checkpoints los hace su hilo.
+
+Muestra p50/p99/máximo de la latencia por commit, el tamaño máximo del WAL
+y los checkpoints del gestor, con y sin el reporte concurrente.
+
+Uso:
+    python src/scripts/benchmark_wal_checkpoint.py [--ventas 300] [--historial 200000] [--pausa-ms 100]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection, initialize_database
+from db.wal_checkpoint import CheckpointManager, checkpoint_manager
+from services.report_service import ReportService
+from services.sales_service import SalesService
+
+
+def preparar_base_datos(ruta: str, historial: int) -> None:
+    """Crear base con 500 productos y un año de ventas históricas."""
+    db = initialize_database(ruta)
+    db.apply_profile('bulk-load')
+    conn = db.get_connection()
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 1000000, 5, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(500)]
+    )
+    inicio = datetime.now() - timedelta(days=365)
+    for id_venta in range(1, historial // 4 + 1):
+        fecha = (inicio + timedelta(seconds=id_venta * 365 * 86400 * 4 // historial)).strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute(
+            "INSERT INTO ventas (id_venta, fecha_venta, responsable, subtotal, impuestos, total) "
+            "VALUES (?, ?, 'bench', 40, 2.8, 42.8)", (id_venta, fecha)
+        )
+        conn.executemany(
+            "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item, "
+            "impuesto_item, costo_unitario, costo_total) VALUES (?, ?, 1, 10, 10, 0.7, 5, 5)",
+            [(id_venta, rng.randint(1, 500)) for _ in range(4)]
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close()
+
+
+def ventas_caja(ruta: str, ventas: int, pausa: float, latencias: list) -> None:
+    """Registrar ventas de 3 líneas; agrega la latencia (ms) de cada commit."""
+    db = DatabaseConnection(ruta)
+    servicio = SalesService(db)
+    rng = random.Random(7)
+    try:
+        for _ in range(ventas):
+            t0 = time.perf_counter()
+            venta = servicio.create_sale('caja')
+            latencias.append((time.perf_counter() - t0) * 1000)
+            for _ in range(3):
+                t0 = time.perf_counter()
+                servicio.add_product_to_sale(venta.id_venta, rng.randint(1, 500), 1)
+                latencias.append((time.perf_counter() - t0) * 1000)
+            time.sleep(pausa)
+    finally:
+        db.close()
+
+
+def reportes(ruta: str, detener, contador) -> None:
+    """Generar reportes de ventas y rentabilidad del año hasta que se detenga."""
+    db = DatabaseConnection(ruta, profile='reporting')
+    servicio = ReportService(db)
+    hasta = date.today()
+    desde = hasta - timedelta(days=365)
+    try:
+        while not detener.is_set():
+            servicio.generate_sales_report(desde, hasta)
+            servicio.generate_profitability_report(desde, hasta, group_by='category')
+            with contador.get_lock():
+                contador.value += 1
+    finally:
+        db.close()
+
+
+def escenario(ruta: str, ventas: int, pausa: float, con_reporte: bool, gestor: bool, inactividad_ms: float):
+    """Ejecutar un escenario; devuelve (latencias, wal_max_bytes, reportes, estadísticas del gestor)."""
+    checkpoint_manager.configurar(habilitado=gestor, inactividad_ms=inactividad_ms)
+    checkpoint_manager.reiniciar_estadisticas()
+    if gestor:
+        checkpoint_manager.iniciar(ruta)
+
+    latencias = []
+    # spawn: un fork heredaría los locks de los hilos del gestor y del logging
+    contexto = multiprocessing.get_context('spawn')
+    contador = contexto.Value('i', 0)
+    detener = contexto.Event()
+    proceso_reporte = contexto.Process(target=reportes, args=(ruta, detener, contador), daemon=True)
+    if con_reporte:
+        proceso_reporte.start()
+        time.sleep(0.5)
+
+    wal_max = [0]
+    vigilando = threading.Event()
+
+    def vigilar_wal():
+        while not vigilando.is_set():
+            wal_max[0] = max(wal_max[0], CheckpointManager.tamano_wal(ruta))
+            time.sleep(0.01)
+
+    hilo_wal = threading.Thread(target=vigilar_wal, daemon=True)
+    hilo_wal.start()
+    ventas_caja(ruta, ventas, pausa, latencias)
+    vigilando.set()
+    detener.set()
+    if con_reporte:
+        proceso_reporte.join()
+    hilo_wal.join()
+
+    stats = checkpoint_manager.estadisticas()
+    checkpoint_manager.detener()
+    checkpoint_manager.configurar(habilitado=False)
+    return latencias, wal_max[0], contador.value, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de commits de venta con reporte concurrente")
+    parser.add_argument('--ventas', type=int, default=300, help="Ventas de 3 líneas por escenario")
+    parser.add_argument('--historial', type=int, default=200000, help="Líneas de venta históricas")
+    parser.add_argument('--pausa-ms', type=float, default=100, help="Pausa entre ventas")
+    parser.add_argument('--inactividad-ms', type=float, default=50, help="Ventana inactiva del gestor")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        plantilla = os.path.join(directorio, 'plantilla.db')
+        t0 = time.perf_counter()
+        preparar_base_datos(plantilla, args.historial)
+        print(f"Base de {args.historial} líneas de venta creada en {time.perf_counter() - t0:.1f} s\n")
+
+        print(f"{'Escenario':<26} {'p50 ms':>7} {'p99 ms':>8} {'max ms':>8} {'WAL max':>9} "
+              f"{'reportes':>9}  checkpoints del gestor")
+        for gestor in (False, True):
+            for con_reporte in (False, True):
+                ruta = os.path.join(directorio, f'{int(gestor)}{int(con_reporte)}.db')
+                shutil.copyfile(plantilla, ruta)
+                latencias, wal_max, cantidad, stats = escenario(
+                    ruta, args.ventas, args.pausa_ms / 1000, con_reporte, gestor, args.inactividad_ms
+                )
+                ordenadas = sorted(latencias)
+                p99 = ordenadas[int(len(ordenadas) * 0.99) - 1]
+                nombre = f"{'gestor' if gestor else 'autocheckpoint'}{' + reporte' if con_reporte else ''}"
+                checkpoints = ', '.join(f"{clave}={n}" for clave, n in stats['checkpoints'].items()) or '-'
+                print(f"{nombre:<26} {statistics.median(ordenadas):7.2f} {p99:8.2f} {ordenadas[-1]:8.2f} "
+                      f"{wal_max / 1024:7.0f}KB {cantidad:9d}  {checkpoints}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Notificaciones de cambios de stock y precio frente a recargar el catálogo.
+
+Crea una base con un catálogo de productos y mide:
+
+- En el proceso: ventas con SalesService y cambios de precio con
+  ProductService; un suscriptor de db.change_notifier recibe cada cambio
+  después del commit.
+- Entre procesos: otro proceso vende y cambia precios; este proceso los
+  detecta sondeando PRAGMA data_version y leyendo el registro de cambios.
+  Latencia commit -> evento (p50/p99) según el intervalo de sondeo.
+- Costo de cada sondeo de data_version sin cambios frente a recargar el
+  catálogo completo (lo que hace un cliente que consulta periódicamente).
+
+Uso:
+    python src/scripts/change_notifications_demo.py [--productos 5000] [--ventas 200] [--intervalo-ms 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.change_notifier import change_notifier
+from db.database import DatabaseConnection, initialize_database
+from services.product_service import ProductService
+from services.sales_service import SalesService
+
+
+def preparar_base_datos(ruta: str, productos: int) -> None:
+    """Crear base con un catálogo de productos con stock."""
+    db = initialize_database(ruta)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 1000000, 5, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(productos)]
+    )
+    conn.commit()
+    db.close()
+
+
+def terminal_remota(ruta: str, productos: int, ventas: int, pausa: float, cola) -> None:
+    """Vender y cambiar precios en otro proceso; informa (id_producto, stock, precio, instante del commit)."""
+    change_notifier.configurar(habilitado=False)
+    db = DatabaseConnection(ruta)
+    servicio = SalesService(db)
+    conn = db.get_connection()
+    rng = random.Random(11)
+    try:
+        for numero in range(ventas):
+            id_producto = rng.randint(1, productos)
+            if numero % 5 == 4:
+                conn.execute("UPDATE productos SET precio = precio + 1 WHERE id_producto = ?", (id_producto,))
+                conn.commit()
+            else:
+                venta = servicio.create_sale('terminal remota')
+                servicio.add_product_to_sale(venta.id_venta, id_producto, 1)
+            instante = time.time()
+            stock, precio = conn.execute(
+                "SELECT stock, precio FROM productos WHERE id_producto = ?", (id_producto,)
+            ).fetchone()
+            cola.put((id_producto, stock, precio, instante))
+            time.sleep(pausa)
+    finally:
+        cola.put(None)
+        db.close()
+
+
+def en_proceso(ruta: str, productos: int, ventas: int) -> None:
+    """Cambios hechos por los servicios de este proceso."""
+    recibidos = []
+    suscripcion = change_notifier.suscribir(lambda evento: recibidos.append((evento, time.perf_counter())))
+    db = DatabaseConnection(ruta)
+    ventas_servicio = SalesService(db)
+    productos_servicio = ProductService(db)
+    rng = random.Random(3)
+    latencias = []
+    try:
+        for numero in range(ventas):
+            id_producto = rng.randint(1, productos)
+            previos = len(recibidos)
+            t0 = time.perf_counter()
+            if numero % 5 == 4:
+                productos_servicio.update_product(id_producto, precio=10 + numero)
+            else:
+                venta = ventas_servicio.create_sale('caja')
+                ventas_servicio.add_product_to_sale(venta.id_venta, id_producto, 1)
+            if len(recibidos) > previos:
+                latencias.append((recibidos[-1][1] - t0) * 1000)
+    finally:
+        change_notifier.desuscribir(suscripcion)
+        db.close()
+
+    stats = change_notifier.estadisticas()
+    print(f"  {ventas} operaciones, {len(recibidos)} eventos "
+          f"(tipos de campo: {sorted({c for e, _ in recibidos for c in e['campos']})})")
+    print(f"  operación + notificación: p50={statistics.median(latencias):.2f} ms  "
+          f"eventos suprimidos sin cambios: {stats['suprimidos']}")
+
+
+def entre_procesos(ruta: str, productos: int, ventas: int, intervalo_ms: float) -> None:
+    """Cambios de otro proceso detectados con PRAGMA data_version."""
+    change_notifier.configurar(intervalo_ms=intervalo_ms)
+    change_notifier.reiniciar_estadisticas()
+    recibidos = {}
+
+    def registrar(evento):
+        recibidos.setdefault((evento['id_producto'], evento.get('stock'), evento.get('precio')), time.time())
+
+    suscripcion = change_notifier.suscribir(registrar)
+    change_notifier.iniciar(ruta)
+
+    # spawn: un fork heredaría los locks del hilo de sondeo y del logging
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    proceso = contexto.Process(target=terminal_remota, args=(ruta, productos, ventas, 0.01, cola), daemon=True)
+    proceso.start()
+    commits = []
+    while True:
+        item = cola.get()
+        if item is None:
+            break
+        commits.append(item)
+    proceso.join()
+    limite = time.time() + 2 + intervalo_ms / 1000
+    while time.time() < limite and len(recibidos) < len(commits):
+        time.sleep(0.05)
+    change_notifier.detener()
+    change_notifier.desuscribir(suscripcion)
+
+    latencias = sorted(
+        (recibidos[(id_producto, stock, precio)] - instante) * 1000
+        for id_producto, stock, precio, instante in commits
+        if (id_producto, stock, precio) in recibidos
+    )
+    stats = change_notifier.estadisticas()
+    p99 = latencias[max(0, int(len(latencias) * 0.99) - 1)] if latencias else 0.0
+    print(f"  sondeo cada {intervalo_ms:.0f} ms: {len(latencias)}/{len(commits)} commits notificados, "
+          f"latencia p50={statistics.median(latencias) if latencias else 0:.1f} ms p99={p99:.1f} ms")
+    print(f"  sondeos={stats['sondeos']} con cambios={stats['sondeos_con_cambios']} "
+          f"filas del registro leídas={stats['cambios_leidos']}")
+
+
+def costo_sondeo(ruta: str, repeticiones: int = 2000) -> None:
+    """PRAGMA data_version sin cambios frente a recargar el catálogo completo."""
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        conn.execute("PRAGMA data_version").fetchone()
+    sondeo_us = (time.perf_counter() - t0) / repeticiones * 1e6
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        filas = conn.execute("SELECT id_producto, nombre, stock, precio, activo FROM productos").fetchall()
+    recarga_ms = (time.perf_counter() - t0) / 20 * 1000
+    conn.close()
+    print(f"  PRAGMA data_version: {sondeo_us:.1f} µs por sondeo")
+    print(f"  recarga del catálogo ({len(filas)} productos): {recarga_ms:.2f} ms por consulta "
+          f"({recarga_ms * 1000 / sondeo_us:.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notificaciones de cambios de stock y precio")
+    parser.add_argument('--productos', type=int, default=5000, help="Productos del catálogo")
+    parser.add_argument('--ventas', type=int, default=200, help="Operaciones por escenario")
+    parser.add_argument('--intervalo-ms', type=float, default=50, help="Intervalo de sondeo entre procesos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'notificaciones.db')
+        preparar_base_datos(ruta, args.productos)
+
+        print("En el proceso (publicar después del commit):")
+        en_proceso(ruta, args.productos, args.ventas)
+        print("\nEntre procesos (PRAGMA data_version + registro de cambios):")
+        entre_procesos(ruta, args.productos, args.ventas, args.intervalo_ms)
+        print("\nSondeo frente a recarga completa:")
+        costo_sondeo(ruta)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Sincronización de dos terminales por registro de cambios.
+
+Crea dos bases (terminal A y B) y las sincroniza en el mismo proceso con
+SyncService (el mismo protocolo que sirven los endpoints /api/v1/sync):
+
+- A crea productos con historial de movimientos; B crea clientes
+- Sincronización inicial en ambos sentidos
+- Ventas concurrentes del mismo producto en A y B (stock: libro de movimientos)
+- Edición del mismo producto en A y B (catálogo: gana la más reciente)
+- Comparación de catálogos y stock entre A y B
+- Costo de una sincronización delta de pocos cambios según el tamaño del registro
+- Compactación del registro
+
+Uso:
+    python src/scripts/sync_terminals.py [--productos 500] [--movimientos 100000] [--ventas 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import initialize_database
+from services.sales_service import SalesService
+from services.sync_service import SyncService
+
+
+def poblar_terminal_a(db, productos: int, movimientos: int) -> None:
+    """Productos con stock inicial y un historial de ENTRADAS en A."""
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 100, 5, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(productos)]
+    )
+    rng = random.Random(42)
+    stock = {i + 1: 100 for i in range(productos)}
+    filas = []
+    for _ in range(movimientos):
+        id_producto = rng.randint(1, productos)
+        filas.append((id_producto, stock[id_producto], stock[id_producto] + 1))
+        stock[id_producto] += 1
+    conn.executemany(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, cantidad_anterior, cantidad_nueva, "
+        "responsable) VALUES (?, 'ENTRADA', 1, ?, ?, 'terminal A')", filas
+    )
+    conn.executemany("UPDATE productos SET stock = ? WHERE id_producto = ?",
+                     [(valor, id_producto) for id_producto, valor in stock.items()])
+    conn.commit()
+
+
+def poblar_terminal_b(db, clientes: int) -> None:
+    """Clientes en B."""
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO clientes (nombre, ruc) VALUES (?, ?)",
+        [(f"Cliente {i + 1}", f"{20000000 + i}") for i in range(clientes)]
+    )
+    conn.commit()
+
+
+def sincronizar(destino: SyncService, origen: SyncService, etiqueta: str) -> float:
+    t0 = time.perf_counter()
+    resumen = destino.sincronizar(origen)
+    duracion = (time.perf_counter() - t0) * 1000
+    print(f"  {etiqueta:<8} {duracion:9.1f} ms  aplicados={resumen['aplicados']} "
+          f"descartados={resumen['descartados']} conflictos={resumen['conflictos']} "
+          f"omitidos={resumen['omitidos']} lotes={resumen['lotes']}")
+    return duracion
+
+
+def estado(db) -> dict:
+    """Catálogo por clave natural: producto -> (precio, stock), clientes, categorías, ventas."""
+    conn = db.get_connection()
+    return {
+        'productos': {fila[0]: (fila[1], fila[2]) for fila in conn.execute(
+            "SELECT nombre, precio, stock FROM productos")},
+        'clientes': sorted(fila[0] for fila in conn.execute("SELECT ruc FROM clientes")),
+        'categorias': sorted(fila[0] for fila in conn.execute("SELECT nombre || '|' || tipo FROM categorias")),
+        'ventas': conn.execute("SELECT COUNT(*), ROUND(SUM(total), 2) FROM ventas").fetchone()[:],
+        'movimientos': conn.execute("SELECT COUNT(*) FROM movimientos").fetchone()[0],
+    }
+
+
+def comparar(db_a, db_b) -> None:
+    a, b = estado(db_a), estado(db_b)
+    for clave in ('productos', 'clientes', 'categorias', 'ventas', 'movimientos'):
+        igual = 'iguales' if a[clave] == b[clave] else 'DISTINTOS'
+        cantidad = len(a[clave]) if isinstance(a[clave], (dict, list)) else a[clave]
+        print(f"  {clave:<12} {igual}  (A: {cantidad})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincronización de dos terminales")
+    parser.add_argument('--productos', type=int, default=500, help="Productos creados en A")
+    parser.add_argument('--movimientos', type=int, default=100000, help="Historial de movimientos de A")
+    parser.add_argument('--clientes', type=int, default=1000, help="Clientes creados en B")
+    parser.add_argument('--ventas', type=int, default=20, help="Ventas en cada terminal")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_a = initialize_database(os.path.join(directorio, 'terminal_a.db'))
+        db_b = initialize_database(os.path.join(directorio, 'terminal_b.db'))
+        # Registro de cambios activo desde el principio, como con [sync] enabled
+        for db in (db_a, db_b):
+            db.set_change_logging(True)
+        poblar_terminal_a(db_a, args.productos, args.movimientos)
+        poblar_terminal_b(db_b, args.clientes)
+        sync_a, sync_b = SyncService(db_a), SyncService(db_b)
+        print(f"Nodos: A={sync_a.nodo_local()[:8]} B={sync_b.nodo_local()[:8]}; "
+              f"registro de A: {sync_a.info()['version']} cambios\n")
+
+        print("Sincronización inicial:")
+        sincronizar(sync_b, sync_a, "B <- A")
+        sincronizar(sync_a, sync_b, "A <- B")
+
+        # Ventas del mismo producto en ambas terminales y edición concurrente de su precio
+        rng = random.Random(7)
+        id_b = db_b.get_connection().execute(
+            "SELECT id_producto FROM productos WHERE nombre = 'Producto 1'"
+        ).fetchone()[0]
+        for db, id_producto in ((db_a, 1), (db_b, id_b)):
+            ventas = SalesService(db)
+            for _ in range(args.ventas):
+                venta = ventas.create_sale('caja')
+                ventas.add_product_to_sale(venta.id_venta, id_producto, 1)
+                ventas.add_product_to_sale(venta.id_venta, rng.randint(1, args.productos), 2)
+        db_a.get_connection().execute("UPDATE productos SET precio = 11 WHERE id_producto = 1")
+        db_a.get_connection().commit()
+        time.sleep(0.01)
+        db_b.get_connection().execute("UPDATE productos SET precio = 12 WHERE id_producto = ?", (id_b,))
+        db_b.get_connection().commit()
+        stock_a = db_a.get_connection().execute("SELECT stock FROM productos WHERE id_producto = 1").fetchone()[0]
+        stock_b = db_b.get_connection().execute(
+            "SELECT stock FROM productos WHERE id_producto = ?", (id_b,)).fetchone()[0]
+
+        print(f"\nTras {args.ventas} ventas por terminal y precio 11 en A / 12 en B (B escribió después):")
+        print(f"  Producto 1 antes de sincronizar: stock A={stock_a}, B={stock_b}")
+        sincronizar(sync_b, sync_a, "B <- A")
+        sincronizar(sync_a, sync_b, "A <- B")
+        precio_stock = estado(db_a)['productos']['Producto 1']
+        print(f"  Producto 1 después: precio={precio_stock[0]}, stock={precio_stock[1]}")
+        comparar(db_a, db_b)
+
+        print("\nDelta de 10 cambios (costo según cambios, no según tamaño del registro):")
+        version = sync_a.info()['version']
+        for id_producto in range(2, 12):
+            db_a.get_connection().execute("UPDATE productos SET precio = precio + 1 WHERE id_producto = ?",
+                                          (id_producto,))
+        db_a.get_connection().commit()
+        print(f"  registro de A: {version} cambios")
+        sincronizar(sync_b, sync_a, "B <- A")
+
+        print("\nCompactación:")
+        for nombre, servicio in (('A', sync_a), ('B', sync_b)):
+            antes = servicio.info()['version']
+            resumen = servicio.compactar()
+            restantes = servicio.db.get_connection().execute("SELECT COUNT(*) FROM cambios").fetchone()[0]
+            print(f"  {nombre}: {resumen['colapsados']} colapsados, {resumen['entregados']} entregados eliminados; "
+                  f"quedan {restantes} de {antes}")
+
+        db_a.close()
+        db_b.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Verificación de integridad y comparación del costo en el arranque.
+
+Sin --db crea una base con historial de ventas y movimientos y mide:
+
+- Arranque anterior: create_tables completo + PRAGMA foreign_key_check
+- Arranque actual: huella del schema + existencia de tablas
+- Verificación completa en background (claves foráneas, quick_check, stock)
+- Verificación incremental tras algunas ventas, y su detección de una fila
+  huérfana y de un movimiento cuyo stock no llegó a productos
+
+Con --db ejecuta IntegrityService sobre una base existente y muestra el
+resultado guardado.
+
+Uso:
+    python src/scripts/verify_integrity.py [--movimientos 300000] [--ventas 20]
+    python src/scripts/verify_integrity.py --db inventario.db [--completa]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from db.database import DatabaseConnection, initialize_database
+from services.integrity_service import IntegrityService
+from services.sales_service import SalesService
+
+
+def preparar_base_datos(ruta: str, movimientos: int) -> None:
+    """Crear base con 500 productos y `movimientos` líneas de venta con su movimiento."""
+    db = initialize_database(ruta)
+    db.apply_profile('bulk-load')
+    conn = db.get_connection()
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, costo_promedio, precio, tasa_impuesto) "
+        "VALUES (?, 1, 1000000, 5, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(500)]
+    )
+    stock = {i + 1: 1000000 for i in range(500)}
+    inicio = datetime.now() - timedelta(days=365)
+    for id_venta in range(1, movimientos // 4 + 1):
+        fecha = (inicio + timedelta(seconds=id_venta * 30)).strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute(
+            "INSERT INTO ventas (id_venta, fecha_venta, responsable, subtotal, impuestos, total) "
+            "VALUES (?, ?, 'bench', 40, 2.8, 42.8)", (id_venta, fecha)
+        )
+        lineas = [rng.randint(1, 500) for _ in range(4)]
+        conn.executemany(
+            "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item, "
+            "impuesto_item, costo_unitario, costo_total) VALUES (?, ?, 1, 10, 10, 0.7, 5, 5)",
+            [(id_venta, id_producto) for id_producto in lineas]
+        )
+        filas = []
+        for id_producto in lineas:
+            stock[id_producto] -= 1
+            filas.append((id_producto, stock[id_producto] + 1, stock[id_producto], id_venta, fecha))
+        conn.executemany(
+            "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, cantidad_anterior, cantidad_nueva, "
+            "responsable, id_venta, fecha_movimiento) VALUES (?, 'VENTA', -1, ?, ?, 'bench', ?, ?)", filas
+        )
+    conn.executemany("UPDATE productos SET stock = ? WHERE id_producto = ?",
+                     [(valor, id_producto) for id_producto, valor in stock.items()])
+    conn.commit()
+    db.close()
+
+
+def cronometrar(funcion) -> float:
+    t0 = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - t0) * 1000
+
+
+def imprimir_resumen(resumen) -> None:
+    tablas = resumen['tablas'] if isinstance(resumen['tablas'], str) else ', '.join(resumen['tablas']) or '-'
+    print(f"  {resumen['alcance'].lower()} en {resumen['duracion_ms']:.1f} ms, tablas: {tablas}")
+    for tipo, problemas in resumen['problemas'].items():
+        print(f"    {tipo:<20} {problemas} problemas")
+
+
+def sobre_base_existente(ruta: str, completa: bool) -> None:
+    db = DatabaseConnection(ruta)
+    print(f"Huella del schema vigente: {db.schema_is_current()}")
+    imprimir_resumen(IntegrityService(db).ejecutar_verificacion(completa=True if completa else None))
+    for tipo, verificacion in IntegrityService(db).ultimo_resultado().items():
+        if verificacion and verificacion['detalle']:
+            print(f"\n{tipo}: primeros problemas")
+            for problema in verificacion['detalle'][:10]:
+                print(f"  {problema}")
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación de integridad en arranque y en background")
+    parser.add_argument('--db', help="Verificar una base existente")
+    parser.add_argument('--completa', action='store_true', help="Con --db: forzar verificación completa")
+    parser.add_argument('--movimientos', type=int, default=300000, help="Movimientos de la base generada")
+    parser.add_argument('--ventas', type=int, default=20, help="Ventas antes de la verificación incremental")
+    args = parser.parse_args()
+
+    if args.db:
+        sobre_base_existente(args.db, args.completa)
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'integridad.db')
+        t0 = time.perf_counter()
+        preparar_base_datos(ruta, args.movimientos)
+        print(f"Base con {args.movimientos} movimientos creada en {time.perf_counter() - t0:.1f} s "
+              f"({os.path.getsize(ruta) / 1e6:.0f} MB)\n")
+
+        db = DatabaseConnection(ruta)
+        db.get_connection().execute("DELETE FROM estado_integridad WHERE clave = 'huella_schema'")
+        db.get_connection().commit()
+        anterior = cronometrar(db.create_tables) + cronometrar(lambda: db.verify_schema_integrity(True))
+        actual = cronometrar(db.create_tables) + cronometrar(db.verify_schema_integrity)
+        print("Arranque (migraciones + verificación):")
+        print(f"  schema completo + foreign_key_check: {anterior:8.1f} ms")
+        print(f"  huella del schema + tablas:          {actual:8.1f} ms\n")
+
+        integridad = IntegrityService(db)
+        print("Verificación en background:")
+        imprimir_resumen(integridad.ejecutar_verificacion(completa=True))
+        imprimir_resumen(integridad.ejecutar_verificacion())
+
+        ventas = SalesService(db)
+        rng = random.Random(7)
+        for _ in range(args.ventas):
+            venta = ventas.create_sale('verificacion')
+            ventas.add_product_to_sale(venta.id_venta, rng.randint(1, 500), 1)
+        imprimir_resumen(integridad.ejecutar_verificacion())
+
+        conn = db.get_connection()
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item) "
+                     "VALUES (999999999, 1, 1, 10, 10)")
+        conn.execute("INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, cantidad_anterior, "
+                     "cantidad_nueva, responsable) SELECT id_producto, 'ENTRADA', 5, stock, stock + 5, "
+                     "'verificacion' FROM productos WHERE id_producto = 1")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys = ON")
+        print("\nTras una línea huérfana y un movimiento sin su actualización de stock:")
+        imprimir_resumen(integridad.ejecutar_verificacion())
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
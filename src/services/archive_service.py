@@ -0,0 +1,446 @@
+"""
+Servicio de archivado de historial (base caliente / base de archivo).
+Mueve ventas, detalle de ventas y movimientos de períodos cerrados a una
+base de datos de archivo adjunta (ATTACH DATABASE) con el mismo schema.
+
+Este servicio maneja:
+- Archivado hasta una fecha de corte (primer día de un mes cerrado)
+- Resúmenes mensuales de lo archivado que quedan en la base caliente
+  (resumen_ventas_mensual, resumen_movimientos_mensual)
+- Vistas temporales *_historico (base caliente UNION ALL archivo) para
+  consultas cuyo rango de fechas cruza la fecha de corte
+
+La base caliente queda con los períodos abiertos: copias de seguridad y
+VACUUM rápidos. El archivo se adjunta solo cuando una consulta lo necesita.
+
+El archivado se hace en dos transacciones: primero se copian las filas al
+archivo (INSERT OR IGNORE, repetible) y después se borran de la base
+caliente registrando la fecha de corte. Las vistas solo muestran filas
+archivadas anteriores al último corte registrado, así que una interrupción
+entre ambos pasos no duplica datos.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-30
+"""
+
+import logging
+import os
+import re
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+
+ALIAS_ARCHIVO = 'archivo'
+
+# Tabla caliente -> (vista histórica, columna de fecha o None)
+TABLAS_ARCHIVADAS = {
+    'ventas': ('ventas_historico', 'fecha_venta'),
+    'detalle_ventas': ('detalle_ventas_historico', None),
+    'movimientos': ('movimientos_historico', 'fecha_movimiento'),
+}
+
+
+class ArchiveService:
+    """
+    Servicio de archivado de períodos cerrados.
+
+    Las consultas de reportes obtienen la tabla a usar con
+    tabla_para_rango(): la tabla caliente si el rango empieza después del
+    último corte, o la vista histórica si incluye períodos archivados.
+    """
+
+    ANIOS_EN_CALIENTE = 2
+    SUFIJO_ARCHIVO = '_archivo.db'
+
+    def __init__(self, db_connection):
+        """
+        Inicializar servicio de archivado.
+
+        Args:
+            db_connection: Conexión a base de datos caliente
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+
+    # ==================== RESOLUCIÓN DE TABLAS ====================
+
+    @classmethod
+    def ruta_archivo(cls, conn: sqlite3.Connection) -> Optional[str]:
+        """
+        Obtener la ruta del archivo asociado a la base caliente.
+
+        Args:
+            conn: Conexión a la base caliente
+
+        Returns:
+            Ruta del archivo o None para bases en memoria
+        """
+        for _, nombre, ruta in conn.execute("PRAGMA database_list"):
+            if nombre == 'main':
+                if not ruta:
+                    return None
+                raiz, _ = os.path.splitext(ruta)
+                return raiz + cls.SUFIJO_ARCHIVO
+        return None
+
+    @staticmethod
+    def fecha_corte(conn: sqlite3.Connection) -> Optional[date]:
+        """
+        Obtener la fecha de corte vigente (lo anterior está archivado).
+
+        Args:
+            conn: Conexión a la base caliente
+
+        Returns:
+            Fecha de corte o None si nunca se archivó
+        """
+        row = conn.execute("SELECT MAX(hasta) FROM main.archivo_periodos").fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    @classmethod
+    def tabla_para_rango(cls, conn: sqlite3.Connection, tabla: str,
+                         fecha_inicio: Optional[date] = None) -> str:
+        """
+        Elegir tabla caliente o vista histórica para un rango de fechas.
+
+        Args:
+            conn: Conexión a la base caliente
+            tabla: 'ventas', 'detalle_ventas' o 'movimientos'
+            fecha_inicio: Inicio del rango (None = todo el historial)
+
+        Returns:
+            Nombre de tabla o vista a usar en el FROM
+        """
+        corte = cls.fecha_corte(conn)
+        if corte is None or (fecha_inicio is not None and fecha_inicio >= corte):
+            return tabla
+
+        if not cls.adjuntar(conn):
+            logging.getLogger(__name__).warning(
+                f"No se pudo adjuntar el archivo; la consulta de {tabla} omite datos anteriores a {corte}"
+            )
+            return tabla
+        return TABLAS_ARCHIVADAS[tabla][0]
+
+    @classmethod
+    def adjuntar(cls, conn: sqlite3.Connection, crear: bool = False) -> bool:
+        """
+        Adjuntar la base de archivo y crear las vistas históricas.
+
+        Args:
+            conn: Conexión a la base caliente
+            crear: Crear el archivo si no existe
+
+        Returns:
+            True si el archivo quedó adjunto
+        """
+        adjuntas = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if ALIAS_ARCHIVO not in adjuntas:
+            ruta = cls.ruta_archivo(conn)
+            if ruta is None or (not crear and not os.path.exists(ruta)):
+                return False
+            if conn.in_transaction:
+                # ATTACH no está permitido dentro de una transacción
+                return False
+            conn.execute(f"ATTACH DATABASE ? AS {ALIAS_ARCHIVO}", (ruta,))
+            cls._sincronizar_schema(conn)
+        return True
+
+    @staticmethod
+    def _columnas(conn: sqlite3.Connection, esquema: str, tabla: str) -> List[sqlite3.Row]:
+        """Columnas de una tabla (nombre en [1], tipo en [2])."""
+        return conn.execute(f"PRAGMA {esquema}.table_info({tabla})").fetchall()
+
+    @classmethod
+    def _sincronizar_schema(cls, conn: sqlite3.Connection) -> None:
+        """
+        Crear en el archivo las tablas e índices que falten (mismo schema que
+        la base caliente), agregar columnas nuevas y crear las vistas.
+        """
+        for tabla, (vista, columna_fecha) in TABLAS_ARCHIVADAS.items():
+            columnas_archivo = {col[1] for col in cls._columnas(conn, ALIAS_ARCHIVO, tabla)}
+
+            if not columnas_archivo:
+                sql = conn.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+                ).fetchone()[0]
+                conn.execute(re.sub(
+                    r'^CREATE TABLE\s+(?:IF NOT EXISTS\s+)?["`\[]?\w+["`\]]?',
+                    f'CREATE TABLE IF NOT EXISTS {ALIAS_ARCHIVO}.{tabla}', sql, count=1
+                ))
+                for (sql_indice,) in conn.execute(
+                    "SELECT sql FROM main.sqlite_master "
+                    "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (tabla,)
+                ).fetchall():
+                    conn.execute(re.sub(
+                        r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF NOT EXISTS\s+)?(\w+)',
+                        rf'CREATE \1INDEX IF NOT EXISTS {ALIAS_ARCHIVO}.\2', sql_indice, count=1
+                    ))
+            else:
+                # Columnas agregadas por migraciones posteriores al primer archivado
+                for col in cls._columnas(conn, 'main', tabla):
+                    if col[1] not in columnas_archivo:
+                        conn.execute(f"ALTER TABLE {ALIAS_ARCHIVO}.{tabla} ADD COLUMN {col[1]} {col[2]}")
+
+            columnas = ', '.join(col[1] for col in cls._columnas(conn, 'main', tabla))
+            if columna_fecha:
+                filtro = f"WHERE a.{columna_fecha} < (SELECT MAX(hasta) FROM main.archivo_periodos)"
+            else:
+                filtro = (
+                    f"WHERE EXISTS (SELECT 1 FROM {ALIAS_ARCHIVO}.ventas v WHERE v.id_venta = a.id_venta "
+                    "AND v.fecha_venta < (SELECT MAX(hasta) FROM main.archivo_periodos))"
+                )
+            conn.execute(f"""
+                CREATE TEMP VIEW IF NOT EXISTS {vista} AS
+                SELECT {columnas} FROM main.{tabla}
+                UNION ALL
+                SELECT {', '.join('a.' + c for c in columnas.split(', '))}
+                FROM {ALIAS_ARCHIVO}.{tabla} a
+                {filtro}
+            """)
+
+    # ==================== ARCHIVADO ====================
+
+    def archivar_hasta(self, fecha_corte: date, responsable: str = 'sistema',
+                       compactar: bool = False) -> Dict[str, Any]:
+        """
+        Archivar ventas y movimientos anteriores a fecha_corte.
+
+        Antes de mover los movimientos se asegura un cierre de inventario el
+        día anterior al corte, para que el stock a fechas posteriores siga
+        calculándose solo con la base caliente.
+
+        Args:
+            fecha_corte: Primer día del primer mes que queda en la base caliente
+            responsable: Usuario o proceso que archiva
+            compactar: Ejecutar VACUUM de la base caliente al terminar
+
+        Returns:
+            Dict con fecha_corte, ventas, detalles y movimientos archivados
+
+        Raises:
+            ValueError: Si la fecha no es inicio de un mes cerrado o ya está archivada
+        """
+        if fecha_corte.day != 1 or fecha_corte > date.today().replace(day=1):
+            raise ValueError("La fecha de corte debe ser el primer día de un mes ya cerrado")
+
+        conn = self.db.get_connection()
+        corte_actual = self.fecha_corte(conn)
+        if corte_actual is not None and fecha_corte <= corte_actual:
+            raise ValueError(f"Los períodos anteriores a {corte_actual.isoformat()} ya están archivados")
+
+        from services.inventory_snapshot_service import InventorySnapshotService
+        snapshots = InventorySnapshotService(self.db)
+        cierre = fecha_corte - timedelta(days=1)
+        if cierre.isoformat() not in {c['fecha_corte'] for c in snapshots.listar_cierres()}:
+            snapshots.crear_cierre(cierre, responsable=responsable)
+
+        if conn.in_transaction:
+            conn.commit()
+        self.adjuntar(conn, crear=True)
+        corte = fecha_corte.isoformat()
+
+        # Sin claves foráneas: el archivo no tiene productos/clientes y los
+        # tickets conservan la referencia a ventas y movimientos archivados
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            # Paso 1: copiar al archivo (repetible)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for tabla, (_, columna_fecha) in TABLAS_ARCHIVADAS.items():
+                    columnas = ', '.join(col[1] for col in self._columnas(conn, 'main', tabla))
+                    if columna_fecha:
+                        condicion = f"{columna_fecha} < ?"
+                    else:
+                        condicion = "id_venta IN (SELECT id_venta FROM main.ventas WHERE fecha_venta < ?)"
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO {ALIAS_ARCHIVO}.{tabla} ({columnas}) "
+                        f"SELECT {columnas} FROM main.{tabla} WHERE {condicion}",
+                        (corte,)
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            # Paso 2: resúmenes, borrado de la base caliente y registro del corte
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._acumular_resumenes(conn, corte)
+                # Archivar no es un borrado para los demás nodos: sin registro de
+                # cambios, y los ya registrados de las filas archivadas se descartan
+                conn.execute("UPDATE main.sync_contexto SET registrar = 0")
+                cambios = conn.execute("""
+                    DELETE FROM main.cambios
+                    WHERE (tabla = 'ventas' AND id_fila IN
+                              (SELECT id_venta FROM main.ventas WHERE fecha_venta < ?))
+                       OR (tabla = 'movimientos' AND id_fila IN
+                              (SELECT id_movimiento FROM main.movimientos WHERE fecha_movimiento < ?))
+                """, (corte, corte)).rowcount
+                detalles = conn.execute(
+                    "DELETE FROM main.detalle_ventas "
+                    "WHERE id_venta IN (SELECT id_venta FROM main.ventas WHERE fecha_venta < ?)",
+                    (corte,)
+                ).rowcount
+                ventas = conn.execute("DELETE FROM main.ventas WHERE fecha_venta < ?", (corte,)).rowcount
+                movimientos = conn.execute(
+                    "DELETE FROM main.movimientos WHERE fecha_movimiento < ?", (corte,)
+                ).rowcount
+                conn.execute("""
+                    INSERT INTO main.archivo_periodos (hasta, ventas, detalles, movimientos, responsable)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (corte, ventas, detalles, movimientos, responsable))
+                conn.execute("UPDATE main.sync_contexto SET registrar = 1")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+        if compactar:
+            self.compactar()
+
+        self.logger.info(
+            f"Archivado hasta {corte}: {ventas} ventas, {detalles} detalles, {movimientos} movimientos "
+            f"({cambios} cambios descartados)"
+        )
+        return {
+            'fecha_corte': corte,
+            'ventas': ventas,
+            'detalles': detalles,
+            'movimientos': movimientos
+        }
+
+    def _acumular_resumenes(self, conn: sqlite3.Connection, corte: str) -> None:
+        """Sumar a los resúmenes mensuales las filas que salen de la base caliente."""
+        conn.execute("""
+            INSERT INTO main.resumen_ventas_mensual (
+                periodo, id_producto, lineas, cantidad, ingresos, impuestos, costo
+            )
+            SELECT strftime('%Y-%m', v.fecha_venta), dv.id_producto, COUNT(*), SUM(dv.cantidad),
+                   SUM(dv.subtotal_item), SUM(dv.impuesto_item),
+                   SUM(COALESCE(dv.costo_total, dv.cantidad * COALESCE(p.costo_promedio, p.costo, 0)))
+            FROM main.ventas v
+            JOIN main.detalle_ventas dv ON dv.id_venta = v.id_venta
+            LEFT JOIN main.productos p ON p.id_producto = dv.id_producto
+            WHERE v.fecha_venta < ?
+            GROUP BY 1, 2
+            ON CONFLICT(periodo, id_producto) DO UPDATE SET
+                lineas = lineas + excluded.lineas,
+                cantidad = cantidad + excluded.cantidad,
+                ingresos = ingresos + excluded.ingresos,
+                impuestos = impuestos + excluded.impuestos,
+                costo = costo + excluded.costo
+        """, (corte,))
+        conn.execute("""
+            INSERT INTO main.resumen_movimientos_mensual (
+                periodo, id_producto, tipo_movimiento, movimientos, unidades, costo
+            )
+            SELECT strftime('%Y-%m', fecha_movimiento), id_producto, tipo_movimiento, COUNT(*),
+                   SUM(ABS(cantidad)), SUM(ABS(cantidad) * COALESCE(costo_unitario, 0))
+            FROM main.movimientos
+            WHERE fecha_movimiento < ?
+            GROUP BY 1, 2, 3
+            ON CONFLICT(periodo, id_producto, tipo_movimiento) DO UPDATE SET
+                movimientos = movimientos + excluded.movimientos,
+                unidades = unidades + excluded.unidades,
+                costo = costo + excluded.costo
+        """, (corte,))
+
+    def archivar_periodos_cerrados(self, anios_en_caliente: Optional[int] = None,
+                                   compactar: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Archivar los ejercicios (años calendario) cerrados.
+
+        Args:
+            anios_en_caliente: Años completos que quedan en la base caliente
+                además del año en curso
+            compactar: Ejecutar VACUUM al terminar
+
+        Returns:
+            Resultado de archivar_hasta o None si no hay nada nuevo que archivar
+        """
+        anios = self.ANIOS_EN_CALIENTE if anios_en_caliente is None else anios_en_caliente
+        fecha_corte = date(date.today().year - anios, 1, 1)
+
+        corte_actual = self.fecha_corte(self.db.get_connection())
+        if corte_actual is not None and fecha_corte <= corte_actual:
+            return None
+        return self.archivar_hasta(fecha_corte, compactar=compactar)
+
+    def compactar(self) -> None:
+        """Compactar la base caliente (VACUUM) y truncar el WAL."""
+        conn = self.db.get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("VACUUM main")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    # ==================== CONSULTAS ====================
+
+    def obtener_resumen_ventas(self, desde: Optional[str] = None,
+                               hasta: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtener los resúmenes mensuales de ventas archivadas.
+
+        Args:
+            desde: Período inicial 'YYYY-MM' incluido (opcional)
+            hasta: Período final 'YYYY-MM' incluido (opcional)
+
+        Returns:
+            Lista de dicts por período y producto
+        """
+        return self._consultar_resumen('resumen_ventas_mensual', desde, hasta)
+
+    def obtener_resumen_movimientos(self, desde: Optional[str] = None,
+                                    hasta: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtener los resúmenes mensuales de movimientos archivados.
+
+        Args:
+            desde: Período inicial 'YYYY-MM' incluido (opcional)
+            hasta: Período final 'YYYY-MM' incluido (opcional)
+
+        Returns:
+            Lista de dicts por período, producto y tipo de movimiento
+        """
+        return self._consultar_resumen('resumen_movimientos_mensual', desde, hasta)
+
+    def _consultar_resumen(self, tabla: str, desde: Optional[str], hasta: Optional[str]) -> List[Dict[str, Any]]:
+        """Leer una tabla de resumen filtrando por período."""
+        query = f"SELECT * FROM {tabla} WHERE periodo >= ? AND periodo <= ? ORDER BY periodo, id_producto"
+        rows = self.db.get_connection().execute(query, (desde or '0000-00', hasta or '9999-99')).fetchall()
+        return [dict(row) for row in rows]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Obtener filas y tamaño de la base caliente y del archivo.
+
+        Returns:
+            Dict con fecha_corte, filas por tabla y tamaños en bytes
+        """
+        conn = self.db.get_connection()
+        corte = self.fecha_corte(conn)
+        ruta = self.ruta_archivo(conn)
+        adjunto = self.adjuntar(conn)
+
+        filas = {}
+        for tabla in TABLAS_ARCHIVADAS:
+            filas[tabla] = {
+                'caliente': conn.execute(f"SELECT COUNT(*) FROM main.{tabla}").fetchone()[0],
+                'archivo': (
+                    conn.execute(f"SELECT COUNT(*) FROM {ALIAS_ARCHIVO}.{tabla}").fetchone()[0]
+                    if adjunto else 0
+                )
+            }
+
+        ruta_caliente = getattr(self.db, 'db_path', None)
+        return {
+            'fecha_corte': corte.isoformat() if corte else None,
+            'filas': filas,
+            'tamano_caliente': os.path.getsize(ruta_caliente) if ruta_caliente and os.path.exists(ruta_caliente) else 0,
+            'tamano_archivo': os.path.getsize(ruta) if ruta and os.path.exists(ruta) else 0,
+            'ruta_archivo': ruta
+        }
@@ -0,0 +1,357 @@
+"""
+Servicio de búsqueda de clientes.
+Implementa búsquedas indexadas y paginadas sobre la tabla clientes.
+
+Este servicio maneja:
+- Búsqueda por prefijo del nombre normalizado (idx_clientes_nombre_normalizado)
+- Búsqueda exacta o por prefijo de RUC (idx_clientes_ruc)
+- Búsqueda opcional por prefijo de palabra con FTS5
+- Páginas limitadas con cursor (keyset) en lugar de OFFSET
+
+Ninguna consulta recorre la tabla completa: los filtros de nombre y RUC
+se traducen a rangos sobre un índice y cada página lee a lo sumo
+limite + 1 filas.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-22
+"""
+
+import copy
+import logging
+import re
+import sqlite3
+from typing import Optional, Tuple
+
+from db.database import get_database_connection
+from models.cliente import Cliente
+
+
+# Mayor que cualquier carácter válido: cota superior para rangos por prefijo
+_FIN_PREFIJO = '\U0010ffff'
+
+# Texto que parece un RUC: contiene dígitos y solo dígitos, letras y guiones
+_PATRON_RUC = re.compile(r'^(?=.*\d)[0-9A-Za-z\-]+$')
+
+
+class PaginaClientes(list):
+    """
+    Página de resultados de búsqueda de clientes.
+
+    Es una lista de Cliente con los datos necesarios para pedir la página
+    siguiente, de modo que puede usarse directamente donde se espera una
+    lista de clientes.
+    """
+
+    def __init__(self, clientes=(), modo: str = 'nombre',
+                 cursor: Optional[Tuple] = None, hay_mas: bool = False):
+        """
+        Inicializar página.
+
+        Args:
+            clientes: Clientes de la página
+            modo: Estrategia usada ('nombre', 'ruc', 'fts')
+            cursor: Cursor para la página siguiente (None si no hay más)
+            hay_mas: True si existen más resultados
+        """
+        super().__init__(clientes)
+        self.modo = modo
+        self.cursor = cursor
+        self.hay_mas = hay_mas
+
+
+class ClientSearchService:
+    """
+    Servicio de búsqueda de clientes para selectores con miles de registros.
+
+    El nombre normalizado (minúsculas, sin acentos) se guarda en
+    clientes.nombre_normalizado; ClientService lo mantiene al crear o
+    actualizar y este servicio completa las filas que no lo tengan.
+    """
+
+    TAMANO_PAGINA = 50
+
+    def __init__(self, db_connection=None, usar_fts: bool = False):
+        """
+        Inicializar servicio de búsqueda.
+
+        Args:
+            db_connection: Conexión a base de datos (opcional)
+            usar_fts: Buscar por prefijo de cualquier palabra con FTS5
+                (si SQLite no soporta FTS5 se usa la búsqueda por prefijo)
+        """
+        self.db = db_connection or get_database_connection()
+        self.logger = logging.getLogger(__name__)
+        self.usar_fts = False
+
+        self.sincronizar_nombres_normalizados()
+        if usar_fts:
+            self.usar_fts = self.habilitar_fts()
+
+    # ==================== BÚSQUEDA ====================
+
+    @staticmethod
+    def es_ruc(texto: str) -> bool:
+        """
+        Determinar si el texto de búsqueda debe tratarse como RUC.
+
+        Args:
+            texto: Texto ingresado
+
+        Returns:
+            True si contiene dígitos y solo dígitos, letras y guiones
+        """
+        return bool(texto) and bool(_PATRON_RUC.match(texto.strip()))
+
+    def buscar_clientes(self, texto: str = '', limite: Optional[int] = None,
+                        cursor: Optional[Tuple] = None) -> PaginaClientes:
+        """
+        Buscar clientes activos por nombre o RUC.
+
+        Si el texto parece un RUC se busca por prefijo de RUC (la coincidencia
+        exacta aparece primero); si no hay resultados se busca por nombre.
+
+        Args:
+            texto: Texto de búsqueda (vacío para listar todos)
+            limite: Tamaño de página (por defecto TAMANO_PAGINA)
+            cursor: Cursor devuelto por la página anterior
+
+        Returns:
+            PaginaClientes con los clientes de la página
+        """
+        limite = limite or self.TAMANO_PAGINA
+        texto = (texto or '').strip()
+
+        if cursor is not None:
+            modo = cursor[0]
+        elif self.es_ruc(texto):
+            pagina = self._buscar_pagina('ruc', texto, limite, None)
+            if pagina:
+                return pagina
+            modo = 'nombre'
+        else:
+            modo = 'fts' if self.usar_fts and texto else 'nombre'
+
+        return self._buscar_pagina(modo, texto, limite, cursor)
+
+    def buscar_por_ruc(self, ruc: str) -> Optional[Cliente]:
+        """
+        Buscar un cliente activo por RUC exacto.
+
+        Args:
+            ruc: RUC del cliente
+
+        Returns:
+            Cliente o None si no existe
+        """
+        if not ruc or not ruc.strip():
+            return None
+
+        row = self.db.get_connection().execute(
+            "SELECT id_cliente, nombre, ruc, activo FROM clientes WHERE ruc = ? AND activo = 1",
+            (ruc.strip(),)
+        ).fetchone()
+        return self._row_to_cliente(row) if row else None
+
+    def con_conexion(self, db_connection) -> 'ClientSearchService':
+        """
+        Copia del servicio que consulta con otra conexión.
+
+        Para el hilo de búsqueda, que usa su propia conexión de solo lectura:
+        no repite la sincronización de nombres ni la detección de FTS5.
+
+        Args:
+            db_connection: Conexión a usar
+
+        Returns:
+            ClientSearchService con la misma configuración
+        """
+        copia = copy.copy(self)
+        copia.db = db_connection
+        return copia
+
+    def coincide(self, cliente: Cliente, texto: str) -> bool:
+        """
+        Evaluar en memoria el mismo criterio de búsqueda por nombre.
+
+        Permite refinar una página completa sin consultar de nuevo.
+
+        Args:
+            cliente: Cliente a evaluar
+            texto: Texto de búsqueda
+
+        Returns:
+            True si el cliente cumple el filtro por nombre
+        """
+        termino = Cliente.normalizar_nombre(texto)
+        nombre = Cliente.normalizar_nombre(cliente.nombre)
+        if not self.usar_fts:
+            return nombre.startswith(termino)
+
+        palabras = nombre.split()
+        return all(any(p.startswith(t) for p in palabras) for t in termino.split())
+
+    def obtener_ultimo_id(self) -> int:
+        """
+        Obtener el mayor id_cliente registrado.
+
+        Returns:
+            Último ID o 0 si no hay clientes
+        """
+        row = self.db.get_connection().execute("SELECT MAX(id_cliente) FROM clientes").fetchone()
+        return row[0] or 0
+
+    def _buscar_pagina(self, modo: str, texto: str, limite: int,
+                       cursor: Optional[Tuple]) -> PaginaClientes:
+        """
+        Ejecutar la consulta de una página.
+
+        Args:
+            modo: 'nombre', 'ruc' o 'fts'
+            texto: Texto de búsqueda
+            limite: Tamaño de página
+            cursor: (modo, clave, id_cliente) de la última fila anterior
+
+        Returns:
+            PaginaClientes
+        """
+        condiciones = ["c.activo = 1"]
+        params = []
+        tabla = "clientes c"
+
+        if modo == 'ruc':
+            clave = "c.ruc"
+            condiciones.append("c.ruc >= ? AND c.ruc < ?")
+            params.extend([texto, texto + _FIN_PREFIJO])
+        elif modo == 'fts':
+            clave = "c.nombre_normalizado"
+            tabla = "clientes_fts f JOIN clientes c ON c.id_cliente = f.rowid"
+            condiciones.append("clientes_fts MATCH ?")
+            params.append(self._consulta_fts(texto))
+        else:
+            clave = "c.nombre_normalizado"
+            prefijo = Cliente.normalizar_nombre(texto)
+            if prefijo:
+                condiciones.append("c.nombre_normalizado >= ? AND c.nombre_normalizado < ?")
+                params.extend([prefijo, prefijo + _FIN_PREFIJO])
+
+        if cursor is not None:
+            condiciones.append(f"({clave}, c.id_cliente) > (?, ?)")
+            params.extend([cursor[1], cursor[2]])
+
+        query = f"""
+            SELECT c.id_cliente, c.nombre, c.ruc, c.activo, {clave} AS clave
+            FROM {tabla}
+            WHERE {' AND '.join(condiciones)}
+            ORDER BY {clave}, c.id_cliente
+            LIMIT ?
+        """
+        params.append(limite + 1)
+
+        try:
+            rows = self.db.get_connection().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error buscando clientes ({modo}) '{texto}': {e}")
+            return PaginaClientes(modo=modo)
+
+        hay_mas = len(rows) > limite
+        rows = rows[:limite]
+        siguiente = (modo, rows[-1]['clave'], rows[-1]['id_cliente']) if hay_mas else None
+
+        return PaginaClientes(
+            (self._row_to_cliente(row) for row in rows),
+            modo=modo, cursor=siguiente, hay_mas=hay_mas
+        )
+
+    @staticmethod
+    def _consulta_fts(texto: str) -> str:
+        """Convertir el texto en una consulta FTS5 de prefijos por palabra."""
+        terminos = Cliente.normalizar_nombre(texto).replace('"', ' ').split()
+        return ' '.join(f'"{t}"*' for t in terminos)
+
+    @staticmethod
+    def _row_to_cliente(row) -> Cliente:
+        """Convertir fila en objeto Cliente."""
+        return Cliente(
+            id_cliente=row['id_cliente'],
+            nombre=row['nombre'],
+            ruc=row['ruc'],
+            activo=bool(row['activo'])
+        )
+
+    # ==================== MANTENIMIENTO DE ÍNDICES ====================
+
+    def sincronizar_nombres_normalizados(self) -> int:
+        """
+        Completar nombre_normalizado en filas creadas sin él.
+
+        Returns:
+            Número de clientes actualizados
+        """
+        conn = self.db.get_connection()
+        try:
+            rows = conn.execute(
+                "SELECT id_cliente, nombre FROM clientes WHERE nombre_normalizado IS NULL"
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            # Base de datos sin la migración de nombre_normalizado
+            self.logger.warning(f"Búsqueda de clientes sin índice normalizado: {e}")
+            return 0
+
+        if not rows:
+            return 0
+
+        conn.executemany(
+            "UPDATE clientes SET nombre_normalizado = ? WHERE id_cliente = ?",
+            [(Cliente.normalizar_nombre(row[1]), row[0]) for row in rows]
+        )
+        conn.commit()
+        self.logger.info(f"Nombres normalizados completados para {len(rows)} clientes")
+        return len(rows)
+
+    def habilitar_fts(self) -> bool:
+        """
+        Crear (si no existe) el índice FTS5 de clientes y sus triggers.
+
+        Returns:
+            True si FTS5 está disponible y el índice quedó listo
+        """
+        conn = self.db.get_connection()
+        try:
+            existe = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_fts'"
+            ).fetchone()
+            if existe:
+                return True
+
+            conn.executescript("""
+                CREATE VIRTUAL TABLE clientes_fts USING fts5(
+                    nombre_normalizado, content='clientes', content_rowid='id_cliente'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ai AFTER INSERT ON clientes BEGIN
+                    INSERT INTO clientes_fts(rowid, nombre_normalizado)
+                    VALUES (new.id_cliente, new.nombre_normalizado);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ad AFTER DELETE ON clientes BEGIN
+                    INSERT INTO clientes_fts(clientes_fts, rowid, nombre_normalizado)
+                    VALUES ('delete', old.id_cliente, old.nombre_normalizado);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_au
+                AFTER UPDATE OF nombre_normalizado ON clientes BEGIN
+                    INSERT INTO clientes_fts(clientes_fts, rowid, nombre_normalizado)
+                    VALUES ('delete', old.id_cliente, old.nombre_normalizado);
+                    INSERT INTO clientes_fts(rowid, nombre_normalizado)
+                    VALUES (new.id_cliente, new.nombre_normalizado);
+                END;
+
+                INSERT INTO clientes_fts(clientes_fts) VALUES ('rebuild');
+            """)
+            conn.commit()
+            self.logger.info("Índice FTS5 de clientes creado")
+            return True
+
+        except sqlite3.Error as e:
+            self.logger.warning(f"FTS5 no disponible, se usa búsqueda por prefijo: {e}")
+            return False
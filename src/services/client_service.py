@@ -67,8 +67,8 @@ class ClientService:
         # Crear en base de datos
         cursor = self.db.get_connection().cursor()
         cursor.execute(
-            "INSERT INTO clientes (nombre, ruc, activo) VALUES (?, ?, 1)",
-            (nombre, ruc)
+            "INSERT INTO clientes (nombre, ruc, activo, nombre_normalizado) VALUES (?, ?, 1, ?)",
+            (nombre, ruc, Cliente.normalizar_nombre(nombre))
         )
         self.db.get_connection().commit()
         
@@ -120,8 +120,8 @@ class ClientService:
         # Actualizar en la base de datos
         cursor = self.db.get_connection().cursor()
         cursor.execute(
-            "UPDATE clientes SET nombre = ?, ruc = ? WHERE id_cliente = ?",
-            (nombre, ruc, id_cliente)
+            "UPDATE clientes SET nombre = ?, ruc = ?, nombre_normalizado = ? WHERE id_cliente = ?",
+            (nombre, ruc, Cliente.normalizar_nombre(nombre), id_cliente)
         )
         self.db.get_connection().commit()
         
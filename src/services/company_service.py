@@ -17,7 +17,7 @@ Fecha: 2025-06-25
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from decimal import Decimal
 import threading
 
@@ -39,6 +39,7 @@ class CompanyService:
     _instance = None
     _lock = threading.Lock()
     _config_cache = None
+    _listeners_cambios: List[Callable[[], None]] = []
     
     def __new__(cls, db_connection=None):
         """
@@ -68,6 +69,21 @@ class CompanyService:
             self.db = db_connection or get_database_connection()
             self._initialized = True
     
+    @classmethod
+    def registrar_listener_cambios(cls, callback: Callable[[], None]) -> None:
+        """
+        Registrar una función a llamar cuando cambia la configuración.
+        
+        Permite que caches derivados (por ejemplo plantillas de tickets)
+        se invaliden junto con el cache de configuración.
+        
+        Args:
+            callback: Función sin argumentos
+        """
+        with cls._lock:
+            if callback not in cls._listeners_cambios:
+                cls._listeners_cambios.append(callback)
+    
     def _limpiar_cache(self) -> None:
         """
         Limpiar el cache de configuración.
@@ -75,6 +91,14 @@ class CompanyService:
         """
         with self._lock:
             CompanyService._config_cache = None
+            listeners = list(CompanyService._listeners_cambios)
+        
+        # Notificar fuera del lock para evitar bloqueos cruzados
+        for callback in listeners:
+            try:
+                callback()
+            except Exception:
+                pass
     
     def _crear_configuracion_defecto(self) -> CompanyConfig:
         """
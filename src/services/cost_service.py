@@ -0,0 +1,459 @@
+"""
+Servicio de costeo de inventario.
+Mantiene el costo de las existencias de forma incremental y calcula el
+costo de venta de cada línea en el momento de la venta.
+
+Este servicio maneja:
+- Capas de costo (tabla capas_costo): una por ENTRADA o AJUSTE positivo,
+  consumidas en orden FIFO por ventas y ajustes negativos
+- Costo promedio ponderado por producto (productos.costo_promedio),
+  actualizado en cada entrada
+- Costo de venta según el método configurado (PROMEDIO o FIFO)
+- Reconstrucción completa desde el historial de movimientos, usada para
+  verificar el estado incremental
+
+Las capas se mantienen con ambos métodos: cambiar de método solo afecta
+el costo de las ventas posteriores.
+
+Los métodos de registro no hacen commit: se ejecutan dentro de la
+transacción del servicio que registra el movimiento.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-28
+"""
+
+import json
+import logging
+from collections import deque
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services.archive_service import ArchiveService
+
+
+# Precisión de costos unitarios y totales (igual que DECIMAL(10,4) del schema)
+_CUATRO_DECIMALES = Decimal('0.0001')
+
+
+def _decimal(valor: Any) -> Decimal:
+    """Convertir un valor de la base de datos a Decimal (None -> 0)."""
+    if valor is None:
+        return Decimal('0')
+    return Decimal(str(valor))
+
+
+def _redondear(valor: Decimal) -> Decimal:
+    """Redondear a la precisión de costos."""
+    return valor.quantize(_CUATRO_DECIMALES, rounding=ROUND_HALF_UP)
+
+
+class CostService:
+    """
+    Servicio de costeo incremental (promedio ponderado y capas FIFO).
+
+    Con el método PROMEDIO el costo de venta es costo_promedio * cantidad;
+    con FIFO es la suma de las capas consumidas. Si las capas no alcanzan
+    (stock registrado por procesos sin costeo) el faltante se valoriza al
+    costo promedio.
+    """
+
+    METODOS = ('PROMEDIO', 'FIFO')
+    METODO = 'PROMEDIO'
+
+    def __init__(self, db_connection, metodo: Optional[str] = None):
+        """
+        Inicializar servicio de costeo.
+
+        Args:
+            db_connection: Conexión a base de datos
+            metodo: Método de costo de venta ('PROMEDIO' o 'FIFO')
+
+        Raises:
+            ValueError: Si el método no es válido
+        """
+        metodo = (metodo or self.METODO).upper()
+        if metodo not in self.METODOS:
+            raise ValueError(f"Método de costeo no válido: {metodo}. Use uno de {self.METODOS}")
+
+        self.db = db_connection
+        self.metodo = metodo
+        self.logger = logging.getLogger(__name__)
+
+    def _get_connection(self):
+        """Obtener la conexión SQLite subyacente."""
+        return self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+
+    # ==================== REGISTRO INCREMENTAL ====================
+
+    def costear_entradas(self, lineas: Iterable[Tuple[int, int, Optional[Any]]]) -> List[Decimal]:
+        """
+        Calcular el costo unitario de entradas sin registrarlas.
+
+        Permite guardar el costo en el mismo INSERT del movimiento antes de
+        crear las capas con registrar_entradas (que asigna el mismo costo).
+
+        Args:
+            lineas: Tuplas (id_producto, cantidad, costo_unitario)
+
+        Returns:
+            Costo unitario que tendría cada línea, en el mismo orden
+        """
+        lineas = list(lineas)
+        if not lineas:
+            return []
+        estado = self._estado_productos(self._get_connection(), {linea[0] for linea in lineas})
+        return self._costear(estado, lineas)
+
+    def registrar_entradas(self, lineas: Iterable[Tuple[int, int, Optional[Any], Optional[int]]]) -> List[Decimal]:
+        """
+        Registrar entradas de inventario: una capa por línea y nuevo promedio.
+
+        Args:
+            lineas: Tuplas (id_producto, cantidad, costo_unitario, id_movimiento).
+                Sin costo_unitario la capa toma el costo promedio vigente
+                (o productos.costo si el producto aún no tiene promedio)
+
+        Returns:
+            Costo unitario asignado a cada línea, en el mismo orden
+        """
+        lineas = list(lineas)
+        if not lineas:
+            return []
+
+        conn = self._get_connection()
+        estado = self._estado_productos(conn, {linea[0] for linea in lineas})
+        costos = self._costear(estado, [linea[:3] for linea in lineas])
+
+        self._insertar_capas(conn, [
+            (id_producto, id_movimiento, 'ENTRADA', cantidad, cantidad, float(costo))
+            for (id_producto, cantidad, _, id_movimiento), costo in zip(lineas, costos)
+        ])
+        conn.executemany(
+            "UPDATE productos SET costo_promedio = ? WHERE id_producto = ?",
+            [(float(producto['costo_promedio']), id_producto) for id_producto, producto in estado.items()]
+        )
+        return costos
+
+    @staticmethod
+    def _costear(estado: Dict[int, Dict[str, Any]], lineas: List[Tuple]) -> List[Decimal]:
+        """Asignar costo a cada entrada (id_producto, cantidad, costo) y actualizar estado en memoria."""
+        costos = []
+        for id_producto, cantidad, costo_unitario in lineas:
+            producto = estado[id_producto]
+            if costo_unitario is None:
+                costo = producto['costo_promedio']
+            else:
+                costo = _redondear(_decimal(costo_unitario))
+
+            existencias = producto['existencias']
+            if existencias > 0:
+                producto['costo_promedio'] = _redondear(
+                    (producto['costo_promedio'] * existencias + costo * cantidad) / (existencias + cantidad)
+                )
+            else:
+                producto['costo_promedio'] = costo
+            producto['existencias'] = existencias + cantidad
+            costos.append(costo)
+        return costos
+
+    def registrar_entrada(self, id_producto: int, cantidad: int, costo_unitario: Optional[Any] = None,
+                          id_movimiento: Optional[int] = None) -> Decimal:
+        """
+        Registrar una entrada de inventario.
+
+        Args:
+            id_producto: ID del producto
+            cantidad: Cantidad ingresada (positiva)
+            costo_unitario: Costo unitario de compra (opcional)
+            id_movimiento: Movimiento ENTRADA asociado
+
+        Returns:
+            Costo unitario asignado a la capa
+        """
+        return self.registrar_entradas([(id_producto, cantidad, costo_unitario, id_movimiento)])[0]
+
+    def registrar_salida(self, id_producto: int, cantidad: int) -> Tuple[Decimal, Decimal]:
+        """
+        Consumir existencias por una venta o un ajuste negativo.
+
+        Args:
+            id_producto: ID del producto
+            cantidad: Cantidad que sale (positiva)
+
+        Returns:
+            Tupla (costo_unitario, costo_total) según el método configurado
+        """
+        conn = self._get_connection()
+        producto = self._estado_productos(conn, {id_producto})[id_producto]
+        promedio = producto['costo_promedio']
+
+        pendiente = cantidad
+        costo_fifo = Decimal('0')
+        actualizaciones = []
+        for id_capa, restante, costo in conn.execute("""
+            SELECT id_capa, cantidad_restante, costo_unitario
+            FROM capas_costo
+            WHERE id_producto = ? AND cantidad_restante > 0
+            ORDER BY id_capa
+        """, (id_producto,)):
+            if pendiente == 0:
+                break
+            consumo = min(pendiente, restante)
+            costo_fifo += _decimal(costo) * consumo
+            actualizaciones.append((restante - consumo, id_capa))
+            pendiente -= consumo
+
+        if actualizaciones:
+            conn.executemany(
+                "UPDATE capas_costo SET cantidad_restante = ? WHERE id_capa = ?",
+                actualizaciones
+            )
+
+        if self.metodo == 'FIFO':
+            costo_total = _redondear(costo_fifo + promedio * pendiente)
+        else:
+            costo_total = _redondear(promedio * cantidad)
+
+        return _redondear(costo_total / cantidad), costo_total
+
+    def registrar_ajuste(self, id_producto: int, cantidad: int,
+                         id_movimiento: Optional[int] = None) -> Decimal:
+        """
+        Registrar un ajuste de inventario.
+
+        Un ajuste positivo agrega una capa al costo promedio vigente (no lo
+        modifica); uno negativo consume capas como una venta.
+
+        Args:
+            id_producto: ID del producto
+            cantidad: Cantidad con signo
+            id_movimiento: Movimiento AJUSTE asociado
+
+        Returns:
+            Costo unitario del ajuste
+        """
+        conn = self._get_connection()
+        if cantidad < 0:
+            return self.registrar_salida(id_producto, -cantidad)[0]
+
+        costo = self._estado_productos(conn, {id_producto})[id_producto]['costo_promedio']
+        self._insertar_capas(conn, [(id_producto, id_movimiento, 'AJUSTE', cantidad, cantidad, float(costo))])
+        return costo
+
+    def registrar_apertura(self, id_producto: int, cantidad: int, costo_unitario: Any) -> None:
+        """
+        Registrar el stock inicial de un producto nuevo (sin movimiento asociado).
+
+        Args:
+            id_producto: ID del producto
+            cantidad: Stock inicial
+            costo_unitario: Costo del producto
+        """
+        conn = self._get_connection()
+        costo = _redondear(_decimal(costo_unitario))
+        if cantidad > 0:
+            self._insertar_capas(conn, [(id_producto, 0, 'APERTURA', cantidad, cantidad, float(costo))])
+        conn.execute(
+            "UPDATE productos SET costo_promedio = ? WHERE id_producto = ?",
+            (float(costo), id_producto)
+        )
+
+    def _estado_productos(self, conn, ids_producto: set) -> Dict[int, Dict[str, Any]]:
+        """
+        Leer costo promedio y existencias en capas de varios productos.
+
+        Returns:
+            Dict id_producto -> {'costo_promedio': Decimal, 'existencias': int}
+
+        Raises:
+            ValueError: Si algún producto no existe
+        """
+        ids = sorted(ids_producto)
+        estado = {
+            row[0]: {
+                'costo_promedio': _decimal(row[1] if row[1] is not None else row[2]),
+                'existencias': row[3]
+            }
+            for row in conn.execute("""
+                SELECT p.id_producto, p.costo_promedio, p.costo,
+                       COALESCE((SELECT SUM(cantidad_restante) FROM capas_costo cc
+                                 WHERE cc.id_producto = p.id_producto AND cc.cantidad_restante > 0), 0)
+                FROM productos p
+                WHERE p.id_producto IN (SELECT value FROM json_each(?))
+            """, (json.dumps(ids),))
+        }
+        faltantes = [i for i in ids if i not in estado]
+        if faltantes:
+            raise ValueError(f"No existen los productos con ID {faltantes[:10]}")
+        return estado
+
+    @staticmethod
+    def _insertar_capas(conn, capas: List[Tuple]) -> None:
+        """Insertar capas (id_producto, id_movimiento, origen, inicial, restante, costo)."""
+        conn.executemany("""
+            INSERT INTO capas_costo (
+                id_producto, id_movimiento, origen, cantidad_inicial, cantidad_restante, costo_unitario
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, capas)
+
+    # ==================== RECONSTRUCCIÓN ====================
+
+    def reconstruir(self, ids_producto: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Recalcular el costeo desde cero recorriendo el historial de movimientos.
+
+        Parte de las capas de APERTURA (existencias al activar el costeo) y
+        aplica en orden los movimientos posteriores a cada una. No modifica
+        la base de datos.
+
+        Args:
+            ids_producto: Limitar a estos productos (opcional)
+
+        Returns:
+            Dict id_producto -> {'costo_promedio', 'capas': [(restante, costo)],
+            'ventas': {id_movimiento: costo_unitario}}
+        """
+        conn = self._get_connection()
+        filtro, params = "", []
+        if ids_producto is not None:
+            filtro = " AND id_producto IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(sorted(set(ids_producto))))
+
+        estado: Dict[int, Dict[str, Any]] = {}
+        desde: Dict[int, int] = {}
+
+        for id_producto, id_movimiento, inicial, costo in conn.execute(f"""
+            SELECT id_producto, COALESCE(id_movimiento, 0), cantidad_inicial, costo_unitario
+            FROM capas_costo
+            WHERE origen = 'APERTURA'{filtro}
+        """, params):
+            costo = _decimal(costo)
+            estado[id_producto] = {
+                'costo_promedio': costo,
+                'capas': deque([[inicial, costo]]),
+                'ventas': {}
+            }
+            desde[id_producto] = id_movimiento
+
+        costos_base = {
+            row[0]: _decimal(row[1])
+            for row in conn.execute(f"SELECT id_producto, costo FROM productos WHERE 1 = 1{filtro}", params)
+        }
+
+        movimientos = ArchiveService.tabla_para_rango(conn, 'movimientos')
+        for id_movimiento, id_producto, tipo, cantidad, costo_unitario in conn.execute(f"""
+            SELECT id_movimiento, id_producto, tipo_movimiento, cantidad, costo_unitario
+            FROM {movimientos}
+            WHERE 1 = 1{filtro}
+            ORDER BY id_movimiento
+        """, params):
+            if id_movimiento <= desde.get(id_producto, 0):
+                continue
+
+            producto = estado.setdefault(id_producto, {
+                'costo_promedio': costos_base.get(id_producto, Decimal('0')),
+                'capas': deque(),
+                'ventas': {}
+            })
+
+            if tipo == 'ENTRADA':
+                self._reproducir_entrada(producto, cantidad, costo_unitario)
+            elif tipo == 'VENTA':
+                producto['ventas'][id_movimiento] = self._reproducir_salida(producto, abs(cantidad))
+            elif cantidad < 0:
+                self._reproducir_salida(producto, -cantidad)
+            elif cantidad > 0:
+                producto['capas'].append([cantidad, producto['costo_promedio']])
+
+        for producto in estado.values():
+            producto['capas'] = [(restante, costo) for restante, costo in producto['capas'] if restante > 0]
+        return estado
+
+    @staticmethod
+    def _reproducir_entrada(producto: Dict[str, Any], cantidad: int, costo_unitario: Any) -> None:
+        """Aplicar una ENTRADA al estado reconstruido."""
+        costo = producto['costo_promedio'] if costo_unitario is None else _redondear(_decimal(costo_unitario))
+        existencias = sum(restante for restante, _ in producto['capas'])
+        if existencias > 0:
+            producto['costo_promedio'] = _redondear(
+                (producto['costo_promedio'] * existencias + costo * cantidad) / (existencias + cantidad)
+            )
+        else:
+            producto['costo_promedio'] = costo
+        producto['capas'].append([cantidad, costo])
+
+    def _reproducir_salida(self, producto: Dict[str, Any], cantidad: int) -> Decimal:
+        """Consumir capas del estado reconstruido y devolver el costo unitario."""
+        capas = producto['capas']
+        pendiente = cantidad
+        costo_fifo = Decimal('0')
+        while pendiente and capas:
+            capa = capas[0]
+            consumo = min(pendiente, capa[0])
+            costo_fifo += capa[1] * consumo
+            capa[0] -= consumo
+            pendiente -= consumo
+            if capa[0] == 0:
+                capas.popleft()
+
+        if self.metodo == 'FIFO':
+            total = _redondear(costo_fifo + producto['costo_promedio'] * pendiente)
+        else:
+            total = _redondear(producto['costo_promedio'] * cantidad)
+        return _redondear(total / cantidad)
+
+    def verificar(self, ids_producto: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Comparar el estado incremental guardado con una reconstrucción completa.
+
+        Compara costo promedio, capas abiertas y el costo unitario registrado
+        en cada movimiento VENTA.
+
+        Args:
+            ids_producto: Limitar a estos productos (opcional)
+
+        Returns:
+            Lista de diferencias (vacía si el estado es consistente)
+        """
+        esperado = self.reconstruir(ids_producto)
+        conn = self._get_connection()
+        movimientos = ArchiveService.tabla_para_rango(conn, 'movimientos')
+        diferencias = []
+
+        for id_producto, producto in esperado.items():
+            row = conn.execute(
+                "SELECT costo_promedio FROM productos WHERE id_producto = ?", (id_producto,)
+            ).fetchone()
+            if row is not None and row[0] is not None and _decimal(row[0]) != producto['costo_promedio']:
+                diferencias.append({
+                    'id_producto': id_producto, 'campo': 'costo_promedio',
+                    'guardado': _decimal(row[0]), 'esperado': producto['costo_promedio']
+                })
+
+            capas = [
+                (restante, _decimal(costo))
+                for restante, costo in conn.execute("""
+                    SELECT cantidad_restante, costo_unitario FROM capas_costo
+                    WHERE id_producto = ? AND cantidad_restante > 0
+                    ORDER BY id_capa
+                """, (id_producto,))
+            ]
+            if capas != producto['capas']:
+                diferencias.append({
+                    'id_producto': id_producto, 'campo': 'capas',
+                    'guardado': capas, 'esperado': producto['capas']
+                })
+
+            if producto['ventas']:
+                for id_movimiento, costo in conn.execute(f"""
+                    SELECT id_movimiento, costo_unitario FROM {movimientos}
+                    WHERE id_producto = ? AND tipo_movimiento = 'VENTA' AND costo_unitario IS NOT NULL
+                """, (id_producto,)):
+                    esperado_venta = producto['ventas'].get(id_movimiento)
+                    if esperado_venta is not None and _decimal(costo) != esperado_venta:
+                        diferencias.append({
+                            'id_producto': id_producto, 'campo': f'venta {id_movimiento}',
+                            'guardado': _decimal(costo), 'esperado': esperado_venta
+                        })
+
+        return diferencias
@@ -30,7 +30,7 @@ import os
 import tempfile
 import logging
 from datetime import datetime, date
-from decimal import Decimal
+from decimal import InvalidOperation
 from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
 
@@ -38,6 +38,7 @@ from pathlib import Path
 from infrastructure.exports.excel_exporter import ExcelExporter
 from infrastructure.exports.pdf_exporter import PDFExporter
 from infrastructure.exports.report_templates import ReportTemplates
+from models.money import Money
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -483,20 +484,20 @@ class ExportService:
         total_ajustes = sum(1 for mov in movements if mov.get('tipo_movimiento') == 'AJUSTE')
         
         # Calcular valor total si está disponible
-        valor_total = Decimal('0.00')
+        valor_total = Money()
         for mov in movements:
             costo = mov.get('costo_total', 0)
             if costo:
                 try:
-                    valor_total += Decimal(str(costo))
-                except (ValueError, TypeError):
+                    valor_total += Money.desde(costo)
+                except (ValueError, TypeError, InvalidOperation):
                     pass
         
         return {
             'total_movimientos': len(movements),
             'total_entradas': total_entradas,
             'total_ajustes': total_ajustes,
-            'valor_total': f"B/. {valor_total:,.2f}",
+            'valor_total': f"B/. {valor_total.decimal():,.2f}",
             'periodo_generacion': datetime.now().strftime('%d/%m/%Y %H:%M')
         }
     
@@ -783,13 +784,8 @@ class ExportService:
                 'total_productos': len(products),
                 'total_cantidad': sum(p.get('cantidad', 0) for p in products),
                 'observaciones_generales': ticket_data.get('observaciones', '')
-            },
-            'empresa': {
-                'nombre': 'Copy Point S.A.',
-                'direccion': 'Las Lajas, Las Cumbres, Panamá',
-                'telefono': '6342-9218',
-                'email': 'tus_amigos@copypoint.online'
             }
+            # El encabezado de empresa lo aporta el motor de plantillas desde CompanyService
         }
         
         return template_data
@@ -959,13 +955,8 @@ class ExportService:
                 'motivo': adjustment_data.get('reason', 'No especificado'),
                 'observaciones': adjustment_data.get('observations', 'Sin observaciones'),
                 'cantidad_numerica': quantity
-            },
-            'empresa': {
-                'nombre': 'Copy Point S.A.',
-                'direccion': 'Las Lajas, Las Cumbres, Panamá',
-                'telefono': '6342-9218',
-                'email': 'tus_amigos@copypoint.online'
             }
+            # El encabezado de empresa lo aporta el motor de plantillas desde CompanyService
         }
         
         return template_data
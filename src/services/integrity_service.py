@@ -0,0 +1,509 @@
+"""
+Servicio de verificación de integridad de la base de datos.
+
+En el arranque solo se compara user_version y la huella de sqlite_master
+(DatabaseConnection.schema_is_current). Las verificaciones costosas corren
+después del login en un hilo en background con conexión propia y guardan
+su resultado en verificaciones_integridad:
+
+- Claves foráneas: de las filas agregadas desde la última verificación en
+  las tablas que cambiaron (PRAGMA foreign_key_check completo en la
+  verificación completa)
+- PRAGMA quick_check de las tablas que cambiaron
+- Conciliación del stock de cada producto con el último movimiento
+  registrado (cantidad_nueva), para los productos con movimientos nuevos
+
+Los cambios se detectan con los contadores de escritura de
+versiones_catalogo (triggers del schema v11) y las filas nuevas por el
+rowid máximo ya verificado; los libros sin contador (TABLAS_POR_ROWID)
+cuentan como cambiados cuando crece su rowid máximo. Las filas huérfanas por UPDATE o DELETE solo
+aparecen con foreign_keys desactivado (las claves son RESTRICT o SET NULL)
+y las detecta la verificación completa, que corre cada `dias_completa` días
+o a pedido.
+
+Autor: Sistema de Inventario
+Fecha: 2025-08-02
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from db.database import DatabaseConnection, TABLAS_CON_VERSION, TABLAS_POR_ROWID
+from services.archive_service import ArchiveService, TABLAS_ARCHIVADAS
+
+
+# Tipos de verificación registrados en verificaciones_integridad
+TIPOS_VERIFICACION = ('CLAVES_FORANEAS', 'QUICK_CHECK', 'CONCILIACION_STOCK')
+
+
+class IntegrityService:
+    """
+    Servicio de verificaciones de integridad diferidas e incrementales.
+
+    Estado guardado en estado_integridad:
+    - versiones_verificadas: contadores de versiones_catalogo al iniciar
+      la última verificación
+    - rowids_verificados: rowid máximo de cada tabla ya verificado
+    - ultimo_movimiento_conciliado: id_movimiento hasta el que se concilió
+    - ultima_verificacion_completa: fecha ISO de la última verificación completa
+    """
+
+    # Ajustes de [integrity] en config.ini (ver configurar_desde_ini)
+    habilitado = True
+    retraso_segundos = 30.0
+    dias_completa = 7
+    max_problemas = 100
+
+    # Rowids por consulta al buscar filas padre en el archivo
+    LOTE_ROWIDS = 500
+
+    def __init__(self, db_connection):
+        """
+        Inicializar servicio de integridad.
+
+        Args:
+            db_connection: Conexión a base de datos
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+        self._thread: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    @classmethod
+    def configurar_desde_ini(cls, config) -> None:
+        """
+        Configurar desde la sección [integrity] de un ConfigParser.
+
+        Claves: enabled, delay_seconds, full_check_days, max_issues. Los
+        valores inválidos se ignoran con una advertencia.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        if not config.has_section('integrity'):
+            return
+        logger = logging.getLogger(__name__)
+        try:
+            cls.habilitado = config.getboolean('integrity', 'enabled', fallback=cls.habilitado)
+            cls.retraso_segundos = max(0.0, config.getfloat('integrity', 'delay_seconds',
+                                                            fallback=cls.retraso_segundos))
+            cls.dias_completa = max(0, config.getint('integrity', 'full_check_days', fallback=cls.dias_completa))
+            cls.max_problemas = max(1, config.getint('integrity', 'max_issues', fallback=cls.max_problemas))
+        except ValueError as e:
+            logger.warning(f"[integrity] valor inválido ignorado: {e}")
+
+    # ==================== VERIFICACIÓN ====================
+
+    def ejecutar_verificacion(self, completa: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Ejecutar las verificaciones y guardar sus resultados.
+
+        Args:
+            completa: True = base completa; False = solo lo que cambió;
+                      None = completa si la última tiene más de `dias_completa` días
+
+        Returns:
+            Resumen con alcance, tablas verificadas, problemas por tipo y duración (ms)
+        """
+        conn = self.db.get_connection()
+        inicio = time.perf_counter()
+
+        if completa is None:
+            completa = self._completa_pendiente(conn)
+
+        # Contadores y último movimiento leídos antes de verificar: lo que se
+        # escriba durante la verificación se vuelve a revisar la próxima vez
+        versiones = self.db.get_catalog_versions()
+        rowids = {tabla: self._max_rowid(conn, tabla) for tabla in TABLAS_CON_VERSION + TABLAS_POR_ROWID}
+        ultimo_movimiento = rowids['movimientos']
+
+        if completa:
+            tablas = None
+            desde_rowid: Dict[str, int] = {}
+            desde_movimiento = 0
+        else:
+            desde_rowid = json.loads(self._leer_estado(conn, 'rowids_verificados') or '{}')
+            tablas = self._tablas_cambiadas(conn, versiones, desde_rowid, rowids)
+            desde_movimiento = int(self._leer_estado(conn, 'ultimo_movimiento_conciliado') or 0)
+        alcance = 'COMPLETA' if completa else 'INCREMENTAL'
+
+        resumen = {
+            'alcance': alcance,
+            'tablas': sorted(tablas) if tablas is not None else 'todas',
+            'problemas': {},
+        }
+
+        verificaciones = (
+            ('CLAVES_FORANEAS', lambda: self.verificar_claves_foraneas(conn, tablas, desde_rowid, rowids)),
+            ('QUICK_CHECK', lambda: self.verificar_paginas(conn, tablas)),
+            ('CONCILIACION_STOCK', lambda: self.conciliar_stock(conn, desde_movimiento, ultimo_movimiento)),
+        )
+        for tipo, verificar in verificaciones:
+            if self._detener.is_set():
+                resumen['interrumpida'] = True
+                return resumen
+            if tablas is not None and not tablas and tipo != 'CONCILIACION_STOCK':
+                resumen['problemas'][tipo] = 0
+                continue
+            t0 = time.perf_counter()
+            problemas = verificar()
+            self._registrar(conn, tipo, alcance, tablas, problemas, (time.perf_counter() - t0) * 1000)
+            resumen['problemas'][tipo] = len(problemas)
+
+        self._guardar_estado(conn, 'versiones_verificadas', json.dumps(versiones))
+        self._guardar_estado(conn, 'rowids_verificados', json.dumps(rowids))
+        self._guardar_estado(conn, 'ultimo_movimiento_conciliado', str(ultimo_movimiento))
+        if completa:
+            self._guardar_estado(conn, 'ultima_verificacion_completa', datetime.now().isoformat(timespec='seconds'))
+        conn.commit()
+
+        resumen['duracion_ms'] = (time.perf_counter() - inicio) * 1000
+        total = sum(resumen['problemas'].values())
+        mensaje = (f"Verificación de integridad {alcance.lower()} en {resumen['duracion_ms']:.0f} ms: "
+                   f"{resumen['problemas']}")
+        if total:
+            self.logger.warning(mensaje)
+        else:
+            self.logger.info(mensaje)
+        return resumen
+
+    def verificar_claves_foraneas(self, conn, tablas: Optional[Iterable[str]] = None,
+                                  desde_rowid: Optional[Dict[str, int]] = None,
+                                  hasta_rowid: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Buscar filas cuyas claves foráneas no tienen fila padre.
+
+        Las referencias a ventas y movimientos archivados (los tickets las
+        conservan) no cuentan como huérfanas si la fila padre está en el
+        archivo, anterior al último corte de archivo_periodos.
+
+        Args:
+            conn: Conexión SQLite
+            tablas: Tablas hijas a revisar (None = PRAGMA foreign_key_check completo)
+            desde_rowid: Por tabla, revisar solo filas con rowid mayor (filas nuevas)
+            hasta_rowid: Por tabla, rowid máximo a revisar
+
+        Returns:
+            Lista de violaciones {tabla, rowid, tabla_padre, fkid}
+        """
+        if tablas is None:
+            filas = conn.execute("PRAGMA foreign_key_check").fetchall()
+            return self._descartar_archivadas(conn, [
+                {'tabla': fila[0], 'rowid': fila[1], 'tabla_padre': fila[2], 'fkid': fila[3]}
+                for fila in filas
+            ])
+
+        desde_rowid = desde_rowid or {}
+        hasta_rowid = hasta_rowid or {}
+        violaciones = []
+        for tabla in sorted(tablas):
+            if self._detener.is_set():
+                break
+            if hasta_rowid.get(tabla, 0) is None:
+                # Tabla WITHOUT ROWID: sin marca de filas nuevas, se revisa completa
+                violaciones.extend(
+                    {'tabla': fila[0], 'rowid': fila[1], 'tabla_padre': fila[2], 'fkid': fila[3]}
+                    for fila in conn.execute(f"PRAGMA foreign_key_check({tabla})").fetchall()
+                )
+                continue
+            for fkid, (padre, columnas) in self._claves_foraneas(conn, tabla).items():
+                condiciones = ' AND '.join(f"p.{destino} = h.{origen}" for origen, destino in columnas)
+                no_nulas = ' AND '.join(f"h.{origen} IS NOT NULL" for origen, _ in columnas)
+                filas = conn.execute(f"""
+                    SELECT h.rowid FROM {tabla} h
+                    WHERE h.rowid > ? AND h.rowid <= ? AND {no_nulas}
+                      AND NOT EXISTS (SELECT 1 FROM {padre} p WHERE {condiciones})
+                """, (desde_rowid.get(tabla) or 0, hasta_rowid.get(tabla, 2 ** 63 - 1))).fetchall()
+                violaciones.extend(
+                    {'tabla': tabla, 'rowid': fila[0], 'tabla_padre': padre, 'fkid': fkid} for fila in filas
+                )
+        return self._descartar_archivadas(conn, violaciones)
+
+    def _descartar_archivadas(self, conn, violaciones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Quitar las violaciones cuya fila padre fue archivada.
+
+        ArchiveService.archivar_hasta mueve ventas y movimientos de períodos
+        cerrados a la base de archivo y los tickets siguen apuntando a ellos.
+        La fila padre se busca en la vista histórica, que solo muestra filas
+        archivadas anteriores al último corte.
+
+        Args:
+            conn: Conexión SQLite
+            violaciones: Violaciones {tabla, rowid, tabla_padre, fkid}
+
+        Returns:
+            Violaciones sin fila padre ni en la base caliente ni en el archivo
+        """
+        candidatas: Dict[Tuple[str, int], List[int]] = {}
+        for violacion in violaciones:
+            if violacion['tabla_padre'] in TABLAS_ARCHIVADAS and violacion['rowid'] is not None:
+                candidatas.setdefault((violacion['tabla'], violacion['fkid']), []).append(violacion['rowid'])
+        if not candidatas or ArchiveService.fecha_corte(conn) is None:
+            return violaciones
+        if not ArchiveService.adjuntar(conn):
+            self.logger.warning("No se pudo adjuntar el archivo: las referencias a filas archivadas "
+                                "se informan como huérfanas")
+            return violaciones
+
+        archivadas: Set[Tuple[str, int, int]] = set()
+        for (tabla, fkid), rowids in candidatas.items():
+            padre, columnas = self._claves_foraneas(conn, tabla)[fkid]
+            vista = TABLAS_ARCHIVADAS[padre][0]
+            condiciones = ' AND '.join(f"p.{destino} = h.{origen}" for origen, destino in columnas)
+            for inicio in range(0, len(rowids), self.LOTE_ROWIDS):
+                lote = rowids[inicio:inicio + self.LOTE_ROWIDS]
+                filas = conn.execute(f"""
+                    SELECT h.rowid FROM {tabla} h
+                    WHERE h.rowid IN ({', '.join('?' * len(lote))})
+                      AND EXISTS (SELECT 1 FROM {vista} p WHERE {condiciones})
+                """, lote).fetchall()
+                archivadas.update((tabla, fkid, fila[0]) for fila in filas)
+
+        return [v for v in violaciones if (v['tabla'], v['fkid'], v['rowid']) not in archivadas]
+
+    def verificar_paginas(self, conn, tablas: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Ejecutar PRAGMA quick_check (estructura de páginas e índices).
+
+        Args:
+            conn: Conexión SQLite
+            tablas: Tablas a revisar con quick_check(tabla) (None = base completa)
+
+        Returns:
+            Mensajes de error de SQLite (vacío si todo está 'ok')
+        """
+        if tablas is None:
+            consultas = [f"PRAGMA quick_check({self.max_problemas})"]
+        else:
+            consultas = [f"PRAGMA quick_check({tabla})" for tabla in sorted(tablas)]
+
+        errores = []
+        for consulta in consultas:
+            if self._detener.is_set():
+                break
+            errores.extend(fila[0] for fila in conn.execute(consulta).fetchall() if fila[0] != 'ok')
+        return errores
+
+    def conciliar_stock(self, conn, desde_movimiento: int = 0,
+                        hasta_movimiento: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Comparar el stock de cada producto con su último movimiento.
+
+        Cada movimiento guarda cantidad_nueva (stock resultante), así que el
+        stock del producto debe coincidir con el del último movimiento. Los
+        productos sin movimientos en la base caliente (nunca movidos o ya
+        archivados) no se comparan.
+
+        Args:
+            conn: Conexión SQLite
+            desde_movimiento: Solo productos con movimientos posteriores a este id
+            hasta_movimiento: Último id_movimiento a considerar (None = todos)
+
+        Returns:
+            Lista de diferencias {id_producto, nombre, stock, stock_movimientos, id_movimiento}
+        """
+        if hasta_movimiento is None:
+            hasta_movimiento = conn.execute("SELECT COALESCE(MAX(id_movimiento), 0) FROM movimientos").fetchone()[0]
+
+        filas = conn.execute("""
+            WITH productos_revisar AS (
+                SELECT DISTINCT id_producto FROM movimientos
+                WHERE id_movimiento > ? AND id_movimiento <= ?
+            ),
+            ultimo AS (
+                SELECT r.id_producto,
+                       (SELECT MAX(m.id_movimiento) FROM movimientos m
+                        WHERE m.id_producto = r.id_producto AND m.id_movimiento <= ?) AS id_movimiento
+                FROM productos_revisar r
+            )
+            SELECT p.id_producto, p.nombre, p.stock, m.cantidad_nueva, m.id_movimiento
+            FROM ultimo u
+            JOIN movimientos m ON m.id_movimiento = u.id_movimiento
+            JOIN productos p ON p.id_producto = u.id_producto
+            WHERE COALESCE(p.stock, 0) <> COALESCE(m.cantidad_nueva, 0)
+            ORDER BY p.id_producto
+        """, (desde_movimiento, hasta_movimiento, hasta_movimiento)).fetchall()
+        return [
+            {'id_producto': fila[0], 'nombre': fila[1], 'stock': fila[2],
+             'stock_movimientos': fila[3], 'id_movimiento': fila[4]}
+            for fila in filas
+        ]
+
+    # ==================== CONSULTA DE RESULTADOS ====================
+
+    def ultimas_verificaciones(self, limite: int = 20, tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtener las últimas verificaciones registradas.
+
+        Args:
+            limite: Cantidad máxima de registros
+            tipo: Filtrar por tipo (ver TIPOS_VERIFICACION)
+
+        Returns:
+            Lista de verificaciones, la más reciente primero
+        """
+        conn = self.db.get_connection()
+        consulta = ("SELECT id_verificacion, fecha, tipo, alcance, tablas, problemas, duracion_ms, detalle "
+                    "FROM verificaciones_integridad")
+        parametros: Tuple = ()
+        if tipo:
+            consulta += " WHERE tipo = ?"
+            parametros = (tipo,)
+        consulta += " ORDER BY id_verificacion DESC LIMIT ?"
+        filas = conn.execute(consulta, parametros + (limite,)).fetchall()
+        return [
+            {
+                'id_verificacion': fila[0],
+                'fecha': fila[1],
+                'tipo': fila[2],
+                'alcance': fila[3],
+                'tablas': fila[4].split(',') if fila[4] else None,
+                'problemas': fila[5],
+                'duracion_ms': fila[6],
+                'detalle': json.loads(fila[7]) if fila[7] else [],
+            }
+            for fila in filas
+        ]
+
+    def ultimo_resultado(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Obtener la última verificación de cada tipo.
+
+        Returns:
+            Diccionario tipo -> verificación (None si nunca se ejecutó)
+        """
+        return {
+            tipo: next(iter(self.ultimas_verificaciones(limite=1, tipo=tipo)), None)
+            for tipo in TIPOS_VERIFICACION
+        }
+
+    # ==================== BACKGROUND ====================
+
+    def iniciar_verificacion_en_segundo_plano(self, retraso: Optional[float] = None,
+                                              completa: Optional[bool] = None) -> Optional[threading.Thread]:
+        """
+        Ejecutar la verificación en un hilo daemon tras un retraso.
+
+        El retraso deja pasar la carga inicial de la ventana principal; el
+        hilo usa su propia conexión para no compartir transacciones con la
+        interfaz.
+
+        Args:
+            retraso: Segundos de espera (None = retraso_segundos)
+            completa: Ver ejecutar_verificacion
+
+        Returns:
+            Hilo iniciado, o None si está deshabilitado o ya hay uno en curso
+        """
+        if not self.habilitado:
+            return None
+        if self._thread is not None and self._thread.is_alive():
+            return None
+
+        self._detener.clear()
+        self._thread = threading.Thread(
+            target=self._verificacion_worker,
+            args=(self.retraso_segundos if retraso is None else retraso, completa),
+            name="IntegrityCheckWorker",
+            daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def cleanup(self) -> None:
+        """Detener la verificación en curso (la consulta activa termina)."""
+        self._detener.set()
+
+    def _verificacion_worker(self, retraso: float, completa: Optional[bool]) -> None:
+        """Ejecutar la verificación con una conexión propia."""
+        if retraso and self._detener.wait(retraso):
+            return
+        db_path = getattr(self.db, 'db_path', None)
+        worker_db = DatabaseConnection(db_path) if db_path else self.db
+        try:
+            servicio = IntegrityService(worker_db)
+            servicio._detener = self._detener
+            servicio.ejecutar_verificacion(completa)
+        except Exception as e:
+            self.logger.error(f"Error en la verificación de integridad: {e}")
+        finally:
+            if worker_db is not self.db:
+                worker_db.close()
+
+    # ==================== AUXILIARES ====================
+
+    def _tablas_cambiadas(self, conn, versiones: Dict[str, int],
+                          desde_rowid: Dict[str, int], rowids: Dict[str, Optional[int]]) -> Set[str]:
+        """Tablas cuyo contador de escrituras cambió, o libros con filas nuevas, desde la última verificación."""
+        guardadas = json.loads(self._leer_estado(conn, 'versiones_verificadas') or '{}')
+        cambiadas = {
+            tabla for tabla in TABLAS_CON_VERSION
+            if tabla in versiones and versiones[tabla] != guardadas.get(tabla)
+        }
+        cambiadas.update(
+            tabla for tabla in TABLAS_POR_ROWID
+            if rowids.get(tabla) != desde_rowid.get(tabla)
+        )
+        return cambiadas
+
+    @staticmethod
+    def _max_rowid(conn, tabla: str) -> Optional[int]:
+        """Rowid máximo de una tabla (None si es WITHOUT ROWID)."""
+        try:
+            return conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {tabla}").fetchone()[0]
+        except sqlite3.OperationalError:
+            return None
+
+    @staticmethod
+    def _claves_foraneas(conn, tabla: str) -> Dict[int, Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Claves foráneas de una tabla.
+
+        Returns:
+            Diccionario fkid -> (tabla padre, [(columna hija, columna padre)])
+        """
+        claves: Dict[int, Tuple[str, List[Tuple[str, str]]]] = {}
+        for fila in conn.execute(f"PRAGMA foreign_key_list({tabla})").fetchall():
+            fkid, padre, origen, destino = fila[0], fila[2], fila[3], fila[4]
+            claves.setdefault(fkid, (padre, []))[1].append((origen, destino or 'rowid'))
+        return claves
+
+    def _completa_pendiente(self, conn) -> bool:
+        """Indicar si corresponde una verificación completa por antigüedad."""
+        ultima = self._leer_estado(conn, 'ultima_verificacion_completa')
+        if not ultima:
+            return True
+        try:
+            return datetime.now() - datetime.fromisoformat(ultima) >= timedelta(days=self.dias_completa)
+        except ValueError:
+            return True
+
+    def _registrar(self, conn, tipo: str, alcance: str, tablas: Optional[Set[str]],
+                   problemas: List[Any], duracion_ms: float) -> None:
+        """Guardar el resultado de una verificación (detalle acotado a max_problemas)."""
+        conn.execute("""
+            INSERT INTO verificaciones_integridad (tipo, alcance, tablas, problemas, duracion_ms, detalle)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            tipo,
+            alcance,
+            ','.join(sorted(tablas)) if tablas is not None else None,
+            len(problemas),
+            round(duracion_ms, 2),
+            json.dumps(problemas[:self.max_problemas], ensure_ascii=False, default=str) if problemas else None,
+        ))
+
+    @staticmethod
+    def _leer_estado(conn, clave: str) -> Optional[str]:
+        row = conn.execute("SELECT valor FROM estado_integridad WHERE clave = ?", (clave,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _guardar_estado(conn, clave: str, valor: str) -> None:
+        conn.execute("INSERT OR REPLACE INTO estado_integridad (clave, valor) VALUES (?, ?)", (clave, valor))
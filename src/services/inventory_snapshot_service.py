@@ -0,0 +1,337 @@
+"""
+Servicio de cierres de inventario.
+Guarda el stock y la valorización de cada producto a una fecha de corte y
+responde consultas históricas sin recorrer todo el historial.
+
+Este servicio maneja:
+- Cierres (snapshots) por fecha de corte, p.ej. fin de cada mes
+- Stock a una fecha cualquiera: cierre más cercano + delta de movimientos
+- Creación automática de cierres mensuales en un hilo en background
+
+El costo de una consulta histórica queda acotado por los movimientos entre
+la fecha pedida y el cierre más cercano (a lo sumo un período).
+
+Delta de un movimiento: cantidad_nueva - cantidad_anterior cuando ambos
+valores fueron registrados; en filas antiguas que no los tienen se usa la
+cantidad con signo según el tipo (VENTA resta, ENTRADA y AJUSTE suman).
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-25
+"""
+
+import json
+import logging
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.database import DatabaseConnection
+from services.archive_service import ArchiveService
+
+
+# Variación de stock de un movimiento (ver docstring del módulo)
+_DELTA_MOVIMIENTO = """
+    CASE
+        WHEN cantidad_nueva <> cantidad_anterior THEN cantidad_nueva - cantidad_anterior
+        WHEN tipo_movimiento = 'VENTA' THEN -ABS(cantidad)
+        ELSE cantidad
+    END
+"""
+
+
+class InventorySnapshotService:
+    """
+    Servicio de cierres de inventario y stock a fecha de corte.
+
+    Un cierre con fecha_corte D representa el stock al final del día D
+    (movimientos con fecha_movimiento < D + 1 día). Solo se crean cierres
+    de días ya terminados.
+    """
+
+    MESES_CIERRE_INICIAL = 12
+
+    def __init__(self, db_connection):
+        """
+        Inicializar servicio de cierres.
+
+        Args:
+            db_connection: Conexión a base de datos
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== CONSULTA HISTÓRICA ====================
+
+    def calcular_stock_a_fecha(self, fecha_corte: date) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Calcular el stock de cada producto MATERIAL al final de fecha_corte.
+
+        Args:
+            fecha_corte: Fecha de corte
+
+        Returns:
+            Tupla (productos, origen):
+            - productos: id_producto -> {'stock', 'costo'} para productos
+              creados hasta fecha_corte
+            - origen: {'cierre': fecha del cierre usado o None,
+              'movimientos_aplicados': filas de movimientos leídas}
+        """
+        conn = self.db.get_connection()
+        fin_corte = (fecha_corte + timedelta(days=1)).isoformat()
+
+        productos = {
+            row['id_producto']: {'stock': row['stock'] or 0, 'costo': row['costo'] or 0}
+            for row in conn.execute("""
+                SELECT p.id_producto, p.stock, p.costo
+                FROM productos p
+                JOIN categorias c ON c.id_categoria = p.id_categoria
+                WHERE c.tipo = 'MATERIAL'
+                AND (p.fecha_creacion IS NULL OR p.fecha_creacion < ?)
+            """, (fin_corte,))
+        }
+
+        cierre = self._cierre_mas_cercano(fecha_corte)
+        origen = {'cierre': None, 'movimientos_aplicados': 0}
+        sin_cierre = set(productos)
+
+        if cierre is not None:
+            fecha_cierre = date.fromisoformat(cierre['fecha_corte'])
+            origen['cierre'] = cierre['fecha_corte']
+
+            for row in conn.execute(
+                "SELECT id_producto, stock, costo FROM inventario_snapshot WHERE id_cierre = ?",
+                (cierre['id_cierre'],)
+            ):
+                producto = productos.get(row['id_producto'])
+                if producto is not None:
+                    producto['stock'] = row['stock']
+                    producto['costo'] = row['costo'] or 0
+                    sin_cierre.discard(row['id_producto'])
+
+            # Aplicar solo los movimientos entre el cierre y la fecha de corte
+            if fecha_cierre < fecha_corte:
+                desde, hasta, signo = (fecha_cierre + timedelta(days=1)).isoformat(), fin_corte, 1
+            else:
+                desde, hasta, signo = fin_corte, (fecha_cierre + timedelta(days=1)).isoformat(), -1
+
+            if desde != hasta:
+                deltas, filas = self._deltas_movimientos(desde, hasta)
+                origen['movimientos_aplicados'] += filas
+                for id_producto, delta in deltas.items():
+                    if id_producto in productos and id_producto not in sin_cierre:
+                        productos[id_producto]['stock'] += signo * delta
+
+        # Productos sin cierre: stock actual menos lo movido después del corte
+        if sin_cierre:
+            deltas, filas = self._deltas_movimientos(fin_corte, None, sin_cierre)
+            origen['movimientos_aplicados'] += filas
+            for id_producto, delta in deltas.items():
+                productos[id_producto]['stock'] -= delta
+
+        return productos, origen
+
+    def _cierre_mas_cercano(self, fecha_corte: date) -> Optional[Dict[str, Any]]:
+        """Obtener el cierre con fecha más próxima a fecha_corte (anterior en empate)."""
+        row = self.db.get_connection().execute("""
+            SELECT id_cierre, fecha_corte
+            FROM inventario_cierres
+            ORDER BY ABS(julianday(fecha_corte) - julianday(?)), fecha_corte
+            LIMIT 1
+        """, (fecha_corte.isoformat(),)).fetchone()
+        return dict(row) if row else None
+
+    def _deltas_movimientos(self, desde: str, hasta: Optional[str],
+                            ids_producto: Optional[set] = None) -> Tuple[Dict[int, int], int]:
+        """
+        Sumar la variación de stock por producto en un rango de fechas.
+
+        Args:
+            desde: Fecha/hora inicial incluida (ISO)
+            hasta: Fecha/hora final excluida (ISO) o None sin límite
+            ids_producto: Limitar a estos productos (opcional)
+
+        Returns:
+            Tupla (id_producto -> delta, filas de movimientos leídas)
+        """
+        conn = self.db.get_connection()
+        movimientos = ArchiveService.tabla_para_rango(conn, 'movimientos', date.fromisoformat(desde[:10]))
+        
+        query = f"""
+            SELECT id_producto, SUM({_DELTA_MOVIMIENTO}) AS delta, COUNT(*) AS filas
+            FROM {movimientos}
+            WHERE fecha_movimiento >= ?
+        """
+        params: List[Any] = [desde]
+        if hasta is not None:
+            query += " AND fecha_movimiento < ?"
+            params.append(hasta)
+        if ids_producto is not None:
+            query += " AND id_producto IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(sorted(ids_producto)))
+        query += " GROUP BY id_producto"
+
+        deltas, filas = {}, 0
+        for row in conn.execute(query, params):
+            deltas[row['id_producto']] = row['delta'] or 0
+            filas += row['filas']
+        return deltas, filas
+
+    # ==================== CIERRES ====================
+
+    def crear_cierre(self, fecha_corte: date, responsable: str = 'sistema',
+                     reemplazar: bool = False) -> Dict[str, Any]:
+        """
+        Crear el cierre de inventario de una fecha.
+
+        El stock se calcula a partir del cierre más cercano existente, por lo
+        que cada nuevo cierre solo lee un período de movimientos.
+
+        Args:
+            fecha_corte: Fecha de corte (debe ser anterior a hoy)
+            responsable: Usuario o proceso que crea el cierre
+            reemplazar: Recalcular si ya existe un cierre para esa fecha
+
+        Returns:
+            Dict con fecha_corte, total_productos, total_unidades y valor_total
+
+        Raises:
+            ValueError: Si la fecha no es un día terminado o el cierre existe
+        """
+        if fecha_corte >= date.today():
+            raise ValueError("Solo se pueden cerrar días terminados (fecha anterior a hoy)")
+
+        conn = self.db.get_connection()
+        existente = conn.execute(
+            "SELECT id_cierre FROM inventario_cierres WHERE fecha_corte = ?",
+            (fecha_corte.isoformat(),)
+        ).fetchone()
+        if existente and not reemplazar:
+            raise ValueError(f"Ya existe un cierre para {fecha_corte.isoformat()}")
+
+        try:
+            if existente:
+                # Calcular sin el cierre anterior de la misma fecha
+                conn.execute("DELETE FROM inventario_snapshot WHERE id_cierre = ?", (existente['id_cierre'],))
+                conn.execute("DELETE FROM inventario_cierres WHERE id_cierre = ?", (existente['id_cierre'],))
+
+            productos, origen = self.calcular_stock_a_fecha(fecha_corte)
+
+            filas = []
+            total_unidades = 0
+            valor_total = Decimal('0')
+            for id_producto, datos in productos.items():
+                valor = (Decimal(str(datos['costo'])) * datos['stock']).quantize(Decimal('0.01'))
+                filas.append((id_producto, datos['stock'], float(datos['costo']), float(valor)))
+                total_unidades += datos['stock']
+                valor_total += valor
+
+            cursor = conn.execute("""
+                INSERT INTO inventario_cierres (
+                    fecha_corte, total_productos, total_unidades, valor_total, responsable
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (fecha_corte.isoformat(), len(filas), total_unidades, float(valor_total), responsable))
+            id_cierre = cursor.lastrowid
+
+            conn.executemany(
+                "INSERT INTO inventario_snapshot (id_cierre, id_producto, stock, costo, valor) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(id_cierre,) + fila for fila in filas]
+            )
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        self.logger.info(
+            f"Cierre de inventario {fecha_corte.isoformat()}: {len(filas)} productos, "
+            f"valor {valor_total} (base: {origen['cierre'] or 'stock actual'}, "
+            f"{origen['movimientos_aplicados']} movimientos)"
+        )
+        return {
+            'id_cierre': id_cierre,
+            'fecha_corte': fecha_corte.isoformat(),
+            'total_productos': len(filas),
+            'total_unidades': total_unidades,
+            'valor_total': float(valor_total)
+        }
+
+    def listar_cierres(self) -> List[Dict[str, Any]]:
+        """
+        Listar cierres existentes.
+
+        Returns:
+            Lista de cierres ordenada por fecha_corte descendente
+        """
+        rows = self.db.get_connection().execute("""
+            SELECT id_cierre, fecha_corte, total_productos, total_unidades,
+                   valor_total, responsable, fecha_creacion
+            FROM inventario_cierres
+            ORDER BY fecha_corte DESC
+        """).fetchall()
+        return [dict(row) for row in rows]
+
+    def asegurar_cierres_mensuales(self, hasta: Optional[date] = None,
+                                   meses: Optional[int] = None) -> List[str]:
+        """
+        Crear los cierres de fin de mes que falten.
+
+        Sin cierres previos se crean los últimos MESES_CIERRE_INICIAL meses,
+        del más reciente al más antiguo, de modo que cada uno se calcula
+        desde el anterior con un mes de movimientos.
+
+        Args:
+            hasta: Fecha de referencia (por defecto hoy)
+            meses: Meses hacia atrás a revisar
+
+        Returns:
+            Fechas de los cierres creados
+        """
+        hasta = hasta or date.today()
+        meses = meses or self.MESES_CIERRE_INICIAL
+
+        existentes = {c['fecha_corte'] for c in self.listar_cierres()}
+        fin_mes = hasta.replace(day=1) - timedelta(days=1)
+
+        creados = []
+        for _ in range(meses):
+            if fin_mes.isoformat() not in existentes:
+                self.crear_cierre(fin_mes, responsable='sistema')
+                creados.append(fin_mes.isoformat())
+            fin_mes = fin_mes.replace(day=1) - timedelta(days=1)
+
+        return creados
+
+    def iniciar_cierres_automaticos(self) -> None:
+        """
+        Crear en background los cierres mensuales pendientes.
+
+        El hilo usa su propia conexión para no compartir transacciones con
+        la interfaz.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(
+            target=self._cierres_worker,
+            name="InventorySnapshotWorker",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _cierres_worker(self) -> None:
+        """Crear cierres pendientes con una conexión propia."""
+        db_path = getattr(self.db, 'db_path', None)
+        # Los cierres se pueden recalcular desde movimientos: perfil de carga masiva
+        worker_db = DatabaseConnection(db_path, profile='bulk-load') if db_path else self.db
+        try:
+            creados = InventorySnapshotService(worker_db).asegurar_cierres_mensuales()
+            if creados:
+                self.logger.info(f"Cierres mensuales creados: {', '.join(creados)}")
+        except Exception as e:
+            self.logger.error(f"Error creando cierres mensuales: {e}")
+        finally:
+            if worker_db is not self.db:
+                worker_db.close()
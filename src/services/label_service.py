@@ -22,8 +22,6 @@ import json
 import threading
 from pathlib import Path
 
-from networkx import draw
-
 # Importaciones de librerías externas
 try:
     import barcode
@@ -14,10 +14,15 @@ TDD COMPATIBLE:
 - Validaciones explícitas
 """
 
+import json
+import logging
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+from db.change_notifier import change_notifier
 from models.movimiento import Movimiento
+from services.archive_service import ArchiveService
+from services.cost_service import CostService
 
 
 class MovementService:
@@ -32,14 +37,17 @@ class MovementService:
     - Reportes de movimientos
     """
     
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, cost_service: Optional[CostService] = None):
         """
         Inicializar servicio con conexión a base de datos.
         
         Args:
             db_connection: Conexión a base de datos
+            cost_service: Servicio de costeo (opcional, se crea uno si no se pasa)
         """
         self.db = db_connection
+        self.cost_service = cost_service or CostService(db_connection)
+        self.logger = logging.getLogger(__name__)
     
     def create_movement(self, **kwargs) -> Movimiento:
         """
@@ -110,10 +118,23 @@ class MovementService:
         # Convertir costo_unitario si es necesario
         costo_unitario_float = float(costo_unitario) if costo_unitario else None
         
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
         try:
-            connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
             cursor = connection.cursor()
             
+            # Costeo antes del INSERT: el costo se guarda en la misma sentencia.
+            # Las salidas consumen capas; entradas y ajustes positivos toman
+            # el costo que tendrá su capa (se crea después, con el ID del movimiento)
+            if tipo_movimiento == 'VENTA' or cantidad_stock < 0:
+                costo_registrado, _ = self.cost_service.registrar_salida(id_producto, -cantidad_stock)
+            else:
+                costo_entrada = costo_unitario if tipo_movimiento == 'ENTRADA' else None
+                costo_registrado = self.cost_service.costear_entradas(
+                    [(id_producto, cantidad_stock, costo_entrada)]
+                )[0]
+            if costo_unitario_float is None:
+                costo_unitario_float = float(costo_registrado)
+            
             # Insertar movimiento
             cursor.execute("""
                 INSERT INTO movimientos (
@@ -135,6 +156,12 @@ class MovementService:
             
             id_movimiento = cursor.lastrowid
             
+            # Capa nueva en entradas/ajustes positivos (las salidas ya se costearon)
+            if tipo_movimiento == 'ENTRADA':
+                self.cost_service.registrar_entrada(id_producto, cantidad, costo_registrado, id_movimiento)
+            elif tipo_movimiento == 'AJUSTE' and cantidad_stock > 0:
+                self.cost_service.registrar_ajuste(id_producto, cantidad, id_movimiento)
+            
             # Actualizar stock en tabla productos
             cursor.execute("""
                 UPDATE productos 
@@ -143,8 +170,12 @@ class MovementService:
             """, (stock_nuevo, id_producto))
             
             connection.commit()
+            change_notifier.publicar_productos(connection, [id_producto])
             
-            print(f"✅ Movimiento creado: ID {id_movimiento}, Producto {id_producto}, {tipo_movimiento}, Stock: {stock_anterior} -> {stock_nuevo}")
+            self.logger.debug(
+                "Movimiento creado: ID %s, Producto %s, %s, Stock: %s -> %s",
+                id_movimiento, id_producto, tipo_movimiento, stock_anterior, stock_nuevo
+            )
             
             # Crear objeto Movimiento
             movimiento = Movimiento(
@@ -161,7 +192,8 @@ class MovementService:
             return movimiento
             
         except Exception as e:
-            print(f"❌ Error creando movimiento: {e}")
+            connection.rollback()
+            self.logger.error(f"Error creando movimiento: {e}")
             raise e
     
     def get_movement_by_id(self, id_movimiento: int) -> Optional[dict]:
@@ -549,89 +581,171 @@ class MovementService:
             # Para tests unitarios: retornar stock simulado
             return 10
     
-    def get_movements_by_filters(self, filters: Dict[str, Any]) -> List[dict]:
+    # Tamaño de página por defecto del historial paginado
+    PAGE_SIZE = 200
+    
+    def get_movements_by_filters(self, filters: Dict[str, Any], limit: Optional[int] = None) -> List[dict]:
         """
         Obtener movimientos aplicando filtros específicos.
         
+        Recorre todas las páginas de get_movements_page (sin tope fijo);
+        para mostrar resultados en pantalla use get_movements_page.
+        
         Args:
-            filters: Diccionario de filtros
-                - start_date: datetime (opcional)
-                - end_date: datetime (opcional)
-                - transaction_type: str (opcional)
-                - product_id: int (opcional)
-                - responsible: str (opcional)
+            filters: Diccionario de filtros (ver get_movements_page)
+            limit: Máximo de movimientos a devolver (opcional)
                 
         Returns:
-            Lista de movimientos que cumplen los filtros
+            Lista de movimientos que cumplen los filtros, más recientes primero
         """
         try:
-            connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
-            cursor = connection.cursor()
-            
-            # Construir query base
-            query = """
-                SELECT m.id_movimiento, m.id_producto, p.nombre as producto_nombre,
-                       m.tipo_movimiento, m.cantidad, m.cantidad_anterior, m.cantidad_nueva,
-                       m.fecha_movimiento, m.responsable, m.id_venta, m.observaciones,
-                       m.costo_unitario
-                FROM movimientos m
-                INNER JOIN productos p ON m.id_producto = p.id_producto
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            # Aplicar filtros
-            if filters.get('start_date'):
-                query += " AND DATE(m.fecha_movimiento) >= ?"
-                params.append(filters['start_date'].date().isoformat())
-            
-            if filters.get('end_date'):
-                query += " AND DATE(m.fecha_movimiento) <= ?"
-                params.append(filters['end_date'].date().isoformat())
-            
-            if filters.get('transaction_type'):
-                query += " AND m.tipo_movimiento = ?"
-                params.append(filters['transaction_type'])
-            
-            if filters.get('product_id'):
-                query += " AND m.id_producto = ?"
-                params.append(filters['product_id'])
-            
-            if filters.get('responsible'):
-                query += " AND m.responsable LIKE ?"
-                params.append(f"%{filters['responsible']}%")
-            
-            query += " ORDER BY m.fecha_movimiento DESC LIMIT 500"
-            
-            cursor.execute(query, params)
-            
             movements = []
-            for row in cursor.fetchall():
-                if hasattr(row, 'keys'):
-                    movements.append(dict(row))
-                else:
-                    movements.append({
-                        'id_movimiento': row[0],
-                        'id_producto': row[1],
-                        'producto_nombre': row[2],
-                        'tipo_movimiento': row[3],
-                        'cantidad': row[4],
-                        'cantidad_anterior': row[5],
-                        'cantidad_nueva': row[6],
-                        'fecha_movimiento': row[7],
-                        'responsable': row[8],
-                        'id_venta': row[9],
-                        'observaciones': row[10],
-                        'costo_unitario': Decimal(str(row[11])) if row[11] else None
-                    })
-            
+            cursor = None
+            while limit is None or len(movements) < limit:
+                page_size = self.PAGE_SIZE if limit is None else min(self.PAGE_SIZE * 5, limit - len(movements))
+                page = self.get_movements_page(filters, page_size=page_size, cursor=cursor)
+                movements.extend(page['movements'])
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
             return movements
             
         except Exception as e:
-            print(f"❌ Error en get_movements_by_filters: {e}")
+            self.logger.error(f"Error en get_movements_by_filters: {e}")
             return []
     
+    def get_movements_page(self, filters: Dict[str, Any], page_size: Optional[int] = None,
+                           cursor: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
+        """
+        Obtener una página de movimientos ordenada por fecha descendente.
+        
+        Paginación por clave (fecha_movimiento, id_movimiento): cada página
+        continúa después del último movimiento de la anterior con una
+        búsqueda en índice, sin OFFSET, por lo que el costo no crece con el
+        número de página.
+        
+        Args:
+            filters: Diccionario de filtros
+                - start_date: datetime (opcional)
+                - end_date: datetime (opcional, incluido)
+                - transaction_type: str (opcional)
+                - product_id: int (opcional)
+                - responsible: str (opcional, coincidencia exacta sin
+                  distinguir mayúsculas ni espacios extremos)
+            page_size: Movimientos por página (por defecto PAGE_SIZE)
+            cursor: next_cursor de la página anterior (None = primera página)
+                
+        Returns:
+            Dict con 'movements' (lista de dicts) y 'next_cursor'
+            (None si no hay más páginas)
+        """
+        page_size = page_size or self.PAGE_SIZE
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+        tabla, where, params = self._build_movement_filters(connection, filters)
+        
+        if cursor is not None:
+            where += " AND (m.fecha_movimiento, m.id_movimiento) < (?, ?)"
+            params += [cursor[0], cursor[1]]
+        
+        rows = connection.execute(f"""
+            SELECT m.id_movimiento, m.id_producto, p.nombre as producto_nombre,
+                   m.tipo_movimiento, m.cantidad, m.cantidad_anterior, m.cantidad_nueva,
+                   m.fecha_movimiento, m.responsable, m.id_venta, m.observaciones,
+                   m.costo_unitario
+            FROM {tabla} m
+            INNER JOIN productos p ON m.id_producto = p.id_producto
+            WHERE {where}
+            ORDER BY m.fecha_movimiento DESC, m.id_movimiento DESC
+            LIMIT ?
+        """, params + [page_size + 1]).fetchall()
+        
+        columnas = ('id_movimiento', 'id_producto', 'producto_nombre', 'tipo_movimiento', 'cantidad',
+                    'cantidad_anterior', 'cantidad_nueva', 'fecha_movimiento', 'responsable',
+                    'id_venta', 'observaciones', 'costo_unitario')
+        movements = [dict(zip(columnas, row)) for row in rows[:page_size]]
+        
+        next_cursor = None
+        if len(rows) > page_size:
+            ultimo = movements[-1]
+            next_cursor = (ultimo['fecha_movimiento'], ultimo['id_movimiento'])
+        
+        return {'movements': movements, 'next_cursor': next_cursor}
+    
+    def count_movements(self, filters: Dict[str, Any]) -> int:
+        """
+        Contar los movimientos que cumplen los filtros.
+        
+        Siempre es un conteo exacto: con solo rango de fechas se resuelve
+        dentro de idx_movimientos_fecha y con tipo, producto o responsable
+        dentro de su índice. No se estima con el rango de IDs porque los
+        movimientos traídos por sincronización tienen IDs nuevos con fechas
+        antiguas y el archivado deja huecos.
+        
+        Args:
+            filters: Diccionario de filtros (ver get_movements_page)
+            
+        Returns:
+            Cantidad de movimientos
+        """
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+        tabla, where, params = self._build_movement_filters(connection, filters)
+        return connection.execute(f"SELECT COUNT(*) FROM {tabla} m WHERE {where}", params).fetchone()[0]
+    
+    def get_responsables(self) -> List[str]:
+        """
+        Obtener los responsables distintos registrados en movimientos.
+        
+        Returns:
+            Lista ordenada de responsables (recorre idx_movimientos_responsable)
+        """
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+        rows = connection.execute("""
+            SELECT DISTINCT responsable COLLATE NOCASE
+            FROM movimientos
+            WHERE responsable IS NOT NULL
+            ORDER BY 1
+        """).fetchall()
+        return [row[0] for row in rows]
+    
+    def _build_movement_filters(self, connection, filters: Dict[str, Any]) -> Tuple[str, str, List[Any]]:
+        """
+        Construir tabla, condición WHERE y parámetros de los filtros de historial.
+        
+        Las fechas se comparan como rango sobre fecha_movimiento (sin DATE())
+        para que SQLite use los índices.
+        
+        Returns:
+            Tupla (tabla o vista histórica, condición, parámetros)
+        """
+        where = "1=1"
+        params: List[Any] = []
+        
+        # Incluir movimientos archivados si el rango está abierto o empieza antes del corte
+        inicio = filters['start_date'].date() if filters.get('start_date') else None
+        tabla = ArchiveService.tabla_para_rango(connection, 'movimientos', inicio)
+        
+        if inicio is not None:
+            where += " AND m.fecha_movimiento >= ?"
+            params.append(inicio.isoformat())
+        
+        if filters.get('end_date'):
+            where += " AND m.fecha_movimiento < ?"
+            params.append((filters['end_date'].date() + timedelta(days=1)).isoformat())
+        
+        if filters.get('transaction_type'):
+            where += " AND m.tipo_movimiento = ?"
+            params.append(filters['transaction_type'])
+        
+        if filters.get('product_id'):
+            where += " AND m.id_producto = ?"
+            params.append(filters['product_id'])
+        
+        if filters.get('responsible'):
+            where += " AND m.responsable = ? COLLATE NOCASE"
+            params.append(str(filters['responsible']).strip())
+        
+        return tabla, where, params
+    
     def get_movement_by_ticket(self, ticket_number: str) -> Optional[dict]:
         """
         Buscar movimiento por número de ticket (ID de venta).
@@ -683,7 +797,7 @@ class MovementService:
                 return None
                 
         except Exception as e:
-            print(f"❌ Error buscando por ticket {ticket_number}: {e}")
+            self.logger.error(f"Error buscando por ticket {ticket_number}: {e}")
             return None
     
     def get_productos_bajo_stock(self) -> List[dict]:
@@ -756,6 +870,8 @@ class MovementService:
                 raise ValueError("ID de responsable es obligatorio")
             
             # VALIDACIÓN CRÍTICA: Verificar que todos los productos sean MATERIALES
+            # (una sola consulta para todo el lote)
+            catalogo = self.get_products_info([p.get('id') for p in movement_data['productos']])
             productos_validados = []
             
             for producto_data in movement_data['productos']:
@@ -763,12 +879,11 @@ class MovementService:
                 cantidad = producto_data.get('cantidad', 0)
                 
                 # Validar existencia del producto y obtener categoría
-                if not self._product_exists(id_producto):
+                info = catalogo.get(id_producto)
+                if info is None:
                     raise ValueError(f"Producto con ID {id_producto} no existe")
                 
-                # Obtener categoría del producto para validar tipo
-                categoria = self._get_product_category(id_producto)
-                if categoria and categoria.get('tipo') == 'SERVICIO':
+                if info['categoria_tipo'] == 'SERVICIO':
                     producto_nombre = producto_data.get('nombre', f'ID {id_producto}')
                     raise ValueError(f"No se puede agregar '{producto_nombre}' al inventario: es un SERVICIO. Solo productos MATERIALES pueden tener inventario.")
                 
@@ -778,21 +893,17 @@ class MovementService:
                 productos_validados.append({
                     'id_producto': id_producto,
                     'cantidad': cantidad,
-                    'categoria_tipo': categoria.get('tipo') if categoria else 'UNKNOWN'
+                    'costo_unitario': producto_data.get('costo_unitario'),
+                    'categoria_tipo': info['categoria_tipo'] or 'UNKNOWN'
                 })
             
-            # Crear movimientos individuales para cada producto
-            movimientos_creados = []
+            # Crear todos los movimientos en una sola transacción
             responsable_username = f"user_{responsable_id}"  # Convertir ID a username
-            
-            for producto in productos_validados:
-                movimiento = self.create_entrada_inventario(
-                    id_producto=producto['id_producto'],
-                    cantidad=producto['cantidad'],
-                    responsable=responsable_username,
-                    observaciones=f"Entrada masiva desde formulario - {len(productos_validados)} productos"
-                )
-                movimientos_creados.append(movimiento)
+            movimientos_creados = self.create_bulk_entry_movements(
+                productos_validados,
+                responsable=responsable_username,
+                observaciones=f"Entrada masiva desde formulario - {len(productos_validados)} productos"
+            )
             
             # Generar número de ticket
             primer_movimiento = movimientos_creados[0]
@@ -813,9 +924,163 @@ class MovementService:
             }
             
         except Exception as e:
-            print(f"❌ Error en create_entry_movement: {e}")
+            self.logger.error(f"Error en create_entry_movement: {e}")
             raise ValueError(f"Error al crear entrada: {e}")
     
+    def get_products_info(self, ids_producto: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Obtener nombre, stock, estado y tipo de categoría de varios productos.
+        
+        Usa una sola consulta por lote (json_each) en lugar de una por producto.
+        
+        Args:
+            ids_producto: IDs de productos (se ignoran valores no enteros)
+            
+        Returns:
+            Dict id_producto -> {'nombre', 'stock', 'activo', 'categoria_tipo'}
+        """
+        ids = sorted({i for i in ids_producto if isinstance(i, int)})
+        if not ids:
+            return {}
+        
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+        cursor = connection.execute("""
+            SELECT p.id_producto, p.nombre, p.stock, p.activo, c.tipo AS categoria_tipo
+            FROM productos p
+            LEFT JOIN categorias c ON c.id_categoria = p.id_categoria
+            WHERE p.id_producto IN (SELECT value FROM json_each(?))
+        """, (json.dumps(ids),))
+        
+        return {
+            row[0]: {
+                'nombre': row[1],
+                'stock': row[2] or 0,
+                'activo': bool(row[3]),
+                'categoria_tipo': row[4]
+            }
+            for row in cursor.fetchall()
+        }
+    
+    def create_bulk_entry_movements(self, lineas: List[Dict[str, Any]], responsable: str,
+                                    observaciones: Optional[str] = None) -> List[Movimiento]:
+        """
+        Registrar muchas entradas de inventario en una sola transacción.
+        
+        El stock se lee una vez por lote, los movimientos se insertan con
+        executemany y cada producto se actualiza una sola vez con su stock
+        final. Si algo falla no se registra ninguna línea.
+        
+        Args:
+            lineas: Lista de dicts con id_producto, cantidad y costo_unitario (opcional)
+            responsable: Usuario responsable
+            observaciones: Observaciones comunes a todas las líneas
+            
+        Returns:
+            Lista de Movimiento creados, en el orden de las líneas
+            
+        Raises:
+            ValueError: Si no hay líneas, una cantidad no es positiva o un producto no existe
+        """
+        if not lineas:
+            raise ValueError("No se proporcionaron líneas para la entrada")
+        if not responsable or not responsable.strip():
+            raise ValueError("El responsable es obligatorio")
+        
+        for linea in lineas:
+            if not isinstance(linea.get('cantidad'), int) or linea['cantidad'] <= 0:
+                raise ValueError(f"Cantidad debe ser positiva para producto {linea.get('id_producto')}")
+        
+        connection = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
+        propia = not connection.in_transaction
+        if propia:
+            # Bloqueo de escritura desde el inicio: el stock leído no cambia hasta el COMMIT
+            connection.execute("BEGIN IMMEDIATE")
+        
+        try:
+            ids = sorted({linea['id_producto'] for linea in lineas})
+            stocks = {
+                row[0]: row[1] or 0
+                for row in connection.execute(
+                    "SELECT id_producto, stock FROM productos "
+                    "WHERE id_producto IN (SELECT value FROM json_each(?))",
+                    (json.dumps(ids),)
+                )
+            }
+            faltantes = [i for i in ids if i not in stocks]
+            if faltantes:
+                raise ValueError(f"No existen los productos con ID {faltantes[:10]}")
+            
+            ultimo_id = connection.execute(
+                "SELECT COALESCE(MAX(id_movimiento), 0) FROM movimientos"
+            ).fetchone()[0]
+            
+            # Costo de cada línea antes del INSERT (se guarda en la misma sentencia)
+            costos = self.cost_service.costear_entradas(
+                (linea['id_producto'], linea['cantidad'], linea.get('costo_unitario')) for linea in lineas
+            )
+            
+            filas = []
+            for linea, costo_linea in zip(lineas, costos):
+                id_producto = linea['id_producto']
+                anterior = stocks[id_producto]
+                nuevo = anterior + linea['cantidad']
+                stocks[id_producto] = nuevo
+                costo = linea.get('costo_unitario')
+                filas.append((
+                    id_producto, linea['cantidad'], anterior, nuevo, responsable,
+                    observaciones, float(costo) if costo is not None else float(costo_linea)
+                ))
+            
+            connection.executemany("""
+                INSERT INTO movimientos (
+                    id_producto, tipo_movimiento, cantidad, cantidad_anterior,
+                    cantidad_nueva, responsable, observaciones, costo_unitario, fecha_movimiento
+                ) VALUES (?, 'ENTRADA', ?, ?, ?, ?, ?, ?, datetime('now'))
+            """, filas)
+            
+            connection.executemany("""
+                UPDATE productos
+                SET stock = ?, fecha_modificacion = datetime('now')
+                WHERE id_producto = ?
+            """, [(stock, id_producto) for id_producto, stock in stocks.items()])
+            
+            # Bajo el bloqueo de escritura los IDs nuevos son los mayores a ultimo_id
+            ids_movimiento = [
+                row[0] for row in connection.execute(
+                    "SELECT id_movimiento FROM movimientos WHERE id_movimiento > ? ORDER BY id_movimiento",
+                    (ultimo_id,)
+                )
+            ]
+            
+            # Capas de costo y costo promedio de todo el lote (con los costos ya calculados)
+            self.cost_service.registrar_entradas(
+                (fila[0], fila[1], costo, id_movimiento)
+                for id_movimiento, fila, costo in zip(ids_movimiento, filas, costos)
+            )
+            
+            if propia:
+                connection.commit()
+                change_notifier.publicar_productos(connection, stocks)
+                
+        except Exception:
+            if propia:
+                connection.rollback()
+            raise
+        
+        fecha = datetime.now()
+        return [
+            Movimiento(
+                id_movimiento=id_movimiento,
+                id_producto=fila[0],
+                tipo_movimiento='ENTRADA',
+                cantidad=fila[1],
+                responsable=responsable,
+                fecha_movimiento=fecha,
+                observaciones=observaciones
+            )
+            for id_movimiento, fila in zip(ids_movimiento, filas)
+        ]
+    
     def _get_product_category(self, id_producto: int) -> Optional[Dict[str, Any]]:
         """
         Obtener categoría de un producto para validaciones.
@@ -852,7 +1117,7 @@ class MovementService:
                 return None
                 
         except Exception as e:
-            print(f"❌ Error obteniendo categoría de producto {id_producto}: {e}")
+            self.logger.error(f"Error obteniendo categoría de producto {id_producto}: {e}")
             # Para tests: Simular categorías conocidas
             if id_producto in [1, 2, 3, 4, 5]:
                 return {'id_categoria': 1, 'nombre': 'Test Material', 'tipo': 'MATERIAL'}
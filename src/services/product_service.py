@@ -29,14 +29,16 @@ Versión: FASE 3
 """
 
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
 
+from db.change_notifier import change_notifier
 from db.database import DatabaseConnection
 from helpers.database_helper import DatabaseHelper
 from helpers.validation_helper import ValidationHelper  
 from helpers.logging_helper import LoggingHelper
+from models.filas import COLUMNAS_PRODUCTO_LISTADO, ProductoFila, tipo_fila
 from models.producto import Producto
 
 
@@ -60,6 +62,9 @@ class ProductService:
         from services.category_service import CategoryService
         self.category_service = CategoryService(db_connection)
         
+        from services.cost_service import CostService
+        self.cost_service = CostService(db_connection)
+        
         self.logger.info("ProductService inicializado con patrón FASE 3")
         
     def create_product(self, **kwargs):
@@ -169,6 +174,11 @@ class ProductService:
             if not id_producto_real:
                 raise ValueError("Error al crear producto en base de datos")
             
+            # Stock inicial como capa de apertura del costeo
+            self.cost_service.registrar_apertura(id_producto_real, stock_inicial, precio_compra_float)
+            self.db.get_connection().commit()
+            change_notifier.publicar_productos(self.db, [id_producto_real])
+            
             # Logging de operación exitosa
             operation_time = time.time() - start_time
             self.logger.info(f"Producto creado exitosamente: {nombre} (ID: {id_producto_real})")
@@ -273,59 +283,129 @@ class ProductService:
             )
             return None
 
-    def get_all_products(self, only_active: bool = True) -> List[Producto]:
+    # Columnas disponibles para listados: nombre en la fila -> expresión SQL
+    LISTING_COLUMNS = {
+        'id_producto': "p.id_producto",
+        'nombre': "p.nombre",
+        'descripcion': "p.descripcion",
+        'id_categoria': "p.id_categoria",
+        'stock': "COALESCE(p.stock, 0)",
+        'stock_minimo': "COALESCE(p.stock_minimo, 0)",
+        'costo': "COALESCE(p.costo, 0)",
+        'costo_promedio': "p.costo_promedio",
+        'precio': "COALESCE(p.precio, 0)",
+        'tasa_impuesto': "COALESCE(p.tasa_impuesto, 0)",
+        'activo': "COALESCE(p.activo, 1)",
+        'fecha_creacion': "p.fecha_creacion",
+    }
+    
+    # Columnas de categoría: se completan con un diccionario de la tabla
+    # categorias (pocas filas) en lugar de un JOIN, así todas las filas
+    # comparten los mismos str de nombre y tipo
+    CATEGORY_COLUMNS = {
+        'categoria_nombre': "nombre",
+        'categoria_tipo': "tipo",
+    }
+    
+    def list_products(self, columns: Optional[Tuple[str, ...]] = None, status: str = 'active',
+                      search: Optional[str] = None, limit: Optional[int] = None) -> List[ProductoFila]:
+        """
+        Listar productos como filas compactas con solo las columnas pedidas.
+        
+        Para vistas de listado: no crea objetos Producto ni Decimal por fila
+        ni pasa por dict; los montos quedan como float de SQLite. Las
+        columnas de categoría van al final de la fila.
+        
+        Args:
+            columns: Columnas de LISTING_COLUMNS o CATEGORY_COLUMNS
+                (por defecto las del listado del catálogo)
+            status: 'active', 'inactive' o 'all'
+            search: Texto a buscar en el nombre (o ID exacto si es numérico)
+            limit: Máximo de filas
+            
+        Returns:
+            Lista de filas (namedtuple) con atributos por columna
+            
+        Raises:
+            ValueError: Si el estado o alguna columna no es válida
+        """
+        columns = tuple(columns) if columns else COLUMNAS_PRODUCTO_LISTADO
+        unknown = [col for col in columns if col not in self.LISTING_COLUMNS and col not in self.CATEGORY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas no válidas: {unknown}")
+        if status not in ('active', 'inactive', 'all'):
+            raise ValueError(f"Estado inválido '{status}'. Debe ser uno de: ['active', 'inactive', 'all']")
+        
+        product_columns = tuple(col for col in columns if col in self.LISTING_COLUMNS)
+        category_columns = tuple(col for col in columns if col in self.CATEGORY_COLUMNS)
+        expressions = [self.LISTING_COLUMNS[col] for col in product_columns]
+        if category_columns:
+            expressions.append("p.id_categoria")
+        query = f"SELECT {', '.join(expressions)} FROM productos p"
+        
+        conditions, params = [], []
+        if status == 'active':
+            conditions.append("p.activo = 1")
+        elif status == 'inactive':
+            conditions.append("p.activo = 0")
+        
+        order = "p.activo DESC, p.nombre" if status == 'all' else "p.nombre"
+        if search:
+            if search.isdigit():
+                conditions.append("(p.id_producto = ? OR LOWER(p.nombre) LIKE LOWER(?))")
+                params.extend([int(search), f"%{search}%"])
+                order = f"CASE WHEN p.id_producto = {int(search)} THEN 0 ELSE 1 END, {order}"
+            else:
+                conditions.append("LOWER(p.nombre) LIKE LOWER(?)")
+                params.append(f"%{search}%")
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order}"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        fields = product_columns + category_columns
+        row_type = ProductoFila if fields == ProductoFila._fields else tipo_fila('ProductoFila', fields)
+        if not category_columns:
+            return self.db_helper.fetch_rows(query, tuple(params), row_type)
+        
+        categories = self._category_lookup(category_columns)
+        missing = (None,) * len(category_columns)
+        make = row_type._make
+        return [make(row[:-1] + categories.get(row[-1], missing))
+                for row in self.db_helper.fetch_rows(query, tuple(params))]
+    
+    def _category_lookup(self, category_columns: Tuple[str, ...]) -> Dict[int, tuple]:
+        """
+        Valores de categoría por id_categoria para completar filas de listado.
+        
+        Args:
+            category_columns: Columnas de CATEGORY_COLUMNS, en orden
+            
+        Returns:
+            Dict id_categoria -> tupla de valores
+        """
+        fields = ', '.join(self.CATEGORY_COLUMNS[col] for col in category_columns)
+        rows = self.db_helper.fetch_rows(f"SELECT id_categoria, {fields} FROM categorias")
+        return {row[0]: row[1:] for row in rows}
+    
+    def get_all_products(self, only_active: bool = True) -> List[ProductoFila]:
         """
         Obtener todos los productos con consulta optimizada.
-        Retorna una lista de objetos Producto.
+        Retorna filas compactas (ProductoFila) con las columnas del listado.
 
         Args:
             only_active: Si True, retorna solo productos activos.
 
         Returns:
-            Lista de objetos Producto.
+            Lista de ProductoFila.
         """
-        import time
         start_time = time.time()
 
         try:
-            query = """
-                SELECT p.id_producto, p.nombre, p.descripcion, p.precio, p.costo,
-                    p.stock, p.stock_minimo, p.id_categoria, c.nombre as categoria_nombre,
-                    c.tipo AS categoria_tipo,
-                    p.tasa_impuesto, p.activo, p.fecha_creacion
-                FROM productos p
-                LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
-            """
-
-            params = None
-            if only_active:
-                query += " WHERE p.activo = 1"
-
-            query += " ORDER BY p.nombre"
-
-            results = self.db_helper.safe_execute(query, params, 'all')
-
-            if not results:
-                return []
-
-            productos = []
-            for row in results:
-                producto = Producto(
-                    id_producto=row['id_producto'],
-                    nombre=row['nombre'],
-                    # descripcion=row['descripcion'],
-                    precio=row['precio'],
-                    costo=row['costo'],
-                    stock=row['stock'],
-                    # stock_minimo=row['stock_minimo'],
-                    id_categoria=row['id_categoria'],
-                    categoria_tipo=row.get('categoria_tipo'),
-                    # categoria_nombre=row['categoria_nombre'],
-                    # tasa_impuesto=row['tasa_impuesto'],
-                    activo=bool(row['activo']),
-                    # fecha_creacion=row['fecha_creacion']
-                )
-                productos.append(producto)
+            productos = self.list_products(status='active' if only_active else 'all')
 
             operation_time = time.time() - start_time
             self.logger.info(f"[get_all_products] Cargados {len(productos)} productos en {operation_time:.2f} seg.")
@@ -341,7 +421,7 @@ class ProductService:
     # IMPLEMENTACIÓN FASE 2: DESARROLLO ATÓMICO
     # ===============================
     
-    def get_products_by_status(self, status: str) -> List[Producto]:
+    def get_products_by_status(self, status: str) -> List[ProductoFila]:
         """
         Obtener productos filtrados por estado (activo/inactivo/todos).
         
@@ -354,56 +434,13 @@ class ProductService:
             status: Estado a filtrar ('active', 'inactive', 'all')
             
         Returns:
-            Lista de productos según el filtro especificado
+            Lista de ProductoFila según el filtro especificado
             
         Raises:
             ValueError: Si el estado no es válido
         """
         try:
-            # Validar estado
-            valid_statuses = ['active', 'inactive', 'all']
-            if status not in valid_statuses:
-                raise ValueError(f"Estado inválido '{status}'. Debe ser uno de: {valid_statuses}")
-            
-            query = """
-                SELECT p.id_producto, p.nombre, p.descripcion, p.precio, p.costo,
-                       p.stock, p.stock_minimo, p.id_categoria, c.nombre as categoria_nombre,
-                       c.tipo AS categoria_tipo,
-                       p.tasa_impuesto, p.activo, p.fecha_creacion
-                FROM productos p
-                LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
-            """
-            
-            params = None
-            
-            # Agregar filtro según estado
-            if status == 'active':
-                query += " WHERE p.activo = 1"
-            elif status == 'inactive':
-                query += " WHERE p.activo = 0"
-            # Para 'all' no agregar WHERE (todos los productos)
-            
-            query += " ORDER BY p.activo DESC, p.nombre"  # Activos primero, luego por nombre
-            
-            results = self.db_helper.safe_execute(query, params, 'all')
-            
-            if not results:
-                return []
-            
-            productos = []
-            for row in results:
-                producto = Producto(
-                    id_producto=row['id_producto'],
-                    nombre=row['nombre'],
-                    id_categoria=row['id_categoria'],
-                    categoria_tipo=row['categoria_tipo'],
-                    stock=row['stock'] if row['stock'] is not None else 0,
-                    costo=Decimal(str(row['costo'])) if row['costo'] is not None else Decimal('0'),
-                    precio=Decimal(str(row['precio'])) if row['precio'] is not None else Decimal('0'),
-                    tasa_impuesto=Decimal(str(row['tasa_impuesto'])) if row['tasa_impuesto'] is not None else Decimal('0'),
-                    activo=bool(row['activo']) if row['activo'] is not None else True
-                )
-                productos.append(producto)
+            productos = self.list_products(status=status)
             
             self.logger.debug(f"Filtro '{status}': {len(productos)} productos encontrados")
             return productos
@@ -482,6 +519,7 @@ class ProductService:
             success = bool(rows_affected)
             
             if success:
+                change_notifier.publicar_productos(self.db, [id_producto])
                 self.logger.info(f"Producto reactivado: {result['nombre']} (ID: {id_producto})")
                 LoggingHelper.log_database_operation(
                     'productos',
@@ -758,6 +796,8 @@ class ProductService:
             rows_affected = self.db_helper.safe_execute_with_commit(query, tuple(valores))
             
             if rows_affected:
+                change_notifier.publicar_productos(self.db, [id_producto])
+                
                 # Logging de operación exitosa
                 operation_time = time.time() - start_time
                 self.logger.info(f"Producto {id_producto} actualizado exitosamente: {changes}")
@@ -848,6 +888,7 @@ class ProductService:
             success = bool(rows_affected)
             
             if success:
+                change_notifier.publicar_productos(self.db, [id_producto])
                 self.logger.info(f"Producto desactivado: {product.nombre} (ID: {id_producto})")
                 LoggingHelper.log_database_operation(
                     'productos',
@@ -1100,79 +1141,33 @@ class ProductService:
             )
             return []
     
-    # def search_products(self, search_term: str) -> List[Dict[str, Any]]:
-    def search_products(self, search_term: str) -> List[Producto]:
-
+    # Columnas de los resultados de búsqueda (ProductSearchWidget, etiquetas, API)
+    SEARCH_COLUMNS = (
+        'id_producto', 'nombre', 'stock', 'precio', 'tasa_impuesto',
+        'id_categoria', 'activo', 'categoria_nombre', 'categoria_tipo'
+    )
+    
+    def search_products(self, search_term: str) -> List[ProductoFila]:
         """
         Buscar productos por nombre o ID.
         
         NUEVO MÉTODO FASE 3:
         - Búsqueda por nombre (LIKE) o ID exacto
         - Optimizado para ProductSearchWidget
-        - Retorna formato compatible con UI
+        - Retorna filas compactas con las columnas de SEARCH_COLUMNS
         
         Args:
             search_term: Término de búsqueda (nombre o ID)
             
         Returns:
-            Lista de diccionarios con datos de productos para UI
+            Lista de ProductoFila activos (máximo 20, coincidencia por ID primero)
         """
         try:
             if not search_term or not search_term.strip():
                 return []
             
             search_term = search_term.strip()
-            
-            # Si es numérico, buscar por ID también
-            if search_term.isdigit():
-                query = """
-                    SELECT p.id_producto as id, p.nombre, p.stock, p.precio, 
-                           p.id_categoria, c.nombre as categoria_nombre, c.tipo as categoria_tipo
-                    FROM productos p
-                    LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
-                    WHERE (p.id_producto = ? OR LOWER(p.nombre) LIKE LOWER(?)) 
-                    AND p.activo = 1
-                    ORDER BY 
-                        CASE WHEN p.id_producto = ? THEN 0 ELSE 1 END,
-                        p.nombre
-                    LIMIT 20
-                """
-                search_param = f"%{search_term}%"
-                params = (int(search_term), search_param, int(search_term))
-            else:
-                # Búsqueda solo por nombre
-                query = """
-                    SELECT p.id_producto as id, p.nombre, p.stock, p.precio,
-                           p.id_categoria, c.nombre as categoria_nombre, c.tipo as categoria_tipo
-                    FROM productos p
-                    LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
-                    WHERE LOWER(p.nombre) LIKE LOWER(?) AND p.activo = 1
-                    ORDER BY p.nombre
-                    LIMIT 20
-                """
-                search_param = f"%{search_term}%"
-                params = (search_param,)
-            
-            results = self.db_helper.safe_execute(query, params, 'all')
-            
-            if not results:
-                return []
-            
-            # Convertir a formato compatible con ProductSearchWidget
-            productos = []
-            for row in results:
-                producto = Producto(
-                    id_producto=row['id'],
-                    nombre=row['nombre'],
-                    id_categoria=row['id_categoria'],
-                    categoria_tipo=row.get('categoria_tipo'),
-                    stock=row['stock'] if row['stock'] is not None else 0,
-                    precio=Decimal(str(row['precio'])) if row['precio'] is not None else Decimal('0'),
-                    costo=Decimal('0'),  # Si no se usa en esta vista, puede ir como cero
-                    tasa_impuesto=Decimal('0'),  # Igual
-                    activo=True
-                )
-                productos.append(producto)
+            productos = self.list_products(self.SEARCH_COLUMNS, status='active', search=search_term, limit=20)
             
             self.logger.debug(f"Búsqueda '{search_term}': {len(productos)} productos encontrados")
             return productos
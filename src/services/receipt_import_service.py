@@ -0,0 +1,411 @@
+"""
+Servicio de importación de recepciones de mercancía.
+Lee archivos Excel (.xlsx) o CSV de proveedores y los convierte en líneas
+de entrada de inventario validadas.
+
+Este servicio maneja:
+- Lectura perezosa de filas (openpyxl en modo read_only / csv.reader)
+- Detección de columnas por encabezado (id, cantidad, costo)
+- Validación por lotes con una consulta al catálogo por lote
+- Errores por fila sin detener la importación
+- Consolidación de líneas repetidas del mismo producto
+
+La memoria usada depende del número de productos distintos del archivo y
+no del número de filas. El registro de las líneas válidas lo realiza
+MovementService.create_bulk_entry_movements en una sola transacción.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-23
+"""
+
+import csv
+import importlib.util
+import logging
+import os
+import time
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# openpyxl se importa al leer el primer Excel (no en el arranque de la aplicación)
+OPENPYXL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+
+
+# Nombres de encabezado aceptados (normalizados) para cada campo
+ALIAS_COLUMNAS = {
+    'id_producto': {'id', 'id_producto', 'idproducto', 'producto_id', 'codigo', 'cod', 'code'},
+    'cantidad': {'cantidad', 'cant', 'qty', 'unidades'},
+    'costo_unitario': {'costo', 'costo_unitario', 'costo unitario', 'precio_costo', 'costo_u'},
+}
+
+# Orden de columnas si el archivo no tiene encabezado
+COLUMNAS_POSICIONALES = ('id_producto', 'cantidad', 'costo_unitario')
+
+
+class ReceiptImportService:
+    """
+    Servicio de importación de recepciones (ENTRADA) desde archivos.
+
+    Flujo:
+    1. leer_filas() produce (numero_fila, datos) sin cargar el archivo completo
+    2. importar_archivo() agrupa las filas en lotes, valida cada lote contra
+       el catálogo con una sola consulta y acumula las líneas válidas
+    3. El formulario registra las líneas con create_bulk_entry_movements
+    """
+
+    TAMANO_LOTE = 1000
+
+    # Máximo de errores detallados que se conservan (el total siempre se cuenta)
+    MAX_ERRORES_DETALLE = 1000
+
+    # Cantidad máxima por línea: valores como '1e999' se rechazan por fila
+    MAX_CANTIDAD = 1000000
+
+    # Costo unitario máximo (un '1e999' se guardaría como inf en la columna REAL)
+    MAX_COSTO = Decimal('1000000000')
+
+    # Exponente decimal máximo aceptado por _a_entero (enteros de 64 bits de SQLite)
+    _MAX_EXPONENTE_ENTERO = 18
+
+    EXTENSIONES_EXCEL = ('.xlsx', '.xlsm')
+    EXTENSIONES_CSV = ('.csv', '.txt')
+
+    def __init__(self, db_connection, movement_service=None):
+        """
+        Inicializar servicio de importación.
+
+        Args:
+            db_connection: Conexión a base de datos
+            movement_service: MovementService (opcional, se crea si no se indica)
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+
+        if movement_service is None:
+            from services.movement_service import MovementService
+            movement_service = MovementService(db_connection)
+        self.movement_service = movement_service
+
+    # ==================== LECTURA ====================
+
+    def leer_filas(self, file_path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Leer filas de datos de un archivo Excel o CSV de forma perezosa.
+
+        Args:
+            file_path: Ruta del archivo
+
+        Yields:
+            Tupla (numero_fila, datos) con claves id_producto, cantidad y
+            costo_unitario (valores crudos del archivo)
+
+        Raises:
+            ValueError: Si el formato no es soportado
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+
+        if extension in self.EXTENSIONES_EXCEL:
+            filas = self._filas_excel(file_path)
+        elif extension in self.EXTENSIONES_CSV:
+            filas = self._filas_csv(file_path)
+        else:
+            raise ValueError(f"Formato no soportado: {extension}. Use .xlsx o .csv")
+
+        columnas = None
+        for numero_fila, valores in filas:
+            if not valores or all(v is None or str(v).strip() == '' for v in valores):
+                continue
+
+            if columnas is None:
+                columnas = self._detectar_columnas(valores)
+                if columnas is not None:
+                    continue  # Era la fila de encabezado
+                columnas = {campo: i for i, campo in enumerate(COLUMNAS_POSICIONALES)}
+
+            yield numero_fila, {
+                campo: valores[indice] if indice < len(valores) else None
+                for campo, indice in columnas.items()
+            }
+
+    def _filas_excel(self, file_path: str) -> Iterator[Tuple[int, tuple]]:
+        """Iterar filas de la primera hoja en modo read_only."""
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError(
+                "openpyxl es requerido para importar Excel. "
+                "Instalar con: pip install openpyxl"
+            )
+
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            for numero_fila, valores in enumerate(sheet.iter_rows(values_only=True), start=1):
+                yield numero_fila, valores
+        finally:
+            workbook.close()
+
+    def _filas_csv(self, file_path: str) -> Iterator[Tuple[int, list]]:
+        """Iterar filas de un CSV detectando el separador (, ; o tabulador)."""
+        with open(file_path, newline='', encoding='utf-8-sig') as archivo:
+            muestra = archivo.read(4096)
+            archivo.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+            except csv.Error:
+                dialecto = csv.excel
+
+            for numero_fila, valores in enumerate(csv.reader(archivo, dialecto), start=1):
+                yield numero_fila, valores
+
+    @staticmethod
+    def _normalizar_encabezado(valor: Any) -> str:
+        """Encabezado en minúsculas, sin acentos y con '_' en lugar de espacios."""
+        texto = unicodedata.normalize('NFKD', str(valor or '').strip().lower())
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        return '_'.join(texto.split())
+
+    def _detectar_columnas(self, valores) -> Optional[Dict[str, int]]:
+        """
+        Detectar la fila de encabezado.
+
+        Returns:
+            Dict campo -> índice de columna, o None si la fila no es encabezado
+        """
+        columnas = {}
+        for indice, valor in enumerate(valores):
+            nombre = self._normalizar_encabezado(valor)
+            for campo, alias in ALIAS_COLUMNAS.items():
+                if campo not in columnas and (nombre in alias or nombre.replace('_', ' ') in alias):
+                    columnas[campo] = indice
+
+        if 'id_producto' in columnas and 'cantidad' in columnas:
+            return columnas
+        return None
+
+    # ==================== VALIDACIÓN ====================
+
+    @staticmethod
+    def _a_entero(valor: Any) -> Optional[int]:
+        """
+        Convertir a entero aceptando 12, 12.0 y '12'.
+
+        Returns:
+            Entero, o None si no es entero, no es finito ('nan', 'inf') o
+            no cabe en un entero de SQLite
+        """
+        if isinstance(valor, bool) or valor is None:
+            return None
+        if isinstance(valor, int):
+            return valor if abs(valor) < 2 ** 63 else None
+        try:
+            numero = Decimal(str(valor).strip())
+            if not numero.is_finite() or numero != numero.to_integral_value():
+                return None
+            if numero and numero.adjusted() > ReceiptImportService._MAX_EXPONENTE_ENTERO:
+                return None
+            return int(numero)
+        except (InvalidOperation, ValueError, OverflowError):
+            return None
+
+    @staticmethod
+    def _a_costo(valor: Any) -> Tuple[Optional[Decimal], bool]:
+        """
+        Convertir costo opcional.
+
+        Returns:
+            Tupla (costo, es_valido); 'nan', 'inf' e 'Infinity' no son válidos
+        """
+        if valor is None or str(valor).strip() == '':
+            return None, True
+        try:
+            costo = Decimal(str(valor).strip().replace(',', '.'))
+            if not costo.is_finite():
+                return None, False
+            return costo, 0 <= costo <= ReceiptImportService.MAX_COSTO
+        except (InvalidOperation, ValueError):
+            return None, False
+
+    def _validar_lote(self, lote: List[Tuple[int, Dict[str, Any]]],
+                      catalogo: Dict[int, Optional[Dict[str, Any]]],
+                      lineas: Dict[int, Dict[str, Any]], resultado: Dict[str, Any]) -> None:
+        """
+        Validar un lote de filas y acumular las líneas válidas.
+
+        Args:
+            lote: Filas (numero_fila, datos)
+            catalogo: Cache id_producto -> info (None si no existe)
+            lineas: Líneas válidas acumuladas por producto
+            resultado: Resumen de importación (errores y contadores)
+        """
+        parseadas = []
+        for numero_fila, datos in lote:
+            id_producto = self._a_entero(datos.get('id_producto'))
+            cantidad = self._a_entero(datos.get('cantidad'))
+            costo, costo_valido = self._a_costo(datos.get('costo_unitario'))
+
+            if id_producto is None or id_producto <= 0:
+                self._agregar_error(resultado, numero_fila, f"ID de producto inválido: {datos.get('id_producto')!r}")
+            elif cantidad is None or cantidad <= 0:
+                self._agregar_error(resultado, numero_fila, f"Cantidad inválida: {datos.get('cantidad')!r}")
+            elif cantidad > self.MAX_CANTIDAD:
+                self._agregar_error(resultado, numero_fila,
+                                    f"Cantidad fuera de rango (máximo {self.MAX_CANTIDAD}): {datos.get('cantidad')!r}")
+            elif not costo_valido:
+                self._agregar_error(resultado, numero_fila, f"Costo inválido: {datos.get('costo_unitario')!r}")
+            else:
+                parseadas.append((numero_fila, id_producto, cantidad, costo))
+
+        # Una consulta por lote, solo para IDs no vistos en lotes anteriores
+        nuevos = {p[1] for p in parseadas if p[1] not in catalogo}
+        if nuevos:
+            encontrados = self.movement_service.get_products_info(list(nuevos))
+            for id_producto in nuevos:
+                catalogo[id_producto] = encontrados.get(id_producto)
+
+        for numero_fila, id_producto, cantidad, costo in parseadas:
+            info = catalogo.get(id_producto)
+            if info is None:
+                self._agregar_error(resultado, numero_fila, f"Producto {id_producto} no existe")
+                continue
+            if not info['activo']:
+                self._agregar_error(resultado, numero_fila, f"Producto {id_producto} está inactivo")
+                continue
+            if info['categoria_tipo'] == 'SERVICIO':
+                self._agregar_error(
+                    resultado, numero_fila,
+                    f"'{info['nombre']}' es un SERVICIO y no maneja inventario"
+                )
+                continue
+
+            linea = lineas.get(id_producto)
+            if linea is None:
+                linea = lineas[id_producto] = {
+                    'id': id_producto,
+                    'nombre': info['nombre'],
+                    'cantidad': 0,
+                    'stock_original': info['stock'],
+                    'categoria_tipo': info['categoria_tipo'] or 'UNKNOWN',
+                    'costo_unitario': None,
+                    '_costo_total': Decimal('0'),
+                    '_cantidad_con_costo': 0
+                }
+            linea['cantidad'] += cantidad
+            if costo is not None:
+                # Costo promedio ponderado si el producto aparece varias veces
+                linea['_costo_total'] += costo * cantidad
+                linea['_cantidad_con_costo'] += cantidad
+                linea['costo_unitario'] = linea['_costo_total'] / linea['_cantidad_con_costo']
+            resultado['filas_validas'] += 1
+
+    def _agregar_error(self, resultado: Dict[str, Any], numero_fila: int, mensaje: str) -> None:
+        """Registrar error de una fila (el detalle se limita a MAX_ERRORES_DETALLE)."""
+        resultado['total_errores'] += 1
+        if len(resultado['errores']) < self.MAX_ERRORES_DETALLE:
+            resultado['errores'].append({'fila': numero_fila, 'error': mensaje})
+
+    # ==================== IMPORTACIÓN ====================
+
+    def importar_archivo(self, file_path: str,
+                         progreso: Optional[Callable[[int, Optional[int]], None]] = None,
+                         tamano_lote: Optional[int] = None,
+                         cancelado: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Leer y validar un archivo de recepción.
+
+        Args:
+            file_path: Ruta del archivo .xlsx o .csv
+            progreso: Callback (filas_procesadas, total_estimado) por lote
+            tamano_lote: Filas por lote de validación (por defecto TAMANO_LOTE)
+            cancelado: Función que devuelve True para detener la lectura
+
+        Returns:
+            Dict con lineas (consolidadas por producto, formato de
+            MovementEntryForm.selected_products), filas_leidas, filas_validas,
+            errores (detalle por fila), total_errores, cancelado y duracion
+        """
+        inicio = time.perf_counter()
+        tamano_lote = tamano_lote or self.TAMANO_LOTE
+        total_estimado = self._estimar_filas(file_path)
+
+        resultado = {
+            'archivo': os.path.basename(file_path),
+            'filas_leidas': 0,
+            'filas_validas': 0,
+            'errores': [],
+            'total_errores': 0,
+            'cancelado': False
+        }
+        catalogo: Dict[int, Optional[Dict[str, Any]]] = {}
+        lineas: Dict[int, Dict[str, Any]] = {}
+
+        lote = []
+        for fila in self.leer_filas(file_path):
+            lote.append(fila)
+            if len(lote) >= tamano_lote:
+                self._procesar_lote(lote, catalogo, lineas, resultado, progreso, total_estimado)
+                lote = []
+                if cancelado and cancelado():
+                    resultado['cancelado'] = True
+                    break
+
+        if lote and not resultado['cancelado']:
+            self._procesar_lote(lote, catalogo, lineas, resultado, progreso, total_estimado)
+
+        for linea in lineas.values():
+            del linea['_costo_total'], linea['_cantidad_con_costo']
+
+        resultado['lineas'] = list(lineas.values())
+        resultado['duracion'] = time.perf_counter() - inicio
+
+        self.logger.info(
+            f"Importación {resultado['archivo']}: {resultado['filas_leidas']} filas, "
+            f"{resultado['filas_validas']} válidas, {resultado['total_errores']} errores, "
+            f"{len(resultado['lineas'])} productos en {resultado['duracion']:.2f}s"
+        )
+        return resultado
+
+    def _procesar_lote(self, lote, catalogo, lineas, resultado, progreso, total_estimado) -> None:
+        """Validar un lote y notificar progreso."""
+        self._validar_lote(lote, catalogo, lineas, resultado)
+        resultado['filas_leidas'] += len(lote)
+        if progreso:
+            progreso(resultado['filas_leidas'], total_estimado)
+
+    def _estimar_filas(self, file_path: str) -> Optional[int]:
+        """
+        Estimar el número de filas para mostrar progreso.
+
+        Returns:
+            Filas según la dimensión de la hoja Excel, o None si no se conoce
+        """
+        if not file_path.lower().endswith(self.EXTENSIONES_EXCEL) or not OPENPYXL_AVAILABLE:
+            return None
+        try:
+            from openpyxl import load_workbook
+            workbook = load_workbook(file_path, read_only=True)
+            try:
+                return workbook.worksheets[0].max_row
+            finally:
+                workbook.close()
+        except Exception:
+            return None
+
+    def registrar_entrada(self, lineas: List[Dict[str, Any]], responsable: str,
+                          observaciones: Optional[str] = None) -> List:
+        """
+        Registrar las líneas importadas en una sola transacción.
+
+        Args:
+            lineas: Líneas devueltas por importar_archivo
+            responsable: Usuario responsable
+            observaciones: Observaciones de la entrada
+
+        Returns:
+            Movimientos creados
+        """
+        return self.movement_service.create_bulk_entry_movements(
+            [{'id_producto': l['id'], 'cantidad': l['cantidad'],
+              'costo_unitario': l.get('costo_unitario')} for l in lineas],
+            responsable=responsable,
+            observaciones=observaciones or f"Importación de recepción - {len(lineas)} productos"
+        )
@@ -0,0 +1,365 @@
+"""
+Servicio de reposición de inventario.
+Calcula demanda, stock de seguridad y punto de reorden de todo el catálogo
+de MATERIALES a la vez.
+
+Este servicio maneja:
+- Demanda diaria por producto a partir de movimientos VENTA (una consulta)
+- Tasa de demanda por suavizado exponencial o media móvil (NumPy)
+- Variabilidad, stock de seguridad y punto de reorden
+- Cantidad sugerida para reponer hasta el nivel objetivo
+- Persistencia de sugerencias y actualización opcional de stock_minimo
+
+Las ventas se cargan en una matriz productos x días y todos los cálculos
+son operaciones vectoriales sobre esa matriz; el costo no depende de
+consultas por producto.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-24
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class SugerenciaReposicion:
+    """Resultado del cálculo de reposición de un producto"""
+    id_producto: int
+    nombre: str
+    id_categoria: int
+    categoria: str
+    stock: int
+    stock_minimo: int
+    demanda_diaria: float
+    desviacion_diaria: float
+    stock_seguridad: int
+    punto_reorden: int
+    stock_minimo_sugerido: int
+    cantidad_reorden: int
+    ventas_periodo: int
+
+    @property
+    def stock_bajo(self) -> bool:
+        """True si el stock está en o bajo el mínimo configurado o el punto de reorden"""
+        return self.stock <= max(self.stock_minimo, self.punto_reorden)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertir a diccionario"""
+        return asdict(self)
+
+
+class ReplenishmentService:
+    """
+    Motor de reposición para el catálogo completo.
+
+    Fórmulas (L = días de entrega, C = días de cobertura):
+    - stock_seguridad = z * desviación diaria * sqrt(L)
+    - punto_reorden = demanda diaria * L + stock_seguridad
+    - nivel objetivo = punto_reorden + demanda diaria * C
+    - cantidad_reorden = nivel objetivo - stock (mínimo 0)
+    """
+
+    METODOS = ('ewma', 'media_movil')
+
+    DIAS_HISTORIA = 90
+    ALPHA = 0.1              # Suavizado exponencial (mayor = más peso a días recientes)
+    VENTANA_MEDIA_MOVIL = 28
+    DIAS_ENTREGA = 7
+    DIAS_COBERTURA = 30
+    FACTOR_SERVICIO = 1.65   # z para ~95% de nivel de servicio
+
+    def __init__(self, db_connection):
+        """
+        Inicializar servicio de reposición.
+
+        Args:
+            db_connection: Conexión a base de datos
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+
+    # ==================== CÁLCULO ====================
+
+    def calcular_reposicion(self, metodo: str = 'ewma', dias_historia: Optional[int] = None,
+                            dias_entrega: Optional[int] = None,
+                            dias_cobertura: Optional[int] = None,
+                            factor_servicio: Optional[float] = None,
+                            alpha: Optional[float] = None,
+                            ventana: Optional[int] = None,
+                            fecha_fin: Optional[date] = None) -> List[SugerenciaReposicion]:
+        """
+        Calcular sugerencias de reposición para todos los MATERIALES activos.
+
+        Args:
+            metodo: 'ewma' (suavizado exponencial) o 'media_movil'
+            dias_historia: Días de ventas considerados (por defecto DIAS_HISTORIA)
+            dias_entrega: Tiempo de entrega del proveedor en días
+            dias_cobertura: Días de demanda que debe cubrir un pedido
+            factor_servicio: Factor z del nivel de servicio
+            alpha: Constante de suavizado para 'ewma' (0 < alpha <= 1)
+            ventana: Días de la media móvil para 'media_movil'
+            fecha_fin: Último día del historial (por defecto hoy)
+
+        Returns:
+            Lista de SugerenciaReposicion ordenada por id_producto
+
+        Raises:
+            ValueError: Si el método o los parámetros no son válidos
+        """
+        if metodo not in self.METODOS:
+            raise ValueError(f"Método de demanda no válido: {metodo}. Use {self.METODOS}")
+
+        dias = dias_historia or self.DIAS_HISTORIA
+        entrega = self.DIAS_ENTREGA if dias_entrega is None else dias_entrega
+        cobertura = self.DIAS_COBERTURA if dias_cobertura is None else dias_cobertura
+        z = self.FACTOR_SERVICIO if factor_servicio is None else factor_servicio
+        alpha = self.ALPHA if alpha is None else alpha
+        ventana = min(ventana or self.VENTANA_MEDIA_MOVIL, dias)
+        if dias < 2 or entrega < 0 or cobertura < 0 or not 0 < alpha <= 1:
+            raise ValueError("Parámetros de reposición inválidos")
+
+        inicio_calculo = time.perf_counter()
+        productos = self._obtener_productos()
+        if not productos:
+            return []
+
+        ids = np.fromiter((p[0] for p in productos), dtype=np.int64, count=len(productos))
+        stock = np.fromiter((p[4] or 0 for p in productos), dtype=np.int64, count=len(productos))
+        demanda = self._matriz_demanda(ids, dias, fecha_fin or date.today())
+
+        # Tasa y variabilidad de la demanda diaria
+        if metodo == 'ewma':
+            pesos = (1 - alpha) ** np.arange(dias - 1, -1, -1, dtype=np.float64)
+            pesos /= pesos.sum()
+            tasa = demanda @ pesos
+            desviacion = np.sqrt(((demanda - tasa[:, None]) ** 2) @ pesos)
+        else:
+            recientes = demanda[:, -ventana:]
+            tasa = recientes.mean(axis=1)
+            desviacion = recientes.std(axis=1, ddof=1) if ventana > 1 else np.zeros_like(tasa)
+
+        stock_seguridad = z * desviacion * math.sqrt(entrega)
+        punto_reorden = tasa * entrega + stock_seguridad
+        nivel_objetivo = punto_reorden + tasa * cobertura
+
+        stock_seguridad_int = np.ceil(stock_seguridad).astype(np.int64)
+        punto_reorden_int = np.ceil(punto_reorden).astype(np.int64)
+        cantidad_reorden = np.maximum(np.ceil(nivel_objetivo - stock), 0).astype(np.int64)
+        ventas_periodo = demanda.sum(axis=1).astype(np.int64)
+
+        sugerencias = [
+            SugerenciaReposicion(
+                id_producto=int(p[0]),
+                nombre=p[1],
+                id_categoria=p[2],
+                categoria=p[3],
+                stock=int(stock[i]),
+                stock_minimo=p[5] or 0,
+                demanda_diaria=round(float(tasa[i]), 4),
+                desviacion_diaria=round(float(desviacion[i]), 4),
+                stock_seguridad=int(stock_seguridad_int[i]),
+                punto_reorden=int(punto_reorden_int[i]),
+                stock_minimo_sugerido=int(punto_reorden_int[i]),
+                cantidad_reorden=int(cantidad_reorden[i]),
+                ventas_periodo=int(ventas_periodo[i])
+            )
+            for i, p in enumerate(productos)
+        ]
+
+        self.logger.info(
+            f"Reposición calculada para {len(sugerencias)} productos "
+            f"({metodo}, {dias} días) en {(time.perf_counter() - inicio_calculo) * 1000:.1f} ms"
+        )
+        return sugerencias
+
+    def _obtener_productos(self) -> List[tuple]:
+        """Obtener MATERIALES activos ordenados por id_producto."""
+        return self.db.get_connection().execute("""
+            SELECT p.id_producto, p.nombre, p.id_categoria, c.nombre, p.stock, p.stock_minimo
+            FROM productos p
+            JOIN categorias c ON c.id_categoria = p.id_categoria
+            WHERE p.activo = 1 AND c.tipo = 'MATERIAL'
+            ORDER BY p.id_producto
+        """).fetchall()
+
+    def _matriz_demanda(self, ids: np.ndarray, dias: int, fecha_fin: date) -> np.ndarray:
+        """
+        Construir la matriz de unidades vendidas por producto y día.
+
+        Args:
+            ids: IDs de productos ordenados ascendentemente
+            dias: Número de días (columnas)
+            fecha_fin: Último día incluido
+
+        Returns:
+            Matriz float64 de forma (len(ids), dias); la última columna es fecha_fin
+        """
+        inicio = fecha_fin - timedelta(days=dias - 1)
+
+        # Tuplas simples: evita construir un sqlite3.Row por fila agregada
+        cursor = self.db.get_connection().cursor()
+        cursor.row_factory = None
+        filas = cursor.execute("""
+            SELECT id_producto,
+                   CAST(julianday(fecha_movimiento) - julianday(?) AS INTEGER) AS dia,
+                   SUM(ABS(cantidad))
+            FROM movimientos
+            WHERE tipo_movimiento = 'VENTA'
+              AND fecha_movimiento >= ? AND fecha_movimiento < ?
+            GROUP BY id_producto, dia
+        """, (inicio.isoformat(), inicio.isoformat(),
+              (fecha_fin + timedelta(days=1)).isoformat())).fetchall()
+
+        demanda = np.zeros((len(ids), dias), dtype=np.float64)
+        if not filas:
+            return demanda
+
+        ventas = np.array(filas, dtype=np.float64)
+        producto = ventas[:, 0].astype(np.int64)
+        dia = ventas[:, 1].astype(np.int64)
+
+        # Ubicar cada fila en la matriz; se descartan productos fuera del catálogo
+        posicion = np.searchsorted(ids, producto)
+        posicion_valida = np.minimum(posicion, len(ids) - 1)
+        valido = (ids[posicion_valida] == producto) & (dia >= 0) & (dia < dias)
+
+        np.add.at(demanda, (posicion[valido], dia[valido]), ventas[valido, 2])
+        return demanda
+
+    # ==================== PERSISTENCIA ====================
+
+    def guardar_sugerencias(self, sugerencias: List[SugerenciaReposicion], metodo: str,
+                            dias_historia: int, aplicar_stock_minimo: bool = False) -> int:
+        """
+        Guardar sugerencias en reposicion_sugerida.
+
+        Args:
+            sugerencias: Resultado de calcular_reposicion
+            metodo: Método usado en el cálculo
+            dias_historia: Días de historial usados
+            aplicar_stock_minimo: Copiar stock_minimo_sugerido a productos.stock_minimo
+                (solo productos con ventas en el período, para no borrar mínimos
+                configurados a mano en productos sin historial)
+
+        Returns:
+            Número de sugerencias guardadas
+        """
+        conn = self.db.get_connection()
+        try:
+            conn.executemany("""
+                INSERT INTO reposicion_sugerida (
+                    id_producto, demanda_diaria, desviacion_diaria, stock_seguridad,
+                    punto_reorden, stock_minimo_sugerido, cantidad_reorden,
+                    metodo, dias_historia, fecha_calculo
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(id_producto) DO UPDATE SET
+                    demanda_diaria = excluded.demanda_diaria,
+                    desviacion_diaria = excluded.desviacion_diaria,
+                    stock_seguridad = excluded.stock_seguridad,
+                    punto_reorden = excluded.punto_reorden,
+                    stock_minimo_sugerido = excluded.stock_minimo_sugerido,
+                    cantidad_reorden = excluded.cantidad_reorden,
+                    metodo = excluded.metodo,
+                    dias_historia = excluded.dias_historia,
+                    fecha_calculo = excluded.fecha_calculo
+            """, [
+                (s.id_producto, s.demanda_diaria, s.desviacion_diaria, s.stock_seguridad,
+                 s.punto_reorden, s.stock_minimo_sugerido, s.cantidad_reorden,
+                 metodo, dias_historia)
+                for s in sugerencias
+            ])
+
+            if aplicar_stock_minimo:
+                conn.executemany(
+                    "UPDATE productos SET stock_minimo = ?, fecha_modificacion = CURRENT_TIMESTAMP "
+                    "WHERE id_producto = ? AND stock_minimo IS NOT ?",
+                    [(s.stock_minimo_sugerido, s.id_producto, s.stock_minimo_sugerido)
+                     for s in sugerencias if s.ventas_periodo > 0]
+                )
+                for s in sugerencias:
+                    if s.ventas_periodo > 0:
+                        s.stock_minimo = s.stock_minimo_sugerido
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        return len(sugerencias)
+
+    def recalcular_catalogo(self, aplicar_stock_minimo: bool = False, metodo: str = 'ewma',
+                            **parametros) -> Dict[str, Any]:
+        """
+        Calcular y guardar las sugerencias de todo el catálogo.
+
+        Args:
+            aplicar_stock_minimo: Actualizar productos.stock_minimo con la sugerencia
+            metodo: 'ewma' o 'media_movil'
+            **parametros: Parámetros adicionales de calcular_reposicion
+
+        Returns:
+            Dict con productos, productos_bajo_minimo, duracion_ms y sugerencias
+        """
+        inicio = time.perf_counter()
+        sugerencias = self.calcular_reposicion(metodo=metodo, **parametros)
+        self.guardar_sugerencias(
+            sugerencias, metodo, parametros.get('dias_historia') or self.DIAS_HISTORIA,
+            aplicar_stock_minimo=aplicar_stock_minimo
+        )
+        return {
+            'productos': len(sugerencias),
+            'productos_bajo_minimo': sum(1 for s in sugerencias if s.stock_bajo),
+            'duracion_ms': (time.perf_counter() - inicio) * 1000,
+            'sugerencias': sugerencias
+        }
+
+    def obtener_sugerencias(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Obtener las últimas sugerencias guardadas.
+
+        Returns:
+            Dict id_producto -> datos de reposicion_sugerida
+        """
+        rows = self.db.get_connection().execute("SELECT * FROM reposicion_sugerida").fetchall()
+        return {row['id_producto']: dict(row) for row in rows}
+
+    # ==================== PRONÓSTICO DE SERIES ====================
+
+    @staticmethod
+    def pronosticar_serie(valores: Sequence[float], periodos: int,
+                          alpha: float = 0.5, beta: float = 0.3) -> List[float]:
+        """
+        Pronosticar una serie con suavizado exponencial doble (Holt).
+
+        A diferencia de extrapolar entre el primer y el último punto, usa
+        toda la serie y amortigua el ruido de los extremos.
+
+        Args:
+            valores: Serie histórica (al menos 2 valores)
+            periodos: Períodos a pronosticar
+            alpha: Suavizado del nivel
+            beta: Suavizado de la tendencia
+
+        Returns:
+            Lista de valores pronosticados (no negativos)
+        """
+        serie = np.asarray(valores, dtype=np.float64)
+        if serie.size < 2 or periodos <= 0:
+            return []
+
+        nivel = serie[0]
+        tendencia = serie[1] - serie[0]
+        for valor in serie[1:]:
+            nivel_anterior = nivel
+            nivel = alpha * valor + (1 - alpha) * (nivel + tendencia)
+            tendencia = beta * (nivel - nivel_anterior) + (1 - beta) * tendencia
+
+        pasos = np.arange(1, periodos + 1, dtype=np.float64)
+        return np.maximum(nivel + tendencia * pasos, 0).tolist()
@@ -12,13 +12,20 @@ Autor: Sistema de Inventario Copy Point S.A.
 Metodología: TDD - Implementación basada en tests unitarios
 """
 
+import functools
+import json
 import sqlite3
 import logging
+import threading
 from datetime import datetime, date, timedelta
-from decimal import Decimal
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
+
+import numpy as np
+
 from src.db.database import DatabaseConnection
+from db.wal_checkpoint import checkpoint_manager
+from models.money import Cost, Money
 
 
 @dataclass
@@ -31,6 +38,35 @@ class ReportData:
     totals: Optional[Dict[str, Any]] = None
 
 
+def lectura_registrada(descripcion: str) -> Callable:
+    """
+    Ejecutar un reporte en una conexión de lectura registrada (DatabaseConnection.read_connection).
+
+    Las consultas del reporte no usan la conexión compartida (la de caja);
+    un reporte llamado desde otro reutiliza la conexión del primero.
+
+    Args:
+        descripcion: Nombre de la lectura para métricas y advertencias
+    """
+    def decorador(metodo: Callable) -> Callable:
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            read_connection = getattr(self.db_connection, 'read_connection', None)
+            if getattr(self._local, 'lectura', None) is not None or read_connection is None:
+                with checkpoint_manager.lector_largo(descripcion):
+                    return metodo(self, *args, **kwargs)
+
+            from services.archive_service import ArchiveService
+            with read_connection(descripcion, preparar=ArchiveService.adjuntar) as lectura:
+                self._local.lectura = lectura
+                try:
+                    return metodo(self, *args, **kwargs)
+                finally:
+                    self._local.lectura = None
+        return envoltura
+    return decorador
+
+
 class ReportService:
     """Servicio para generación de reportes del sistema de inventario"""
     
@@ -43,10 +79,35 @@ class ReportService:
         """
         self.db_connection = db_connection
         self.logger = logging.getLogger(__name__)
+        # Conexión de lectura del reporte en curso, por hilo (ver lectura_registrada)
+        self._local = threading.local()
         
+    def _db(self) -> DatabaseConnection:
+        """Conexión de lectura del reporte en curso o la compartida"""
+        return getattr(self._local, 'lectura', None) or self.db_connection
+    
     def _get_connection(self) -> sqlite3.Connection:
         """Obtiene conexión a la base de datos"""
-        return self.db_connection.get_connection()
+        return self._db().get_connection()
+    
+    def _source_table(self, conn: sqlite3.Connection, table: str,
+                      fecha_inicio: Optional[date] = None) -> str:
+        """
+        Obtiene la tabla a consultar para un rango de fechas
+        
+        Si el rango incluye períodos archivados devuelve la vista histórica
+        (base caliente + archivo); si no, la tabla de la base caliente.
+        
+        Args:
+            conn: Conexión a la base de datos
+            table: 'ventas', 'detalle_ventas' o 'movimientos'
+            fecha_inicio: Fecha de inicio del rango (None = todo el historial)
+            
+        Returns:
+            Nombre de tabla o vista para el FROM
+        """
+        from services.archive_service import ArchiveService
+        return ArchiveService.tabla_para_rango(conn, table, fecha_inicio)
     
     def _validate_date_range(self, fecha_inicio: date, fecha_fin: date) -> None:
         """
@@ -62,6 +123,7 @@ class ReportService:
         if fecha_fin < fecha_inicio:
             raise ValueError("fecha_fin debe ser posterior a fecha_inicio")
     
+    @lectura_registrada('reporte de inventario')
     def generate_inventory_report(
         self, 
         categoria_id: Optional[int] = None,
@@ -69,7 +131,11 @@ class ReportService:
         solo_con_stock: bool = False
     ) -> Dict[str, Any]:
         """
-        Genera reporte de inventario actual
+        Genera reporte de inventario actual o a una fecha de corte
+        
+        Para fechas anteriores a hoy el stock se obtiene del cierre de
+        inventario más cercano más los movimientos hasta la fecha de corte
+        (ver InventorySnapshotService).
         
         Args:
             categoria_id: Filtrar por categoría específica
@@ -91,8 +157,8 @@ class ReportService:
                     p.nombre,
                     c.nombre as categoria,
                     p.stock,
+                    p.stock_minimo,
                     p.costo,
-                    (p.stock * p.costo) as valor_total,
                     p.activo
                 FROM productos p
                 JOIN categorias c ON p.id_categoria = c.id_categoria
@@ -108,8 +174,19 @@ class ReportService:
                     params.append(categoria_id)
                     filters_applied['categoria_id'] = categoria_id
                 
-                if solo_con_stock:
+                historico = fecha_corte < date.today()
+                stock_historico = {}
+                origen = {'cierre': None, 'movimientos_aplicados': 0}
+                if historico:
+                    from services.inventory_snapshot_service import InventorySnapshotService
+                    stock_historico, origen = InventorySnapshotService(
+                        self._db()
+                    ).calcular_stock_a_fecha(fecha_corte)
+                    filters_applied['fecha_corte'] = fecha_corte.isoformat()
+                elif solo_con_stock:
                     query += " AND p.stock > 0"
+                
+                if solo_con_stock:
                     filters_applied['solo_con_stock'] = True
                     
                 query += " ORDER BY c.nombre, p.nombre"
@@ -120,24 +197,37 @@ class ReportService:
                 # Convertir a lista de diccionarios
                 data = []
                 total_productos = 0
-                total_valor = Decimal('0')
+                total_valor = Cost()
                 productos_con_stock = 0
                 
                 for row in rows:
+                    if historico:
+                        historial = stock_historico.get(row['id_producto'])
+                        if historial is None:
+                            continue  # Producto creado después de la fecha de corte
+                        stock = historial['stock']
+                        costo = Cost.desde(historial['costo'])
+                        if solo_con_stock and stock <= 0:
+                            continue
+                    else:
+                        stock = row['stock'] or 0
+                        costo = Cost.desde(row['costo'])
+                    
+                    valor_total = costo * int(stock)
                     item = {
                         'id_producto': row['id_producto'],
                         'nombre': row['nombre'],
                         'categoria': row['categoria'],
-                        'stock_actual': row['stock'],
-                        'costo_unitario': float(row['costo']),
-                        'valor_total': float(row['valor_total']),
-                        'stock_minimo': 5  # TODO: Implementar stock mínimo configurable
+                        'stock_actual': stock,
+                        'costo_unitario': float(costo),
+                        'valor_total': float(valor_total),
+                        'stock_minimo': row['stock_minimo'] or 0
                     }
                     data.append(item)
                     
                     total_productos += 1
-                    total_valor += Decimal(str(row['valor_total']))
-                    if row['stock'] > 0:
+                    total_valor += valor_total
+                    if stock > 0:
                         productos_con_stock += 1
                 
                 # Preparar resumen
@@ -146,7 +236,9 @@ class ReportService:
                     'productos_con_stock': productos_con_stock,
                     'productos_sin_stock': total_productos - productos_con_stock,
                     'valor_total_inventario': float(total_valor),
-                    'fecha_corte': fecha_corte.isoformat()
+                    'fecha_corte': fecha_corte.isoformat(),
+                    'cierre_base': origen['cierre'],
+                    'movimientos_aplicados': origen['movimientos_aplicados']
                 }
                 
                 return {
@@ -160,6 +252,7 @@ class ReportService:
             self.logger.error(f"Error generando reporte de inventario: {e}")
             raise
     
+    @lectura_registrada('reporte de movimientos')
     def generate_movements_report(
         self,
         fecha_inicio: date,
@@ -185,8 +278,10 @@ class ReportService:
         
         try:
             with self._get_connection() as conn:
+                movimientos = self._source_table(conn, 'movimientos', fecha_inicio)
+                
                 # Query base para movimientos
-                query = """
+                query = f"""
                 SELECT 
                     m.id_movimiento,
                     m.fecha_movimiento,
@@ -197,8 +292,9 @@ class ReportService:
                     m.responsable,
                     m.observaciones,
                     p.costo,
-                    (ABS(m.cantidad) * p.costo) as valor_movimiento
-                FROM movimientos m
+                    (ABS(m.cantidad) * p.costo) as valor_movimiento,
+                    ABS(m.cantidad) * {Cost.sql('p.costo')} as valor_diezmilesimas
+                FROM {movimientos} m
                 JOIN productos p ON m.id_producto = p.id_producto
                 JOIN categorias c ON p.id_categoria = c.id_categoria
                 WHERE DATE(m.fecha_movimiento) >= ? AND DATE(m.fecha_movimiento) <= ?
@@ -236,7 +332,7 @@ class ReportService:
                 total_movimientos = 0
                 entradas = 0
                 salidas = 0
-                valor_total_movimientos = Decimal('0')
+                valor_total_movimientos = 0
                 
                 for row in rows:
                     item = {
@@ -253,7 +349,7 @@ class ReportService:
                     data.append(item)
                     
                     total_movimientos += 1
-                    valor_total_movimientos += Decimal(str(row['valor_movimiento']))
+                    valor_total_movimientos += row['valor_diezmilesimas'] or 0
                     
                     if row['cantidad'] > 0:
                         entradas += abs(row['cantidad'])
@@ -265,7 +361,7 @@ class ReportService:
                     'total_movimientos': total_movimientos,
                     'total_entradas': entradas,
                     'total_salidas': salidas,
-                    'valor_total_movimientos': float(valor_total_movimientos),
+                    'valor_total_movimientos': float(Cost(valor_total_movimientos).a_centavos()),
                     'periodo': f"{fecha_inicio.isoformat()} - {fecha_fin.isoformat()}"
                 }
                 
@@ -281,6 +377,7 @@ class ReportService:
             self.logger.error(f"Error generando reporte de movimientos: {e}")
             raise
     
+    @lectura_registrada('reporte de ventas')
     def generate_sales_report(
         self,
         fecha_inicio: date,
@@ -306,8 +403,10 @@ class ReportService:
         
         try:
             with self._get_connection() as conn:
+                ventas = self._source_table(conn, 'ventas', fecha_inicio)
+                
                 # Query base para ventas
-                query = """
+                query = f"""
                 SELECT 
                     v.id_venta,
                     v.fecha_venta,
@@ -315,8 +414,11 @@ class ReportService:
                     v.subtotal,
                     v.impuestos,
                     v.total,
+                    {Money.sql('v.subtotal')} as subtotal_centavos,
+                    {Money.sql('v.impuestos')} as impuestos_centavos,
+                    {Money.sql('v.total')} as total_centavos,
                     v.responsable
-                FROM ventas v
+                FROM {ventas} v
                 LEFT JOIN clientes c ON v.id_cliente = c.id_cliente
                 WHERE DATE(v.fecha_venta) >= ? AND DATE(v.fecha_venta) <= ?
                 """
@@ -341,9 +443,10 @@ class ReportService:
                 
                 data = []
                 total_ventas = 0
-                subtotal_acumulado = Decimal('0')
-                impuestos_acumulados = Decimal('0')
-                total_acumulado = Decimal('0')
+                # Acumuladores en centavos enteros (exactos, sin Decimal por fila)
+                subtotal_acumulado = 0
+                impuestos_acumulados = 0
+                total_acumulado = 0
                 
                 for row in rows:
                     item = {
@@ -358,24 +461,20 @@ class ReportService:
                     data.append(item)
                     
                     total_ventas += 1
-                    # subtotal_acumulado += row['subtotal']
-                    # impuestos_acumulados += row['impuestos']
-                    # total_acumulado += row['total']
-
-                    subtotal_acumulado   += Decimal(str(row['subtotal']))
-                    impuestos_acumulados += Decimal(str(row['impuestos']))
-                    total_acumulado      += Decimal(str(row['total']))
+                    subtotal_acumulado   += row['subtotal_centavos'] or 0
+                    impuestos_acumulados += row['impuestos_centavos'] or 0
+                    total_acumulado      += row['total_centavos'] or 0
 
                 # Preparar totales y resumen
                 totals = {
-                    'subtotal_total': float(subtotal_acumulado),
-                    'impuestos_total': float(impuestos_acumulados),
-                    'gran_total': float(total_acumulado)
+                    'subtotal_total': float(Money(subtotal_acumulado)),
+                    'impuestos_total': float(Money(impuestos_acumulados)),
+                    'gran_total': float(Money(total_acumulado))
                 }
                 
                 summary = {
                     'total_ventas': total_ventas,
-                    'promedio_venta': float(total_acumulado / total_ventas) if total_ventas > 0 else 0,
+                    'promedio_venta': total_acumulado / total_ventas / Money.ESCALA if total_ventas > 0 else 0,
                     'periodo': f"{fecha_inicio.isoformat()} - {fecha_fin.isoformat()}"
                 }
                 
@@ -431,50 +530,74 @@ class ReportService:
         
         return grouped
     
+    # Agrupaciones del reporte de rentabilidad: (columnas clave, expresión GROUP BY)
+    PROFITABILITY_GROUPS = {
+        'product': ("p.id_producto AS producto_id, p.nombre AS producto_nombre, "
+                    "c.nombre AS categoria_nombre, p.nombre AS grupo", "p.id_producto"),
+        'category': ("c.id_categoria AS categoria_id, c.nombre AS categoria_nombre, "
+                     "c.nombre AS grupo", "c.id_categoria"),
+        'day': ("DATE(v.fecha_venta) AS grupo", "DATE(v.fecha_venta)"),
+        'month': ("strftime('%Y-%m', v.fecha_venta) AS grupo", "strftime('%Y-%m', v.fecha_venta)"),
+    }
+    
+    @lectura_registrada('reporte de rentabilidad')
     def generate_profitability_report(
         self,
         fecha_inicio: date,
         fecha_fin: date,
-        categoria_id: Optional[int] = None
+        categoria_id: Optional[int] = None,
+        group_by: str = 'product'
     ) -> Dict[str, Any]:
         """
         Genera reporte de rentabilidad por período
         
+        Usa el precio y el costo registrados en cada línea de venta
+        (detalle_ventas.costo_total se guarda al vender), por lo que el
+        resultado no cambia si luego se modifica el costo del producto.
+        Líneas anteriores al costeo por línea se valorizan con el costo
+        promedio actual y se cuentan en summary['lineas_sin_costo'].
+        
         Args:
             fecha_inicio: Fecha de inicio del período
             fecha_fin: Fecha de fin del período
             categoria_id: Filtrar por categoría específica
+            group_by: Agrupación ('product', 'category', 'day' o 'month')
             
         Returns:
             Dict con datos del reporte de rentabilidad
         """
         self._validate_date_range(fecha_inicio, fecha_fin)
         
+        if group_by not in self.PROFITABILITY_GROUPS:
+            raise ValueError(f"Agrupación no válida: {group_by}")
+        columnas, agrupacion = self.PROFITABILITY_GROUPS[group_by]
+        
         try:
             with self._get_connection() as conn:
-                # Query para calcular rentabilidad por producto
-                query = """
+                ventas = self._source_table(conn, 'ventas', fecha_inicio)
+                detalle_ventas = self._source_table(conn, 'detalle_ventas', fecha_inicio)
+                
+                # Un solo agregado sobre las líneas de venta del período
+                query = f"""
                 SELECT 
-                    p.id_producto,
-                    p.nombre as producto_nombre,
-                    c.nombre as categoria_nombre,
-                    SUM(ABS(m.cantidad)) as cantidad_vendida,
-                    SUM(ABS(m.cantidad) * p.precio) as ingresos_brutos,
-                    SUM(ABS(m.cantidad) * p.costo) as costo_total,
-                    (SUM(ABS(m.cantidad) * p.precio) - SUM(ABS(m.cantidad) * p.costo)) as ganancia_bruta,
-                    p.precio,
-                    p.costo
-                FROM movimientos m
-                JOIN productos p ON m.id_producto = p.id_producto
+                    {columnas},
+                    SUM(dv.cantidad) as cantidad_vendida,
+                    SUM({Money.sql('dv.subtotal_item')}) as ingresos_centavos,
+                    SUM(COALESCE({Cost.sql('dv.costo_total')},
+                                 dv.cantidad * {Cost.sql('COALESCE(p.costo_promedio, p.costo, 0)')})) as costo_diezmilesimas,
+                    SUM(dv.costo_total IS NULL) as lineas_sin_costo
+                FROM {ventas} v
+                JOIN {detalle_ventas} dv ON dv.id_venta = v.id_venta
+                JOIN productos p ON dv.id_producto = p.id_producto
                 JOIN categorias c ON p.id_categoria = c.id_categoria
-                WHERE m.tipo_movimiento = 'VENTA'
-                AND DATE(m.fecha_movimiento) >= ? AND DATE(m.fecha_movimiento) <= ?
+                WHERE v.fecha_venta >= ? AND v.fecha_venta < ?
                 """
                 
-                params = [fecha_inicio.isoformat(), fecha_fin.isoformat()]
+                params = [fecha_inicio.isoformat(), (fecha_fin + timedelta(days=1)).isoformat()]
                 filters_applied = {
                     'fecha_inicio': fecha_inicio.isoformat(),
-                    'fecha_fin': fecha_fin.isoformat()
+                    'fecha_fin': fecha_fin.isoformat(),
+                    'group_by': group_by
                 }
                 
                 if categoria_id:
@@ -482,47 +605,52 @@ class ReportService:
                     params.append(categoria_id)
                     filters_applied['categoria_id'] = categoria_id
                 
-                query += " GROUP BY p.id_producto ORDER BY ganancia_bruta DESC"
+                query += (f" GROUP BY {agrupacion} ORDER BY "
+                          f"ingresos_centavos * {Cost.ESCALA // Money.ESCALA} - costo_diezmilesimas DESC")
                 
                 cursor = conn.execute(query, params)
                 rows = cursor.fetchall()
                 
                 # Convertir a lista de diccionarios
                 data = []
-                total_ingresos = Decimal('0')
-                total_costos = Decimal('0')
-                total_ganancia = Decimal('0')
+                total_ingresos = Money()
+                total_costos = Money()
+                total_ganancia = Money()
+                lineas_sin_costo = 0
                 
                 for row in rows:
-                    ingresos = Decimal(str(row['ingresos_brutos']))
-                    costos = Decimal(str(row['costo_total']))
-                    ganancia = Decimal(str(row['ganancia_bruta']))
+                    ingresos = Money(row['ingresos_centavos'] or 0)
+                    costos = Cost(row['costo_diezmilesimas'] or 0).a_centavos()
+                    ganancia = ingresos - costos
                     
                     # Calcular margen de ganancia
                     margen_porcentaje = 0
                     if ingresos > 0:
-                        margen_porcentaje = float((ganancia / ingresos) * 100)
+                        margen_porcentaje = ganancia.unidades / ingresos.unidades * 100
                     
                     item = {
-                        'producto_id': row['id_producto'],
-                        'producto_nombre': row['producto_nombre'],
-                        'categoria_nombre': row['categoria_nombre'],
+                        key: row[key]
+                        for key in ('grupo', 'producto_id', 'producto_nombre', 'categoria_id', 'categoria_nombre')
+                        if key in row.keys()
+                    }
+                    item.update({
                         'cantidad_vendida': row['cantidad_vendida'],
                         'ingresos_brutos': float(ingresos),
                         'costo_total': float(costos),
                         'ganancia_bruta': float(ganancia),
                         'margen_porcentaje': round(margen_porcentaje, 2)
-                    }
+                    })
                     data.append(item)
                     
                     total_ingresos += ingresos
                     total_costos += costos
                     total_ganancia += ganancia
+                    lineas_sin_costo += row['lineas_sin_costo'] or 0
                 
                 # Calcular margen total
                 margen_total_porcentaje = 0
                 if total_ingresos > 0:
-                    margen_total_porcentaje = float((total_ganancia / total_ingresos) * 100)
+                    margen_total_porcentaje = total_ganancia.unidades / total_ingresos.unidades * 100
                 
                 # Preparar totales y resumen
                 totals = {
@@ -533,8 +661,9 @@ class ReportService:
                 }
                 
                 summary = {
-                    'productos_analizados': len(data),
-                    'periodo': f"{fecha_inicio.isoformat()} - {fecha_fin.isoformat()}"
+                    'productos_analizados' if group_by == 'product' else 'grupos_analizados': len(data),
+                    'periodo': f"{fecha_inicio.isoformat()} - {fecha_fin.isoformat()}",
+                    'lineas_sin_costo': lineas_sin_costo
                 }
                 
                 return {
@@ -612,11 +741,11 @@ class ReportService:
                 # Procesar datos
                 data = []
                 productos_agotados = 0
-                valor_reposicion_total = Decimal('0')
+                valor_reposicion_total = Cost()
                 
                 for row in rows:
                     cantidad_sugerida = max(0, row['cantidad_sugerida']) if row['cantidad_sugerida'] else 10
-                    valor_reposicion = cantidad_sugerida * Decimal(str(row['costo']))
+                    valor_reposicion = Cost.desde(row['costo']) * int(cantidad_sugerida)
                     
                     item = {
                         'producto_id': row['id_producto'],
@@ -654,6 +783,7 @@ class ReportService:
             self.logger.error(f"Error generando reporte de stock bajo: {e}")
             raise
     
+    @lectura_registrada('productos más vendidos')
     def generate_top_selling_products_report(
         self,
         fecha_inicio: date,
@@ -680,27 +810,31 @@ class ReportService:
         try:
             with self._get_connection() as conn:
                 # Ordenamiento dinámico
-                order_field = "cantidad_vendida" if order_by == 'quantity' else "ingresos_generados"
+                order_field = "cantidad_vendida" if order_by == 'quantity' else "ingresos_centavos"
+                ventas = self._source_table(conn, 'ventas', fecha_inicio)
+                detalle_ventas = self._source_table(conn, 'detalle_ventas', fecha_inicio)
                 
+                # Montos de cada línea de venta (como el reporte de rentabilidad),
+                # no el precio y costo actuales del producto
                 query = f"""
                 SELECT 
                     p.id_producto,
                     p.nombre as producto_nombre,
                     c.nombre as categoria_nombre,
-                    SUM(ABS(m.cantidad)) as cantidad_vendida,
-                    SUM(ABS(m.cantidad) * p.precio) as ingresos_generados,
-                    SUM(ABS(m.cantidad) * p.costo) as costo_total,
-                    (SUM(ABS(m.cantidad) * p.precio) - SUM(ABS(m.cantidad) * p.costo)) as ganancia_bruta,
+                    SUM(dv.cantidad) as cantidad_vendida,
+                    SUM({Money.sql('dv.subtotal_item')}) as ingresos_centavos,
+                    SUM(COALESCE({Cost.sql('dv.costo_total')},
+                                 dv.cantidad * {Cost.sql('COALESCE(p.costo_promedio, p.costo, 0)')})) as costo_diezmilesimas,
                     p.precio as precio_unitario,
-                    COUNT(DISTINCT DATE(m.fecha_movimiento)) as dias_con_ventas
-                FROM movimientos m
-                JOIN productos p ON m.id_producto = p.id_producto
+                    COUNT(DISTINCT DATE(v.fecha_venta)) as dias_con_ventas
+                FROM {ventas} v
+                JOIN {detalle_ventas} dv ON dv.id_venta = v.id_venta
+                JOIN productos p ON dv.id_producto = p.id_producto
                 JOIN categorias c ON p.id_categoria = c.id_categoria
-                WHERE m.tipo_movimiento = 'VENTA'
-                AND DATE(m.fecha_movimiento) >= ? AND DATE(m.fecha_movimiento) <= ?
+                WHERE v.fecha_venta >= ? AND v.fecha_venta < ?
                 """
                 
-                params = [fecha_inicio.isoformat(), fecha_fin.isoformat()]
+                params = [fecha_inicio.isoformat(), (fecha_fin + timedelta(days=1)).isoformat()]
                 filters_applied = {
                     'fecha_inicio': fecha_inicio.isoformat(),
                     'fecha_fin': fecha_fin.isoformat(),
@@ -721,17 +855,18 @@ class ReportService:
                 
                 # Procesar datos
                 data = []
-                total_ingresos = Decimal('0')
+                total_ingresos = Money()
                 total_cantidad = 0
                 
                 for row in rows:
-                    ingresos = Decimal(str(row['ingresos_generados']))
-                    ganancia = Decimal(str(row['ganancia_bruta']))
+                    ingresos = Money(row['ingresos_centavos'] or 0)
+                    costo_total = Cost(row['costo_diezmilesimas'] or 0).a_centavos()
+                    ganancia = ingresos - costo_total
                     
                     # Calcular margen de ganancia
                     margen_porcentaje = 0
                     if ingresos > 0:
-                        margen_porcentaje = float((ganancia / ingresos) * 100)
+                        margen_porcentaje = ganancia.unidades / ingresos.unidades * 100
                     
                     item = {
                         'producto_id': row['id_producto'],
@@ -739,7 +874,7 @@ class ReportService:
                         'categoria_nombre': row['categoria_nombre'],
                         'cantidad_vendida': row['cantidad_vendida'],
                         'ingresos_generados': float(ingresos),
-                        'costo_total': float(row['costo_total']),
+                        'costo_total': float(costo_total),
                         'ganancia_bruta': float(ganancia),
                         'margen_porcentaje': round(margen_porcentaje, 2),
                         'precio_unitario': float(row['precio_unitario']),
@@ -770,6 +905,7 @@ class ReportService:
             self.logger.error(f"Error generando reporte productos más vendidos: {e}")
             raise
     
+    @lectura_registrada('análisis de tendencias')
     def generate_trends_analysis_report(
         self,
         fecha_inicio: date,
@@ -813,14 +949,15 @@ class ReportService:
                 else:
                     raise ValueError(f"Tipo de período no válido: {period_type}")
                 
+                movimientos = self._source_table(conn, 'movimientos', fecha_inicio)
                 query = f"""
                 SELECT 
                     {date_format} as periodo,
                     SUM(ABS(m.cantidad)) as cantidad_vendida,
-                    SUM(ABS(m.cantidad) * p.precio) as ingresos_generados,
+                    SUM(ABS(m.cantidad) * {Money.sql('p.precio')}) as ingresos_centavos,
                     COUNT(DISTINCT m.id_movimiento) as numero_transacciones,
                     AVG(ABS(m.cantidad)) as promedio_cantidad_por_transaccion
-                FROM movimientos m
+                FROM {movimientos} m
                 JOIN productos p ON m.id_producto = p.id_producto
                 WHERE m.tipo_movimiento = 'VENTA'
                 AND DATE(m.fecha_movimiento) >= ? AND DATE(m.fecha_movimiento) <= ?
@@ -856,7 +993,7 @@ class ReportService:
                     item = {
                         'periodo': row['periodo'],
                         'cantidad_vendida': row['cantidad_vendida'],
-                        'ingresos_generados': float(row['ingresos_generados']),
+                        'ingresos_generados': float(Money(row['ingresos_centavos'] or 0)),
                         'numero_transacciones': row['numero_transacciones'],
                         'promedio_cantidad_transaccion': round(row['promedio_cantidad_por_transaccion'], 2),
                         'index': i
@@ -896,67 +1033,351 @@ class ReportService:
         if len(values) < 2:
             return {'direction': 'INSUFICIENTE_DATA', 'growth_rate': 0, 'correlation_coefficient': 0}
         
-        # Cálculo simple de tendencia
-        n = len(values)
-        x_values = list(range(n))
+        stats = self._compute_trend_statistics(np.asarray([values], dtype=np.float64))
+        
+        return {
+            'direction': str(stats['direction'][0]),
+            'growth_rate': round(float(stats['growth_rate'][0]), 2),
+            'correlation_coefficient': round(float(stats['correlation'][0]), 3)
+        }
+    
+    # Períodos por ciclo estacional según tipo de período
+    SEASON_LENGTHS = {'day': 7, 'week': 52, 'month': 12}
+    
+    TREND_RANK_FIELDS = ('slope', 'relative_slope', 'growth_rate')
+    
+    def _compute_trend_statistics(self, matrix: np.ndarray,
+                                  season_length: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula estadísticas de tendencia para cada fila de una matriz.
+        
+        Todas las operaciones son vectoriales sobre la matriz completa
+        (filas = series, columnas = períodos consecutivos).
+        
+        Args:
+            matrix: Matriz float64 de forma (series, períodos), períodos >= 2
+            season_length: Períodos por ciclo estacional (None para omitir)
+            
+        Returns:
+            Dict de arrays por fila: slope, relative_slope, correlation,
+            growth_rate, seasonality_strength, seasonal_peak y direction
+        """
+        rows, periods = matrix.shape
+        x = np.arange(periods, dtype=np.float64)
+        x_centered = x - x.mean()
+        sxx = float(x_centered @ x_centered)
         
-        # Correlación simple
-        mean_x = sum(x_values) / n
-        mean_y = sum(values) / n
+        means = matrix.mean(axis=1)
+        centered = matrix - means[:, None]
+        sxy = centered @ x_centered
+        syy = np.einsum('ij,ij->i', centered, centered)
         
-        numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(x_values, values))
-        denominator_x = sum((x - mean_x) ** 2 for x in x_values)
-        denominator_y = sum((y - mean_y) ** 2 for y in values)
+        # Pendiente por mínimos cuadrados y correlación de Pearson con el tiempo
+        slope = sxy / sxx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.where(syy > 0, sxy / np.sqrt(sxx * syy), 0.0)
+            relative_slope = np.where(means > 0, slope / means * 100, 0.0)
         
-        if denominator_x == 0 or denominator_y == 0:
-            correlation = 0
-        else:
-            correlation = numerator / (denominator_x * denominator_y) ** 0.5
+        # Crecimiento compuesto por período entre el primer y el último valor
+        first = matrix[:, 0]
+        last = matrix[:, -1]
+        growth_rate = np.zeros(rows)
+        has_base = first > 0
+        growth_rate[has_base] = (
+            (last[has_base] / first[has_base]) ** (1 / (periods - 1)) - 1
+        ) * 100
         
-        # Tasa de crecimiento promedio
-        if values[0] != 0:
-            growth_rate = ((values[-1] / values[0]) ** (1 / (n - 1)) - 1) * 100
-        else:
-            growth_rate = 0
+        # Estacionalidad: fracción de la varianza sin tendencia explicada por
+        # el perfil promedio de cada posición del ciclo
+        seasonality = np.zeros(rows)
+        seasonal_peak = np.full(rows, -1, dtype=np.int64)
+        if season_length and periods >= 2 * season_length:
+            cycles = periods // season_length
+            residuals = centered - slope[:, None] * x_centered
+            used = residuals[:, :cycles * season_length]
+            profile = used.reshape(rows, cycles, season_length).mean(axis=1)
+            residual_var = used.var(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                seasonality = np.where(residual_var > 0, profile.var(axis=1) / residual_var, 0.0)
+            seasonal_peak = np.where(seasonality > 0, profile.argmax(axis=1), -1)
         
-        # Dirección de tendencia
-        if correlation > 0.3:
-            direction = 'CRECIENTE'
-        elif correlation < -0.3:
-            direction = 'DECRECIENTE'
-        else:
-            direction = 'ESTABLE'
+        direction = np.where(
+            correlation > 0.3, 'CRECIENTE',
+            np.where(correlation < -0.3, 'DECRECIENTE', 'ESTABLE')
+        )
         
         return {
-            'direction': direction,
-            'growth_rate': round(growth_rate, 2),
-            'correlation_coefficient': round(correlation, 3)
+            'slope': slope,
+            'relative_slope': relative_slope,
+            'correlation': correlation,
+            'growth_rate': growth_rate,
+            'seasonality_strength': np.clip(seasonality, 0.0, 1.0),
+            'seasonal_peak': seasonal_peak,
+            'direction': direction
         }
     
+    def _build_period_axis(self, fecha_inicio: date, fecha_fin: date,
+                           period_type: str) -> Tuple[str, List[str], List[Any]]:
+        """
+        Construye la expresión SQL de índice de período y las etiquetas.
+        
+        Args:
+            fecha_inicio: Fecha de inicio
+            fecha_fin: Fecha de fin
+            period_type: 'day', 'week', 'month' o 'year'
+            
+        Returns:
+            Tupla (expresión SQL del índice 0..n-1, etiquetas, parámetros de la expresión)
+        """
+        if period_type == 'day':
+            days = (fecha_fin - fecha_inicio).days + 1
+            labels = [(fecha_inicio + timedelta(days=i)).isoformat() for i in range(days)]
+            expression = "CAST(julianday(fecha_movimiento) - julianday(?) AS INTEGER)"
+            return expression, labels, [fecha_inicio.isoformat()]
+        
+        if period_type == 'week':
+            week_start = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+            weeks = (fecha_fin - week_start).days // 7 + 1
+            labels = [(week_start + timedelta(weeks=i)).strftime('%Y-W%W') for i in range(weeks)]
+            expression = "CAST((julianday(fecha_movimiento) - julianday(?)) / 7 AS INTEGER)"
+            return expression, labels, [week_start.isoformat()]
+        
+        if period_type == 'month':
+            base = fecha_inicio.year * 12 + fecha_inicio.month - 1
+            months = fecha_fin.year * 12 + fecha_fin.month - 1 - base + 1
+            labels = [f"{(base + i) // 12}-{(base + i) % 12 + 1:02d}" for i in range(months)]
+            expression = (
+                "CAST(substr(fecha_movimiento, 1, 4) AS INTEGER) * 12 "
+                "+ CAST(substr(fecha_movimiento, 6, 2) AS INTEGER) - 1 - ?"
+            )
+            return expression, labels, [base]
+        
+        if period_type == 'year':
+            labels = [str(year) for year in range(fecha_inicio.year, fecha_fin.year + 1)]
+            expression = "CAST(substr(fecha_movimiento, 1, 4) AS INTEGER) - ?"
+            return expression, labels, [fecha_inicio.year]
+        
+        raise ValueError(f"Tipo de período no válido: {period_type}")
+    
+    def _build_sales_matrix(self, fecha_inicio: date, fecha_fin: date, period_type: str,
+                            categoria_id: Optional[int] = None
+                            ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Construye la matriz producto x período de unidades vendidas.
+        
+        Una sola consulta agrupada por período sobre movimientos VENTA; cada
+        fila trae los pares "id_producto,cantidad" del período concatenados,
+        que NumPy convierte sin crear un objeto Python por movimiento. Solo
+        aparecen productos con ventas en el rango.
+        
+        Args:
+            fecha_inicio: Fecha de inicio
+            fecha_fin: Fecha de fin
+            period_type: 'day', 'week', 'month' o 'year'
+            categoria_id: Filtrar por categoría (opcional)
+            
+        Returns:
+            Tupla (ids de producto, matriz float64, etiquetas de período)
+        """
+        expression, labels, expression_params = self._build_period_axis(
+            fecha_inicio, fecha_fin, period_type
+        )
+        
+        conn = self._get_connection()
+        movimientos = self._source_table(conn, 'movimientos', fecha_inicio)
+        
+        query = f"""
+            SELECT {expression} AS periodo,
+                   group_concat(id_producto || ',' || ABS(cantidad))
+            FROM {movimientos}
+            WHERE tipo_movimiento = 'VENTA'
+            AND fecha_movimiento >= ? AND fecha_movimiento < ?
+        """
+        params = expression_params + [
+            fecha_inicio.isoformat(), (fecha_fin + timedelta(days=1)).isoformat()
+        ]
+        
+        if categoria_id:
+            query += " AND id_producto IN (SELECT id_producto FROM productos WHERE id_categoria = ?)"
+            params.append(categoria_id)
+        
+        query += " GROUP BY periodo"
+        
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        periods, products, quantities = [], [], []
+        for period, packed in cursor.execute(query, params):
+            if not 0 <= period < len(labels):
+                continue
+            pairs = np.fromstring(packed, dtype=np.float64, sep=',').reshape(-1, 2)
+            periods.append(np.full(len(pairs), period, dtype=np.int64))
+            products.append(pairs[:, 0].astype(np.int64))
+            quantities.append(pairs[:, 1])
+        
+        if not periods:
+            return np.empty(0, dtype=np.int64), np.zeros((0, len(labels))), labels
+        
+        product_ids, row_index = np.unique(np.concatenate(products), return_inverse=True)
+        matrix = np.zeros((len(product_ids), len(labels)), dtype=np.float64)
+        np.add.at(matrix, (row_index, np.concatenate(periods)), np.concatenate(quantities))
+        
+        return product_ids, matrix, labels
+    
+    @lectura_registrada('tendencias por lote')
+    def generate_batch_trends_report(
+        self,
+        fecha_inicio: date,
+        fecha_fin: date,
+        period_type: str = 'month',
+        categoria_id: Optional[int] = None,
+        top_n: int = 10,
+        rank_by: str = 'slope',
+        min_total: float = 0,
+        include_all: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Genera análisis de tendencias de todos los productos en una pasada
+        
+        Equivale a llamar generate_trends_analysis_report por producto, pero
+        con una sola consulta agrupada y cálculos vectoriales sobre la matriz
+        producto x período.
+        
+        Args:
+            fecha_inicio: Fecha de inicio del análisis
+            fecha_fin: Fecha de fin del análisis
+            period_type: Tipo de período ('day', 'week', 'month', 'year')
+            categoria_id: Analizar solo una categoría
+            top_n: Cantidad de productos en top_risers y top_fallers
+            rank_by: Campo de ordenamiento ('slope', 'relative_slope', 'growth_rate')
+            min_total: Unidades vendidas mínimas para entrar en los rankings
+            include_all: Incluir en 'data' la tendencia de cada producto
+            
+        Returns:
+            Dict con data, top_risers, top_fallers, periods, summary,
+            generated_at y filters_applied
+        """
+        self._validate_date_range(fecha_inicio, fecha_fin)
+        if rank_by not in self.TREND_RANK_FIELDS:
+            raise ValueError(f"Campo de ordenamiento no válido: {rank_by}")
+        
+        try:
+            started = datetime.now()
+            product_ids, matrix, labels = self._build_sales_matrix(
+                fecha_inicio, fecha_fin, period_type, categoria_id
+            )
+            
+            filters_applied = {
+                'fecha_inicio': fecha_inicio.isoformat(),
+                'fecha_fin': fecha_fin.isoformat(),
+                'period_type': period_type,
+                'rank_by': rank_by
+            }
+            if categoria_id:
+                filters_applied['categoria_id'] = categoria_id
+            
+            if len(product_ids) == 0 or len(labels) < 2:
+                return {
+                    'data': [], 'top_risers': [], 'top_fallers': [], 'periods': labels,
+                    'summary': {'productos_analizados': 0, 'periodos_analizados': len(labels)},
+                    'generated_at': datetime.now(), 'filters_applied': filters_applied
+                }
+            
+            stats = self._compute_trend_statistics(matrix, self.SEASON_LENGTHS.get(period_type))
+            totals = matrix.sum(axis=1)
+            names = self._get_product_names(product_ids.tolist())
+            
+            def build_rows(indexes) -> List[Dict[str, Any]]:
+                slope = stats['slope'][indexes].tolist()
+                relative = stats['relative_slope'][indexes].tolist()
+                correlation = stats['correlation'][indexes].tolist()
+                growth = stats['growth_rate'][indexes].tolist()
+                seasonality = stats['seasonality_strength'][indexes].tolist()
+                peak = stats['seasonal_peak'][indexes].tolist()
+                direction = stats['direction'][indexes].tolist()
+                ids = product_ids[indexes].tolist()
+                total = totals[indexes].tolist()
+                return [
+                    {
+                        'id_producto': ids[i],
+                        'producto_nombre': names.get(ids[i], ''),
+                        'cantidad_vendida': int(total[i]),
+                        'slope': round(slope[i], 4),
+                        'relative_slope': round(relative[i], 2),
+                        'correlation_coefficient': round(correlation[i], 3),
+                        'growth_rate': round(growth[i], 2),
+                        'seasonality_strength': round(seasonality[i], 3),
+                        'seasonal_peak': labels[peak[i]] if peak[i] >= 0 else None,
+                        'direction': direction[i]
+                    }
+                    for i in range(len(ids))
+                ]
+            
+            # Rankings con argpartition (sin ordenar la matriz completa)
+            score = stats[rank_by]
+            eligible = np.flatnonzero(totals >= min_total)
+            count = min(top_n, len(eligible))
+            top_risers, top_fallers = [], []
+            if count > 0:
+                eligible_score = score[eligible]
+                risers = eligible[np.argpartition(-eligible_score, count - 1)[:count]]
+                fallers = eligible[np.argpartition(eligible_score, count - 1)[:count]]
+                risers = risers[np.argsort(-score[risers])]
+                fallers = fallers[np.argsort(score[fallers])]
+                top_risers = build_rows(risers[score[risers] > 0])
+                top_fallers = build_rows(fallers[score[fallers] < 0])
+            
+            directions = stats['direction']
+            summary = {
+                'productos_analizados': len(product_ids),
+                'periodos_analizados': len(labels),
+                'total_cantidad_vendida': int(totals.sum()),
+                'productos_crecientes': int(np.count_nonzero(directions == 'CRECIENTE')),
+                'productos_decrecientes': int(np.count_nonzero(directions == 'DECRECIENTE')),
+                'productos_estables': int(np.count_nonzero(directions == 'ESTABLE')),
+                'duracion_ms': round((datetime.now() - started).total_seconds() * 1000, 1)
+            }
+            
+            return {
+                'data': build_rows(np.arange(len(product_ids))) if include_all else [],
+                'top_risers': top_risers,
+                'top_fallers': top_fallers,
+                'periods': labels,
+                'summary': summary,
+                'generated_at': datetime.now(),
+                'filters_applied': filters_applied
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error generando tendencias por lote: {e}")
+            raise
+    
+    def _get_product_names(self, product_ids: List[int]) -> Dict[int, str]:
+        """Obtiene nombres de productos en una sola consulta"""
+        if not product_ids:
+            return {}
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = None
+        return dict(cursor.execute(
+            "SELECT id_producto, nombre FROM productos "
+            "WHERE id_producto IN (SELECT value FROM json_each(?))",
+            (json.dumps(product_ids),)
+        ).fetchall())
+    
     def _generate_predictions(self, data: List[Dict], periods: int, period_type: str) -> List[Dict]:
-        """Genera predicciones basadas en tendencia histórica"""
+        """Genera predicciones con suavizado exponencial doble sobre toda la serie"""
+        from services.replenishment_service import ReplenishmentService
+        
         predictions = []
         
         if len(data) < 2:
             return predictions
         
-        # Predicción lineal simple
         values = [item['cantidad_vendida'] for item in data]
-        n = len(values)
-        
-        # Calcular pendiente promedio
-        if n >= 2:
-            slope = (values[-1] - values[0]) / (n - 1)
-        else:
-            slope = 0
-        
-        # Generar predicciones
-        last_value = values[-1]
+        forecast = ReplenishmentService.pronosticar_serie(values, periods)
         last_period = data[-1]['periodo']
         
-        for i in range(1, periods + 1):
-            predicted_value = max(0, last_value + (slope * i))
-            
+        for i, predicted_value in enumerate(forecast, start=1):
             # Calcular próximo período
             next_period = self._get_next_period(last_period, i, period_type)
             
@@ -983,6 +1404,7 @@ class ReportService:
         # Para otros tipos, implementación básica
         return f"{last_period}+{increment}"
     
+    @lectura_registrada('movimientos detallados')
     def generate_detailed_movements_report(
         self,
         fecha_inicio: date,
@@ -1008,8 +1430,10 @@ class ReportService:
         
         try:
             with self._get_connection() as conn:
+                movimientos = self._source_table(conn, 'movimientos', fecha_inicio)
+                
                 # Query base expandida (ajustada al schema real)
-                query = """
+                query = f"""
                 SELECT 
                     m.id_movimiento,
                     m.fecha_movimiento,
@@ -1025,7 +1449,7 @@ class ReportService:
                     p.costo,
                     (ABS(m.cantidad) * COALESCE(m.costo_unitario, p.costo)) as valor_costo,
                     (ABS(m.cantidad) * p.precio) as valor_precio
-                FROM movimientos m
+                FROM {movimientos} m
                 JOIN productos p ON m.id_producto = p.id_producto
                 JOIN categorias c ON p.id_categoria = c.id_categoria
                 WHERE DATE(m.fecha_movimiento) >= ? AND DATE(m.fecha_movimiento) <= ?
@@ -1136,10 +1560,11 @@ class ReportService:
     def _get_sale_details(self, conn: sqlite3.Connection, id_venta: str) -> Optional[Dict[str, Any]]:
         """Obtiene detalles de venta por ID de venta"""
         try:
-            # Buscar venta por ID
-            cursor = conn.execute("""
+            # Buscar venta por ID (también entre las archivadas)
+            ventas = self._source_table(conn, 'ventas')
+            cursor = conn.execute(f"""
                 SELECT id_venta, numero_factura, fecha_venta, total, responsable
-                FROM ventas 
+                FROM {ventas} 
                 WHERE id_venta = ?
             """, [id_venta])
             
@@ -1179,25 +1604,25 @@ class ReportService:
                 stats['productos_con_stock'] = cursor.fetchone()['total']
                 
                 # Valor total del inventario
-                cursor = conn.execute("""
-                    SELECT SUM(stock * costo) as valor_total 
+                cursor = conn.execute(f"""
+                    SELECT SUM(stock * {Cost.sql('costo')}) as valor_total 
                     FROM productos p
                     JOIN categorias c ON p.id_categoria = c.id_categoria
                     WHERE p.activo = 1 AND c.tipo = 'MATERIAL'
                 """)
                 valor_total = cursor.fetchone()['valor_total']
-                stats['valor_total_inventario'] = float(valor_total) if valor_total else 0
+                stats['valor_total_inventario'] = float(Cost(valor_total).a_centavos()) if valor_total else 0
                 
                 # Ventas del mes actual
                 primer_dia_mes = date.today().replace(day=1)
-                cursor = conn.execute("""
-                    SELECT COUNT(*) as total, SUM(total) as suma
+                cursor = conn.execute(f"""
+                    SELECT COUNT(*) as total, SUM({Money.sql('total')}) as suma
                     FROM ventas 
                     WHERE DATE(fecha_venta) >= ?
                 """, [primer_dia_mes.isoformat()])
                 row = cursor.fetchone()
                 stats['ventas_mes_actual'] = row['total']
-                stats['ingresos_mes_actual'] = float(row['suma']) if row['suma'] else 0
+                stats['ingresos_mes_actual'] = float(Money(row['suma'])) if row['suma'] else 0
                 
                 # Productos más vendidos (usando nuevo método)
                 try:
@@ -9,10 +9,12 @@ ARQUITECTURA LIMPIA:
 """
 
 from typing import Optional, List, Dict, Any
-from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
+from db.change_notifier import change_notifier
 from models.venta import Venta
 from models.producto import Producto
+from models.money import Cost, Money
+from services.cost_service import CostService
 
 
 class SalesService:
@@ -27,7 +29,8 @@ class SalesService:
     - Registrar movimientos
     """
     
-    def __init__(self, db_connection, product_service=None, inventory_service=None, client_service=None):
+    def __init__(self, db_connection, product_service=None, inventory_service=None, client_service=None,
+                 cost_service=None):
         """
         Inicializar servicio con sus dependencias.
         
@@ -36,11 +39,13 @@ class SalesService:
             product_service: Servicio de productos
             inventory_service: Servicio de inventario
             client_service: Servicio de clientes
+            cost_service: Servicio de costeo (opcional, se crea uno si no se pasa)
         """
         self.db = db_connection
         self.product_service = product_service
         self.inventory_service = inventory_service
         self.client_service = client_service
+        self.cost_service = cost_service or CostService(db_connection)
     
     def create_sale(self, responsable: str, id_cliente: Optional[int] = None) -> Venta:
         """
@@ -134,49 +139,72 @@ class SalesService:
             if precio_unitario < 0:
                 raise ValueError("El precio unitario no puede ser negativo")
         
-        # Calcular subtotal del item
-        precio_decimal = Decimal(str(precio_unitario)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        subtotal_item = precio_decimal * cantidad
+        # Calcular subtotal e impuesto del item en centavos
+        precio = Money.desde(precio_unitario)
+        subtotal_item = precio * cantidad
+        impuesto_item = subtotal_item.porcentaje(producto.tasa_impuesto)
         
-        # Calcular impuesto del item
-        tasa_impuesto = Decimal(str(producto.tasa_impuesto)) / 100
-        impuesto_item = (subtotal_item * tasa_impuesto).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        
-        # Agregar detalle de venta
         # Manejo robusto de diferentes tipos de conexión DB
         conn = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, subtotal_item, impuesto_item)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (id_venta, id_producto, cantidad, float(precio_decimal), float(subtotal_item), float(impuesto_item)))
         
-        # Actualizar stock si es producto MATERIAL
-        if categoria_tipo == 'MATERIAL':
-            nuevo_stock = producto.stock - cantidad
-            cursor.execute(
-                "UPDATE productos SET stock = ? WHERE id_producto = ?",
-                (nuevo_stock, id_producto)
-            )
+        try:
+            # Costo de venta al momento de vender: capas de inventario para
+            # MATERIAL, costo del producto para SERVICIO
+            if categoria_tipo == 'MATERIAL':
+                costo_unitario, costo_total = self.cost_service.registrar_salida(id_producto, cantidad)
+            else:
+                costo = Cost.desde(producto.costo)
+                costo_unitario, costo_total = costo.decimal(), (costo * cantidad).decimal()
             
-            # Registrar movimiento de inventario
+            # Agregar detalle de venta
             cursor.execute("""
-                INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, id_venta, observaciones)
-                VALUES (?, 'VENTA', ?, ?, ?, ?)
-            """, (id_producto, cantidad, venta.responsable, id_venta, f"Venta #{id_venta}"))
+                INSERT INTO detalle_ventas (
+                    id_venta, id_producto, cantidad, precio_unitario, subtotal_item, impuesto_item,
+                    costo_unitario, costo_total
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (id_venta, id_producto, cantidad, float(precio), float(subtotal_item),
+                  float(impuesto_item), float(costo_unitario), float(costo_total)))
+            id_detalle = cursor.lastrowid
+            
+            # Actualizar stock si es producto MATERIAL
+            if categoria_tipo == 'MATERIAL':
+                nuevo_stock = producto.stock - cantidad
+                cursor.execute(
+                    "UPDATE productos SET stock = ? WHERE id_producto = ?",
+                    (nuevo_stock, id_producto)
+                )
+                
+                # Registrar movimiento de inventario
+                cursor.execute("""
+                    INSERT INTO movimientos (
+                        id_producto, tipo_movimiento, cantidad, cantidad_anterior, cantidad_nueva,
+                        responsable, id_venta, observaciones, costo_unitario
+                    )
+                    VALUES (?, 'VENTA', ?, ?, ?, ?, ?, ?, ?)
+                """, (id_producto, cantidad, producto.stock, nuevo_stock, venta.responsable,
+                      id_venta, f"Venta #{id_venta}", float(costo_unitario)))
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         
-        conn.commit()
+        if categoria_tipo == 'MATERIAL':
+            change_notifier.publicar_productos(conn, [id_producto])
         
         # Recalcular totales de la venta
         self._recalculate_sale_totals(id_venta)
         
         return {
-            'id_detalle': cursor.lastrowid,
+            'id_detalle': id_detalle,
             'producto': producto.nombre,
             'cantidad': cantidad,
-            'precio_unitario': float(precio_decimal),
+            'precio_unitario': float(precio),
             'subtotal_item': float(subtotal_item),
-            'impuesto_item': float(impuesto_item)
+            'impuesto_item': float(impuesto_item),
+            'costo_total': float(costo_total)
         }
     
     def get_sale_by_id(self, id_venta: int) -> Optional[Venta]:
@@ -250,15 +278,16 @@ class SalesService:
         # Manejo robusto de diferentes tipos de conexión DB
         conn = self.db.get_connection() if hasattr(self.db, 'get_connection') else self.db
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COALESCE(SUM(subtotal_item), 0), COALESCE(SUM(impuesto_item), 0)
+        # Suma exacta en centavos (SUM de REAL acumula error binario)
+        cursor.execute(f"""
+            SELECT COALESCE(SUM({Money.sql('subtotal_item')}), 0), COALESCE(SUM({Money.sql('impuesto_item')}), 0)
             FROM detalle_ventas
             WHERE id_venta = ?
         """, (id_venta,))
         
         result = cursor.fetchone()
-        subtotal = Decimal(str(result[0])).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        impuestos = Decimal(str(result[1])).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        subtotal = Money(result[0])
+        impuestos = Money(result[1])
         total = subtotal + impuestos
         
         # Actualizar totales en la venta
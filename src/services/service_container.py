@@ -563,6 +563,23 @@ def get_container(name: str = "main") -> ServiceContainer:
         return _global_container
 
 
+def _module_available(*module_names: str) -> bool:
+    """
+    Verificar que los módulos se pueden importar, sin importarlos.
+    
+    Args:
+        module_names: Nombres de módulo (por ejemplo 'services.label_service', 'reportlab')
+        
+    Returns:
+        True si todos los módulos se encuentran
+    """
+    import importlib.util
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in module_names)
+    except (ImportError, ValueError):
+        return False
+
+
 def setup_default_container() -> ServiceContainer:
     """
     Configurar el container por defecto con los servicios del sistema.
@@ -578,9 +595,15 @@ def setup_default_container() -> ServiceContainer:
         from services.category_service import CategoryService
         from services.product_service import ProductService
         from services.client_service import ClientService
+        from services.client_search_service import ClientSearchService
         from services.sales_service import SalesService
+        from services.cost_service import CostService
         from services.movement_service import MovementService
-        from services.report_service import ReportService
+        from services.receipt_import_service import ReceiptImportService
+        from services.inventory_snapshot_service import InventorySnapshotService
+        from services.archive_service import ArchiveService
+        from services.integrity_service import IntegrityService
+        from services.sync_service import SyncService
         from services.user_service import UserService
         
         # Registrar base de datos
@@ -610,20 +633,78 @@ def setup_default_container() -> ServiceContainer:
         )
         
         container.register(
-            'sales_service',
-            lambda c: SalesService(c.get('database')),
+            'client_search_service',
+            lambda c: ClientSearchService(c.get('database')),
+            dependencies=['database']
+        )
+        
+        container.register(
+            'cost_service',
+            lambda c: CostService(c.get('database')),
             dependencies=['database']
         )
         
+        container.register(
+            'sales_service',
+            lambda c: SalesService(c.get('database'), cost_service=c.get('cost_service')),
+            dependencies=['database', 'cost_service']
+        )
+        
         container.register(
             'movement_service',
-            lambda c: MovementService(c.get('database')),
+            lambda c: MovementService(c.get('database'), c.get('cost_service')),
+            dependencies=['database', 'cost_service']
+        )
+        
+        container.register(
+            'receipt_import_service',
+            lambda c: ReceiptImportService(c.get('database'), c.get('movement_service')),
+            dependencies=['database', 'movement_service']
+        )
+        
+        def create_replenishment_service(c):
+            # Importado en el primer uso: carga numpy
+            from services.replenishment_service import ReplenishmentService
+            return ReplenishmentService(c.get('database'))
+        
+        container.register(
+            'replenishment_service',
+            create_replenishment_service,
+            dependencies=['database']
+        )
+        
+        container.register(
+            'inventory_snapshot_service',
+            lambda c: InventorySnapshotService(c.get('database')),
+            dependencies=['database']
+        )
+        
+        container.register(
+            'archive_service',
+            lambda c: ArchiveService(c.get('database')),
+            dependencies=['database']
+        )
+        
+        container.register(
+            'integrity_service',
+            lambda c: IntegrityService(c.get('database')),
             dependencies=['database']
         )
         
+        container.register(
+            'sync_service',
+            lambda c: SyncService(c.get('database')),
+            dependencies=['database']
+        )
+        
+        def create_report_service(c):
+            # Importado en el primer uso: carga numpy
+            from services.report_service import ReportService
+            return ReportService(c.get('database'))
+        
         container.register(
             'report_service',
-            lambda c: ReportService(c.get('database')),
+            create_report_service,
             dependencies=['database']
         )
         
@@ -649,25 +730,28 @@ def setup_default_container() -> ServiceContainer:
             pass
         
         # Registrar servicios opcionales si están disponibles
-        try:
-            from services.label_service import LabelService
+        # (importados en el primer uso: cargan reportlab, PIL y python-barcode)
+        if _module_available('services.label_service', 'barcode', 'reportlab', 'PIL'):
+            def create_label_service(c):
+                from services.label_service import LabelService
+                return LabelService(category_service=c.get('category_service'))  # Con dependency injection
+            
             container.register(
                 'label_service',
-                lambda c: LabelService(category_service=c.get('category_service')),  # Con dependency injection
+                create_label_service,
                 dependencies=['category_service']
             )
-        except ImportError:
-            pass
         
-        try:
-            from services.barcode_service import BarcodeService
+        if _module_available('services.barcode_service', 'barcode', 'PIL'):
+            def create_barcode_service(c):
+                from services.barcode_service import BarcodeService
+                return BarcodeService()
+            
             container.register(
                 'barcode_service',
-                lambda c: BarcodeService(),
+                create_barcode_service,
                 dependencies=[]
             )
-        except ImportError:
-            pass
         
         # Registrar TicketService - CORREGIDO
         try:
@@ -679,12 +763,25 @@ def setup_default_container() -> ServiceContainer:
             )
         except ImportError:
             pass
-        
+
+        # Registrar TicketRenderService - PDFs de tickets en segundo plano
+        try:
+            from services.ticket_render_service import TicketRenderService
+            container.register(
+                'ticket_render_service',
+                lambda c: TicketRenderService(c.get('database')),
+                dependencies=['database']
+            )
+        except ImportError:
+            pass
+
         # SPRINT 2: Registrar ExportService - Sistema de exportación
         # CORRECCIÓN CRÍTICA: Manejo robusto de errores con validación específica
         try:
-            # Validar que el módulo se puede importar
-            from services.export_service import ExportService
+            # Validar que el módulo existe sin importarlo: ExportService carga
+            # openpyxl y reportlab, que se importan en el primer uso
+            if not _module_available('services.export_service'):
+                raise ImportError("No module named 'services.export_service'")
             
             # Validar que las dependencias están disponibles
             required_deps = ['movement_service', 'report_service']
@@ -698,6 +795,8 @@ def setup_default_container() -> ServiceContainer:
             # Registrar ExportService con factory que valida dependencias
             def create_export_service(c):
                 try:
+                    from services.export_service import ExportService
+                    
                     movement_service = c.get('movement_service')
                     report_service = c.get('report_service')
                     
@@ -706,10 +805,17 @@ def setup_default_container() -> ServiceContainer:
                     if not report_service:
                         raise ValueError("ReportService no disponible para ExportService")
                     
-                    return ExportService(
+                    export_service = ExportService(
                         movement_service=movement_service,
                         report_service=report_service
                     )
+                    
+                    # Verificar que tiene método crítico para tickets
+                    if not hasattr(export_service, 'generate_entry_ticket'):
+                        raise ServiceRegistrationError(
+                            "ExportService no tiene método generate_entry_ticket requerido"
+                        )
+                    return export_service
                 except Exception as create_error:
                     logging.getLogger("ServiceContainer").error(
                         f"❌ Error creando instancia ExportService: {create_error}"
@@ -724,19 +830,8 @@ def setup_default_container() -> ServiceContainer:
                 dependencies=required_deps
             )
             
-            # Verificar que el registro fue exitoso
-            test_service = container.get('export_service')
-            if not test_service:
-                raise ServiceRegistrationError("ExportService se registró pero get() retorna None")
-            
-            # Verificar que tiene método crítico para tickets
-            if not hasattr(test_service, 'generate_entry_ticket'):
-                raise ServiceRegistrationError(
-                    "ExportService no tiene método generate_entry_ticket requerido"
-                )
-            
             logging.getLogger("ServiceContainer").info(
-                "✅ ExportService registrado y validado exitosamente en container"
+                "✅ ExportService registrado en container (se crea en el primer uso)"
             )
             
         except ImportError as e:
@@ -824,6 +919,9 @@ def setup_default_container() -> ServiceContainer:
 def cleanup_container() -> None:
     """
     Cleanup del container global.
+    
+    También detiene el gestor de checkpoints y vacía la cola del logging
+    asíncrono antes del cierre.
     """
     global _global_container
     
@@ -831,6 +929,14 @@ def cleanup_container() -> None:
         if _global_container is not None:
             _global_container.cleanup()
             _global_container = None
+    
+    # Detener el gestor de checkpoints del WAL
+    from db.wal_checkpoint import checkpoint_manager
+    checkpoint_manager.detener()
+    
+    # Vaciar la cola del logging asíncrono (lo que siga se escribe en modo síncrono)
+    from helpers.async_logging import async_logging
+    async_logging.detener()
 
 
 # Decorador para inyección automática de dependencias
@@ -0,0 +1,682 @@
+"""
+Servicio de sincronización entre terminales por registro de cambios.
+
+Los triggers del schema v12 registran en `cambios` cada INSERT, UPDATE y
+DELETE de categorías, clientes, productos, ventas y movimientos con su
+nodo de origen, fecha (UTC, milisegundos) y la fila completa en JSON. La
+versión de un nodo es el id_cambio más alto de su registro. Solo registran
+con [sync] enabled (configurar_registro, schema v15).
+
+Protocolo (pull): un nodo pide a otro los cambios posteriores a la última
+versión que recibió de él (obtener_cambios), los aplica en una transacción
+(aplicar_cambios), guarda la nueva versión en sync_pares y le confirma al
+otro nodo lo aplicado (confirmar_recibido, POST /sync/ack). El costo es
+proporcional a los cambios: la consulta recorre `cambios` por su clave
+primaria desde esa versión.
+
+Identidad de las filas: los ids son locales de cada base. Una fila viaja
+como [nodo, id] del nodo que la creó; sync_identidades traduce las filas
+y claves foráneas recibidas a ids locales. Categorías (nombre y tipo) y
+clientes (RUC) se unen por clave natural con la fila local equivalente.
+
+Reglas de conflicto:
+- Catálogos y ventas: gana la escritura más reciente por fila (fecha y,
+  a igual fecha, nodo), comparada con el último cambio registrado de la
+  fila local.
+- Stock: libro de movimientos. Cada movimiento remoto se inserta una sola
+  vez y suma al stock local su diferencia cantidad_nueva - cantidad_anterior;
+  el stock y el costo promedio de productos nunca se copian de otro nodo
+  (salvo el stock inicial de un producto nuevo). Los UPDATE y DELETE de
+  movimientos no se aplican.
+
+Fuera de alcance: detalle de ventas, capas de costo y tickets siguen
+siendo locales de cada terminal.
+
+Autor: Sistema de Inventario
+Fecha: 2025-08-03
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db.database import COLUMNAS_DERIVADAS, DatabaseConnection
+
+
+# TABLAS_SINCRONIZADAS de db.database -> clave primaria, claves foráneas
+# (columna -> tabla), clave natural y si es un libro (solo INSERT, suma al stock)
+TABLAS = {
+    'categorias': {'clave': 'id_categoria', 'foraneas': {}, 'natural': ('nombre', 'tipo'), 'libro': False},
+    'clientes': {'clave': 'id_cliente', 'foraneas': {}, 'natural': ('ruc',), 'libro': False},
+    'productos': {'clave': 'id_producto', 'foraneas': {'id_categoria': 'categorias'}, 'natural': (),
+                  'libro': False},
+    'ventas': {'clave': 'id_venta', 'foraneas': {'id_cliente': 'clientes'}, 'natural': (), 'libro': False},
+    'movimientos': {'clave': 'id_movimiento', 'foraneas': {'id_producto': 'productos', 'id_venta': 'ventas'},
+                    'natural': (), 'libro': True},
+}
+
+# Parámetros por consulta IN (límite de variables de SQLite)
+LOTE_IN = 500
+
+
+class ClienteSyncHttp:
+    """
+    Fuente de cambios remota: los endpoints /api/v1/sync de otra instancia.
+
+    Expone la misma interfaz que SyncService (info, obtener_cambios,
+    confirmar_recibido) para que SyncService.sincronizar acepte un par
+    remoto o uno local.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        """
+        Args:
+            url: URL base de la API del par (p.ej. http://127.0.0.1:8001)
+            timeout: Segundos por solicitud
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def info(self) -> Dict[str, Any]:
+        return self._solicitar('/api/v1/sync/info')
+
+    def obtener_cambios(self, desde: int, limite: int, nodo: Optional[str] = None) -> Dict[str, Any]:
+        parametros = {'since': desde, 'limit': limite}
+        if nodo:
+            parametros['node'] = nodo
+        return self._solicitar(f"/api/v1/sync/changes?{urllib.parse.urlencode(parametros)}")
+
+    def confirmar_recibido(self, nodo: str, hasta: int) -> Dict[str, Any]:
+        return self._solicitar('/api/v1/sync/ack', {'nodo': nodo, 'hasta': hasta})
+
+    def _solicitar(self, ruta: str, cuerpo_post: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        solicitud = urllib.request.Request(f"{self.url}{ruta}")
+        if cuerpo_post is not None:
+            solicitud.data = json.dumps(cuerpo_post).encode('utf-8')
+            solicitud.add_header('Content-Type', 'application/json')
+        with urllib.request.urlopen(solicitud, timeout=self.timeout) as respuesta:
+            cuerpo = json.loads(respuesta.read().decode('utf-8'))
+        if cuerpo.get('status') != 'success':
+            raise ValueError(cuerpo.get('message', f"Respuesta inválida de {self.url}"))
+        return cuerpo['data']
+
+
+class SyncService:
+    """
+    Servicio de sincronización por registro de cambios (CDC).
+
+    Cada instancia trabaja sobre una conexión; la sincronización en
+    background usa una conexión propia.
+    """
+
+    # Ajustes de [sync] en config.ini (ver configurar_desde_ini)
+    habilitado = False
+    pares: Tuple[str, ...] = ()
+    intervalo_segundos = 60.0
+    tamano_lote = 500
+    horas_compactacion = 24.0
+
+    def __init__(self, db_connection):
+        """
+        Inicializar servicio de sincronización.
+
+        Args:
+            db_connection: Conexión a base de datos
+        """
+        self.db = db_connection
+        self.logger = logging.getLogger(__name__)
+        self._columnas: Dict[str, Dict[str, bool]] = {}
+        self._nodo: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    @classmethod
+    def configurar_desde_ini(cls, config) -> None:
+        """
+        Configurar desde la sección [sync] de un ConfigParser.
+
+        Claves: enabled, peers (URLs separadas por coma), interval_s,
+        batch_size, compact_hours. Los valores inválidos se ignoran con una
+        advertencia.
+
+        Args:
+            config: configparser.ConfigParser ya leído
+        """
+        if not config.has_section('sync'):
+            return
+        logger = logging.getLogger(__name__)
+        try:
+            cls.habilitado = config.getboolean('sync', 'enabled', fallback=cls.habilitado)
+            pares = config.get('sync', 'peers', fallback='')
+            cls.pares = tuple(url.strip() for url in pares.split(',') if url.strip())
+            cls.intervalo_segundos = max(1.0, config.getfloat('sync', 'interval_s', fallback=cls.intervalo_segundos))
+            cls.tamano_lote = max(1, config.getint('sync', 'batch_size', fallback=cls.tamano_lote))
+            cls.horas_compactacion = max(0.0, config.getfloat('sync', 'compact_hours',
+                                                              fallback=cls.horas_compactacion))
+        except ValueError as e:
+            logger.warning(f"[sync] valor inválido ignorado: {e}")
+
+    def configurar_registro(self) -> bool:
+        """
+        Activar el registro de cambios solo si [sync] está habilitado.
+
+        Returns:
+            True si el registro se activó o desactivó
+        """
+        cambio = self.db.set_change_logging(self.habilitado)
+        if cambio:
+            estado = 'activado' if self.habilitado else 'desactivado'
+            self.logger.info(f"Registro de cambios {estado}")
+        return cambio
+
+    # ==================== PROTOCOLO ====================
+
+    def nodo_local(self) -> str:
+        """Identificador de este nodo (generado al migrar al schema v12)."""
+        if self._nodo is None:
+            self._nodo = self.db.get_connection().execute(
+                "SELECT nodo FROM sync_contexto WHERE id = 1"
+            ).fetchone()[0]
+        return self._nodo
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Estado de sincronización del nodo.
+
+        Returns:
+            Nodo, versión actual y pares conocidos con las versiones recibidas y entregadas
+        """
+        conn = self.db.get_connection()
+        version = conn.execute("SELECT COALESCE(MAX(id_cambio), 0) FROM cambios").fetchone()[0]
+        pares = conn.execute(
+            "SELECT nodo, url, recibido_hasta, entregado_hasta, fecha_sync FROM sync_pares ORDER BY nodo"
+        ).fetchall()
+        return {
+            'nodo': self.nodo_local(),
+            'version': version,
+            'pares': [dict(par) for par in pares],
+        }
+
+    def obtener_cambios(self, desde: int = 0, limite: Optional[int] = None,
+                        nodo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Cambios posteriores a una versión, con identidades globales.
+
+        Los cambios originados en el nodo que los pide no se envían. Solo
+        lee: lo que el par aplicó se registra con confirmar_recibido.
+
+        Args:
+            desde: Última versión de este nodo ya aplicada por quien pide
+            limite: Máximo de cambios (None = tamano_lote)
+            nodo: Nodo que pide los cambios
+
+        Returns:
+            {nodo, desde, hasta, version, mas, cambios}; cada cambio con
+            version, tabla, operacion, origen, fecha, fila ([nodo, id]) y
+            datos (claves foráneas como [nodo, id])
+
+        Raises:
+            ValueError: Si `nodo` es este mismo nodo
+        """
+        limite = max(1, int(limite or self.tamano_lote))
+        local = self.nodo_local()
+        if nodo == local:
+            raise ValueError("El par tiene el mismo identificador de nodo (¿copia de esta base?)")
+
+        conn = self.db.get_connection()
+
+        # Versión leída antes que las filas: lo que se escriba mientras tanto
+        # queda para la próxima solicitud
+        version = conn.execute("SELECT COALESCE(MAX(id_cambio), 0) FROM cambios").fetchone()[0]
+        filas = conn.execute("""
+            SELECT id_cambio, tabla, id_fila, operacion, origen, fecha, datos
+            FROM cambios
+            WHERE id_cambio > ? AND id_cambio <= ? AND origen <> ?
+            ORDER BY id_cambio
+            LIMIT ?
+        """, (desde, version, nodo or '', limite + 1)).fetchall()
+        mas = len(filas) > limite
+        filas = filas[:limite]
+        hasta = filas[-1]['id_cambio'] if mas else max(desde, version)
+
+        # Ids locales a traducir, por tabla
+        ids: Dict[str, set] = {tabla: set() for tabla in TABLAS}
+        datos_filas = []
+        for fila in filas:
+            datos = json.loads(fila['datos']) if fila['datos'] else None
+            datos_filas.append(datos)
+            ids[fila['tabla']].add(fila['id_fila'])
+            if datos:
+                for columna, referida in TABLAS[fila['tabla']]['foraneas'].items():
+                    if datos.get(columna) is not None:
+                        ids[referida].add(datos[columna])
+        identidades = {tabla: self._identidades_globales(conn, tabla, valores)
+                       for tabla, valores in ids.items() if valores}
+
+        cambios = []
+        for fila, datos in zip(filas, datos_filas):
+            tabla = fila['tabla']
+            definicion = TABLAS[tabla]
+            if datos:
+                datos.pop(definicion['clave'], None)
+                for columna, referida in definicion['foraneas'].items():
+                    if datos.get(columna) is not None:
+                        datos[columna] = identidades[referida][datos[columna]]
+            cambios.append({
+                'version': fila['id_cambio'],
+                'tabla': tabla,
+                'operacion': fila['operacion'],
+                'origen': fila['origen'],
+                'fecha': fila['fecha'],
+                'fila': identidades[tabla][fila['id_fila']],
+                'datos': datos,
+            })
+
+        return {'nodo': local, 'desde': desde, 'hasta': hasta, 'version': version, 'mas': mas, 'cambios': cambios}
+
+    def confirmar_recibido(self, nodo: str, hasta: int) -> Dict[str, Any]:
+        """
+        Registrar que un par ya aplicó los cambios de este nodo hasta una versión.
+
+        compactar elimina los cambios que recibieron todos los pares conocidos.
+
+        Args:
+            nodo: Nodo del par
+            hasta: Última versión de este nodo aplicada por el par
+
+        Returns:
+            {nodo, entregado_hasta} tras registrar
+
+        Raises:
+            ValueError: Si `nodo` es este mismo nodo
+        """
+        if nodo == self.nodo_local():
+            raise ValueError("El par tiene el mismo identificador de nodo (¿copia de esta base?)")
+        conn = self.db.get_connection()
+        conn.execute("""
+            INSERT INTO sync_pares (nodo, entregado_hasta, fecha_sync) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(nodo) DO UPDATE SET
+                entregado_hasta = MAX(entregado_hasta, excluded.entregado_hasta),
+                fecha_sync = excluded.fecha_sync
+        """, (nodo, int(hasta)))
+        conn.commit()
+        entregado = conn.execute("SELECT entregado_hasta FROM sync_pares WHERE nodo = ?", (nodo,)).fetchone()[0]
+        return {'nodo': nodo, 'entregado_hasta': entregado}
+
+    def aplicar_cambios(self, respuesta: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Aplicar una respuesta de obtener_cambios de otro nodo en una transacción.
+
+        Cada cambio se aplica en un savepoint: uno que viola una restricción
+        (p.ej. DELETE de un producto con movimientos) se descarta sin
+        afectar al resto. Los triggers registran lo aplicado con el origen y
+        la fecha originales, para reenviarlo a otros nodos.
+
+        Args:
+            respuesta: Resultado de obtener_cambios del par
+
+        Returns:
+            Contadores aplicados, descartados (perdieron contra una escritura
+            más reciente), conflictos (restricciones), omitidos (sin efecto
+            o referencias desconocidas) y la versión recibida (hasta)
+
+        Raises:
+            ValueError: Si la respuesta es de este mismo nodo
+        """
+        remoto = respuesta['nodo']
+        if remoto == self.nodo_local():
+            raise ValueError("El par tiene el mismo identificador de nodo (¿copia de esta base?)")
+
+        resumen = {'aplicados': 0, 'descartados': 0, 'conflictos': 0, 'omitidos': 0}
+        conn = self.db.get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for cambio in respuesta['cambios']:
+                conn.execute("UPDATE sync_contexto SET origen = ?, fecha = ? WHERE id = 1",
+                             (cambio['origen'], cambio['fecha']))
+                conn.execute("SAVEPOINT cambio")
+                try:
+                    resultado = self._aplicar_cambio(conn, cambio)
+                    conn.execute("RELEASE cambio")
+                except sqlite3.IntegrityError as e:
+                    conn.execute("ROLLBACK TO cambio")
+                    conn.execute("RELEASE cambio")
+                    self.logger.debug(f"Cambio {cambio['version']} de {remoto} en conflicto: {e}")
+                    resultado = 'conflictos'
+                resumen[resultado] += 1
+
+            conn.execute("UPDATE sync_contexto SET origen = NULL, fecha = NULL WHERE id = 1")
+            conn.execute("""
+                INSERT INTO sync_pares (nodo, recibido_hasta, fecha_sync) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(nodo) DO UPDATE SET
+                    recibido_hasta = MAX(recibido_hasta, excluded.recibido_hasta),
+                    fecha_sync = excluded.fecha_sync
+            """, (remoto, respuesta['hasta']))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        resumen['hasta'] = respuesta['hasta']
+        return resumen
+
+    @staticmethod
+    def _normalizar_url(url: str) -> str:
+        """URL base comparable: sin espacios ni barra final."""
+        return url.strip().rstrip('/')
+
+    def par_permitido(self, url: str) -> bool:
+        """
+        Indicar si una URL puede usarse para traer cambios.
+
+        Solo los pares de [sync] peers o los nodos ya registrados en
+        sync_pares: la API no debe hacer peticiones a URLs arbitrarias.
+
+        Args:
+            url: URL base de la API del par
+
+        Returns:
+            True si la URL es un par configurado o conocido
+        """
+        url = self._normalizar_url(url)
+        if any(self._normalizar_url(par) == url for par in self.pares):
+            return True
+        conocidas = self.db.get_connection().execute(
+            "SELECT url FROM sync_pares WHERE url IS NOT NULL"
+        ).fetchall()
+        return any(self._normalizar_url(fila[0]) == url for fila in conocidas)
+
+    def sincronizar(self, fuente, url: Optional[str] = None) -> Dict[str, int]:
+        """
+        Traer de un par todos los cambios pendientes, en lotes, y confirmarle
+        lo aplicado.
+
+        Args:
+            fuente: Par con info(), obtener_cambios() y confirmar_recibido()
+                (SyncService o ClienteSyncHttp)
+            url: URL del par para guardar en sync_pares
+
+        Returns:
+            Contadores acumulados de aplicar_cambios, lotes y versión recibida
+        """
+        remoto = fuente.info()['nodo']
+        local = self.nodo_local()
+        if remoto == local:
+            raise ValueError("El par tiene el mismo identificador de nodo (¿copia de esta base?)")
+
+        conn = self.db.get_connection()
+        fila = conn.execute("SELECT recibido_hasta FROM sync_pares WHERE nodo = ?", (remoto,)).fetchone()
+        desde = fila[0] if fila else 0
+
+        total = {'aplicados': 0, 'descartados': 0, 'conflictos': 0, 'omitidos': 0, 'lotes': 0}
+        while True:
+            respuesta = fuente.obtener_cambios(desde, self.tamano_lote, local)
+            resumen = self.aplicar_cambios(respuesta)
+            for clave in ('aplicados', 'descartados', 'conflictos', 'omitidos'):
+                total[clave] += resumen[clave]
+            total['lotes'] += 1
+            desde = respuesta['hasta']
+            if not respuesta['mas'] or self._detener.is_set():
+                break
+        fuente.confirmar_recibido(local, desde)
+
+        if url:
+            conn.execute("UPDATE sync_pares SET url = ? WHERE nodo = ?", (url, remoto))
+            conn.commit()
+        total['hasta'] = desde
+        self.logger.info(f"Sincronización desde {url or remoto}: {total}")
+        return total
+
+    def compactar(self) -> Dict[str, int]:
+        """
+        Compactar el registro de cambios.
+
+        De cada fila quedan su INSERT y su último cambio (si el último es un
+        DELETE, solo el DELETE): los pares que no lo recibieron obtienen el
+        estado final y el orden de creación se conserva para las claves
+        foráneas. Los cambios que ya recibieron todos los pares conocidos
+        (entregado_hasta) se eliminan.
+
+        Returns:
+            Cambios colapsados y cambios ya entregados eliminados
+        """
+        conn = self.db.get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            colapsados = conn.execute("""
+                DELETE FROM cambios WHERE id_cambio IN (
+                    SELECT c.id_cambio
+                    FROM (SELECT tabla, id_fila, MAX(id_cambio) AS ultimo
+                          FROM cambios GROUP BY tabla, id_fila HAVING COUNT(*) > 1) u
+                    JOIN cambios ultimo ON ultimo.id_cambio = u.ultimo
+                    JOIN cambios c ON c.tabla = u.tabla AND c.id_fila = u.id_fila AND c.id_cambio < u.ultimo
+                    WHERE c.operacion <> 'INSERT' OR ultimo.operacion = 'DELETE'
+                )
+            """).rowcount
+            entregados = conn.execute("""
+                DELETE FROM cambios
+                WHERE EXISTS (SELECT 1 FROM sync_pares)
+                  AND id_cambio <= (SELECT MIN(entregado_hasta) FROM sync_pares)
+            """).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self.logger.info(f"Registro de cambios compactado: {colapsados} colapsados, {entregados} entregados eliminados")
+        return {'colapsados': colapsados, 'entregados': entregados}
+
+    # ==================== BACKGROUND ====================
+
+    def iniciar_sincronizacion_en_segundo_plano(self) -> Optional[threading.Thread]:
+        """
+        Traer cambios de los pares de [sync] peers cada `intervalo_segundos`.
+
+        Returns:
+            Hilo iniciado, o None si está deshabilitado, sin pares o ya en curso
+        """
+        if not self.habilitado or not self.pares:
+            return None
+        if self._thread is not None and self._thread.is_alive():
+            return None
+
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._sincronizacion_worker, name="SyncWorker", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def cleanup(self) -> None:
+        """Detener la sincronización en background (el lote en curso termina)."""
+        self._detener.set()
+
+    def _sincronizacion_worker(self) -> None:
+        """Sincronizar con cada par y compactar periódicamente, con una conexión propia."""
+        db_path = getattr(self.db, 'db_path', None)
+        worker_db = DatabaseConnection(db_path) if db_path else self.db
+        servicio = SyncService(worker_db)
+        servicio._detener = self._detener
+        ultima_compactacion = time.monotonic()
+        try:
+            while not self._detener.wait(self.intervalo_segundos):
+                for url in self.pares:
+                    try:
+                        servicio.sincronizar(ClienteSyncHttp(url), url=url)
+                    except Exception as e:
+                        self.logger.warning(f"No se pudo sincronizar con {url}: {e}")
+                    if self._detener.is_set():
+                        return
+                if self.horas_compactacion and time.monotonic() - ultima_compactacion >= self.horas_compactacion * 3600:
+                    servicio.compactar()
+                    ultima_compactacion = time.monotonic()
+        except Exception as e:
+            self.logger.error(f"Error en la sincronización en background: {e}")
+        finally:
+            if worker_db is not self.db:
+                worker_db.close()
+
+    # ==================== AUXILIARES ====================
+
+    def _aplicar_cambio(self, conn, cambio: Dict[str, Any]) -> str:
+        """Aplicar un cambio remoto; devuelve el contador del resumen que le corresponde."""
+        tabla = cambio['tabla']
+        definicion = TABLAS[tabla]
+        nodo, id_origen = cambio['fila']
+        id_local = self._resolver(conn, tabla, cambio['fila'])
+
+        if definicion['libro']:
+            if cambio['operacion'] != 'INSERT' or id_local is not None:
+                return 'omitidos'
+            return self._aplicar_movimiento(conn, cambio)
+
+        if id_local is None and cambio['operacion'] != 'DELETE' and definicion['natural']:
+            id_local = self._buscar_por_clave_natural(conn, tabla, cambio['datos'])
+            if id_local is not None:
+                conn.execute(
+                    "INSERT OR IGNORE INTO sync_identidades (tabla, nodo, id_origen, id_local, creada) "
+                    "VALUES (?, ?, ?, ?, 0)", (tabla, nodo, id_origen, id_local)
+                )
+
+        if id_local is not None:
+            marca = conn.execute(
+                "SELECT fecha, origen FROM cambios WHERE tabla = ? AND id_fila = ? ORDER BY id_cambio DESC LIMIT 1",
+                (tabla, id_local)
+            ).fetchone()
+            # A igual marca se aplica: dos escrituras del mismo nodo en el mismo
+            # milisegundo llegan en el orden de su registro
+            if marca is not None and (marca[0], marca[1]) > (cambio['fecha'], cambio['origen']):
+                return 'descartados'
+
+        clave = definicion['clave']
+        if cambio['operacion'] == 'DELETE':
+            if id_local is None:
+                return 'omitidos'
+            conn.execute(f"DELETE FROM {tabla} WHERE {clave} = ?", (id_local,))
+            return 'aplicados'
+
+        valores = self._valores_locales(conn, tabla, cambio['datos'])
+        if valores is None:
+            return 'omitidos'
+        existe = id_local is not None and conn.execute(
+            f"SELECT 1 FROM {tabla} WHERE {clave} = ?", (id_local,)
+        ).fetchone() is not None
+
+        if existe:
+            derivadas = COLUMNAS_DERIVADAS.get(tabla, ())
+            columnas = [columna for columna in valores if columna not in derivadas]
+            asignaciones = ', '.join(f"{columna} = ?" for columna in columnas)
+            conn.execute(f"UPDATE {tabla} SET {asignaciones} WHERE {clave} = ?",
+                         [valores[columna] for columna in columnas] + [id_local])
+        elif id_local is not None:
+            # Borrada aquí antes que esta escritura más reciente: se restaura con su id
+            self._insertar(conn, tabla, dict(valores, **{clave: id_local}))
+        else:
+            id_local = self._insertar(conn, tabla, valores)
+            conn.execute(
+                "INSERT INTO sync_identidades (tabla, nodo, id_origen, id_local, creada) VALUES (?, ?, ?, ?, 1)",
+                (tabla, nodo, id_origen, id_local)
+            )
+        return 'aplicados'
+
+    def _aplicar_movimiento(self, conn, cambio: Dict[str, Any]) -> str:
+        """Insertar un movimiento remoto y sumar su diferencia al stock local."""
+        valores = self._valores_locales(conn, 'movimientos', cambio['datos'])
+        if valores is None:
+            return 'omitidos'
+        diferencia = (valores.get('cantidad_nueva') or 0) - (valores.get('cantidad_anterior') or 0)
+        stock = conn.execute(
+            "SELECT stock FROM productos WHERE id_producto = ?", (valores['id_producto'],)
+        ).fetchone()[0] or 0
+        # Existencias anterior/nueva según el stock de este nodo
+        valores['cantidad_anterior'] = stock
+        valores['cantidad_nueva'] = stock + diferencia
+        id_local = self._insertar(conn, 'movimientos', valores)
+        conn.execute(
+            "INSERT INTO sync_identidades (tabla, nodo, id_origen, id_local, creada) VALUES (?, ?, ?, ?, 1)",
+            ('movimientos', cambio['fila'][0], cambio['fila'][1], id_local)
+        )
+        if diferencia:
+            conn.execute("UPDATE productos SET stock = stock + ? WHERE id_producto = ?",
+                         (diferencia, valores['id_producto']))
+        return 'aplicados'
+
+    def _valores_locales(self, conn, tabla: str, datos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Columnas de un cambio remoto existentes en la tabla local, con las
+        claves foráneas traducidas a ids locales.
+
+        Returns:
+            Valores por columna, o None si falta una referencia obligatoria
+        """
+        columnas = self._columnas_tabla(conn, tabla)
+        valores = {columna: valor for columna, valor in datos.items() if columna in columnas}
+        for columna, referida in TABLAS[tabla]['foraneas'].items():
+            if valores.get(columna) is None:
+                continue
+            valores[columna] = self._resolver(conn, referida, valores[columna])
+            if valores[columna] is None and columnas[columna]:
+                self.logger.debug(f"{tabla}.{columna}: referencia desconocida en {referida}")
+                return None
+        return valores
+
+    def _resolver(self, conn, tabla: str, referencia) -> Optional[int]:
+        """Id local de una fila identificada como [nodo, id] (None si no se conoce)."""
+        nodo, id_origen = referencia
+        if nodo == self.nodo_local():
+            return id_origen
+        fila = conn.execute(
+            "SELECT id_local FROM sync_identidades WHERE tabla = ? AND nodo = ? AND id_origen = ?",
+            (tabla, nodo, id_origen)
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def _identidades_globales(self, conn, tabla: str, ids: Iterable[int]) -> Dict[int, List]:
+        """Identidad [nodo, id] de filas locales: la del nodo que las creó."""
+        local = self.nodo_local()
+        ids = list(ids)
+        identidades = {id_local: [local, id_local] for id_local in ids}
+        for inicio in range(0, len(ids), LOTE_IN):
+            lote = ids[inicio:inicio + LOTE_IN]
+            marcadores = ', '.join('?' * len(lote))
+            for id_local, nodo, id_origen in conn.execute(
+                f"SELECT id_local, nodo, id_origen FROM sync_identidades "
+                f"WHERE tabla = ? AND creada = 1 AND id_local IN ({marcadores})",
+                [tabla] + lote
+            ):
+                identidades[id_local] = [nodo, id_origen]
+        return identidades
+
+    def _buscar_por_clave_natural(self, conn, tabla: str, datos: Dict[str, Any]) -> Optional[int]:
+        """Fila local con la misma clave natural (None si falta algún valor o no hay)."""
+        natural = TABLAS[tabla]['natural']
+        if any(datos.get(columna) is None for columna in natural):
+            return None
+        condicion = ' AND '.join(f"{columna} = ?" for columna in natural)
+        fila = conn.execute(
+            f"SELECT {TABLAS[tabla]['clave']} FROM {tabla} WHERE {condicion} ORDER BY 1 LIMIT 1",
+            [datos[columna] for columna in natural]
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def _columnas_tabla(self, conn, tabla: str) -> Dict[str, bool]:
+        """Columnas de una tabla local -> NOT NULL."""
+        if tabla not in self._columnas:
+            self._columnas[tabla] = {
+                fila[1]: bool(fila[3]) for fila in conn.execute(f"PRAGMA table_info({tabla})")
+            }
+        return self._columnas[tabla]
+
+    @staticmethod
+    def _insertar(conn, tabla: str, valores: Dict[str, Any]) -> int:
+        """INSERT de una fila; devuelve su id."""
+        columnas = ', '.join(valores)
+        marcadores = ', '.join('?' * len(valores))
+        cursor = conn.execute(f"INSERT INTO {tabla} ({columnas}) VALUES ({marcadores})", list(valores.values()))
+        return cursor.lastrowid
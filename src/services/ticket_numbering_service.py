@@ -0,0 +1,285 @@
+"""
+Servicio de numeración de tickets.
+Implementa contadores atómicos sobre la tabla ticket_numbering.
+
+Este servicio maneja:
+- Asignación atómica del siguiente número (UPDATE ... RETURNING)
+- Transacciones inmediatas para evitar números duplicados entre terminales
+- Reserva opcional de bloques de números por terminal
+- Sincronización inicial del contador con los tickets ya emitidos
+
+El formato de los números se mantiene compatible con los tickets
+existentes (prefijo 'V' para ventas y 'E' para entradas, 6 dígitos).
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-20
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+from db.database import get_database_connection
+
+from models.ticket import Ticket, TicketNumberGenerator
+
+
+class TicketNumberingService:
+    """
+    Servicio para asignación de números consecutivos de tickets.
+
+    Usa la fila de ticket_numbering de cada tipo como contador. El
+    incremento y la lectura del nuevo valor se hacen en una sola sentencia
+    dentro de una transacción BEGIN IMMEDIATE, por lo que dos terminales
+    nunca obtienen el mismo número. Si el número se asigna en la misma
+    transacción que inserta el ticket, la numeración no tiene huecos.
+    """
+
+    # Prefijos usados históricamente en los números de ticket
+    PREFIJOS = {
+        Ticket.TIPO_VENTA: "V",
+        Ticket.TIPO_ENTRADA: "E",
+    }
+
+    # Serializa el uso de una conexión compartida entre threads
+    _lock = threading.RLock()
+
+    def __init__(self, db_connection=None, tamano_bloque: int = 1):
+        """
+        Inicializar el servicio de numeración.
+
+        Args:
+            db_connection: Conexión a la base de datos (opcional)
+            tamano_bloque: Números a reservar por acceso al contador.
+                Con 1 (defecto) la numeración no tiene huecos; con valores
+                mayores la terminal preasigna bloques y los números no
+                usados al cerrar se pierden.
+        """
+        if tamano_bloque < 1:
+            raise ValueError("El tamaño de bloque debe ser mayor o igual a 1")
+
+        self.db = db_connection or get_database_connection()
+        self.tamano_bloque = tamano_bloque
+        self._bloques: Dict[str, List[int]] = {}
+        self._tipos_sincronizados = set()
+
+    def _validar_tipo(self, ticket_type: str) -> None:
+        """
+        Validar que el tipo de ticket use numeración consecutiva.
+
+        Args:
+            ticket_type: Tipo de ticket
+
+        Raises:
+            ValueError: Si el tipo de ticket no tiene contador
+        """
+        if ticket_type not in self.PREFIJOS:
+            raise ValueError(
+                f"Tipo de ticket sin numeración consecutiva: {ticket_type}. "
+                f"Tipos válidos: {list(self.PREFIJOS.keys())}"
+            )
+
+    @contextmanager
+    def transaccion_inmediata(self):
+        """
+        Context manager que abre una transacción BEGIN IMMEDIATE.
+
+        La transacción toma el lock de escritura al iniciar, de modo que
+        otra conexión no puede leer el mismo valor del contador antes de
+        que esta termine. Si la conexión ya tiene una transacción abierta
+        se reutiliza y el commit queda a cargo de quien la abrió.
+
+        Usage:
+            with numbering_service.transaccion_inmediata() as cursor:
+                numero = numbering_service.asignar_numero(cursor, 'VENTA')
+                cursor.execute("INSERT INTO tickets ...")
+
+        Yields:
+            Cursor dentro de la transacción
+        """
+        with self._lock:
+            conn = self.db.get_connection()
+            propia = not conn.in_transaction
+            cursor = conn.cursor()
+
+            try:
+                if propia:
+                    cursor.execute("BEGIN IMMEDIATE")
+                yield cursor
+                if propia:
+                    conn.commit()
+            except Exception:
+                if propia:
+                    conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _sincronizar_contador(self, cursor, ticket_type: str) -> None:
+        """
+        Asegurar que el contador existe y no está por detrás de los tickets emitidos.
+
+        Se ejecuta una vez por tipo y por instancia. Cubre bases de datos
+        creadas antes de usar ticket_numbering, donde last_number quedó en 0.
+
+        Args:
+            cursor: Cursor dentro de una transacción inmediata
+            ticket_type: Tipo de ticket
+        """
+        if ticket_type in self._tipos_sincronizados:
+            return
+
+        prefix = self.PREFIJOS[ticket_type]
+
+        cursor.execute("""
+            INSERT OR IGNORE INTO ticket_numbering (ticket_type, last_number, prefix, suffix)
+            VALUES (?, 0, ?, '')
+        """, (ticket_type, prefix))
+
+        cursor.execute("""
+            UPDATE ticket_numbering
+            SET last_number = MAX(
+                COALESCE(last_number, 0),
+                COALESCE((
+                    SELECT MAX(CAST(SUBSTR(ticket_number, ?) AS INTEGER))
+                    FROM tickets
+                    WHERE ticket_type = ? AND ticket_number LIKE ?
+                ), 0)
+            )
+            WHERE ticket_type = ?
+        """, (len(prefix) + 1, ticket_type, f"{prefix}%", ticket_type))
+
+        self._tipos_sincronizados.add(ticket_type)
+
+    def _incrementar_contador(self, cursor, ticket_type: str, cantidad: int) -> int:
+        """
+        Incrementar el contador y devolver el nuevo último número.
+
+        Args:
+            cursor: Cursor dentro de una transacción inmediata
+            ticket_type: Tipo de ticket
+            cantidad: Cantidad de números a consumir
+
+        Returns:
+            Último número asignado tras el incremento
+        """
+        self._sincronizar_contador(cursor, ticket_type)
+
+        cursor.execute("""
+            UPDATE ticket_numbering
+            SET last_number = last_number + ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE ticket_type = ?
+            RETURNING last_number
+        """, (cantidad, ticket_type))
+
+        return cursor.fetchone()[0]
+
+    def asignar_numero(self, cursor, ticket_type: str) -> str:
+        """
+        Asignar el siguiente número de ticket dentro de una transacción abierta.
+
+        Args:
+            cursor: Cursor obtenido de transaccion_inmediata()
+            ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
+
+        Returns:
+            Número de ticket formateado
+        """
+        self._validar_tipo(ticket_type)
+
+        if self.tamano_bloque > 1:
+            bloque = self._bloques.get(ticket_type)
+            if not bloque:
+                ultimo = self._incrementar_contador(cursor, ticket_type, self.tamano_bloque)
+                bloque = list(range(ultimo, ultimo - self.tamano_bloque, -1))
+                self._bloques[ticket_type] = bloque
+            numero = bloque.pop()
+        else:
+            numero = self._incrementar_contador(cursor, ticket_type, 1)
+
+        return self.formatear_numero(ticket_type, numero)
+
+    def siguiente_numero(self, ticket_type: str) -> str:
+        """
+        Consumir y devolver el siguiente número de ticket.
+
+        Args:
+            ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
+
+        Returns:
+            Número de ticket formateado
+        """
+        with self.transaccion_inmediata() as cursor:
+            return self.asignar_numero(cursor, ticket_type)
+
+    def reservar_bloque(self, ticket_type: str, cantidad: int) -> range:
+        """
+        Reservar un bloque de números consecutivos para uso exclusivo.
+
+        Args:
+            ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
+            cantidad: Cantidad de números a reservar
+
+        Returns:
+            Rango con los números secuenciales reservados
+
+        Raises:
+            ValueError: Si la cantidad no es positiva o el tipo es inválido
+        """
+        self._validar_tipo(ticket_type)
+        if cantidad < 1:
+            raise ValueError("La cantidad a reservar debe ser mayor que 0")
+
+        with self.transaccion_inmediata() as cursor:
+            ultimo = self._incrementar_contador(cursor, ticket_type, cantidad)
+
+        return range(ultimo - cantidad + 1, ultimo + 1)
+
+    def obtener_ultimo_numero(self, ticket_type: str) -> int:
+        """
+        Consultar el último número asignado sin consumir ninguno.
+
+        Args:
+            ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
+
+        Returns:
+            Último número secuencial asignado (0 si no hay ninguno)
+        """
+        self._validar_tipo(ticket_type)
+
+        with self.transaccion_inmediata() as cursor:
+            self._sincronizar_contador(cursor, ticket_type)
+            cursor.execute(
+                "SELECT last_number FROM ticket_numbering WHERE ticket_type = ?",
+                (ticket_type,)
+            )
+            row = cursor.fetchone()
+
+        return row[0] if row and row[0] else 0
+
+    def formatear_numero(self, ticket_type: str, numero: int) -> str:
+        """
+        Formatear un número secuencial como número de ticket.
+
+        Args:
+            ticket_type: Tipo de ticket
+            numero: Número secuencial
+
+        Returns:
+            Número de ticket con prefijo
+        """
+        return TicketNumberGenerator.generar_numero(
+            ticket_type, numero - 1, prefix=self.PREFIJOS[ticket_type]
+        )
+
+    def liberar_bloques(self) -> Dict[str, int]:
+        """
+        Descartar los números preasignados que no se usaron.
+
+        Returns:
+            Diccionario con la cantidad de números descartados por tipo
+        """
+        descartados = {tipo: len(bloque) for tipo, bloque in self._bloques.items()}
+        self._bloques.clear()
+        return descartados
@@ -0,0 +1,534 @@
+"""
+Servicio de generación asíncrona de PDFs de tickets.
+Saca la generación de PDF y QR del hilo de la interfaz.
+
+Este servicio maneja:
+- Cola de renderizado procesada por un hilo de trabajo
+- Actualización de tickets.pdf_path al terminar cada PDF
+- Cola de impresión que agrupa trabajos antes de enviarlos a la impresora
+- Recuperación de tickets pendientes (sin PDF) tras un cierre inesperado
+
+El registro del ticket (número y fila en tickets) sigue siendo síncrono
+y rápido; solo el PDF se genera en segundo plano.
+
+Autor: Sistema de Inventario
+Fecha: 2025-07-20
+"""
+
+import logging
+import os
+import platform
+import queue
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+
+from db.database import DatabaseConnection
+
+from models.ticket import Ticket
+
+
+@dataclass
+class TicketRenderJob:
+    """Trabajo de renderizado de un ticket."""
+    id_ticket: int
+    formato: str = "a4"
+    incluir_qr: bool = True
+    imprimir: bool = False
+    callback: Optional[Callable[[Ticket, Optional[str], Optional[Exception]], None]] = None
+    intentos: int = 0
+    encolado_en: datetime = field(default_factory=datetime.now)
+
+
+class PrintSpooler:
+    """
+    Cola de impresión que agrupa PDFs antes de enviarlos a la impresora.
+
+    Los trabajos se acumulan hasta alcanzar batch_size o hasta que pasa
+    flush_interval segundos desde el primero, y se envían en un solo
+    comando de impresión.
+    """
+
+    def __init__(self,
+                 printer: Optional[Callable[[List[str]], bool]] = None,
+                 printer_name: Optional[str] = None,
+                 batch_size: int = 5,
+                 flush_interval: float = 2.0):
+        """
+        Inicializar la cola de impresión.
+
+        Args:
+            printer: Función que imprime una lista de PDFs (opcional).
+                Por defecto se usa el comando de impresión del sistema.
+            printer_name: Impresora destino (opcional, predeterminada si None)
+            batch_size: Cantidad de trabajos que fuerza un envío
+            flush_interval: Segundos máximos de espera antes de enviar
+        """
+        self.printer = printer or self._imprimir_con_sistema
+        self.printer_name = printer_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self.logger = logging.getLogger(__name__)
+
+        self._pendientes: List[str] = []
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Estadísticas
+        self.trabajos_impresos = 0
+        self.lotes_enviados = 0
+        self.errores = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Indica si el hilo de impresión está activo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Iniciar el hilo de impresión en background."""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._spool_loop,
+            name="TicketPrintSpooler",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Detener el hilo de impresión enviando lo que quede pendiente.
+
+        Args:
+            timeout: Segundos máximos de espera
+        """
+        if not self.is_running:
+            return
+
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            self.logger.warning("PrintSpooler no terminó en tiempo esperado")
+
+    def encolar(self, pdf_path: str) -> None:
+        """
+        Agregar un PDF a la cola de impresión.
+
+        Args:
+            pdf_path: Ruta del PDF a imprimir
+        """
+        with self._condition:
+            self._pendientes.append(pdf_path)
+            if len(self._pendientes) >= self.batch_size:
+                self._condition.notify_all()
+
+        if not self.is_running:
+            self.start()
+
+    def flush(self) -> int:
+        """
+        Enviar a la impresora todos los trabajos pendientes.
+
+        Returns:
+            Cantidad de trabajos enviados
+        """
+        with self._condition:
+            lote = self._pendientes
+            self._pendientes = []
+
+        if not lote:
+            return 0
+
+        try:
+            if self.printer(lote):
+                self.trabajos_impresos += len(lote)
+                self.lotes_enviados += 1
+            else:
+                self.errores += 1
+                self.logger.error(f"La impresora rechazó un lote de {len(lote)} tickets")
+        except Exception as e:
+            self.errores += 1
+            self.logger.error(f"Error enviando lote de impresión: {e}")
+
+        return len(lote)
+
+    def _spool_loop(self) -> None:
+        """Bucle principal del hilo de impresión."""
+        while not self._stop_event.is_set():
+            with self._condition:
+                if not self._pendientes:
+                    self._condition.wait(timeout=self.flush_interval)
+                if (self._pendientes and len(self._pendientes) < self.batch_size
+                        and not self._stop_event.is_set()):
+                    # Dar tiempo a que se junten más trabajos en el lote
+                    self._condition.wait(timeout=self.flush_interval)
+
+            self.flush()
+
+        self.flush()
+
+    def _imprimir_con_sistema(self, pdf_paths: List[str]) -> bool:
+        """
+        Imprimir PDFs con el comando del sistema operativo.
+
+        Args:
+            pdf_paths: Rutas de los PDFs a imprimir
+
+        Returns:
+            True si todos los trabajos se enviaron
+        """
+        existentes = [path for path in pdf_paths if os.path.exists(path)]
+        if not existentes:
+            return False
+
+        if platform.system() == "Windows":
+            for path in existentes:
+                os.startfile(path, "print")
+            return True
+
+        # lp acepta varios archivos en un solo trabajo
+        cmd = ["lp"]
+        if self.printer_name:
+            cmd += ["-d", self.printer_name]
+        result = subprocess.run(cmd + existentes, capture_output=True)
+        return result.returncode == 0
+
+    def obtener_estadisticas(self) -> Dict[str, int]:
+        """
+        Obtener estadísticas de impresión.
+
+        Returns:
+            Diccionario con contadores de la cola
+        """
+        with self._condition:
+            pendientes = len(self._pendientes)
+
+        return {
+            'pendientes': pendientes,
+            'trabajos_impresos': self.trabajos_impresos,
+            'lotes_enviados': self.lotes_enviados,
+            'errores': self.errores
+        }
+
+
+class TicketRenderService:
+    """
+    Servicio de renderizado de tickets en segundo plano.
+
+    El hilo de trabajo usa su propia conexión SQLite para no compartir
+    transacciones con el hilo de la interfaz. Los callbacks se ejecutan en
+    el hilo de trabajo; la interfaz debe reenviarlos con after().
+
+    Ejemplo de uso:
+        render_service.encolar_ticket(
+            ticket,
+            callback=lambda t, path, error: root.after(0, actualizar, t, path, error)
+        )
+    """
+
+    # Tipos soportados por TicketGenerator.generar_ticket_pdf
+    TIPOS_SOPORTADOS = (Ticket.TIPO_VENTA, Ticket.TIPO_ENTRADA)
+
+    def __init__(self,
+                 db_connection,
+                 directorio_base: str = "data/reports",
+                 spooler: Optional[PrintSpooler] = None,
+                 max_reintentos: int = 2):
+        """
+        Inicializar el servicio de renderizado.
+
+        Args:
+            db_connection: Conexión de base de datos principal
+            directorio_base: Directorio base para los PDFs
+            spooler: Cola de impresión (opcional, se crea una por defecto)
+            max_reintentos: Reintentos por ticket antes de descartarlo
+        """
+        self.db = db_connection
+        self.directorio_base = directorio_base
+        self.spooler = spooler or PrintSpooler()
+        self.max_reintentos = max_reintentos
+
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue[Optional[TicketRenderJob]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._en_cola = set()
+
+        # Recursos propios del hilo de trabajo
+        self._worker_db = None
+        self._generator = None
+        self._ticket_service = None
+
+        # Estadísticas
+        self.tickets_generados = 0
+        self.tickets_fallidos = 0
+        self.tiempo_total_ms = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """Indica si el hilo de renderizado está activo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, recuperar_pendientes: bool = True) -> None:
+        """
+        Iniciar el hilo de renderizado.
+
+        Args:
+            recuperar_pendientes: Encolar tickets que quedaron sin PDF
+        """
+        with self._lock:
+            if self.is_running:
+                return
+
+            self._thread = threading.Thread(
+                target=self._worker_loop,
+                name="TicketRenderWorker",
+                daemon=True
+            )
+            self._thread.start()
+
+        self.logger.info("TicketRenderService iniciado")
+
+        if recuperar_pendientes:
+            self.recuperar_pendientes()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Detener el servicio terminando los trabajos ya encolados.
+
+        El hilo vacía la cola antes de salir, incluidos los reintentos que
+        se vuelvan a encolar detrás de la señal de fin.
+
+        Args:
+            timeout: Segundos máximos de espera
+        """
+        if self.is_running:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                self.logger.warning("TicketRenderWorker no terminó en tiempo esperado")
+
+        self.spooler.stop()
+        self.logger.info("TicketRenderService detenido")
+
+    def cleanup(self) -> None:
+        """Liberar recursos al cerrar el Service Container."""
+        self.stop()
+
+    def encolar_ticket(self,
+                       ticket: Union[Ticket, int],
+                       formato: str = "a4",
+                       incluir_qr: bool = True,
+                       imprimir: bool = False,
+                       callback: Optional[Callable] = None) -> bool:
+        """
+        Encolar un ticket para generar su PDF en segundo plano.
+
+        Args:
+            ticket: Ticket o id_ticket a renderizar
+            formato: Formato del PDF (ver TicketGenerator)
+            incluir_qr: Si incluir código QR
+            imprimir: Enviar a la cola de impresión al terminar
+            callback: Función (ticket, pdf_path, error) llamada al terminar
+
+        Returns:
+            True si se encoló, False si ya estaba en cola
+        """
+        id_ticket = ticket.id_ticket if isinstance(ticket, Ticket) else ticket
+        if not id_ticket:
+            raise ValueError("El ticket debe estar registrado antes de generar su PDF")
+
+        with self._lock:
+            if id_ticket in self._en_cola:
+                return False
+            self._en_cola.add(id_ticket)
+
+        if not self.is_running:
+            self.start(recuperar_pendientes=False)
+
+        self._queue.put(TicketRenderJob(
+            id_ticket=id_ticket,
+            formato=formato,
+            incluir_qr=incluir_qr,
+            imprimir=imprimir,
+            callback=callback
+        ))
+        return True
+
+    def recuperar_pendientes(self) -> int:
+        """
+        Encolar los tickets registrados que no tienen PDF.
+
+        Cubre trabajos perdidos por un cierre de la aplicación antes de que
+        el hilo de renderizado los terminara.
+
+        Returns:
+            Cantidad de tickets encolados
+        """
+        from services.ticket_service import TicketService
+
+        try:
+            pendientes = TicketService(self.db).obtener_tickets_sin_pdf()
+        except Exception as e:
+            self.logger.error(f"Error consultando tickets sin PDF: {e}")
+            return 0
+
+        encolados = 0
+        for ticket in pendientes:
+            if ticket.ticket_type in self.TIPOS_SOPORTADOS and self.encolar_ticket(ticket):
+                encolados += 1
+
+        if encolados:
+            self.logger.info(f"{encolados} tickets pendientes encolados para generar PDF")
+
+        return encolados
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Esperar a que la cola quede vacía.
+
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            True si la cola se vació dentro del tiempo
+        """
+        fin = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._en_cola:
+                    return True
+            if fin is not None and time.monotonic() >= fin:
+                return False
+            time.sleep(0.01)
+
+    def obtener_estadisticas(self) -> Dict[str, object]:
+        """
+        Obtener estadísticas del servicio.
+
+        Returns:
+            Diccionario con contadores de renderizado e impresión
+        """
+        with self._lock:
+            en_cola = len(self._en_cola)
+
+        promedio = (self.tiempo_total_ms / self.tickets_generados
+                    if self.tickets_generados else 0.0)
+
+        return {
+            'en_cola': en_cola,
+            'tickets_generados': self.tickets_generados,
+            'tickets_fallidos': self.tickets_fallidos,
+            'tiempo_promedio_ms': round(promedio, 2),
+            'impresion': self.spooler.obtener_estadisticas()
+        }
+
+    # Métodos del hilo de trabajo
+
+    def _worker_loop(self) -> None:
+        """Bucle principal del hilo de renderizado."""
+        detener = False
+        try:
+            while True:
+                # Tras la señal de fin se sigue hasta vaciar la cola (reintentos incluidos)
+                try:
+                    job = self._queue.get(block=not detener)
+                except queue.Empty:
+                    break
+                if job is None:
+                    detener = True
+                    continue
+
+                try:
+                    self._procesar_trabajo(job)
+                except Exception as e:
+                    self.logger.error(f"Error inesperado renderizando ticket {job.id_ticket}: {e}")
+        finally:
+            if self._worker_db is not None:
+                self._worker_db.close()
+                self._worker_db = None
+                self._generator = None
+                self._ticket_service = None
+
+    def _preparar_recursos(self) -> None:
+        """Crear conexión, generador y servicio propios del hilo de trabajo."""
+        if self._generator is not None:
+            return
+
+        from reports.ticket_generator import TicketGenerator
+        from services.ticket_service import TicketService
+
+        db_path = getattr(self.db, 'db_path', None)
+        self._worker_db = DatabaseConnection(db_path) if db_path else self.db
+        self._ticket_service = TicketService(self._worker_db)
+        self._generator = TicketGenerator(self._worker_db)
+
+    def _procesar_trabajo(self, job: TicketRenderJob) -> None:
+        """
+        Generar el PDF de un ticket y registrar su ruta.
+
+        Args:
+            job: Trabajo de renderizado
+        """
+        ticket = None
+        pdf_path = None
+        error = None
+        inicio = datetime.now()
+
+        try:
+            self._preparar_recursos()
+
+            ticket = self._ticket_service.obtener_ticket_por_id(job.id_ticket)
+            if ticket is None:
+                raise ValueError(f"El ticket con ID {job.id_ticket} no existe")
+
+            if ticket.tiene_pdf_generado() and os.path.exists(ticket.pdf_path):
+                pdf_path = ticket.pdf_path
+            else:
+                pdf_path = self._generator.generar_ruta_archivo(ticket, self.directorio_base)
+                self._generator.generar_ticket_pdf(
+                    ticket, pdf_path, job.formato, job.incluir_qr
+                )
+                self._ticket_service.actualizar_pdf_path(ticket.id_ticket, pdf_path)
+                ticket.pdf_path = pdf_path
+
+                self.tickets_generados += 1
+                self.tiempo_total_ms += (datetime.now() - inicio).total_seconds() * 1000
+
+            if job.imprimir:
+                self.spooler.encolar(pdf_path)
+
+        except Exception as e:
+            job.intentos += 1
+            if job.intentos <= self.max_reintentos:
+                self.logger.warning(
+                    f"Error generando PDF del ticket {job.id_ticket} "
+                    f"(intento {job.intentos}): {e}"
+                )
+                self._queue.put(job)
+                return
+
+            error = e
+            pdf_path = None
+            self.tickets_fallidos += 1
+            self.logger.error(f"No se pudo generar el PDF del ticket {job.id_ticket}: {e}")
+
+        with self._lock:
+            self._en_cola.discard(job.id_ticket)
+
+        if job.callback:
+            try:
+                job.callback(ticket, pdf_path, error)
+            except Exception as e:
+                self.logger.warning(f"Error en callback de ticket {job.id_ticket}: {e}")
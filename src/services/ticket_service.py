@@ -18,9 +18,10 @@ from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from db.database import get_database_connection
 
-from models.ticket import Ticket, TicketNumberGenerator
+from models.ticket import Ticket
 from services.sales_service import SalesService
 from services.movement_service import MovementService
+from services.ticket_numbering_service import TicketNumberingService
 
 class TicketService:
     """
@@ -30,6 +31,13 @@ class TicketService:
     tickets de venta y entrada de inventario.
     """
     
+    _INSERT_TICKET_QUERY = """
+        INSERT INTO tickets (
+            ticket_type, ticket_number, id_venta, id_movimiento,
+            generated_at, generated_by, pdf_path, reprint_count
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
     def __init__(self, db_connection=None):
         """
         Inicializar el servicio de tickets.
@@ -40,11 +48,16 @@ class TicketService:
         self.db = db_connection or get_database_connection()
         self.sales_service = SalesService(self.db)
         self.movement_service = MovementService(self.db)
+        self.numbering_service = TicketNumberingService(self.db)
     
     def _obtener_siguiente_numero_ticket(self, ticket_type: str) -> str:
         """
         Obtener el siguiente número de ticket para el tipo especificado.
         
+        Consulta el contador de ticket_numbering sin consumirlo. La asignación
+        definitiva se hace en _registrar_ticket_numerado, dentro de la misma
+        transacción que inserta el ticket.
+        
         Args:
             ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
             
@@ -57,52 +70,29 @@ class TicketService:
         if ticket_type not in Ticket.TIPOS_VALIDOS:
             raise ValueError(f"Tipo de ticket inválido: {ticket_type}. Tipos válidos: {Ticket.TIPOS_VALIDOS}")
         
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        ultimo_numero = self.numbering_service.obtener_ultimo_numero(ticket_type)
+        return self.numbering_service.formatear_numero(ticket_type, ultimo_numero + 1)
+    
+    def _registrar_ticket_numerado(self, ticket_type: str, crear_ticket) -> Ticket:
+        """
+        Asignar número e insertar el ticket en una sola transacción inmediata.
         
-        try:
-            # Buscar el último número de ticket del tipo especificado
-            query = """
-                SELECT ticket_number 
-                FROM tickets 
-                WHERE ticket_type = ? 
-                ORDER BY id_ticket DESC 
-                LIMIT 1
-            """
-            
-            cursor.execute(query, (ticket_type,))
-            resultado = cursor.fetchone()
+        Si la inserción falla, el incremento del contador se revierte junto
+        con ella, por lo que la numeración queda sin huecos.
+        
+        Args:
+            ticket_type: Tipo de ticket ('VENTA' o 'ENTRADA')
+            crear_ticket: Callable que recibe el número y devuelve el Ticket
             
-            if resultado is None:
-                # Es el primer ticket de este tipo
-                ultimo_numero = 0
-            else:
-                ultimo_ticket_number = resultado[0]
-                # Extraer el número secuencial del ticket
-                if ticket_type == Ticket.TIPO_VENTA:
-                    ultimo_numero = TicketNumberGenerator.extraer_numero_secuencial(
-                        ultimo_ticket_number, prefix="V"
-                    )
-                else:  # ENTRADA
-                    ultimo_numero = TicketNumberGenerator.extraer_numero_secuencial(
-                        ultimo_ticket_number, prefix="E"
-                    )
-            
-            # Generar el siguiente número
-            if ticket_type == Ticket.TIPO_VENTA:
-                return TicketNumberGenerator.generar_numero(
-                    ticket_type, ultimo_numero, prefix="V"
-                )
-            else:  # ENTRADA
-                return TicketNumberGenerator.generar_numero(
-                    ticket_type, ultimo_numero, prefix="E"
-                )
-                
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
+        Returns:
+            Ticket insertado con su id_ticket
+        """
+        with self.numbering_service.transaccion_inmediata() as cursor:
+            ticket_number = self.numbering_service.asignar_numero(cursor, ticket_type)
+            ticket = crear_ticket(ticket_number)
+            ticket.id_ticket = self._insertar_ticket_en_bd(ticket, cursor=cursor)
+        
+        return ticket
     
     def _verificar_ticket_existente_para_venta(self, id_venta: int) -> bool:
         """
@@ -162,39 +152,27 @@ class TicketService:
         finally:
             cursor.close()
     
-    def _insertar_ticket_en_bd(self, ticket: Ticket) -> int:
+    def _insertar_ticket_en_bd(self, ticket: Ticket, cursor=None) -> int:
         """
         Insertar ticket en la base de datos.
         
         Args:
             ticket: Instancia de ticket a insertar
+            cursor: Cursor de una transacción abierta (opcional). Si se
+                indica, el commit queda a cargo de quien abrió la transacción.
             
         Returns:
             ID del ticket insertado
         """
+        if cursor is not None:
+            cursor.execute(self._INSERT_TICKET_QUERY, self._valores_insert_ticket(ticket))
+            return cursor.lastrowid
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
         try:
-            insert_query = """
-                INSERT INTO tickets (
-                    ticket_type, ticket_number, id_venta, id_movimiento,
-                    generated_at, generated_by, pdf_path, reprint_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            values = (
-                ticket.ticket_type,
-                ticket.ticket_number,
-                ticket.id_venta,
-                ticket.id_movimiento,
-                ticket.generated_at,
-                ticket.generated_by,
-                ticket.pdf_path,
-                ticket.reprint_count
-            )
-            
-            cursor.execute(insert_query, values)
+            cursor.execute(self._INSERT_TICKET_QUERY, self._valores_insert_ticket(ticket))
             conn.commit()
             
             return cursor.lastrowid
@@ -205,6 +183,27 @@ class TicketService:
         finally:
             cursor.close()
     
+    def _valores_insert_ticket(self, ticket: Ticket) -> tuple:
+        """
+        Obtener los valores de inserción de un ticket.
+        
+        Args:
+            ticket: Instancia de ticket
+            
+        Returns:
+            Tupla en el orden de _INSERT_TICKET_QUERY
+        """
+        return (
+            ticket.ticket_type,
+            ticket.ticket_number,
+            ticket.id_venta,
+            ticket.id_movimiento,
+            ticket.generated_at,
+            ticket.generated_by,
+            ticket.pdf_path,
+            ticket.reprint_count
+        )
+    
     def _row_to_ticket(self, row: tuple) -> Ticket:
         """
         Convertir fila de base de datos a objeto Ticket.
@@ -263,22 +262,16 @@ class TicketService:
         if self._verificar_ticket_existente_para_venta(id_venta):
             raise ValueError(f"La venta {id_venta} ya tiene un ticket generado")
         
-        # Generar número de ticket
-        ticket_number = self._obtener_siguiente_numero_ticket(Ticket.TIPO_VENTA)
-        
-        # Crear instancia de ticket
-        ticket = Ticket.crear_ticket_venta(
-            ticket_number=ticket_number,
-            id_venta=id_venta,
-            generated_by=generated_by,
-            pdf_path=pdf_path
+        # Asignar número e insertar en una sola transacción
+        return self._registrar_ticket_numerado(
+            Ticket.TIPO_VENTA,
+            lambda ticket_number: Ticket.crear_ticket_venta(
+                ticket_number=ticket_number,
+                id_venta=id_venta,
+                generated_by=generated_by,
+                pdf_path=pdf_path
+            )
         )
-        
-        # Insertar en base de datos
-        ticket_id = self._insertar_ticket_en_bd(ticket)
-        ticket.id_ticket = ticket_id
-        
-        return ticket
     
     def generar_ticket_entrada(
         self, 
@@ -313,22 +306,16 @@ class TicketService:
         if self._verificar_ticket_existente_para_movimiento(id_movimiento):
             raise ValueError(f"El movimiento {id_movimiento} ya tiene un ticket generado")
         
-        # Generar número de ticket
-        ticket_number = self._obtener_siguiente_numero_ticket(Ticket.TIPO_ENTRADA)
-        
-        # Crear instancia de ticket
-        ticket = Ticket.crear_ticket_entrada(
-            ticket_number=ticket_number,
-            id_movimiento=id_movimiento,
-            generated_by=generated_by,
-            pdf_path=pdf_path
+        # Asignar número e insertar en una sola transacción
+        return self._registrar_ticket_numerado(
+            Ticket.TIPO_ENTRADA,
+            lambda ticket_number: Ticket.crear_ticket_entrada(
+                ticket_number=ticket_number,
+                id_movimiento=id_movimiento,
+                generated_by=generated_by,
+                pdf_path=pdf_path
+            )
         )
-        
-        # Insertar en base de datos
-        ticket_id = self._insertar_ticket_en_bd(ticket)
-        ticket.id_ticket = ticket_id
-        
-        return ticket
     
     def generar_ticket_ajuste(
         self, 
@@ -20,9 +20,10 @@ import logging
 
 from services.service_container import get_container
 from models.cliente import Cliente
+from ui.utils.window_manager import PooledFormMixin
 
 
-class ClientWindow:
+class ClientWindow(PooledFormMixin):
     """
     Ventana de gestión de clientes del sistema de inventario.
     
@@ -53,6 +54,9 @@ class ClientWindow:
     - Confirmación de operaciones críticas
     """
     
+    # Catálogo que se recarga al reabrir desde el pool si cambió
+    pool_catalogs = ('clientes',)
+    
     def __init__(self, parent: tk.Tk):
         """
         Inicializa la ventana de clientes.
@@ -537,4 +541,17 @@ Nota: Al eliminar un cliente sus datos no son
             if not result:
                 return
                 
-        self.root.destroy()
+        self._close_or_hide()
+    
+    # ==================== REUTILIZACIÓN DESDE EL POOL DE VENTANAS ====================
+    
+    def reset_for_reuse(self):
+        """Descartar la edición en curso y la búsqueda sin recargar datos."""
+        self._cancel_edit()
+        if self.search_var.get():
+            self.search_var.set("")
+    
+    def refresh_catalogs(self, changed):
+        """Recargar clientes si cambiaron mientras la ventana estaba oculta."""
+        if 'clientes' in changed:
+            self._load_clients()
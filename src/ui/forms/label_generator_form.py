@@ -43,6 +43,9 @@ class LabelGeneratorForm(tk.Toplevel):
     y generar etiquetas en PDF para impresión masiva.
     """
     
+    # Columnas del listado y de las etiquetas (proyección de list_products)
+    PRODUCT_COLUMNS = ('id_producto', 'nombre', 'id_categoria', 'precio', 'stock', 'categoria_nombre')
+    
     def __init__(self, parent=None):
         """
         Inicializar formulario de generación de etiquetas.
@@ -421,8 +424,8 @@ class LabelGeneratorForm(tk.Toplevel):
         try:
             self.update_status("Cargando datos...")
             
-            # Cargar productos
-            self.products = self.product_service.get_all_products()
+            # Cargar productos (solo las columnas que se muestran y se imprimen)
+            self.products = self.product_service.list_products(self.PRODUCT_COLUMNS)
             self.load_products_to_tree(self.products)
             
             # Cargar categorías
@@ -448,14 +451,16 @@ class LabelGeneratorForm(tk.Toplevel):
             
             # Agregar productos
             for product in products:
-                # Obtener nombre de categoría
+                # Obtener nombre de categoría (las filas del listado ya lo traen)
                 category_name = ""
                 if product.id_categoria:
-                    try:
-                        category = self.category_service.get_category_by_id(product.id_categoria)
-                        category_name = category.nombre if category else "Sin categoría"
-                    except:
-                        category_name = "Sin categoría"
+                    category_name = getattr(product, 'categoria_nombre', None)
+                    if not category_name:
+                        try:
+                            category = self.category_service.get_category_by_id(product.id_categoria)
+                            category_name = category.nombre if category else "Sin categoría"
+                        except:
+                            category_name = "Sin categoría"
                 
                 # Formatear precio
                 precio_str = f"B/. {product.precio:.2f}" if product.precio else "N/A"
@@ -8,6 +8,7 @@ Patrón: Event Listener via Event Bus + Mediator coordination
 
 import os
 import subprocess
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
@@ -72,6 +73,7 @@ class MovementEntryForm:
         self._product_service = None
         self._export_service = None
         self._session_manager = None
+        self._receipt_import_service = None
         
         # Estado del formulario
         self.selected_products: List[Dict] = []
@@ -217,6 +219,14 @@ class MovementEntryForm:
                 
         return self._export_service
 
+    @property
+    def receipt_import_service(self):
+        """Lazy loading del ReceiptImportService"""
+        if self._receipt_import_service is None:
+            container = get_container()
+            self._receipt_import_service = container.get('receipt_import_service')
+        return self._receipt_import_service
+
     @property
     def session_manager(self):
         """Lazy loading del SessionManager"""
@@ -1429,11 +1439,16 @@ class MovementEntryForm:
             return ""
 
     def _on_import_excel(self):
-        """Importar desde Excel (placeholder)"""
+        """Seleccionar archivo de recepción (Excel o CSV) e importarlo"""
         try:
             file_path = filedialog.askopenfilename(
-                title="Seleccionar archivo Excel",
-                filetypes=[("Excel files", "*.xlsx *.xls")]
+                title="Seleccionar archivo de recepción",
+                filetypes=[
+                    ("Archivos de recepción", "*.xlsx *.xlsm *.csv"),
+                    ("Excel files", "*.xlsx *.xlsm"),
+                    ("CSV files", "*.csv")
+                ],
+                parent=self.window
             )
             
             if file_path:
@@ -1444,8 +1459,134 @@ class MovementEntryForm:
             messagebox.showerror("Error", f"Error al importar Excel: {e}", parent=self.window)
 
     def _import_from_excel(self, file_path: str):
-        """Importar desde Excel (placeholder)"""
-        messagebox.showinfo("Info", "Funcionalidad de importación Excel en desarrollo", parent=self.window)
+        """
+        Importar archivo de recepción en un hilo de trabajo.
+        
+        Las filas se leen y validan por lotes fuera del hilo de tkinter; las
+        líneas válidas se agregan a la lista y se registran con el botón
+        Registrar en una sola transacción.
+        
+        Args:
+            file_path: Ruta del archivo .xlsx o .csv
+        """
+        import_service = self.receipt_import_service
+        cancel_event = threading.Event()
+        progress_window, progress_bar, progress_label = self._create_import_progress_window(
+            os.path.basename(file_path), cancel_event
+        )
+
+        def on_progress(processed: int, total: Optional[int]):
+            self.window.after(0, self._update_import_progress,
+                              progress_bar, progress_label, processed, total)
+
+        def worker():
+            try:
+                result = import_service.importar_archivo(
+                    file_path, progreso=on_progress, cancelado=cancel_event.is_set
+                )
+                self.window.after(0, self._on_import_finished, progress_window, result, None)
+            except Exception as e:
+                self.logger.error(f"Error importando {file_path}: {e}")
+                self.window.after(0, self._on_import_finished, progress_window, None, e)
+
+        threading.Thread(target=worker, name="ReceiptImport", daemon=True).start()
+
+    def _create_import_progress_window(self, file_name: str, cancel_event: threading.Event):
+        """Crear ventana modal de progreso de importación"""
+        progress_window = tk.Toplevel(self.window)
+        progress_window.title("Importando recepción")
+        progress_window.resizable(False, False)
+        progress_window.transient(self.window)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel_event.set)
+
+        frame = ttk.Frame(progress_window, padding=15)
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(frame, text=f"Archivo: {file_name}").pack(anchor="w")
+        progress_bar = ttk.Progressbar(frame, length=320, mode="indeterminate")
+        progress_bar.pack(fill="x", pady=10)
+        progress_bar.start(15)
+        progress_label = ttk.Label(frame, text="Leyendo filas...")
+        progress_label.pack(anchor="w")
+        ttk.Button(frame, text="Cancelar", command=cancel_event.set).pack(pady=(10, 0))
+
+        progress_window.grab_set()
+        return progress_window, progress_bar, progress_label
+
+    def _update_import_progress(self, progress_bar, progress_label, processed: int, total: Optional[int]):
+        """Actualizar barra de progreso (hilo de UI)"""
+        try:
+            if total:
+                if str(progress_bar.cget("mode")) != "determinate":
+                    progress_bar.stop()
+                    progress_bar.configure(mode="determinate", maximum=total)
+                progress_bar.configure(value=min(processed, total))
+                progress_label.configure(text=f"{processed:,} de ~{total:,} filas procesadas")
+            else:
+                progress_label.configure(text=f"{processed:,} filas procesadas")
+        except tk.TclError:
+            pass  # Ventana de progreso cerrada
+
+    def _on_import_finished(self, progress_window, result: Optional[Dict], error: Optional[Exception]):
+        """Agregar líneas importadas a la lista y mostrar resumen (hilo de UI)"""
+        try:
+            progress_window.grab_release()
+            progress_window.destroy()
+        except tk.TclError:
+            pass
+
+        if self._is_closing:
+            return
+
+        if error is not None:
+            messagebox.showerror("Error", f"No se pudo importar el archivo:\n{error}", parent=self.window)
+            return
+
+        self._merge_imported_lines(result['lineas'])
+
+        summary = (
+            f"Filas leídas: {result['filas_leidas']:,}\n"
+            f"Filas válidas: {result['filas_validas']:,}\n"
+            f"Productos agregados: {len(result['lineas']):,}\n"
+            f"Filas con error: {result['total_errores']:,}"
+        )
+        if result['cancelado']:
+            summary = "Importación cancelada (se agregaron las filas leídas).\n\n" + summary
+        if result['errores']:
+            summary += "\n\nPrimeros errores:\n" + "\n".join(
+                f"• Fila {e['fila']}: {e['error']}" for e in result['errores'][:10]
+            )
+        if result['lineas']:
+            summary += "\n\nRevise la lista y presione Registrar para confirmar la entrada."
+
+        show = messagebox.showwarning if result['total_errores'] else messagebox.showinfo
+        show("Importación de recepción", summary, parent=self.window)
+
+    def _merge_imported_lines(self, lines: List[Dict]):
+        """Sumar líneas importadas a los productos seleccionados"""
+        existing = {p['id']: p for p in self.selected_products}
+        for line in lines:
+            current = existing.get(line['id'])
+            if current is None:
+                current = dict(line)
+                self.selected_products.append(current)
+                existing[line['id']] = current
+                continue
+
+            # Costo promedio ponderado si el producto ya estaba en la lista
+            if line.get('costo_unitario') is not None:
+                if current.get('costo_unitario') is not None:
+                    total_qty = current['cantidad'] + line['cantidad']
+                    current['costo_unitario'] = (
+                        current['costo_unitario'] * current['cantidad']
+                        + line['costo_unitario'] * line['cantidad']
+                    ) / total_qty
+                else:
+                    current['costo_unitario'] = line['costo_unitario']
+            current['cantidad'] += line['cantidad']
+
+        self._update_products_tree()
+        self.logger.info(f"Importación agregada: {len(lines)} productos, total en lista {len(self.selected_products)}")
 
     def _validate_quantity_input(self, *args):
         """Validar entrada de cantidad en tiempo real"""
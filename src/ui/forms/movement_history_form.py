@@ -16,9 +16,12 @@ from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
 import re
 import shutil  # NUEVO: Para manejo de archivos cross-drive
+import threading
 from typing import List, Dict, Optional, Any
 import logging
 
+from ui.widgets.data_grid import DataGrid
+
 # Configurar logger
 logger = logging.getLogger(__name__)
 
@@ -57,6 +60,13 @@ class MovementHistoryForm:
         self.current_movements = []
         self.selected_movement = None
         
+        # Paginación del historial (cursor de la siguiente página y conteo)
+        self._page_filters: Optional[Dict[str, Any]] = None
+        self._next_cursor = None
+        self._loading_page = False
+        self._total_count: Optional[int] = None
+        self._search_generation = 0
+        
         # Configurar ventana y UI primero
         self._setup_window()
         self._create_ui_components()
@@ -230,6 +240,18 @@ class MovementHistoryForm:
         ttk.Label(search_frame, text="Número Ticket:").grid(row=1, column=2, sticky=tk.W, padx=(0, 5), pady=(10, 0))
         self.ticket_search_entry = ttk.Entry(search_frame, width=15)
         self.ticket_search_entry.grid(row=1, column=3, sticky=(tk.W, tk.E), padx=(0, 20), pady=(10, 0))
+        
+        # Fila 3: Responsable (coincidencia exacta, lista cargada al desplegar)
+        ttk.Label(search_frame, text="Responsable:").grid(row=2, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        self.responsible_combo = ttk.Combobox(
+            search_frame,
+            values=['TODOS'],
+            state='readonly',
+            width=15,
+            postcommand=self._load_responsables
+        )
+        self.responsible_combo.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(0, 20), pady=(10, 0))
+        self.responsible_combo.set('TODOS')
     
     def _create_action_panel(self, parent):
         """Crear panel de botones de acción"""
@@ -280,47 +302,20 @@ class MovementHistoryForm:
         results_frame.columnconfigure(0, weight=1)
         results_frame.rowconfigure(0, weight=1)
         
-        # Crear Treeview con scrollbars
-        tree_frame = ttk.Frame(results_frame)
-        tree_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        tree_frame.columnconfigure(0, weight=1)
-        tree_frame.rowconfigure(0, weight=1)
-        
-        # Configurar columnas
-        columns = ('ID', 'Fecha/Hora', 'Tipo', 'Ticket', 'Producto', 'Cantidad', 'Responsable', 'Observaciones')
-        self.results_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=15)
-        
-        # Configurar encabezados
-        self.results_tree.heading('ID', text='ID')
-        self.results_tree.heading('Fecha/Hora', text='Fecha/Hora')
-        self.results_tree.heading('Tipo', text='Tipo')
-        self.results_tree.heading('Ticket', text='Ticket')
-        self.results_tree.heading('Producto', text='Producto')
-        self.results_tree.heading('Cantidad', text='Cantidad')
-        self.results_tree.heading('Responsable', text='Responsable')
-        self.results_tree.heading('Observaciones', text='Observaciones')
-        
-        # Configurar anchos de columna
-        self.results_tree.column('ID', width=60, minwidth=50)
-        self.results_tree.column('Fecha/Hora', width=130, minwidth=100)
-        self.results_tree.column('Tipo', width=80, minwidth=70)
-        self.results_tree.column('Ticket', width=100, minwidth=80)
-        self.results_tree.column('Producto', width=200, minwidth=150)
-        self.results_tree.column('Cantidad', width=80, minwidth=70)
-        self.results_tree.column('Responsable', width=100, minwidth=80)
-        self.results_tree.column('Observaciones', width=200, minwidth=150)
-        
-        # Posicionar Treeview
-        self.results_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.results_tree.configure(yscrollcommand=v_scrollbar.set)
-        
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.results_tree.xview)
-        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
-        self.results_tree.configure(xscrollcommand=h_scrollbar.set)
+        # Tabla virtual: solo se crean items para las filas visibles, así cargar
+        # miles de movimientos (scroll o exportación) no congela la ventana
+        columns = [
+            ('ID', 'ID', 60),
+            ('Fecha/Hora', 'Fecha/Hora', 130),
+            ('Tipo', 'Tipo', 80),
+            ('Ticket', 'Ticket', 100),
+            ('Producto', 'Producto', 200),
+            ('Cantidad', 'Cantidad', 80),
+            ('Responsable', 'Responsable', 100),
+            ('Observaciones', 'Observaciones', 200)
+        ]
+        self.results_grid = DataGrid(results_frame, columns, show_search=False, virtual=True)
+        self.results_grid.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
     def _create_details_panel(self, parent):
         """Crear panel de detalles del movimiento seleccionado"""
@@ -347,8 +342,9 @@ class MovementHistoryForm:
     
     def _setup_bindings(self):
         """Configurar eventos y bindings"""
-        # Evento selección en Treeview
-        self.results_tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        # Selección en la tabla y carga de la siguiente página al acercarse al final
+        self.results_grid.set_row_select_callback(self._on_rows_selected)
+        self.results_grid.set_scroll_end_callback(self._on_results_scroll_end)
         
         # Eventos de teclado para búsqueda rápida
         self.ticket_search_entry.bind('<Return>', lambda e: self._search_movements())
@@ -525,14 +521,11 @@ class MovementHistoryForm:
             if filters.get('ticket_number'):
                 # Búsqueda específica por ticket
                 movements = self._search_by_ticket(filters['ticket_number'])
+                self._display_search_results(movements)
+                logger.info(f"Búsqueda ejecutada: {len(movements)} movimientos encontrados")
             else:
-                # Búsqueda general por filtros
-                movements = self._search_by_filters(filters)
-            
-            # Mostrar resultados
-            self._display_search_results(movements)
-            
-            logger.info(f"Búsqueda ejecutada: {len(movements)} movimientos encontrados")
+                # Búsqueda general por filtros: primera página y el resto al desplazarse
+                self._start_paged_search(filters)
             
         except ValueError as e:
             messagebox.showerror("Error de Validación", str(e))
@@ -563,6 +556,11 @@ class MovementHistoryForm:
         if ticket_number:
             filters['ticket_number'] = self._sanitize_ticket_input(ticket_number)
         
+        # Responsable
+        responsible = self.responsible_combo.get()
+        if responsible and responsible != 'TODOS':
+            filters['responsible'] = responsible
+        
         return filters
     
     def _validate_filters(self, filters: Dict[str, Any]):
@@ -593,6 +591,114 @@ class MovementHistoryForm:
             logger.error(f"Error buscando por filtros: {e}")
             raise
     
+    def _load_responsables(self):
+        """Cargar la lista de responsables al desplegar el combo"""
+        try:
+            self.responsible_combo['values'] = ['TODOS'] + self.movement_service.get_responsables()
+        except Exception as e:
+            logger.error(f"Error cargando responsables: {e}")
+    
+    # ===============================
+    # PAGINACIÓN DE RESULTADOS
+    # ===============================
+    
+    def _start_paged_search(self, filters: Dict[str, Any]):
+        """Iniciar búsqueda paginada: primera página y conteo total en segundo plano"""
+        self._search_generation += 1
+        self._page_filters = filters
+        self._next_cursor = None
+        self._loading_page = False
+        
+        page = self.movement_service.get_movements_page(filters)
+        self._display_search_results(page['movements'])
+        self._next_cursor = page['next_cursor']
+        
+        self._total_count = None
+        if self._next_cursor is None:
+            self._total_count = len(page['movements'])
+        else:
+            self._start_count(filters, self._search_generation)
+        self._update_results_title()
+        
+        logger.info(f"Búsqueda ejecutada: {len(page['movements'])} movimientos en la primera página")
+    
+    def _start_count(self, filters: Dict[str, Any], generation: int):
+        """Calcular el total en un hilo con conexión propia"""
+        db_path = getattr(self.db, 'db_path', None)
+        if not db_path:
+            self._total_count = self.movement_service.count_movements(filters)
+            return
+        
+        def worker():
+            from db.database import DatabaseConnection
+            from services.movement_service import MovementService
+            worker_db = DatabaseConnection(db_path, profile='reporting')
+            try:
+                count = MovementService(worker_db).count_movements(filters)
+                self.window.after(0, self._on_count, count, generation)
+            except Exception as e:
+                logger.error(f"Error contando movimientos: {e}")
+            finally:
+                worker_db.close()
+        
+        threading.Thread(target=worker, name="MovementHistoryCount", daemon=True).start()
+    
+    def _on_count(self, count: int, generation: int):
+        """Recibir el total si la búsqueda sigue vigente"""
+        if generation != self._search_generation or self.window is None:
+            return
+        self._total_count = count
+        self._update_results_title()
+    
+    def _on_results_scroll_end(self):
+        """Pedir la siguiente página cuando la tabla se acerca al final"""
+        if self._next_cursor is not None and not self._loading_page:
+            self._loading_page = True
+            self.window.after_idle(self._load_next_page)
+    
+    def _load_next_page(self) -> bool:
+        """
+        Cargar y agregar la siguiente página de resultados.
+        
+        Returns:
+            True si se cargó una página
+        """
+        try:
+            if self._next_cursor is None or self._page_filters is None:
+                return False
+            page = self.movement_service.get_movements_page(self._page_filters, cursor=self._next_cursor)
+            self._next_cursor = page['next_cursor']
+            self.current_movements.extend(page['movements'])
+            self._insert_movements(page['movements'])
+            if self._next_cursor is None:
+                self._total_count = len(self.current_movements)
+            self._update_results_title()
+            return True
+        except Exception as e:
+            logger.error(f"Error cargando página de movimientos: {e}")
+            self._next_cursor = None
+            return False
+        finally:
+            self._loading_page = False
+    
+    def _load_all_pages(self):
+        """Cargar las páginas pendientes (exportación del resultado completo)"""
+        while self._next_cursor is not None:
+            if not self._load_next_page():
+                break
+    
+    def _update_results_title(self):
+        """Mostrar movimientos cargados y total en el título"""
+        shown = len(self.current_movements)
+        if self._next_cursor is None:
+            self.window.title(f"Historial de Movimientos - {shown} resultados encontrados")
+        elif self._total_count is None:
+            self.window.title(f"Historial de Movimientos - mostrando {shown} resultados (contando...)")
+        else:
+            self.window.title(
+                f"Historial de Movimientos - mostrando {shown} de {self._total_count} resultados"
+            )
+    
     def _search_by_ticket(self, ticket_number: str) -> List[Any]:
         """Buscar movimiento por número de ticket específico"""
         try:
@@ -622,21 +728,26 @@ class MovementHistoryForm:
     
     def _display_search_results(self, movements: List[Any]):
         """Mostrar resultados de búsqueda en la tabla"""
-        # Limpiar tabla
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
         # Guardar movimientos actuales
         self.current_movements = movements
         
         if not movements:
             # Mostrar mensaje de no resultados
-            self.results_tree.insert('', 'end', values=(
-                '', '', '', 'No se encontraron movimientos', '', '', '', ''
-            ))
+            self.results_grid.set_data([['', '', '', 'No se encontraron movimientos', '', '', '', '']])
             return
         
-        # Insertar movimientos con mapeo correcto de campos
+        self.results_grid.set_data(self._movement_rows(movements))
+        
+        # Mostrar contador de resultados
+        self.window.title(f"Historial de Movimientos - {len(movements)} resultados encontrados")
+    
+    def _insert_movements(self, movements: List[Any]):
+        """Agregar movimientos al final de la tabla"""
+        self.results_grid.append_rows(self._movement_rows(movements))
+    
+    def _movement_rows(self, movements: List[Any]) -> List[List[Any]]:
+        """Convertir movimientos en filas de la tabla"""
+        rows = []
         for movement in movements:
             # CORRECCIÓN CRÍTICA: Mapear nombres de campos MovementService → UI
             movement_id = self._get_movement_field(movement, ['id', 'id_movimiento'])
@@ -652,7 +763,7 @@ class MovementHistoryForm:
             if observations and len(str(observations)) > 50:
                 observations = str(observations)[:50] + '...'
             
-            self.results_tree.insert('', 'end', values=(
+            rows.append([
                 movement_id or '',
                 movement_date or '',
                 movement_type or '', 
@@ -661,16 +772,17 @@ class MovementHistoryForm:
                 quantity or '',
                 responsible or '',
                 observations or ''
-            ))
-        
-        # Mostrar contador de resultados
-        self.window.title(f"Historial de Movimientos - {len(movements)} resultados encontrados")
+            ])
+        return rows
     
     def _clear_results(self):
         """Limpiar resultados de búsqueda"""
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        self.results_grid.clear_data()
         self.current_movements = []
+        self._page_filters = None
+        self._next_cursor = None
+        self._total_count = None
+        self._search_generation += 1
         self._clear_details()
     
     def _clear_details(self):
@@ -680,16 +792,12 @@ class MovementHistoryForm:
         self.detail_obs_var.set('')
         self.selected_movement = None
     
-    def _on_tree_select(self, event):
-        """Manejar selección en Treeview"""
-        selection = self.results_tree.selection()
-        if not selection:
+    def _on_rows_selected(self, rows: List[List[Any]]):
+        """Manejar selección en la tabla"""
+        if not rows:
             return
         
-        # Obtener item seleccionado
-        item = self.results_tree.item(selection[0])
-        values = item['values']
-        
+        values = rows[0]
         if not values or not values[0]:  # No hay datos válidos
             return
         
@@ -731,6 +839,8 @@ class MovementHistoryForm:
     
     def _export_to_pdf(self):
         """Exportar resultados actuales a PDF"""
+        # Exportar el resultado completo, no solo las páginas visibles
+        self._load_all_pages()
         if not self.current_movements:
             messagebox.showwarning("Sin Datos", "No hay movimientos para exportar")
             return
@@ -791,6 +901,8 @@ class MovementHistoryForm:
     
     def _export_to_excel(self):
         """Exportar resultados actuales a Excel"""
+        # Exportar el resultado completo, no solo las páginas visibles
+        self._load_all_pages()
         if not self.current_movements:
             messagebox.showwarning("Sin Datos", "No hay movimientos para exportar")
             return
@@ -864,6 +976,7 @@ class MovementHistoryForm:
         
         self.transaction_type_combo.set('TODOS')
         self.ticket_search_entry.delete(0, tk.END)
+        self.responsible_combo.set('TODOS')
         
         # Limpiar resultados y detalles
         self._clear_results()
@@ -48,6 +48,7 @@ class MovementStockForm(BaseForm):
         self._export_service = None
         self._session_manager = None
         self._window_manager = None
+        self._replenishment_service = None
         
         # Logger directo (no del container)
         self.logger = get_logger(__name__)
@@ -115,6 +116,14 @@ class MovementStockForm(BaseForm):
             self._window_manager = container.get('window_manager')
         return self._window_manager
 
+    @property
+    def replenishment_service(self):
+        """Lazy loading ReplenishmentService"""
+        if self._replenishment_service is None:
+            container = get_container()
+            self._replenishment_service = container.get('replenishment_service')
+        return self._replenishment_service
+
     # ========== MÉTODOS PÚBLICOS ==========
     
     def show(self) -> None:
@@ -132,6 +141,29 @@ class MovementStockForm(BaseForm):
             self.logger.error(f"Error actualizando datos: {e}")
             messagebox.showerror("Error", f"Error actualizando datos: {str(e)}")
     
+    def apply_suggested_minimums(self) -> None:
+        """Recalcular reposición y guardar el stock mínimo sugerido en productos"""
+        if not messagebox.askyesno(
+            "Aplicar Mínimos Sugeridos",
+            "Se actualizará el stock mínimo de los productos con ventas recientes "
+            "según su punto de reorden calculado.\n\n¿Desea continuar?",
+            parent=self.window
+        ):
+            return
+        
+        try:
+            resultado = self.replenishment_service.recalcular_catalogo(aplicar_stock_minimo=True)
+            self._load_initial_data(resultado['sugerencias'])
+            messagebox.showinfo(
+                "Mínimos Actualizados",
+                f"Stock mínimo recalculado para {resultado['productos']} productos "
+                f"en {resultado['duracion_ms']:.0f} ms.",
+                parent=self.window
+            )
+        except Exception as e:
+            self.logger.error(f"Error aplicando mínimos sugeridos: {e}")
+            messagebox.showerror("Error", f"Error aplicando mínimos sugeridos: {str(e)}")
+    
     def apply_category_filter(self, category_id: Optional[int] = None) -> None:
         """
         Aplicar filtro por categoría
@@ -335,6 +367,12 @@ class MovementStockForm(BaseForm):
             command=self.refresh_data
         ).pack(side="left", padx=(0, 10))
         
+        ttk.Button(
+            action_frame,
+            text="Aplicar Mínimos Sugeridos",
+            command=self.apply_suggested_minimums
+        ).pack(side="left", padx=(0, 10))
+        
         ttk.Button(
             action_frame,
             text="Cerrar",
@@ -356,23 +394,25 @@ class MovementStockForm(BaseForm):
             self.logger.error(f"Error validando permisos: {e}")
             return False
 
-    def _load_initial_data(self) -> None:
-        """Cargar datos iniciales stock bajo"""
+    def _load_initial_data(self, sugerencias: Optional[List] = None) -> None:
+        """
+        Cargar datos iniciales stock bajo
+        
+        Args:
+            sugerencias: Sugerencias de reposición ya calculadas (opcional)
+        """
         try:
-            # Obtener productos con stock bajo (solo MATERIALES)
-            low_stock_products = self.product_service.get_low_stock_products()
-            
-            # Filtrar solo productos MATERIALES
-            material_products = [
-                product for product in low_stock_products
-                if product.get('category_type') == 'MATERIAL'
-            ]
+            # Demanda y punto de reorden de todo el catálogo MATERIAL en un solo cálculo
+            if sugerencias is None:
+                sugerencias = self.replenishment_service.recalcular_catalogo()['sugerencias']
             
             # Calcular datos complementarios
-            self.products_data = []
-            for product in material_products:
-                processed_product = self._calculate_low_stock_product_data(product)
-                self.products_data.append(processed_product)
+            self.products_data = [
+                self._calculate_low_stock_product_data(sugerencia)
+                for sugerencia in sugerencias
+                if sugerencia.stock_bajo
+            ]
+            self.products_data.sort(key=lambda p: (p['stock_actual'], p['producto']))
             
             # Inicializar filtered_data
             self.filtered_data = self.products_data.copy()
@@ -386,86 +426,54 @@ class MovementStockForm(BaseForm):
             self.logger.error(f"Error cargando datos iniciales: {e}")
             messagebox.showerror("Error", f"Error cargando datos: {str(e)}")
 
-    def _calculate_low_stock_product_data(self, product: Dict) -> Dict:
+    def _calculate_low_stock_product_data(self, sugerencia) -> Dict:
         """
         Calcular datos complementarios producto stock bajo
         
         Args:
-            product: Datos básicos producto
+            sugerencia: SugerenciaReposicion del producto
             
         Returns:
             Dict: Producto con datos calculados
         """
-        try:
-            # Calcular pedido mínimo basado en consumo
-            consumption_rate = product.get('consumption_rate', 0)
-            minimum_order = self._calculate_minimum_order(product['id'], consumption_rate)
-            
-            # Determinar estado stock
-            current_stock = product.get('current_stock', 0)
-            low_stock_limit = product.get('low_stock_limit', 0)
-            
-            if current_stock <= 0:
-                status = 'Crítico'
-            elif current_stock <= low_stock_limit * 0.5:
-                status = 'Muy Bajo' 
-            elif current_stock <= low_stock_limit:
-                status = 'Bajo'
-            else:
-                status = 'Normal'
-            
-            return {
-                'id': product['id'],
-                'categoria': product.get('category_name', 'N/A'),
-                'producto': product.get('name', 'N/A'),
-                'stock_actual': current_stock,
-                'limite_stock_bajo': low_stock_limit,
-                'pedido_minimo': minimum_order,
-                'estado': status,
-                'category_id': product.get('category_id')
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error calculando datos producto {product.get('id')}: {e}")
-            # Retornar datos básicos en caso de error
-            return {
-                'id': product.get('id', 0),
-                'categoria': product.get('category_name', 'Error'),
-                'producto': product.get('name', 'Error'),
-                'stock_actual': product.get('current_stock', 0),
-                'limite_stock_bajo': product.get('low_stock_limit', 0),
-                'pedido_minimo': 0,
-                'estado': 'Error',
-                'category_id': product.get('category_id')
-            }
+        current_stock = sugerencia.stock
+        # Límite: el mayor entre el mínimo configurado y el punto de reorden
+        low_stock_limit = max(sugerencia.stock_minimo, sugerencia.punto_reorden)
+        
+        if current_stock <= 0:
+            status = 'Crítico'
+        elif current_stock <= low_stock_limit * 0.5:
+            status = 'Muy Bajo' 
+        elif current_stock <= low_stock_limit:
+            status = 'Bajo'
+        else:
+            status = 'Normal'
+        
+        return {
+            'id': sugerencia.id_producto,
+            'categoria': sugerencia.categoria or 'N/A',
+            'producto': sugerencia.nombre or 'N/A',
+            'stock_actual': current_stock,
+            'limite_stock_bajo': low_stock_limit,
+            'pedido_minimo': self._calculate_minimum_order(sugerencia),
+            'estado': status,
+            'category_id': sugerencia.id_categoria
+        }
 
-    def _calculate_minimum_order(self, product_id: int, consumption_rate: float) -> int:
+    def _calculate_minimum_order(self, sugerencia) -> int:
         """
-        Calcular pedido mínimo basado en consumo
+        Calcular pedido mínimo sugerido
         
         Args:
-            product_id: ID del producto
-            consumption_rate: Tasa consumo diaria promedio
+            sugerencia: SugerenciaReposicion del producto
             
         Returns:
-            int: Cantidad pedido mínimo sugerido
+            int: Cantidad para reponer hasta el nivel objetivo; si el producto
+            no tiene ventas en el período, lo necesario para llegar al stock mínimo
         """
-        try:
-            # Algoritmo pedido mínimo:
-            # Consumo promedio diario * 30 días * factor seguridad 1.2
-            if consumption_rate <= 0:
-                return 0
-                
-            base_order = consumption_rate * 30  # 30 días cobertura
-            safety_factor = 1.2  # 20% factor seguridad
-            minimum_order = int(base_order * safety_factor)
-            
-            # Mínimo 1 unidad
-            return max(minimum_order, 1)
-            
-        except Exception as e:
-            self.logger.error(f"Error calculando pedido mínimo producto {product_id}: {e}")
-            return 0
+        if sugerencia.cantidad_reorden > 0:
+            return sugerencia.cantidad_reorden
+        return max(sugerencia.stock_minimo - sugerencia.stock, 0)
 
     def _load_categories(self, combo: ttk.Combobox) -> None:
         """
@@ -715,17 +723,18 @@ class MovementStockForm(BaseForm):
     def _update_data_grid(self) -> None:
         """Actualizar DataGrid con datos filtrados"""
         try:
-            self.data_grid.clear_data()
-            
-            for product in self.filtered_data:
-                self.data_grid.add_row([
+            # Una sola carga: add_row por fila re-filtra el grid completo en cada llamada
+            self.data_grid.set_data([
+                [
                     product['categoria'],
-                    product['producto'], 
+                    product['producto'],
                     product['stock_actual'],
                     product['limite_stock_bajo'],
                     product['pedido_minimo'],
                     product['estado']
-                ])
+                ]
+                for product in self.filtered_data
+            ])
                 
             self.logger.debug(f"DataGrid actualizado con {len(self.filtered_data)} productos")
             
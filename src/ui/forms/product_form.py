@@ -25,6 +25,7 @@ import openpyxl
 try:
     from services.service_container import get_container
     from models.producto import Producto
+    from ui.utils.window_manager import PooledFormMixin
     
     # Imports opcionales para códigos de barras (MODO TECLADO)
     try:
@@ -40,7 +41,7 @@ except ImportError as e:
     raise
 
 
-class ProductWindow:
+class ProductWindow(PooledFormMixin):
     """
     Ventana de gestión de productos con inicialización de servicios corregida.
     
@@ -51,6 +52,9 @@ class ProductWindow:
     - CRÍTICO: Manejo correcto de variable global BARCODE_SUPPORT
     """
     
+    # Catálogos que se recargan al reabrir desde el pool si cambiaron
+    pool_catalogs = ('productos', 'categorias')
+    
     def __init__(self, parent: tk.Tk):
         """Inicializa la ventana de productos con servicios correctamente configurados."""
         self.parent = parent
@@ -1017,7 +1021,27 @@ class ProductWindow:
             if not result:
                 return
                 
-        self.root.destroy()
+        self._close_or_hide()
+    
+    # === REUTILIZACIÓN DESDE EL POOL DE VENTANAS ===
+    
+    def reset_for_reuse(self):
+        """Descartar la edición en curso y la búsqueda sin recargar datos."""
+        self._cancel_edit()
+        if self.search_var.get():
+            self.search_var.set("")
+        
+    def refresh_catalogs(self, changed):
+        """Recargar categorías y/o productos si cambiaron mientras la ventana estaba oculta."""
+        try:
+            if 'categorias' in changed:
+                self.categories = self.category_service.get_all_categories()
+                self.category_combo['values'] = [f"{cat.nombre} ({cat.tipo})" for cat in self.categories]
+            self._load_products_by_filter()
+            self._update_product_list(self.search_var.get())
+            self._update_stats_label()
+        except Exception as e:
+            self.logger.error(f"Error recargando catálogos {sorted(changed)}: {e}")
     
     # === NUEVOS MÉTODOS SISTEMA FILTROS Y REACTIVACIÓN ===
     
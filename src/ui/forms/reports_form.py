@@ -22,7 +22,9 @@ import os
 import logging
 
 # ReportService se obtiene desde ServiceContainer
+from db.database import DatabaseConnection
 from services.category_service import CategoryService
+from services.report_service import ReportService
 from services.client_service import ClientService
 from ui.utils.window_manager import WindowManager
 
@@ -579,17 +581,21 @@ class ReportsForm:
     
     def _generate_report_worker(self):
         """Worker para generar reporte en hilo separado"""
+        # Conexión propia con perfil de reportes (caché y mmap grandes)
+        db_path = getattr(self.report_service.db_connection, 'db_path', None)
+        worker_db = DatabaseConnection(db_path, profile='reporting') if db_path else None
+        service = ReportService(worker_db) if worker_db else self.report_service
         try:
             report_type = self.report_type_var.get()
             
             if report_type == "inventory":
-                report_data = self._generate_inventory_report()
+                report_data = self._generate_inventory_report(service)
             elif report_type == "movements":
-                report_data = self._generate_movements_report()
+                report_data = self._generate_movements_report(service)
             elif report_type == "sales":
-                report_data = self._generate_sales_report()
+                report_data = self._generate_sales_report(service)
             elif report_type == "profitability":
-                report_data = self._generate_profitability_report()
+                report_data = self._generate_profitability_report(service)
             else:
                 raise ValueError(f"Tipo de reporte no soportado: {report_type}")
             
@@ -599,30 +605,33 @@ class ReportsForm:
         except Exception as e:
             self.logger.error(f"Error generando reporte: {e}")
             self.window.after(0, self._on_report_error, str(e))
+        finally:
+            if worker_db is not None:
+                worker_db.close()
     
-    def _generate_inventory_report(self) -> Dict[str, Any]:
+    def _generate_inventory_report(self, service=None) -> Dict[str, Any]:
         """Genera reporte de inventario"""
         categoria_id = self._get_selected_categoria_id()
         solo_con_stock = self.solo_con_stock_var.get()
         
-        return self.report_service.generate_inventory_report(
+        return (service or self.report_service).generate_inventory_report(
             categoria_id=categoria_id,
             solo_con_stock=solo_con_stock
         )
     
-    def _generate_movements_report(self) -> Dict[str, Any]:
+    def _generate_movements_report(self, service=None) -> Dict[str, Any]:
         """Genera reporte de movimientos"""
         fecha_inicio = datetime.strptime(self.date_inicio_var.get(), "%Y-%m-%d").date()
         fecha_fin = datetime.strptime(self.date_fin_var.get(), "%Y-%m-%d").date()
         categoria_id = self._get_selected_categoria_id()
         
-        return self.report_service.generate_movements_report(
+        return (service or self.report_service).generate_movements_report(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
             categoria_id=categoria_id
         )
     
-    def _generate_sales_report(self) -> Dict[str, Any]:
+    def _generate_sales_report(self, service=None) -> Dict[str, Any]:
         """Genera reporte de ventas"""
         fecha_inicio = datetime.strptime(self.date_inicio_var.get(), "%Y-%m-%d").date()
         fecha_fin = datetime.strptime(self.date_fin_var.get(), "%Y-%m-%d").date()
@@ -630,7 +639,7 @@ class ReportsForm:
         group_by = self.group_by_var.get() if self.group_by_var.get() != "none" else None
         include_details = self.include_details_var.get()
         
-        return self.report_service.generate_sales_report(
+        return (service or self.report_service).generate_sales_report(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
             cliente_id=cliente_id,
@@ -638,13 +647,13 @@ class ReportsForm:
             include_details=include_details
         )
     
-    def _generate_profitability_report(self) -> Dict[str, Any]:
+    def _generate_profitability_report(self, service=None) -> Dict[str, Any]:
         """Genera reporte de rentabilidad"""
         fecha_inicio = datetime.strptime(self.date_inicio_var.get(), "%Y-%m-%d").date()
         fecha_fin = datetime.strptime(self.date_fin_var.get(), "%Y-%m-%d").date()
         categoria_id = self._get_selected_categoria_id()
         
-        return self.report_service.generate_profitability_report(
+        return (service or self.report_service).generate_profitability_report(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
             categoria_id=categoria_id
@@ -31,15 +31,25 @@ import logging
 from decimal import Decimal
 
 from services.service_container import get_container
+from services.client_search_service import ClientSearchService
 from src.models import producto
-from src.reports.ticket_generator import TicketGenerator
 from ui.widgets.barcode_entry import BarcodeEntry
+from ui.shared.incremental_search import IncrementalSearch
+from ui.utils.window_manager import PooledFormMixin
 from utils.barcode_utils import validate_barcode, BarcodeUtils
 
 
-class SalesWindow:
+class SalesWindow(PooledFormMixin):
     """Ventana de procesamiento de ventas con códigos de barras - Modo Teclado."""
     
+    # Al reabrirse desde el pool solo se recarga la lista de clientes si cambió
+    pool_catalogs = ('clientes',)
+    
+    # Búsqueda de clientes: espera tras la última tecla y tamaño de página
+    CLIENT_SEARCH_DELAY_MS = 200
+    CLIENT_PAGE_SIZE = 50
+    CLIENT_MORE_TEXT = "… más resultados"
+    
     def __init__(self, parent: tk.Tk):
         """
         Inicializa la ventana de ventas.
@@ -52,9 +62,11 @@ class SalesWindow:
         # Lazy loading para servicios
         self._product_service = None
         self._client_service = None
+        self._client_search_service = None
         self._sales_service = None
         self._barcode_service = None
         self._ticket_service = None
+        self._ticket_render_service = None
         
         # Configurar logging
         self.logger = logging.getLogger(__name__)
@@ -77,9 +89,13 @@ class SalesWindow:
         self.quantity_var = tk.StringVar(value="1")
         self.client_var = tk.StringVar()
 
-        self.all_clients: List = []         # Lista completa de clientes
-        self.filtered_clients: List = []    # Lista filtrada por búsqueda
+        self.filtered_clients: List = []    # Clientes mostrados (páginas cargadas)
         self.client_search_var = tk.StringVar()  # Texto del campo de búsqueda
+        self._client_has_more = False       # Hay más páginas para la búsqueda actual
+        self._next_client_cursor = None     # Cursor de la página siguiente
+        self._pending_client_id = None      # Cliente a seleccionar al llegar resultados
+        self._client_search: Optional[IncrementalSearch] = None
+        self._client_search_worker = None   # ClientSearchService del hilo de búsqueda
 
         self.subtotal_var = tk.StringVar(value="B/. 0.00")
         self.tax_var = tk.StringVar(value="B/. 0.00")
@@ -112,6 +128,14 @@ class SalesWindow:
             self._client_service = container.get('client_service')
         return self._client_service
     
+    @property
+    def client_search_service(self):
+        """Acceso lazy al ClientSearchService a través del Service Container."""
+        if self._client_search_service is None:
+            container = get_container()
+            self._client_search_service = container.get('client_search_service')
+        return self._client_search_service
+    
     @property
     def sales_service(self):
         """Acceso lazy al SalesService a través del Service Container."""
@@ -148,6 +172,14 @@ class SalesWindow:
             container = get_container()
             self._ticket_service = container.get('ticket_service')
         return self._ticket_service
+
+    @property
+    def ticket_render_service(self):
+        """Acceso lazy al TicketRenderService a través del Service Container."""
+        if self._ticket_render_service is None:
+            container = get_container()
+            self._ticket_render_service = container.get('ticket_render_service')
+        return self._ticket_render_service
         
     def _create_ui(self):
         """Crea los elementos de la interfaz de usuario."""
@@ -428,8 +460,21 @@ class SalesWindow:
         # Preview de información del producto al escribir en el campo de código
         ## self.barcode_var.trace_add("write", self._preview_product_info)
 
-        # Filtrado de clientes en tiempo real
-        self.client_search_var.trace_add("write", lambda *_: self._update_client_listbox())
+        # Búsqueda de clientes en tiempo real (debounce + consulta en hilo de trabajo
+        # con conexión propia de solo lectura)
+        self._client_search = IncrementalSearch(
+            self.root,
+            search_func=self._search_clients_page,
+            on_results=self._on_client_results,
+            on_error=lambda term, e: self.logger.error(f"Error buscando clientes '{term}': {e}"),
+            match_func=lambda cliente, texto: self.client_search_service.coincide(cliente, texto),
+            delay_ms=self.CLIENT_SEARCH_DELAY_MS,
+            result_limit=self.CLIENT_PAGE_SIZE,
+            reusable_modes={"nombre"},
+            name="ClientSearchWorker",
+            db_path=getattr(self.client_search_service.db, 'db_path', None)
+        )
+        self.client_search_var.trace_add("write", lambda *_: self._on_client_search_changed())
 
         # Selección de cliente al hacer clic
         self.client_listbox.bind("<<ListboxSelect>>", self._on_client_selected)
@@ -443,8 +488,9 @@ class SalesWindow:
             # self.client_combo['values'] = client_options
             # self.client_combo.current(0)  # Seleccionar "Venta sin cliente"
             
-            self.all_clients = self.client_service.get_all_clients()
-            self.filtered_clients = self.all_clients.copy()
+            # Clientes: solo la primera página, el resto se busca bajo demanda.
+            # El servicio se crea aquí (hilo de UI) y no en el hilo de búsqueda.
+            _ = self.client_search_service
             self._update_client_listbox()
 
             self.logger.info("Datos cargados para venta")
@@ -459,6 +505,10 @@ class SalesWindow:
             selection = self.client_listbox.curselection()
             if selection:
                 index = selection[0]
+                if index >= len(self.filtered_clients):
+                    # Entrada "más resultados": cargar la página siguiente
+                    self._load_more_clients()
+                    return
                 self.selected_client = self.filtered_clients[index]
                 self.logger.info(f"Cliente seleccionado: {self.selected_client.nombre}")
                 self.selected_client_label.config(text=f"Cliente seleccionado: {self.selected_client.nombre}")
@@ -470,22 +520,90 @@ class SalesWindow:
             self.logger.error(f"Error seleccionando cliente: {e}")
             self.selected_client = None
 
+    def _client_search_mode(self, text: str) -> str:
+        """Modo de búsqueda de clientes según el texto ingresado."""
+        return "ruc" if ClientSearchService.es_ruc(text) else "nombre"
+
+    def _on_client_search_changed(self):
+        """Programa la búsqueda de clientes al escribir (con debounce)."""
+        if self._client_search is None:
+            return
+        text = self.client_search_var.get().strip()
+        self._client_search.schedule(text, self._client_search_mode(text))
+
     def _update_client_listbox(self):
-        """Actualiza el Listbox con los clientes filtrados por búsqueda."""
+        """Busca de inmediato los clientes del texto actual y actualiza el Listbox."""
+        if self._client_search is None:
+            return
+        text = self.client_search_var.get().strip()
+        self._client_search.search_now(text, self._client_search_mode(text))
+
+    def _load_more_clients(self):
+        """Carga la página siguiente de la búsqueda actual."""
+        if self._client_search is None or not self._client_has_more:
+            return
+        # El cursor se toma aquí (hilo de UI) y viaja con la búsqueda
+        self._client_search.search_now(self.client_search_var.get().strip(), "mas",
+                                       params={'cursor': self._next_client_cursor})
+
+    def _search_clients_page(self, text: str, mode: str, db=None, cursor=None):
+        """
+        Consulta una página de clientes (se ejecuta en el hilo de búsqueda).
+        
+        Args:
+            text: Texto de búsqueda
+            mode: "nombre", "ruc" o "mas" (página siguiente)
+            db: Conexión de solo lectura del hilo de búsqueda (None: la del servicio)
+            cursor: Cursor de la página siguiente, solo en modo "mas"
+        """
+        service = self.client_search_service
+        if db is not None:
+            if self._client_search_worker is None or self._client_search_worker.db is not db:
+                self._client_search_worker = service.con_conexion(db)
+            service = self._client_search_worker
+        return service.buscar_clientes(text, self.CLIENT_PAGE_SIZE, cursor if mode == "mas" else None)
+
+    def _on_client_results(self, text: str, mode: str, clientes: List, info: Dict):
+        """Muestra una página de clientes en el Listbox (hilo de tkinter)."""
         if not hasattr(self, "client_listbox") or not self.client_listbox.winfo_exists():
             return  # El Listbox no está creado o ya fue destruido
 
-        search_text = self.client_search_var.get().lower()
-        self.filtered_clients = [
-            c for c in self.all_clients
-            if search_text in c.nombre.lower()
-        ]
-        
-        self.client_listbox.delete(0, tk.END)
-        
-        for c in self.filtered_clients:
-            ruc_str = c.ruc if c.ruc else "Sin RUC"
-            self.client_listbox.insert(tk.END, f"{c.nombre} - {ruc_str}")
+        # Quitar la entrada "más resultados" de la página anterior
+        if self._client_has_more:
+            self.client_listbox.delete(len(self.filtered_clients))
+
+        if mode == "mas":
+            self.filtered_clients.extend(clientes)
+        else:
+            self.filtered_clients = list(clientes)
+            self.client_listbox.delete(0, tk.END)
+
+        # Las páginas filtradas en memoria son listas completas (sin cursor)
+        self._client_has_more = getattr(clientes, 'hay_mas', False)
+        self._next_client_cursor = getattr(clientes, 'cursor', None)
+
+        self.client_listbox.insert(tk.END, *[
+            f"{c.nombre} - {c.ruc if c.ruc else 'Sin RUC'}" for c in clientes
+        ])
+        if self._client_has_more:
+            self.client_listbox.insert(tk.END, self.CLIENT_MORE_TEXT)
+
+        self._select_pending_client()
+
+    def _select_pending_client(self):
+        """Selecciona en el Listbox el cliente recién creado, si ya está visible."""
+        if self._pending_client_id is None:
+            return
+        for i, cliente in enumerate(self.filtered_clients):
+            if cliente.id_cliente == self._pending_client_id:
+                self._pending_client_id = None
+                self.selected_client = cliente
+                self.client_listbox.selection_clear(0, tk.END)
+                self.client_listbox.selection_set(i)
+                self.client_listbox.activate(i)
+                self.client_listbox.see(i)
+                self.selected_client_label.config(text=f"Cliente seleccionado: {cliente.nombre}")
+                break
 
     # ===== MÉTODOS DE CÓDIGOS DE BARRAS - MODO TECLADO =====
     
@@ -1038,32 +1156,23 @@ class SalesWindow:
     def _create_new_client(self):
         from ui.forms.client_form import ClientWindow
 
-        # Guardar lista completa antes (id_cliente y ruc)
-        clientes_antes = {(c.ruc, c.nombre) for c in self.client_service.get_all_clients()}
+        # Último ID antes de abrir el formulario (sin cargar todos los clientes)
+        ultimo_id = self.client_search_service.obtener_ultimo_id()
 
         # Abrir ventana de creación de cliente y esperar cierre
         client_window = ClientWindow(self.root)
         self.root.wait_window(client_window.root)
 
-        # Recargar clientes y lista
-        self._load_data()
+        nuevo_id = self.client_search_service.obtener_ultimo_id()
+        cliente = self.client_service.get_client_by_id(nuevo_id) if nuevo_id > ultimo_id else None
 
-        # Lista después
-        clientes_despues = {(c.ruc, c.nombre) for c in self.all_clients}
-
-        nuevos = clientes_despues - clientes_antes
-
-        if nuevos:
-            nuevo_ruc, nuevo_nombre = nuevos.pop()
-            for i, cliente in enumerate(self.filtered_clients):
-                if cliente.ruc == nuevo_ruc and cliente.nombre == nuevo_nombre:
-                    self.selected_client = cliente
-                    self.client_listbox.selection_clear(0, tk.END)
-                    self.client_listbox.selection_set(i)
-                    self.client_listbox.activate(i)
-                    self.client_listbox.see(i)
-                    self.selected_client_label.config(text=f"Cliente seleccionado: {cliente.nombre}")
-                    break
+        if cliente:
+            # Buscar el nuevo cliente y seleccionarlo cuando lleguen los resultados
+            self.selected_client = cliente
+            self.selected_client_label.config(text=f"Cliente seleccionado: {cliente.nombre}")
+            self._pending_client_id = cliente.id_cliente
+            self.client_search_var.set(cliente.ruc or cliente.nombre)
+            self._update_client_listbox()
         else:
             # No se detectó nuevo cliente
             self.selected_client = None
@@ -1210,43 +1319,18 @@ class SalesWindow:
                     generated_by=responsable
                 )
 
-                # --- Generar PDF del ticket ---
-                from reports.ticket_generator import TicketGenerator
-                # generator = TicketGenerator()
-                
-                db = getattr(self.ticket_service.sales_service, 'db', None)
-                
-                # Crear generador de ticket pasando db correctamente
-                generator = TicketGenerator(db)
-
-                output_path = generator.generar_ruta_archivo(ticket)
-                success = generator.generar_ticket_pdf(ticket, output_path)
-
-                if success:
-                    # Actualizar ruta en la base de datos y en el objeto ticket
-                    ticket_service.actualizar_pdf_path(ticket.id_ticket, output_path)
-                    ticket.pdf_path = output_path
-
-                    messagebox.showinfo(
-                        "Ticket Generado",
-                        f"Ticket de venta generado exitosamente\n"
-                        f"Número: {ticket.ticket_number}\n"
-                        f"Archivo: {ticket.pdf_path}"
+                # El PDF se genera en segundo plano para no bloquear la siguiente venta
+                self.ticket_render_service.encolar_ticket(
+                    ticket,
+                    callback=lambda t, path, error: self._schedule_on_ui(
+                        self._on_ticket_pdf_ready, ticket.ticket_number, path, error
                     )
+                )
 
-                    # Preguntar si desea abrir el archivo PDF
-                    if ticket.pdf_path and messagebox.askyesno("Abrir PDF", "¿Desea abrir el archivo PDF generado?"):
-                        import os
-                        import subprocess
-                        try:
-                            if os.path.exists(ticket.pdf_path):
-                                os.startfile(ticket.pdf_path)  # Windows
-                        except AttributeError:
-                            subprocess.run(['xdg-open', ticket.pdf_path])  # Linux/Mac
-                        except Exception:
-                            messagebox.showinfo("Archivo Listo", f"El archivo se guardó en: {ticket.pdf_path}")
-                else:
-                    messagebox.showwarning("Advertencia", "El ticket fue generado pero no se pudo crear el PDF.")
+                self.product_status_label.config(
+                    text=f"🧾 Ticket {ticket.ticket_number} registrado, generando PDF...",
+                    foreground="blue"
+                )
 
         except AttributeError as e:
             self.logger.error(f"Error de atributo en generación de ticket: {e}")
@@ -1265,6 +1349,30 @@ class SalesWindow:
             self.logger.error(f"Error general generando ticket: {e}")
             messagebox.showerror("Error", f"Error al generar ticket: {e}")
 
+    def _schedule_on_ui(self, callback, *args):
+        """Reenviar un callback de un hilo de trabajo al hilo de Tk."""
+        try:
+            self.root.after(0, callback, *args)
+        except (tk.TclError, RuntimeError):
+            # La ventana se cerró antes de que terminara el trabajo
+            pass
+
+    def _on_ticket_pdf_ready(self, ticket_number: str, pdf_path: Optional[str], error):
+        """Actualizar el estado cuando termina la generación del PDF del ticket."""
+        if error or not pdf_path:
+            self.logger.error(f"Error generando PDF del ticket {ticket_number}: {error}")
+            self.product_status_label.config(
+                text=f"⚠️ Ticket {ticket_number} registrado, PDF pendiente",
+                foreground="orange"
+            )
+            return
+
+        self.logger.info(f"PDF del ticket {ticket_number} generado: {pdf_path}")
+        self.product_status_label.config(
+            text=f"🧾 Ticket {ticket_number} listo: {pdf_path}",
+            foreground="green"
+        )
+
     def _close_window(self):
         """Cierra la ventana."""
         try:
@@ -1276,8 +1384,40 @@ class SalesWindow:
                 if not result:
                     return
             
-            self.root.destroy()
+            # Oculta la ventana si está en el pool (el hilo de búsqueda queda en espera)
+            self._close_or_hide()
             
         except Exception as e:
             self.logger.error(f"Error cerrando ventana: {e}")
+            self.on_pool_evicted()
             self.root.destroy()
+
+    # ===== REUTILIZACIÓN DESDE EL POOL DE VENTANAS =====
+
+    def reset_for_reuse(self):
+        """Dejar la ventana lista para una venta nueva sin reconstruirla."""
+        self.sale_items.clear()
+        self.items_tree.delete(*self.items_tree.get_children())
+        self._update_totals()
+        self._update_items_info()
+
+        self.selected_client = None
+        self._pending_client_id = None
+        self.selected_client_label.config(text="Cliente seleccionado: Ninguno")
+        self.client_listbox.selection_clear(0, tk.END)
+        if self.client_search_var.get():
+            self.client_search_var.set("")  # Programa la búsqueda de la lista inicial
+
+        self.quantity_var.set("1")
+        self._clear_barcode()
+
+    def refresh_catalogs(self, changed):
+        """Recargar la lista de clientes si cambió mientras la ventana estaba oculta."""
+        if 'clientes' in changed and self._client_search is not None:
+            self._client_search.invalidate_cache()
+            self._update_client_listbox()
+
+    def on_pool_evicted(self):
+        """Detener el hilo de búsqueda de clientes antes de destruir la ventana."""
+        if self._client_search:
+            self._client_search.stop()
@@ -32,22 +32,32 @@ from services.service_container import get_container
 # Importar configuración de base de datos para path correcto
 from config_db import get_database_path
 
-# Importaciones de ventanas
-from ui.forms.category_form import CategoryWindow
-from ui.forms.product_form import ProductWindow
-from ui.forms.client_form import ClientWindow
-from ui.forms.sales_form import SalesWindow
-from ui.forms.movement_form import MovementForm
-from ui.forms.label_generator_form import LabelGeneratorForm  # SISTEMA DE ETIQUETAS
-
-
-from ui.forms.reports_form import ReportsForm  # FASE 2: Sistema de Reportes
-from ui.forms.ticket_preview_form import TicketPreviewForm  # FASE 3: Sistema de Tickets
-from ui.forms.company_config_form import CompanyConfigForm  # FASE 3: Configuración de Empresa
 # from ui.auth.session_manager import session_manager  # DEPRECATED: Usar ServiceContainer
-from services.service_container import get_container
+from ui.shared.change_notifications import ChangeNotificationBridge
+from ui.utils.lazy_registry import LazyRegistry
 from ui.utils.window_manager import window_manager
 
+# Ventanas: se importan al abrirse por primera vez (arrastran reportlab,
+# openpyxl, PIL, barcode...) y se precargan en segundo plano tras el login
+FORMS = LazyRegistry({
+    'CategoryWindow': 'ui.forms.category_form:CategoryWindow',
+    'ProductWindow': 'ui.forms.product_form:ProductWindow',
+    'ClientWindow': 'ui.forms.client_form:ClientWindow',
+    'SalesWindow': 'ui.forms.sales_form:SalesWindow',
+    'MovementForm': 'ui.forms.movement_form:MovementForm',
+    'LabelGeneratorForm': 'ui.forms.label_generator_form:LabelGeneratorForm',  # SISTEMA DE ETIQUETAS
+    'ReportsForm': 'ui.forms.reports_form:ReportsForm',  # FASE 2: Sistema de Reportes
+    'TicketPreviewForm': 'ui.forms.ticket_preview_form:TicketPreviewForm',  # FASE 3: Sistema de Tickets
+    'CompanyConfigForm': 'ui.forms.company_config_form:CompanyConfigForm',  # FASE 3: Configuración de Empresa
+}, name="FormWarmUp")
+
+# Orden de precarga: primero lo que se abre en caja
+WARM_UP_ORDER = ('SalesWindow', 'ClientWindow', 'ProductWindow', 'MovementForm', 'ReportsForm',
+                 'CategoryWindow', 'LabelGeneratorForm', 'TicketPreviewForm', 'CompanyConfigForm')
+
+# Servicios pesados que el container resuelve en el primer uso
+WARM_UP_MODULES = ('services.export_service', 'services.label_service')
+
 class MainWindow:
     """Ventana principal del sistema de gestión de inventario."""
     
@@ -92,6 +102,17 @@ class MainWindow:
         self._create_status_bar()
         self._setup_events()
         
+        # Ventas, productos y clientes se ocultan al cerrarse y se reutilizan;
+        # al reabrirlos solo se recargan los catálogos que cambiaron
+        window_manager.configure_pool(catalog_versions=lambda: self.db_connection.get_catalog_versions())
+        
+        # Cambios de stock y precio (de esta y de otras terminales) como eventos PRODUCT_CHANGED
+        self.change_bridge = ChangeNotificationBridge(self.root)
+        self.change_bridge.start()
+        
+        # Precargar formularios en segundo plano una vez dibujada la ventana
+        FORMS.warm_up(WARM_UP_ORDER, WARM_UP_MODULES, delay=1.0)
+        
         self.logger.info("Ventana principal inicializada correctamente")
     
     # === PROPIEDADES LAZY PARA SERVICIOS DEL CONTAINER ===
@@ -424,7 +445,7 @@ class MainWindow:
             
         try:
             # Crear nueva ventana
-            category_window = CategoryWindow(self.root)
+            category_window = FORMS.get('CategoryWindow')(self.root)
             self.logger.info("Ventana de categorías abierta")
         except Exception as e:
             self.logger.error(f"Error al abrir ventana de categorías: {e}")
@@ -436,14 +457,9 @@ class MainWindow:
             messagebox.showwarning("Acceso Denegado", "No tiene permisos para acceder a esta función")
             return
             
-        # Verificar si ya está abierta y es válida
-        if window_manager.is_window_open('products'):
-            window_manager.bring_to_front('products')
-            return
-            
         try:
-            # Crear nueva ventana
-            product_window = ProductWindow(self.root)
+            # Trae al frente, reutiliza la ventana oculta o crea una nueva
+            window_manager.open_pooled('products', lambda: FORMS.get('ProductWindow')(self.root))
             self.logger.info("Ventana de productos abierta")
         except Exception as e:
             self.logger.error(f"Error al abrir ventana de productos: {e}")
@@ -451,14 +467,9 @@ class MainWindow:
             
     def _open_clients(self):
         """Abre la ventana de gestión de clientes."""
-        # Verificar si ya está abierta y es válida
-        if window_manager.is_window_open('clients'):
-            window_manager.bring_to_front('clients')
-            return
-            
         try:
-            # Crear nueva ventana
-            client_window = ClientWindow(self.root)
+            # Trae al frente, reutiliza la ventana oculta o crea una nueva
+            window_manager.open_pooled('clients', lambda: FORMS.get('ClientWindow')(self.root))
             self.logger.info("Ventana de clientes abierta")
         except Exception as e:
             self.logger.error(f"Error al abrir ventana de clientes: {e}")
@@ -466,14 +477,9 @@ class MainWindow:
             
     def _open_sales(self):
         """Abre la ventana de procesamiento de ventas."""
-        # Verificar si ya está abierta y es válida
-        if window_manager.is_window_open('sales'):
-            window_manager.bring_to_front('sales')
-            return
-            
         try:
-            # Crear nueva ventana
-            sales_window = SalesWindow(self.root)
+            # Trae al frente, reutiliza la ventana oculta o crea una nueva
+            window_manager.open_pooled('sales', lambda: FORMS.get('SalesWindow')(self.root))
             self.logger.info("Ventana de ventas abierta")
         except Exception as e:
             self.logger.error(f"Error al abrir ventana de ventas: {e}")
@@ -492,7 +498,7 @@ class MainWindow:
 
         try:
             # Crear nueva ventana usando MovementForm
-            movement_form = MovementForm(self.root, self.db_connection)
+            movement_form = FORMS.get('MovementForm')(self.root, self.db_connection)
             if movement_form.window:
                 window_manager.register_window('movements', movement_form.window)
                 self.logger.info("Ventana de movimientos abierta")
@@ -523,7 +529,7 @@ class MainWindow:
             db_path = get_database_path()  # Obtener string path
             
             # Crear nueva instancia del formulario de reportes con path correcto
-            self.reports_form = ReportsForm(self.root, db_path)  # ✅ CORREGIDO
+            self.reports_form = FORMS.get('ReportsForm')(self.root, db_path)  # ✅ CORREGIDO
             self.reports_form.show()
             self.logger.info("Sistema de reportes abierto exitosamente")
             
@@ -583,7 +589,7 @@ class MainWindow:
             
         try:
             # Crear nueva ventana
-            label_generator = LabelGeneratorForm(self.root)
+            label_generator = FORMS.get('LabelGeneratorForm')(self.root)
             self.logger.info("Generador de etiquetas abierto")
         except Exception as e:
             self.logger.error(f"Error al abrir generador de etiquetas: {e}")
@@ -647,7 +653,7 @@ class MainWindow:
             # self.company_config_form.show()
             # self.logger.info("Configuración de empresa abierta exitosamente")
             
-            self.company_config_form = CompanyConfigForm(self.root)
+            self.company_config_form = FORMS.get('CompanyConfigForm')(self.root)
             # Mostrar el formulario (bloquea hasta cerrarse)
             self.company_config_form.show()
             # Al volver, recargar la info en la ventana principal
@@ -900,7 +906,7 @@ class MainWindow:
             db_path = get_database_path()  # Obtener string path
             
             # Crear nueva instancia del formulario de preview
-            self.ticket_preview_form = TicketPreviewForm(self.root, db_path)
+            self.ticket_preview_form = FORMS.get('TicketPreviewForm')(self.root, db_path)
             self.ticket_preview_form.show()
             self.logger.info("Vista previa de tickets abierta exitosamente")
             
@@ -1034,6 +1040,10 @@ Desarrollado siguiendo metodología TDD"""
     def _logout_and_close(self):
         """Cierra sesión y la aplicación."""
         try:
+            # Detener precarga pendiente de formularios y notificaciones de cambios
+            FORMS.stop()
+            self.change_bridge.stop()
+            
             # Cerrar ventana de reportes si está abierta
             if self.reports_form and hasattr(self.reports_form, 'window') and self.reports_form.window:
                 try:
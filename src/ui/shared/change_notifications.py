@@ -0,0 +1,78 @@
+"""
+Puente entre db.change_notifier y el Event Bus de tkinter.
+
+El notificador llama a sus suscriptores desde el hilo que escribió (un
+servicio o el hilo de sondeo entre procesos); tkinter solo puede tocarse
+desde su propio hilo. El puente acumula los eventos por producto (gana el
+último estado) y programa un único after() por ráfaga; en el hilo de
+tkinter los publica como EventTypes.PRODUCT_CHANGED para que las ventanas
+actualicen sus datos en memoria sin volver a consultar el catálogo.
+"""
+
+import logging
+import threading
+import tkinter as tk
+from typing import Any, Dict, Optional
+
+from ui.shared.event_bus_tkinter import EventBusTkinter, get_event_bus_tkinter
+from ui.shared.events import EventSources, EventTypes
+
+
+class ChangeNotificationBridge:
+    """Reenvía los cambios de productos del notificador al Event Bus, en el hilo de tkinter."""
+
+    def __init__(self, root: tk.Misc, notifier=None, event_bus: Optional[EventBusTkinter] = None):
+        """
+        Inicializar el puente.
+
+        Args:
+            root: Ventana raíz (o cualquier widget) para programar after()
+            notifier: ChangeNotifier (por defecto db.change_notifier.change_notifier)
+            event_bus: Event Bus (por defecto el singleton)
+        """
+        if notifier is None:
+            from db.change_notifier import change_notifier as notifier
+        self._root = root
+        self._notifier = notifier
+        self._event_bus = event_bus or get_event_bus_tkinter()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._scheduled = False
+        self._subscription: Optional[int] = None
+        self._logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        """Suscribirse al notificador (sin efecto si ya está suscrito)."""
+        if self._subscription is None:
+            self._subscription = self._notifier.suscribir(self._on_change)
+
+    def stop(self) -> None:
+        """Desuscribirse y descartar los eventos pendientes."""
+        if self._subscription is not None:
+            self._notifier.desuscribir(self._subscription)
+            self._subscription = None
+        with self._lock:
+            self._pending.clear()
+
+    def _on_change(self, evento: Dict[str, Any]) -> None:
+        """Recibir un evento en el hilo que publicó y programar el despacho."""
+        with self._lock:
+            self._pending[evento['id_producto']] = evento
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self._root.after(0, self._flush)
+        except (RuntimeError, tk.TclError) as e:
+            # Ventana destruida o tkinter sin soporte de hilos
+            with self._lock:
+                self._scheduled = False
+            self._logger.debug(f"No se pudo programar el despacho de cambios: {e}")
+
+    def _flush(self) -> None:
+        """Publicar en el Event Bus los cambios acumulados (hilo de tkinter)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        for evento in sorted(pending.values(), key=lambda item: item['version']):
+            self._event_bus.publish(EventTypes.PRODUCT_CHANGED, dict(evento), source=EventSources.CHANGE_NOTIFIER)
@@ -8,16 +8,42 @@ CORRECCIÓN CRÍTICA: Eliminada dependencia PyQt6 para compatibilidad tkinter
 - Event loop 100% tkinter compatible
 - Threading safe con tkinter after()
 - Logging integrado para debugging
+
+DESPACHO POR LOTES (modo 'batched', por defecto):
+- Los eventos publicados dentro de un frame (frame_ms) se despachan en un
+  único callback after() en lugar de uno por evento
+- Los eventos coalescibles del mismo tipo y clave se reemplazan dentro del
+  lote (gana el último, por ejemplo el último resultado de búsqueda)
+- Prioridades por evento y por listener
+- Listeners con referencia débil (weak=True)
+- Métricas de latencia de despacho por tipo de evento
+El modo 'immediate' conserva el comportamiento anterior (un after(0) por evento).
 """
 
 import logging
 import time
 import threading
 import tkinter as tk
-from typing import Dict, List, Callable, Any, Optional
+import weakref
+from collections import deque
+from typing import Dict, List, Callable, Any, Optional, Union
 from dataclasses import dataclass
 
 
+# Prioridades de evento (mayor se despacha antes dentro de un lote)
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+DISPATCH_MODES = ('batched', 'immediate')
+
+# Duración de un frame para agrupar eventos (ms)
+DEFAULT_FRAME_MS = 16
+
+# Muestras de latencia guardadas por tipo de evento (para percentiles)
+_LATENCY_SAMPLES = 256
+
+
 @dataclass
 class EventData:
     """Estructura de datos estándar para eventos del Event Bus."""
@@ -39,6 +65,71 @@ class EventData:
             self.timestamp = time.time()
 
 
+class _Listener:
+    """Listener registrado (referencia fuerte o débil) con su prioridad."""
+    
+    __slots__ = ('_ref', 'priority', 'weak')
+    
+    def __init__(self, callback: Callable, priority: int, weak: bool):
+        self.priority = priority
+        self.weak = weak
+        if weak:
+            # WeakMethod para métodos ligados: una referencia simple al método moriría al instante
+            self._ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else weakref.ref(callback)
+        else:
+            self._ref = callback
+    
+    def resolve(self) -> Optional[Callable]:
+        """Obtener el callback, o None si su objeto fue recolectado."""
+        return self._ref() if self.weak else self._ref
+    
+    def matches(self, callback: Callable) -> bool:
+        return self.resolve() == callback
+
+
+class _PendingEvent:
+    """Evento en espera del próximo lote."""
+    
+    __slots__ = ('event_data', 'priority', 'sequence', 'published_at')
+    
+    def __init__(self, event_data: EventData, priority: int, sequence: int):
+        self.event_data = event_data
+        self.priority = priority
+        self.sequence = sequence
+        self.published_at = time.perf_counter()
+
+
+class _EventTypeMetrics:
+    """Contadores y latencias de despacho de un tipo de evento."""
+    
+    __slots__ = ('published', 'dispatched', 'coalesced', 'listener_calls',
+                 'latency_total', 'latency_max', 'listener_total', 'samples')
+    
+    def __init__(self):
+        self.published = 0
+        self.dispatched = 0
+        self.coalesced = 0
+        self.listener_calls = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.listener_total = 0.0
+        self.samples = deque(maxlen=_LATENCY_SAMPLES)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            'published': self.published,
+            'dispatched': self.dispatched,
+            'coalesced': self.coalesced,
+            'listener_calls': self.listener_calls,
+            'latency_avg_ms': round(self.latency_total / self.dispatched * 1000, 3) if self.dispatched else 0.0,
+            'latency_p95_ms': round(p95 * 1000, 3),
+            'latency_max_ms': round(self.latency_max * 1000, 3),
+            'listener_avg_ms': round(self.listener_total / self.dispatched * 1000, 3) if self.dispatched else 0.0,
+        }
+
+
 class EventBusTkinter:
     """
     Event Bus implementation 100% compatible con tkinter.
@@ -46,6 +137,7 @@ class EventBusTkinter:
     Implementa patrón Publisher/Subscriber con:
     - Registro dinámico de listeners
     - Publicación asíncrona de eventos via tkinter.after()
+    - Despacho por lotes con coalescencia y prioridades
     - Thread safety para aplicaciones tkinter
     - Logging para debugging
     - Manejo robusto de errores
@@ -69,7 +161,7 @@ class EventBusTkinter:
         if hasattr(self, '_initialized'):
             return
         
-        self._listeners: Dict[str, List[Callable]] = {}
+        self._listeners: Dict[str, List[_Listener]] = {}
         self._logger = logging.getLogger(__name__)
         self._lock = threading.RLock()
         self._initialized = True
@@ -77,8 +169,25 @@ class EventBusTkinter:
         # Tkinter root para scheduling asíncrono
         self._root: Optional[tk.Tk] = None
         
+        # Despacho por lotes
+        self._dispatch_mode = 'batched'
+        self._frame_ms = DEFAULT_FRAME_MS
+        self._pending: Dict[Any, _PendingEvent] = {}
+        self._flush_scheduled = False
+        self._sequence = 0
+        self._coalescing: Dict[str, Union[str, Callable[[Dict[str, Any]], Any], None]] = {}
+        self._priorities: Dict[str, int] = {}
+        self._metrics: Dict[str, _EventTypeMetrics] = {}
+        self._apply_default_policies()
+        
         self._logger.info("EventBusTkinter inicializado correctamente (sin PyQt6)")
     
+    def _apply_default_policies(self) -> None:
+        """Aplicar la coalescencia y prioridades por defecto de los eventos del dominio."""
+        from .events import COALESCING_KEYS, EVENT_PRIORITIES
+        self._coalescing.update(COALESCING_KEYS)
+        self._priorities.update(EVENT_PRIORITIES)
+    
     def set_tkinter_root(self, root: tk.Tk) -> None:
         """
         Establecer root de tkinter para scheduling asíncrono.
@@ -89,13 +198,67 @@ class EventBusTkinter:
         self._root = root
         self._logger.debug("Tkinter root configurado para Event Bus")
     
-    def register(self, event_type: str, callback: Callable[[EventData], None]) -> None:
+    def set_dispatch_mode(self, mode: str, frame_ms: Optional[int] = None) -> None:
+        """
+        Elegir el modo de despacho.
+        
+        Args:
+            mode: 'batched' (un after() por frame) o 'immediate' (un after(0) por evento)
+            frame_ms: Ventana de agrupación en milisegundos (modo 'batched')
+            
+        Raises:
+            ValueError: Si el modo no existe
+        """
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"Modo de despacho desconocido: {mode} (disponibles: {', '.join(DISPATCH_MODES)})")
+        
+        if mode == 'immediate':
+            self.flush()
+        with self._lock:
+            self._dispatch_mode = mode
+            if frame_ms is not None:
+                self._frame_ms = max(0, int(frame_ms))
+        self._logger.debug(f"Modo de despacho: {mode} ({self._frame_ms} ms)")
+    
+    def set_coalescing(self, event_type: str,
+                       key: Union[str, Callable[[Dict[str, Any]], Any], None] = None) -> None:
+        """
+        Declarar un tipo de evento como coalescible.
+        
+        Dentro de un lote, un evento nuevo del mismo tipo y clave reemplaza al
+        pendiente (se despacha solo el último). Usar solo en eventos donde el
+        último estado sustituye a los anteriores (resultados de búsqueda),
+        nunca en acciones que deben procesarse todas (productos escaneados).
+        
+        Args:
+            event_type: Tipo de evento
+            key: Campo de data (str) o función data -> clave; None = una clave por tipo
+        """
+        with self._lock:
+            self._coalescing[event_type] = key
+    
+    def set_event_priority(self, event_type: str, priority: int) -> None:
+        """
+        Fijar la prioridad por defecto de un tipo de evento.
+        
+        Args:
+            event_type: Tipo de evento
+            priority: Prioridad (PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH o cualquier entero)
+        """
+        with self._lock:
+            self._priorities[event_type] = priority
+    
+    def register(self, event_type: str, callback: Callable[[EventData], None],
+                 priority: int = PRIORITY_NORMAL, weak: bool = False) -> None:
         """
         Registrar listener para tipo de evento específico.
         
         Args:
             event_type: Tipo de evento a escuchar
             callback: Función a llamar cuando se publique el evento
+            priority: Los listeners de mayor prioridad se llaman primero
+            weak: Guardar referencia débil (el listener se descarta al
+                  destruirse su objeto, sin necesidad de unregister)
             
         Raises:
             ValueError: Si event_type está vacío o callback es None
@@ -110,11 +273,12 @@ class EventBusTkinter:
             raise ValueError("callback debe ser callable")
         
         with self._lock:
-            if event_type not in self._listeners:
-                self._listeners[event_type] = []
+            listeners = self._listeners.setdefault(event_type, [])
             
-            if callback not in self._listeners[event_type]:
-                self._listeners[event_type].append(callback)
+            if not any(listener.matches(callback) for listener in listeners):
+                listeners.append(_Listener(callback, priority, weak))
+                # Orden estable: misma prioridad conserva el orden de registro
+                listeners.sort(key=lambda listener: -listener.priority)
                 self._logger.debug(f"Listener registrado para evento '{event_type}'")
             else:
                 self._logger.warning(f"Listener ya estaba registrado para evento '{event_type}'")
@@ -135,22 +299,25 @@ class EventBusTkinter:
         
         with self._lock:
             if event_type in self._listeners:
-                try:
-                    self._listeners[event_type].remove(callback)
-                    self._logger.debug(f"Listener desregistrado para evento '{event_type}'")
-                    
-                    # Limpiar lista vacía
-                    if not self._listeners[event_type]:
-                        del self._listeners[event_type]
-                    
-                    return True
-                except ValueError:
-                    self._logger.warning(f"Listener no encontrado para evento '{event_type}'")
-                    return False
+                listeners = self._listeners[event_type]
+                for index, listener in enumerate(listeners):
+                    if listener.matches(callback):
+                        del listeners[index]
+                        self._logger.debug(f"Listener desregistrado para evento '{event_type}'")
+                        
+                        # Limpiar lista vacía
+                        if not listeners:
+                            del self._listeners[event_type]
+                        
+                        return True
+                
+                self._logger.warning(f"Listener no encontrado para evento '{event_type}'")
+                return False
             
             return False
     
-    def publish(self, event_type: str, data: Dict[str, Any], source: str = "unknown") -> None:
+    def publish(self, event_type: str, data: Dict[str, Any], source: str = "unknown",
+                priority: Optional[int] = None) -> None:
         """
         Publicar evento a todos los listeners registrados.
         
@@ -158,6 +325,7 @@ class EventBusTkinter:
             event_type: Tipo de evento a publicar
             data: Datos del evento
             source: Fuente que origina el evento
+            priority: Prioridad dentro del lote (None = la del tipo de evento)
         """
         try:
             event_data = EventData(
@@ -167,47 +335,179 @@ class EventBusTkinter:
                 source=source
             )
             
-            # Procesar de forma asíncrona via tkinter.after() si root disponible
-            if self._root:
-                self._root.after(0, lambda: self._handle_event_async(event_data))
+            with self._lock:
+                self._metrics_for(event_type).published += 1
+                if priority is None:
+                    priority = self._priorities.get(event_type, PRIORITY_NORMAL)
+                batched = self._dispatch_mode == 'batched' and self._root is not None
+                if batched:
+                    self._enqueue(event_data, priority)
+            
+            if batched:
+                self._schedule_flush()
+            elif self._root:
+                # Procesar de forma asíncrona via tkinter.after() (modo 'immediate')
+                pending = _PendingEvent(event_data, priority, 0)
+                self._root.after(0, lambda: self._dispatch(pending))
             else:
                 # Fallback: procesamiento síncrono
-                self._handle_event_async(event_data)
+                self._dispatch(_PendingEvent(event_data, priority, 0))
             
             self._logger.debug(f"Evento '{event_type}' publicado desde '{source}' (tkinter)")
             
         except Exception as e:
             self._logger.error(f"Error publicando evento '{event_type}': {e}")
     
-    def _handle_event_async(self, event_data: EventData) -> None:
+    def flush(self) -> int:
+        """
+        Despachar ahora los eventos pendientes del lote.
+        
+        Debe llamarse desde el hilo de tkinter (o sin root configurado).
+        
+        Returns:
+            int: Cantidad de eventos despachados
+        """
+        with self._lock:
+            pending = sorted(self._pending.values(), key=lambda event: (-event.priority, event.sequence))
+            self._pending = {}
+            self._flush_scheduled = False
+        
+        for event in pending:
+            self._dispatch(event)
+        return len(pending)
+    
+    def _enqueue(self, event_data: EventData, priority: int) -> None:
+        """Agregar al lote pendiente, reemplazando el evento coalescible anterior (con lock)."""
+        self._sequence += 1
+        event_type = event_data.event_type
+        
+        if event_type in self._coalescing:
+            key = self._coalescing[event_type]
+            if callable(key):
+                key = key(event_data.data)
+            elif key is not None:
+                key = event_data.data.get(key) if isinstance(event_data.data, dict) else None
+            slot = (event_type, key)
+            if slot in self._pending:
+                self._metrics_for(event_type).coalesced += 1
+                # Se conserva la hora de publicación del primero: mide la espera real de la UI
+                published_at = self._pending.pop(slot).published_at
+                pending = _PendingEvent(event_data, priority, self._sequence)
+                pending.published_at = published_at
+                self._pending[slot] = pending
+                return
+        else:
+            slot = self._sequence
+        
+        self._pending[slot] = _PendingEvent(event_data, priority, self._sequence)
+    
+    def _schedule_flush(self) -> None:
+        """Programar un único callback after() para el lote actual."""
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        
+        try:
+            self._root.after(self._frame_ms, self.flush)
+        except (tk.TclError, RuntimeError) as e:
+            # Root destruido o sin mainloop: despachar en el hilo actual
+            self._logger.debug(f"after() no disponible ({e}); despacho síncrono del lote")
+            self.flush()
+    
+    def _dispatch(self, pending: _PendingEvent) -> None:
+        """
+        Entregar un evento a sus listeners y registrar métricas.
+        
+        Args:
+            pending: Evento pendiente con su hora de publicación
+        """
+        event_data = pending.event_data
+        started = time.perf_counter()
+        calls = self._handle_event_async(event_data)
+        finished = time.perf_counter()
+        
+        with self._lock:
+            metrics = self._metrics_for(event_data.event_type)
+            latency = started - pending.published_at
+            metrics.dispatched += 1
+            metrics.listener_calls += calls
+            metrics.latency_total += latency
+            metrics.latency_max = max(metrics.latency_max, latency)
+            metrics.listener_total += finished - started
+            metrics.samples.append(latency)
+    
+    def _metrics_for(self, event_type: str) -> _EventTypeMetrics:
+        """Obtener (o crear) las métricas de un tipo de evento (con lock)."""
+        metrics = self._metrics.get(event_type)
+        if metrics is None:
+            metrics = self._metrics[event_type] = _EventTypeMetrics()
+        return metrics
+    
+    def _handle_event_async(self, event_data: EventData) -> int:
         """
         Manejar evento de forma asíncrona (compatible con tkinter).
         
         Args:
             event_data: Datos del evento
+            
+        Returns:
+            int: Cantidad de listeners notificados
         """
         try:
             with self._lock:
-                listeners = self._listeners.get(event_data.event_type, []).copy()
+                listeners = self._listeners.get(event_data.event_type, [])
+                callbacks = []
+                for listener in listeners:
+                    callback = listener.resolve()
+                    if callback is not None:
+                        callbacks.append(callback)
+                if len(callbacks) != len(listeners):
+                    # Quitar listeners débiles cuyo objeto ya no existe
+                    listeners[:] = [listener for listener in listeners if listener.resolve() is not None]
+                    if not listeners:
+                        self._listeners.pop(event_data.event_type, None)
             
-            if not listeners:
+            if not callbacks:
                 self._logger.debug(f"No hay listeners para evento '{event_data.event_type}'")
-                return
+                return 0
             
             # Notificar a todos los listeners
-            for listener in listeners:
+            for callback in callbacks:
                 try:
-                    listener(event_data)
+                    callback(event_data)
                 except Exception as e:
                     self._logger.error(
                         f"Error en listener para evento '{event_data.event_type}': {e}",
                         exc_info=True
                     )
             
-            self._logger.debug(f"Evento '{event_data.event_type}' procesado por {len(listeners)} listeners")
+            self._logger.debug(f"Evento '{event_data.event_type}' procesado por {len(callbacks)} listeners")
+            return len(callbacks)
             
         except Exception as e:
             self._logger.error(f"Error manejando evento '{event_data.event_type}': {e}", exc_info=True)
+            return 0
+    
+    def get_dispatch_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtener métricas de despacho por tipo de evento.
+        
+        La latencia va desde la publicación hasta que empiezan a llamarse
+        los listeners; listener_avg_ms es el tiempo medio dentro de ellos.
+        
+        Returns:
+            Dict tipo de evento -> published, dispatched, coalesced,
+            listener_calls, latency_avg_ms, latency_p95_ms, latency_max_ms,
+            listener_avg_ms
+        """
+        with self._lock:
+            return {event_type: metrics.as_dict() for event_type, metrics in self._metrics.items()}
+    
+    def reset_dispatch_metrics(self) -> None:
+        """Reiniciar las métricas de despacho."""
+        with self._lock:
+            self._metrics.clear()
     
     def get_registered_events(self) -> List[str]:
         """
@@ -230,7 +530,7 @@ class EventBusTkinter:
             int: Cantidad de listeners registrados
         """
         with self._lock:
-            return len(self._listeners.get(event_type, []))
+            return sum(1 for listener in self._listeners.get(event_type, []) if listener.resolve() is not None)
     
     def clear_all_listeners(self) -> None:
         """Limpiar todos los listeners registrados."""
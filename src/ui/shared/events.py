@@ -186,6 +186,7 @@ class EventTypes:
     PRODUCT_SEARCH_REQUEST = "product_search_request" 
     PRODUCT_SEARCH_RESULT = "product_search_result"
     PRODUCT_VALIDATION = "product_validation"
+    PRODUCT_CHANGED = "product_changed"  # Stock/precio/estado cambiados (db.change_notifier)
     
     # Eventos de movimientos
     MOVEMENT_ENTRY_ACTION = "movement_entry_action"
@@ -221,11 +222,31 @@ class EventSources:
     PRODUCT_SERVICE = "ProductService"
     INVENTORY_SERVICE = "InventoryService"
     VALIDATION_SERVICE = "ValidationService"
+    CHANGE_NOTIFIER = "ChangeNotifier"
     
     # Mediadores
     PRODUCT_MOVEMENT_MEDIATOR = "ProductMovementMediator"
 
 
+# ==================== POLÍTICAS DE DESPACHO ====================
+
+# Eventos coalescibles en el despacho por lotes: tipo -> campo clave de data.
+# Dentro de un frame solo se entrega el último evento de cada clave (la
+# última búsqueda de cada widget). Las selecciones y acciones no se
+# coalescen: en una ráfaga de escaneos cada producto cuenta.
+COALESCING_KEYS = {
+    EventTypes.PRODUCT_SEARCH_REQUEST: 'requester',
+    EventTypes.PRODUCT_SEARCH_RESULT: 'search_source',
+    EventTypes.PRODUCT_CHANGED: 'id_producto',
+}
+
+# Prioridad por tipo de evento (mayor se despacha antes dentro de un lote)
+EVENT_PRIORITIES = {
+    EventTypes.VALIDATION_ERROR: 10,
+    EventTypes.BUSINESS_RULE_VIOLATION: 10,
+}
+
+
 # ==================== FACTORY FUNCTIONS ====================
 
 def create_product_selected_event_data(
@@ -0,0 +1,342 @@
+"""
+Incremental Search - Búsqueda incremental fuera del hilo de tkinter
+Carga: Presentation Layer - UI Shared Components
+Objetivo: Mantener la escritura fluida mientras se consulta la base de datos
+
+- Debounce de teclas con tkinter after()
+- Consulta en un hilo de trabajo, resultados devueltos con after()
+- Descarte de consultas obsoletas (solo se entrega la última)
+- Reutilización de resultados por prefijo: "tal" -> "tala" filtra en memoria
+- Conexión de solo lectura propia del hilo de trabajo (no comparte la del hilo de UI)
+"""
+
+import logging
+import threading
+import time
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class IncrementalSearch:
+    """
+    Motor de búsqueda incremental para widgets tkinter.
+
+    El hilo de tkinter solo programa y entrega búsquedas; la consulta se
+    ejecuta en un hilo de trabajo. Cada búsqueda recibe un número de
+    generación y cualquier resultado que llegue con una generación antigua
+    se descarta.
+
+    La reutilización por prefijo solo se aplica si el resultado anterior
+    estaba completo (menos filas que result_limit), ya que en otro caso el
+    servicio pudo haber truncado coincidencias del término más largo.
+
+    Con db_path el hilo de trabajo abre su propia conexión (PRAGMA
+    query_only) y la pasa a search_func como argumento db; la conexión del
+    hilo de tkinter nunca se usa desde el hilo de trabajo.
+    """
+
+    def __init__(self, widget: tk.Misc,
+                 search_func: Callable[..., List[Any]],
+                 on_results: Callable[[str, str, List[Any], Dict[str, Any]], None],
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 match_func: Optional[Callable[[Any, str], bool]] = None,
+                 delay_ms: int = 150, result_limit: Optional[int] = None,
+                 reusable_modes: Optional[Set[str]] = None,
+                 name: str = "IncrementalSearch", db_path: Optional[str] = None):
+        """
+        Inicializar motor de búsqueda.
+
+        Args:
+            widget: Widget tkinter usado para after() (hilo de UI)
+            search_func: Función (term, mode, **params) -> resultados, ejecutada en el
+                hilo de trabajo (con db_path recibe además db=conexión del hilo)
+            on_results: Callback (term, mode, results, info) ejecutado en el hilo de UI
+            on_error: Callback (term, error) ejecutado en el hilo de UI (opcional)
+            match_func: Función (item, term_lower) -> bool para filtrar en memoria
+                (sin ella no se reutilizan resultados por prefijo)
+            delay_ms: Espera tras la última tecla antes de buscar
+            result_limit: Máximo de filas que devuelve search_func (None si no trunca)
+            reusable_modes: Modos cuyos resultados se reutilizan por prefijo (None: todos)
+            name: Nombre del hilo de trabajo
+            db_path: Ruta de la base; si se indica, el hilo de trabajo abre su propia
+                conexión de solo lectura
+        """
+        self._widget = widget
+        self._search_func = search_func
+        self._on_results = on_results
+        self._on_error = on_error
+        self._match_func = match_func
+        self.delay_ms = delay_ms
+        self.result_limit = result_limit
+        self._reusable_modes = reusable_modes
+        self._name = name
+        self._db_path = db_path
+        self._logger = logging.getLogger(__name__)
+
+        self._after_id: Optional[str] = None
+        self._generation = 0
+
+        # Último resultado completo, por modo: mode -> (term_lower, results)
+        self._cache: Dict[str, Tuple[str, List[Any]]] = {}
+
+        # Hilo de trabajo con una única petición pendiente (la más reciente)
+        self._condition = threading.Condition()
+        self._pending: Optional[Tuple[int, str, str, Dict[str, Any], float]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Estadísticas
+        self.consultas = 0
+        self.reutilizadas = 0
+        self.descartadas = 0
+
+    # ==================== API PÚBLICA ====================
+
+    def schedule(self, term: str, mode: str = "partial", delay_ms: Optional[int] = None,
+                 params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Programar una búsqueda con debounce.
+
+        Args:
+            term: Término de búsqueda
+            mode: Modo de búsqueda, se pasa tal cual a search_func
+            delay_ms: Espera específica (por defecto self.delay_ms)
+            params: Argumentos adicionales para search_func, tomados en el hilo de UI
+        """
+        self._cancel_after()
+        delay = self.delay_ms if delay_ms is None else delay_ms
+        self._after_id = self._widget.after(max(0, delay), self._dispatch, term, mode, params)
+
+    def search_now(self, term: str, mode: str = "partial",
+                   params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Buscar sin esperar el debounce (Enter, botón Buscar).
+
+        Args:
+            term: Término de búsqueda
+            mode: Modo de búsqueda
+            params: Argumentos adicionales para search_func (p.ej. cursor de página)
+        """
+        self._cancel_after()
+        self._dispatch(term, mode, params)
+
+    def cancel(self) -> None:
+        """Cancelar la búsqueda programada y descartar la que esté en curso."""
+        self._cancel_after()
+        self._generation += 1
+        with self._condition:
+            self._pending = None
+
+    def invalidate_cache(self) -> None:
+        """Descartar resultados reutilizables (p.ej. tras modificar productos)."""
+        self._cache.clear()
+
+    def update_cached(self, update: Callable[[Any], None]) -> None:
+        """
+        Aplicar un cambio en el lugar a los resultados reutilizables.
+
+        Para cambios que no alteran qué elementos coinciden con el término
+        (stock o precio notificados), en lugar de invalidar la caché.
+
+        Args:
+            update: Función que recibe cada resultado guardado y lo modifica
+        """
+        for _, results in self._cache.values():
+            for item in results:
+                update(item)
+
+    def stop(self) -> None:
+        """Detener el hilo de trabajo."""
+        self.cancel()
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Obtener estadísticas de uso.
+
+        Returns:
+            Diccionario con consultas, reutilizadas y descartadas
+        """
+        return {
+            'consultas': self.consultas,
+            'reutilizadas': self.reutilizadas,
+            'descartadas': self.descartadas
+        }
+
+    # ==================== HILO DE UI ====================
+
+    def _cancel_after(self) -> None:
+        """Cancelar el after() de debounce pendiente."""
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _dispatch(self, term: str, mode: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Resolver la búsqueda en memoria o enviarla al hilo de trabajo.
+
+        Args:
+            term: Término de búsqueda
+            mode: Modo de búsqueda
+            params: Argumentos adicionales para search_func
+        """
+        self._after_id = None
+        self._generation += 1
+        generation = self._generation
+        started = time.perf_counter()
+
+        cached = self._filter_cached(term, mode)
+        if cached is not None:
+            self.reutilizadas += 1
+            self._deliver(generation, term, mode, cached, started, True)
+            return
+
+        with self._condition:
+            if self._pending is not None:
+                self.descartadas += 1
+            self._pending = (generation, term, mode, dict(params or {}), started)
+            self._ensure_worker()
+            self._condition.notify()
+
+    def _is_reusable(self, mode: str) -> bool:
+        """Indicar si los resultados de un modo pueden filtrarse en memoria."""
+        if self._match_func is None:
+            return False
+        return self._reusable_modes is None or mode in self._reusable_modes
+
+    def _filter_cached(self, term: str, mode: str) -> Optional[List[Any]]:
+        """
+        Filtrar en memoria el último resultado completo si term lo extiende.
+
+        Returns:
+            Resultados filtrados o None si hay que consultar
+        """
+        if not self._is_reusable(mode) or mode not in self._cache:
+            return None
+
+        term_lower = term.strip().lower()
+        cached_term, cached_results = self._cache[mode]
+        if not cached_term or not term_lower.startswith(cached_term):
+            return None
+
+        match = self._match_func
+        return [item for item in cached_results if match(item, term_lower)]
+
+    def _deliver(self, generation: int, term: str, mode: str, results: List[Any],
+                 started: float, from_cache: bool) -> None:
+        """
+        Entregar resultados al widget si siguen siendo vigentes.
+
+        Args:
+            generation: Generación de la búsqueda
+            term: Término buscado
+            mode: Modo de búsqueda
+            results: Resultados
+            started: Instante de inicio (perf_counter)
+            from_cache: True si se resolvió en memoria
+        """
+        if generation != self._generation:
+            self.descartadas += 1
+            return
+
+        if not from_cache and self._is_reusable(mode):
+            if self.result_limit is None or len(results) < self.result_limit:
+                self._cache[mode] = (term.strip().lower(), results)
+            else:
+                self._cache.pop(mode, None)
+
+        info = {
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'from_cache': from_cache
+        }
+        try:
+            self._on_results(term, mode, results, info)
+        except Exception as e:
+            self._logger.error(f"Error entregando resultados de '{term}': {e}")
+
+    def _deliver_error(self, generation: int, term: str, error: Exception) -> None:
+        """Entregar error al widget si la búsqueda sigue vigente."""
+        if generation != self._generation or self._on_error is None:
+            return
+        try:
+            self._on_error(term, error)
+        except Exception as e:
+            self._logger.error(f"Error en callback de error de búsqueda: {e}")
+
+    # ==================== HILO DE TRABAJO ====================
+
+    def _ensure_worker(self) -> None:
+        """Iniciar el hilo de trabajo si no está corriendo (con el lock tomado)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker_loop, name=self._name, daemon=True)
+        self._thread.start()
+
+    def _open_worker_db(self):
+        """
+        Abrir la conexión de solo lectura del hilo de trabajo.
+
+        Returns:
+            DatabaseConnection o None si no hay db_path o no se pudo abrir
+        """
+        if not self._db_path:
+            return None
+        from db.database import DatabaseConnection
+        try:
+            worker_db = DatabaseConnection(self._db_path)
+            worker_db.get_connection().execute("PRAGMA query_only = ON")
+            return worker_db
+        except Exception as e:
+            self._logger.error(f"Error abriendo conexión de búsqueda: {e}")
+            return None
+
+    def _worker_loop(self) -> None:
+        """Atender la petición pendiente más reciente."""
+        worker_db = self._open_worker_db()
+        try:
+            while True:
+                with self._condition:
+                    while self._running and self._pending is None:
+                        self._condition.wait()
+                    if not self._running:
+                        return
+                    generation, term, mode, params, started = self._pending
+                    self._pending = None
+
+                # Si ya llegó otra búsqueda, esta es obsoleta: no consultar
+                if generation != self._generation:
+                    self.descartadas += 1
+                    continue
+
+                if worker_db is not None:
+                    params['db'] = worker_db
+                try:
+                    self.consultas += 1
+                    results = self._search_func(term, mode, **params) or []
+                    if not isinstance(results, list):
+                        results = list(results)
+                    self._post(self._deliver, generation, term, mode, results, started, False)
+                except Exception as e:
+                    self._logger.error(f"Error en búsqueda '{term}': {e}")
+                    self._post(self._deliver_error, generation, term, e)
+        finally:
+            if worker_db is not None:
+                worker_db.close()
+
+    def _post(self, callback: Callable, *args) -> None:
+        """Programar callback en el hilo de UI."""
+        try:
+            self._widget.after(0, callback, *args)
+        except (tk.TclError, RuntimeError):
+            # Widget destruido o mainloop terminado
+            with self._condition:
+                self._running = False
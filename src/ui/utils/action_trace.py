@@ -0,0 +1,41 @@
+"""
+Trazas de consultas SQL por acción de usuario.
+
+Envuelve los callbacks de tkinter (botones, menús, bind, after) en una
+traza de db.query_metrics, de modo que cada sentencia ejecutada durante el
+callback queda asociada a un identificador de traza y al nombre del
+callback. Solo se instala con la instrumentación habilitada.
+"""
+
+import tkinter as tk
+
+from db.query_metrics import query_metrics
+
+_call_original = None
+
+
+def _nombre_accion(func) -> str:
+    """Nombre legible del callback (Clase.metodo o función)."""
+    func = getattr(func, '__func__', func)
+    return getattr(func, '__qualname__', None) or getattr(func, '__name__', None) or repr(func)
+
+
+def instalar_trazas_tkinter() -> bool:
+    """
+    Instrumentar tkinter.CallWrapper para abrir una traza por callback.
+
+    Returns:
+        True si se instaló (False si ya estaba o la instrumentación está apagada)
+    """
+    global _call_original
+    if _call_original is not None or not query_metrics.habilitado:
+        return False
+
+    _call_original = tk.CallWrapper.__call__
+
+    def __call__(self, *args):
+        with query_metrics.traza(_nombre_accion(self.func)):
+            return _call_original(self, *args)
+
+    tk.CallWrapper.__call__ = __call__
+    return True
@@ -0,0 +1,135 @@
+"""
+Registro de importación diferida para formularios y subsistemas pesados.
+
+Los formularios arrastran reportlab, openpyxl, PIL, python-barcode y qrcode
+al importarse. Registrándolos como 'modulo:Atributo' solo se importan al
+abrirse por primera vez, y warm_up() los precarga en un hilo daemon
+después del login para que la primera apertura no espere la importación.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class LazyRegistry:
+    """
+    Registro nombre -> 'modulo:Atributo' resuelto en el primer get().
+
+    Thread-safe: el hilo de precarga y el hilo de tkinter pueden pedir el
+    mismo módulo; el sistema de importación de Python serializa la carga.
+    """
+
+    def __init__(self, entries: Dict[str, str], name: str = "LazyRegistry"):
+        """
+        Inicializar registro.
+
+        Args:
+            entries: Diccionario nombre -> 'paquete.modulo:Atributo'
+            name: Nombre del hilo de precarga
+        """
+        self._entries = dict(entries)
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._name = name
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.load_times: Dict[str, float] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def modules(self) -> List[str]:
+        """Módulos registrados (para hiddenimports del empaquetado)."""
+        return sorted({entry.split(':', 1)[0] for entry in self._entries.values()})
+
+    def is_loaded(self, name: str) -> bool:
+        """Indicar si la entrada ya fue importada."""
+        return name in self._loaded
+
+    def get(self, name: str) -> Any:
+        """
+        Obtener el atributo registrado, importando su módulo si hace falta.
+
+        Args:
+            name: Nombre registrado
+
+        Returns:
+            Clase o función registrada
+
+        Raises:
+            KeyError: Si el nombre no está registrado
+            ImportError: Si el módulo no se puede importar
+        """
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+
+        module_name, _, attribute = self._entries[name].partition(':')
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        value = getattr(module, attribute) if attribute else module
+
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = value
+                self.load_times[name] = time.perf_counter() - start
+        return value
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, extra_modules: Iterable[str] = (),
+                delay: float = 0.0, pause: float = 0.02) -> Optional[threading.Thread]:
+        """
+        Precargar entradas y módulos adicionales en un hilo daemon.
+
+        Los errores de importación solo se registran: el formulario
+        volverá a intentarlo (y mostrará el error) al abrirse.
+
+        Args:
+            names: Entradas a precargar (None = todas, en orden de registro)
+            extra_modules: Módulos adicionales (por ejemplo, services.export_service)
+            delay: Espera inicial en segundos (dejar que la ventana termine de dibujarse)
+            pause: Pausa entre importaciones para ceder el GIL al hilo de tkinter
+
+        Returns:
+            Hilo de precarga, o None si ya hay una precarga en curso
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return None
+
+        pending = [n for n in (names if names is not None else self._entries) if not self.is_loaded(n)]
+        extras = list(extra_modules)
+        self._stop.clear()
+
+        def worker():
+            if delay and self._stop.wait(delay):
+                return
+            start = time.perf_counter()
+            for module_name in extras:
+                if self._stop.is_set():
+                    return
+                try:
+                    importlib.import_module(module_name)
+                except Exception as e:
+                    self.logger.warning(f"Precarga de {module_name} fallida: {e}")
+                time.sleep(pause)
+            for entry in pending:
+                if self._stop.is_set():
+                    return
+                try:
+                    self.get(entry)
+                except Exception as e:
+                    self.logger.warning(f"Precarga de {entry} fallida: {e}")
+                time.sleep(pause)
+            self.logger.info(f"Precarga de {len(pending)} formularios y {len(extras)} módulos "
+                             f"completada en {time.perf_counter() - start:.2f} s")
+
+        self._thread = threading.Thread(target=worker, name=self._name, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Detener la precarga pendiente (la importación en curso termina)."""
+        self._stop.set()
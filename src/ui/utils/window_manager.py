@@ -5,10 +5,71 @@ Este módulo proporciona funciones utilitarias para gestionar ventanas
 de forma segura, evitando referencias a widgets destruidos.
 """
 
+import time
 import tkinter as tk
-from typing import Dict, Any, Optional
+from tkinter import ttk
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Set
 import logging
 
+
+# Presupuesto de memoria por defecto para formularios ocultos en el pool
+DEFAULT_POOL_BUDGET_BYTES = 16 * 1024 * 1024
+
+# Estimación de memoria: costo aproximado de un widget Tk (objeto Tcl +
+# wrapper Python + comandos registrados) y de una fila de Treeview/Listbox
+BYTES_PER_WIDGET = 8 * 1024
+BYTES_PER_ROW = 1024
+
+
+class PooledFormMixin:
+    """
+    Soporte de reutilización para formularios con `root` (Toplevel).
+    
+    Un formulario en el pool se oculta al cerrarse en lugar de destruirse.
+    Al reabrirse, WindowManager llama a reset_for_reuse() y, si cambió
+    alguno de sus catálogos (pool_catalogs), a refresh_catalogs().
+    """
+    
+    # Catálogos de versiones_catalogo de los que dependen los datos del formulario
+    pool_catalogs: tuple = ()
+    
+    # Lo asigna WindowManager al tomar el formulario en el pool
+    release_to_pool: Optional[Callable[[], bool]] = None
+    
+    def reset_for_reuse(self) -> None:
+        """Limpiar el estado de la sesión anterior (sin recargar datos)."""
+    
+    def refresh_catalogs(self, changed: Set[str]) -> None:
+        """
+        Recargar los datos de los catálogos que cambiaron mientras estaba oculto.
+        
+        Args:
+            changed: Catálogos cuya versión cambió
+        """
+    
+    def on_pool_evicted(self) -> None:
+        """Liberar recursos (hilos, after pendientes) antes de destruir la ventana."""
+    
+    def _close_or_hide(self) -> None:
+        """Ocultar la ventana si está en el pool; destruirla si no."""
+        if self.release_to_pool is None or not self.release_to_pool():
+            self.on_pool_evicted()
+            self.root.destroy()
+
+
+class _PooledEntry:
+    """Formulario oculto en el pool."""
+    
+    __slots__ = ('form', 'versions', 'size', 'hidden_at')
+    
+    def __init__(self, form: Any, versions: Dict[str, int], size: int):
+        self.form = form
+        self.versions = versions
+        self.size = size
+        self.hidden_at = time.monotonic()
+
+
 class WindowManager:
     """Gestor centralizado de ventanas secundarias."""
     
@@ -16,6 +77,13 @@ class WindowManager:
         self._windows: Dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
         
+        # Pool de formularios ocultos (orden LRU: el primero se descarta antes)
+        self._pool: "OrderedDict[str, _PooledEntry]" = OrderedDict()
+        self._pool_budget = DEFAULT_POOL_BUDGET_BYTES
+        self._catalog_versions: Optional[Callable[[], Dict[str, int]]] = None
+        self._open_stats: Dict[str, Dict[str, float]] = {}
+        
+
     def register_window(self, name: str, window: Any) -> None:
         """
         Registra una ventana en el gestor.
@@ -114,9 +182,214 @@ class WindowManager:
                 self._remove_window(name)
                 
     def close_all_windows(self) -> None:
-        """Cierra todas las ventanas registradas."""
+        """Cierra todas las ventanas registradas y vacía el pool."""
         for name in list(self._windows.keys()):
             self.close_window(name)
+        self.clear_pool()
+    
+    # ==================== POOL DE FORMULARIOS ====================
+    
+    def configure_pool(self, budget_bytes: Optional[int] = None,
+                       catalog_versions: Optional[Callable[[], Dict[str, int]]] = None) -> None:
+        """
+        Configurar el pool de formularios.
+        
+        Args:
+            budget_bytes: Memoria estimada máxima de los formularios ocultos (0 = sin pool)
+            catalog_versions: Función que devuelve {catálogo: versión}
+                              (DatabaseConnection.get_catalog_versions)
+        """
+        if budget_bytes is not None:
+            self._pool_budget = max(0, int(budget_bytes))
+            self._enforce_pool_budget()
+        if catalog_versions is not None:
+            self._catalog_versions = catalog_versions
+    
+    def open_pooled(self, name: str, factory: Callable[[], Any]) -> Optional[Any]:
+        """
+        Abrir un formulario reutilizable.
+        
+        Si está visible lo trae al frente; si está oculto en el pool lo
+        muestra de nuevo (reset_for_reuse + refresh_catalogs de lo que
+        cambió); si no, lo crea con factory().
+        
+        Args:
+            name: Nombre único de la ventana
+            factory: Crea el formulario (debe tener `root`)
+            
+        Returns:
+            Formulario abierto, o None si factory no creó la ventana
+        """
+        if self.is_window_open(name):
+            self.bring_to_front(name)
+            return self._windows[name]
+        
+        start = time.perf_counter()
+        entry = self._pool.pop(name, None)
+        form = self._reuse(name, entry) if entry is not None else None
+        warm = form is not None
+        
+        if form is None:
+            form = factory()
+            if not hasattr(form, 'root'):
+                return None
+            form.release_to_pool = lambda: self.release(name)
+        
+        self._windows[name] = form
+        try:
+            form.root.update_idletasks()
+        except tk.TclError:
+            pass
+        self._record_open(name, warm, time.perf_counter() - start)
+        return form
+    
+    def release(self, name: str) -> bool:
+        """
+        Ocultar un formulario y guardarlo en el pool.
+        
+        Args:
+            name: Nombre de la ventana
+            
+        Returns:
+            True si quedó en el pool; False si debe destruirse (pool
+            deshabilitado, ventana inválida o excede el presupuesto)
+        """
+        form = self._windows.get(name)
+        if form is None or self._pool_budget <= 0:
+            self._remove_window(name)
+            return False
+        
+        try:
+            size = self._estimate_size(form)
+            if size > self._pool_budget:
+                self._remove_window(name)
+                return False
+            
+            form.root.grab_release()
+            form.root.withdraw()
+        except (tk.TclError, AttributeError):
+            self._remove_window(name)
+            return False
+        
+        self._remove_window(name)
+        self._pool[name] = _PooledEntry(form, self._read_catalog_versions(), size)
+        self._enforce_pool_budget()
+        self.logger.debug(f"Ventana '{name}' oculta en el pool (~{size // 1024} KB)")
+        return True
+    
+    def clear_pool(self) -> None:
+        """Destruir todos los formularios ocultos del pool."""
+        while self._pool:
+            name, entry = self._pool.popitem(last=False)
+            self._destroy_pooled(name, entry)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estado del pool y latencias de apertura.
+        
+        Returns:
+            Dict con formularios ocultos, memoria estimada, presupuesto y,
+            por ventana, aperturas en frío/reutilizadas con su tiempo medio (ms)
+        """
+        return {
+            'pooled': list(self._pool.keys()),
+            'pooled_bytes': sum(entry.size for entry in self._pool.values()),
+            'budget_bytes': self._pool_budget,
+            'opens': {name: dict(stats) for name, stats in self._open_stats.items()},
+        }
+    
+    def _reuse(self, name: str, entry: _PooledEntry) -> Optional[Any]:
+        """Mostrar de nuevo un formulario del pool; None si ya no es válido."""
+        form = entry.form
+        try:
+            if not form.root.winfo_exists():
+                return None
+            
+            form.reset_for_reuse()
+            
+            current = self._read_catalog_versions()
+            changed = {
+                catalog for catalog in getattr(form, 'pool_catalogs', ())
+                if current.get(catalog) != entry.versions.get(catalog) or catalog not in current
+            }
+            if changed:
+                form.refresh_catalogs(changed)
+            
+            form.root.deiconify()
+            form.root.lift()
+            form.root.grab_set()
+            form.root.focus_force()
+            self.logger.debug(f"Ventana '{name}' reutilizada (catálogos recargados: {sorted(changed) or 'ninguno'})")
+            return form
+        except (tk.TclError, AttributeError) as e:
+            self.logger.warning(f"No se pudo reutilizar '{name}': {e}")
+            self._destroy_pooled(name, entry)
+            return None
+    
+    def _read_catalog_versions(self) -> Dict[str, int]:
+        """Leer las versiones de catálogo ({} si no hay proveedor o falla)."""
+        if self._catalog_versions is None:
+            return {}
+        try:
+            return self._catalog_versions()
+        except Exception as e:
+            self.logger.warning(f"No se pudieron leer las versiones de catálogo: {e}")
+            return {}
+    
+    def _enforce_pool_budget(self) -> None:
+        """Destruir los formularios ocultos menos recientes hasta entrar en el presupuesto."""
+        total = sum(entry.size for entry in self._pool.values())
+        while self._pool and total > self._pool_budget:
+            name, entry = self._pool.popitem(last=False)
+            total -= entry.size
+            self._destroy_pooled(name, entry)
+            self.logger.debug(f"Ventana '{name}' descartada del pool por presupuesto de memoria")
+    
+    def _destroy_pooled(self, name: str, entry: _PooledEntry) -> None:
+        """Destruir un formulario que estaba oculto."""
+        form = entry.form
+        form.release_to_pool = None
+        try:
+            if hasattr(form, 'on_pool_evicted'):
+                form.on_pool_evicted()
+            form.root.destroy()
+        except (tk.TclError, AttributeError):
+            pass
+    
+    @staticmethod
+    def _estimate_size(form: Any) -> int:
+        """
+        Estimar la memoria de un formulario (widgets y filas de listas).
+        
+        Un formulario puede definir estimate_pool_bytes() para dar su propia cifra.
+        """
+        if hasattr(form, 'estimate_pool_bytes'):
+            return int(form.estimate_pool_bytes())
+        
+        widgets = 0
+        rows = 0
+        pending = [form.root]
+        while pending:
+            widget = pending.pop()
+            widgets += 1
+            if isinstance(widget, ttk.Treeview):
+                rows += len(widget.get_children())
+            elif isinstance(widget, tk.Listbox):
+                rows += widget.size()
+            pending.extend(widget.winfo_children())
+        return widgets * BYTES_PER_WIDGET + rows * BYTES_PER_ROW
+    
+    def _record_open(self, name: str, warm: bool, seconds: float) -> None:
+        """Acumular latencia de apertura (fría o reutilizada)."""
+        stats = self._open_stats.setdefault(
+            name, {'cold': 0, 'cold_ms': 0.0, 'warm': 0, 'warm_ms': 0.0, 'last_ms': 0.0}
+        )
+        kind = 'warm' if warm else 'cold'
+        ms = seconds * 1000
+        stats[f'{kind}_ms'] = (stats[f'{kind}_ms'] * stats[kind] + ms) / (stats[kind] + 1)
+        stats[kind] += 1
+        stats['last_ms'] = ms
+        self.logger.info(f"Ventana '{name}' abierta ({'reutilizada' if warm else 'nueva'}) en {ms:.1f} ms")
             
     def _on_window_close(self, name: str) -> None:
         """Callback interno para manejar cierre de ventana."""
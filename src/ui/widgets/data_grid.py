@@ -6,7 +6,7 @@ Patrón: Component + Observer
 
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Tuple, Optional, Any, Callable
+from typing import List, Tuple, Optional, Any, Callable, Dict, Sequence, Set
 import logging
 
 from utils.logger import get_logger
@@ -21,6 +21,8 @@ class DataGrid(ttk.Frame):
     - Ordenamiento
     - Selección de filas
     - Exportación de datos
+    - Modo virtual: solo se materializan las filas visibles
+    - Origen de datos externo (callback) para filtrar/ordenar en SQL
     
     Arquitectura:
     - Component Pattern: Widget reutilizable
@@ -28,9 +30,21 @@ class DataGrid(ttk.Frame):
     - Strategy Pattern: Diferentes tipos de celda
     """
     
+    # Filas pedidas por llamada al origen de datos externo
+    SOURCE_BLOCK_SIZE = 200
+    
+    # Alturas por defecto (px) usadas para calcular filas visibles
+    DEFAULT_ROW_HEIGHT = 20
+    HEADER_HEIGHT = 24
+    
+    # Separador de celdas en la columna de búsqueda precalculada
+    _SEARCH_SEPARATOR = '\x1f'
+    
     def __init__(self, parent: tk.Widget, columns: List[Tuple[str, str, int]], 
                  show_search: bool = True, show_pagination: bool = True,
-                 page_size: int = 50, **kwargs):
+                 page_size: int = 50, virtual: bool = False,
+                 data_source: Optional[Callable] = None,
+                 search_delay_ms: int = 250, **kwargs):
         """
         Constructor del DataGrid
         
@@ -38,8 +52,13 @@ class DataGrid(ttk.Frame):
             parent: Widget padre
             columns: Lista de tuplas (id, title, width) para columnas
             show_search: Mostrar barra de búsqueda
-            show_pagination: Mostrar controles de paginación
+            show_pagination: Mostrar controles de paginación (ignorado en modo virtual)
             page_size: Elementos por página
+            virtual: Usar scroll virtual (solo se crean items para las filas visibles)
+            data_source: Callback opcional (search_term, sort_column, descending,
+                offset, limit) -> (filas, total) para delegar filtro, orden y
+                paginación al origen de datos (por ejemplo una consulta SQL)
+            search_delay_ms: Espera tras la última tecla antes de filtrar
             **kwargs: Argumentos adicionales para ttk.Frame
         """
         super().__init__(parent, **kwargs)
@@ -47,15 +66,43 @@ class DataGrid(ttk.Frame):
         self.logger = get_logger(self.__class__.__name__)
         self.columns = columns
         self.show_search = show_search
-        self.show_pagination = show_pagination
+        self.virtual = virtual
+        self.show_pagination = show_pagination and not virtual
         self.page_size = page_size
+        self.data_source = data_source
+        self.search_delay_ms = search_delay_ms
         
         # Datos y estado
-        self.all_data: List[List[Any]] = []
-        self.filtered_data: List[List[Any]] = []
+        self.all_data: Sequence[Sequence[Any]] = []
+        # False mientras all_data sea la secuencia recibida en set_data (se copia al modificarla)
+        self._owns_data = True
         self.current_page = 0
         self.total_pages = 0
         
+        # Vista actual: índices de all_data que pasan el filtro, en orden de display
+        self._view: List[int] = []
+        
+        # Caches derivados de all_data (se construyen bajo demanda)
+        self._search_index: Optional[List[str]] = None
+        self._sort_keys: Dict[int, List[Any]] = {}
+        self._sort_reverse: Dict[str, bool] = {}
+        self._sort_state: Optional[Tuple[int, bool]] = None
+        
+        # Filtro: último término aplicado (None si la vista no corresponde a un término)
+        self._search_term = ''
+        self._last_search_term: Optional[str] = ''
+        self._search_after_id: Optional[str] = None
+        
+        # Origen de datos externo
+        self._source_total = 0
+        self._source_blocks: Dict[int, List[List[Any]]] = {}
+        
+        # Scroll virtual: pool de items reutilizados y posiciones seleccionadas
+        self._first_row = 0
+        self._visible_rows = max(1, page_size)
+        self._row_items: List[str] = []
+        self._selected_positions: Set[int] = set()
+        
         # Variables de control
         self.search_var = tk.StringVar()
         self.search_var.trace('w', self._on_search_changed)
@@ -63,6 +110,7 @@ class DataGrid(ttk.Frame):
         # Callbacks de eventos
         self.row_select_callback: Optional[Callable] = None
         self.row_double_click_callback: Optional[Callable] = None
+        self.scroll_end_callback: Optional[Callable] = None
         
         # Crear componentes
         self._create_components()
@@ -83,6 +131,8 @@ class DataGrid(ttk.Frame):
         # Controles de paginación (opcional)
         if self.show_pagination:
             self._create_pagination_controls()
+        elif self.virtual:
+            self._create_virtual_info()
     
     def _create_search_bar(self) -> None:
         """Crear barra de búsqueda"""
@@ -129,11 +179,16 @@ class DataGrid(ttk.Frame):
             self.tree.heading(col_id, text=col_title, anchor='w')
             self.tree.column(col_id, width=col_width, anchor='w')
         
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        # Scrollbars (en modo virtual la vertical recorre los datos, no los items)
+        if self.virtual:
+            v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self._on_virtual_scroll)
+        else:
+            v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+            self.tree.configure(yscrollcommand=v_scrollbar.set)
         h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
         
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        self.v_scrollbar = v_scrollbar
         
         # Grid layout para tree y scrollbars
         tree_frame.grid_rowconfigure(0, weight=1)
@@ -195,6 +250,17 @@ class DataGrid(ttk.Frame):
         # Actualizar estado inicial
         self._update_pagination_info()
     
+    def _create_virtual_info(self) -> None:
+        """Crear contador de registros para el modo virtual"""
+        info_frame = ttk.Frame(self)
+        info_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.page_info_var = tk.StringVar()
+        self.page_info_label = ttk.Label(info_frame, textvariable=self.page_info_var)
+        self.page_info_label.pack(side=tk.LEFT)
+        
+        self._update_pagination_info()
+    
     def _setup_layout(self) -> None:
         """Configurar layout del DataGrid"""
         self.grid_rowconfigure(1 if self.show_search else 0, weight=1)
@@ -211,22 +277,42 @@ class DataGrid(ttk.Frame):
         # Ordenamiento por columna
         for col_id, _, _ in self.columns:
             self.tree.heading(col_id, command=lambda c=col_id: self._sort_by_column(c))
+        
+        # Scroll virtual: rueda, teclado y redimensionado
+        if self.virtual:
+            self.tree.bind('<Configure>', self._on_tree_configure)
+            self.tree.bind('<Button-1>', self._on_virtual_click)
+            self.tree.bind('<MouseWheel>', self._on_mouse_wheel)
+            self.tree.bind('<Button-4>', lambda e: self._scroll_rows(-3))
+            self.tree.bind('<Button-5>', lambda e: self._scroll_rows(3))
+            self.tree.bind('<Up>', lambda e: self._on_virtual_key(-1))
+            self.tree.bind('<Down>', lambda e: self._on_virtual_key(1))
+            self.tree.bind('<Prior>', lambda e: self._on_virtual_key(-self._visible_rows))
+            self.tree.bind('<Next>', lambda e: self._on_virtual_key(self._visible_rows))
     
     # ========== MÉTODOS PÚBLICOS - GESTIÓN DE DATOS ==========
     
-    def set_data(self, data: List[List[Any]]) -> None:
+    def set_data(self, data: Sequence[Sequence[Any]]) -> None:
         """
         Establecer datos completos del grid
         
+        La secuencia recibida se usa tal cual, sin copiarla: solo se
+        materializan las filas visibles. Si después se agregan o quitan
+        filas, se copia una vez antes de modificarla para no alterar la
+        del llamador.
+        
         Args:
-            data: Lista de listas con datos de filas
+            data: Secuencia de filas (listas o tuplas)
         """
         try:
-            self.all_data = data.copy()
-            self.filtered_data = data.copy()
-            self.current_page = 0
-            self._calculate_pages()
-            self._update_display()
+            if isinstance(data, Sequence):
+                self.all_data = data
+                self._owns_data = False
+            else:
+                self.all_data = list(data)
+                self._owns_data = True
+            self._invalidate_caches()
+            self._apply_current_filter()
             
             self.logger.debug(f"Datos establecidos: {len(data)} filas")
             
@@ -241,12 +327,56 @@ class DataGrid(ttk.Frame):
             row_data: Datos de la fila a agregar
         """
         try:
-            self.all_data.append(row_data)
+            self._own_data().append(row_data)
+            
+            # Extender caches en lugar de reconstruirlos
+            if self._search_index is not None:
+                self._search_index.append(self._search_text(row_data))
+            for col_index, keys in self._sort_keys.items():
+                keys.append(self._sort_key(row_data[col_index]))
+            
+            self._last_search_term = None
             self._apply_current_filter()
             
         except Exception as e:
             self.logger.error(f"Error agregando fila: {e}")
     
+    def append_rows(self, rows: List[List[Any]]) -> None:
+        """
+        Agregar un bloque de filas al final sin reconstruir la vista
+        
+        Pensado para listados que se cargan por páginas: conserva la
+        posición de scroll y la selección.
+        
+        Args:
+            rows: Filas a agregar
+        """
+        try:
+            start = len(self.all_data)
+            self._own_data().extend(rows)
+            new_indexes = range(start, len(self.all_data))
+            
+            if self._search_index is not None:
+                self._search_index.extend(self._search_text(row) for row in rows)
+            for col_index, keys in self._sort_keys.items():
+                keys.extend(self._sort_key(row[col_index]) for row in rows)
+            
+            if self.data_source is None:
+                if self._search_term:
+                    index = self._get_search_index()
+                    new_indexes = [i for i in new_indexes if self._search_term in index[i]]
+                self._view.extend(new_indexes)
+                if self._sort_state is not None:
+                    # Las posiciones seleccionadas dejan de corresponder tras reordenar
+                    self._apply_sort()
+                    self._selected_positions.clear()
+            
+            self._calculate_pages()
+            self._update_display()
+        
+        except Exception as e:
+            self.logger.error(f"Error agregando filas: {e}")
+    
     def remove_row(self, row_index: int) -> bool:
         """
         Remover una fila del grid
@@ -259,7 +389,14 @@ class DataGrid(ttk.Frame):
         """
         try:
             if 0 <= row_index < len(self.all_data):
-                del self.all_data[row_index]
+                del self._own_data()[row_index]
+                
+                if self._search_index is not None:
+                    del self._search_index[row_index]
+                for keys in self._sort_keys.values():
+                    del keys[row_index]
+                
+                self._last_search_term = None
                 self._apply_current_filter()
                 return True
             return False
@@ -271,15 +408,31 @@ class DataGrid(ttk.Frame):
     def clear_data(self) -> None:
         """Limpiar todos los datos del grid"""
         try:
-            self.all_data.clear()
-            self.filtered_data.clear()
-            self.current_page = 0
-            self._calculate_pages()
-            self._update_display()
+            self.all_data = []
+            self._owns_data = True
+            self._invalidate_caches()
+            self._apply_current_filter()
             
         except Exception as e:
             self.logger.error(f"Error limpiando datos: {e}")
     
+    def _own_data(self) -> List[Any]:
+        """Copiar la secuencia recibida en set_data antes de la primera modificación"""
+        if not self._owns_data:
+            self.all_data = list(self.all_data)
+            self._owns_data = True
+        return self.all_data
+    
+    def refresh(self) -> None:
+        """
+        Recargar la vista actual.
+        
+        Con data_source descarta los bloques cargados y vuelve a consultar
+        el origen; en memoria reaplica filtro y orden.
+        """
+        self._last_search_term = None
+        self._apply_current_filter()
+    
     def get_selected_rows(self) -> List[List[Any]]:
         """
         Obtener filas seleccionadas
@@ -288,6 +441,11 @@ class DataGrid(ttk.Frame):
             List[List[Any]]: Datos de filas seleccionadas
         """
         try:
+            if self.virtual:
+                # Las filas seleccionadas pueden estar fuera de la ventana visible
+                return [list(self._get_rows(pos, 1)[0]) for pos in sorted(self._selected_positions)
+                        if pos < self._row_count()]
+            
             selected_items = self.tree.selection()
             selected_rows = []
             
@@ -308,16 +466,27 @@ class DataGrid(ttk.Frame):
         Returns:
             List[List[Any]]: Todos los datos
         """
-        return self.all_data.copy()
+        return list(self.all_data)
     
     def get_filtered_data(self) -> List[List[Any]]:
         """
         Obtener datos filtrados actuales
         
         Returns:
-            List[List[Any]]: Datos filtrados
+            List[List[Any]]: Datos filtrados (con data_source, solo los bloques ya cargados)
         """
-        return self.filtered_data.copy()
+        return self.filtered_data
+    
+    @property
+    def filtered_data(self) -> List[List[Any]]:
+        """Filas de la vista actual, en orden de display"""
+        if self.data_source is not None:
+            rows = []
+            for block in sorted(self._source_blocks):
+                rows.extend(self._source_blocks[block])
+            return rows
+        all_data = self.all_data
+        return [all_data[i] for i in self._view]
     
     # ========== MÉTODOS PÚBLICOS - PAGINACIÓN ==========
     
@@ -370,50 +539,220 @@ class DataGrid(ttk.Frame):
         """
         self.row_double_click_callback = callback
     
+    def set_scroll_end_callback(self, callback: Callable) -> None:
+        """
+        Establecer callback para cuando la ventana visible se acerca al final
+        
+        Solo en modo virtual; permite cargar la siguiente página de datos
+        al desplazarse.
+        
+        Args:
+            callback: Función sin argumentos
+        """
+        self.scroll_end_callback = callback
+    
     # ========== MÉTODOS PRIVADOS ==========
     
+    def _invalidate_caches(self) -> None:
+        """Descartar caches derivados de all_data"""
+        self._search_index = None
+        self._sort_keys.clear()
+        self._last_search_term = None
+    
+    def _search_text(self, row: List[Any]) -> str:
+        """
+        Texto de búsqueda precalculado de una fila
+        
+        Args:
+            row: Datos de la fila
+            
+        Returns:
+            str: Celdas en minúsculas unidas por un separador
+        """
+        return self._SEARCH_SEPARATOR.join(str(cell).lower() for cell in row)
+    
+    def _get_search_index(self) -> List[str]:
+        """Obtener (construyendo si hace falta) la columna de búsqueda"""
+        if self._search_index is None:
+            self._search_index = [self._search_text(row) for row in self.all_data]
+        return self._search_index
+    
+    @staticmethod
+    def _sort_key(value: Any) -> Tuple:
+        """
+        Clave de orden de una celda: números primero (por valor), luego texto
+        
+        Args:
+            value: Valor de la celda
+            
+        Returns:
+            Tuple: Clave comparable entre tipos
+        """
+        if value is None:
+            return (2, '')
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value)
+        text = str(value)
+        try:
+            return (0, float(text))
+        except ValueError:
+            return (1, text.lower())
+    
+    def _get_sort_keys(self, col_index: int) -> List[Any]:
+        """Obtener (construyendo si hace falta) las claves de orden de una columna"""
+        keys = self._sort_keys.get(col_index)
+        if keys is None:
+            sort_key = self._sort_key
+            keys = [sort_key(row[col_index]) for row in self.all_data]
+            self._sort_keys[col_index] = keys
+        return keys
+    
+    def _apply_sort(self) -> None:
+        """Reordenar la vista según el último orden elegido"""
+        if self._sort_state is None:
+            return
+        col_index, reverse = self._sort_state
+        keys = self._get_sort_keys(col_index)
+        self._view.sort(key=keys.__getitem__, reverse=reverse)
+    
     def _apply_current_filter(self) -> None:
         """Aplicar filtro actual y actualizar display"""
-        search_term = self.search_var.get().lower()
+        self._cancel_scheduled_filter()
+        search_term = self.search_var.get().strip().lower()
+        self._search_term = search_term
         
-        if not search_term:
-            self.filtered_data = self.all_data.copy()
+        if self.data_source is not None:
+            self._reset_source()
+        elif not search_term:
+            self._view = list(range(len(self.all_data)))
+            self._apply_sort()
         else:
-            self.filtered_data = []
-            for row in self.all_data:
-                # Buscar en todas las columnas
-                if any(search_term in str(cell).lower() for cell in row):
-                    self.filtered_data.append(row)
+            index = self._get_search_index()
+            last_term = self._last_search_term
+            
+            if last_term and search_term.startswith(last_term):
+                # Refinar la vista actual: conserva el orden ya aplicado
+                self._view = [i for i in self._view if search_term in index[i]]
+            else:
+                self._view = [i for i, text in enumerate(index) if search_term in text]
+                self._apply_sort()
         
-        self.current_page = 0
+        self._last_search_term = search_term
+        self._reset_position()
         self._calculate_pages()
         self._update_display()
     
+    def _reset_position(self) -> None:
+        """Volver al inicio de la vista y limpiar la selección"""
+        self.current_page = 0
+        self._first_row = 0
+        self._selected_positions.clear()
+    
+    # ========== ORIGEN DE DATOS ==========
+    
+    def _row_count(self) -> int:
+        """Número de filas de la vista actual"""
+        if self.data_source is not None:
+            return self._source_total
+        return len(self._view)
+    
+    def _get_rows(self, start: int, count: int) -> List[List[Any]]:
+        """
+        Obtener un rango de filas de la vista actual
+        
+        Args:
+            start: Posición inicial (base 0)
+            count: Número de filas
+            
+        Returns:
+            List[List[Any]]: Filas del rango (puede ser más corto al final)
+        """
+        if count <= 0:
+            return []
+        
+        if self.data_source is None:
+            all_data = self.all_data
+            return [all_data[i] for i in self._view[start:start + count]]
+        
+        rows = []
+        block_size = self.SOURCE_BLOCK_SIZE
+        pos = start
+        end = min(start + count, self._source_total)
+        while pos < end:
+            block_index, offset = divmod(pos, block_size)
+            block = self._load_source_block(block_index)
+            if offset >= len(block):
+                break
+            take = block[offset:offset + (end - pos)]
+            rows.extend(take)
+            pos += len(take)
+        return rows
+    
+    def _load_source_block(self, block_index: int) -> List[List[Any]]:
+        """
+        Obtener un bloque del origen de datos externo (con cache)
+        
+        Args:
+            block_index: Índice de bloque
+            
+        Returns:
+            List[List[Any]]: Filas del bloque
+        """
+        block = self._source_blocks.get(block_index)
+        if block is not None:
+            return block
+        
+        sort_column = None
+        descending = False
+        if self._sort_state is not None:
+            col_index, descending = self._sort_state
+            sort_column = self.columns[col_index][0]
+        
+        try:
+            rows, total = self.data_source(
+                self._search_term, sort_column, descending,
+                block_index * self.SOURCE_BLOCK_SIZE, self.SOURCE_BLOCK_SIZE
+            )
+            block = list(rows)
+            self._source_total = int(total)
+        except Exception as e:
+            self.logger.error(f"Error consultando origen de datos: {e}")
+            block = []
+        
+        self._source_blocks[block_index] = block
+        return block
+    
+    def _reset_source(self) -> None:
+        """Descartar bloques cargados y consultar el total del origen"""
+        self._source_blocks.clear()
+        self._source_total = 0
+        self._load_source_block(0)
+    
+    # ========== DISPLAY ==========
+    
     def _calculate_pages(self) -> None:
         """Calcular número total de páginas"""
         if self.show_pagination and self.page_size > 0:
-            self.total_pages = max(1, (len(self.filtered_data) + self.page_size - 1) // self.page_size)
+            self.total_pages = max(1, (self._row_count() + self.page_size - 1) // self.page_size)
         else:
             self.total_pages = 1
     
     def _update_display(self) -> None:
         """Actualizar display del Treeview"""
         try:
-            # Limpiar items existentes
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            if self.virtual:
+                self._render_window()
+                self._update_pagination_info()
+                return
             
             # Calcular rango de datos para página actual
             if self.show_pagination:
                 start_idx = self.current_page * self.page_size
-                end_idx = min(start_idx + self.page_size, len(self.filtered_data))
-                page_data = self.filtered_data[start_idx:end_idx]
+                page_data = self._get_rows(start_idx, self.page_size)
             else:
-                page_data = self.filtered_data
+                page_data = self._get_rows(0, self._row_count())
             
-            # Insertar datos
-            for row_data in page_data:
-                self.tree.insert('', 'end', values=row_data)
+            self._fill_items(list(self.tree.get_children()), page_data)
             
             # Actualizar info de paginación
             if self.show_pagination:
@@ -423,11 +762,89 @@ class DataGrid(ttk.Frame):
         except Exception as e:
             self.logger.error(f"Error actualizando display: {e}")
     
+    def _fill_items(self, items: List[str], rows: List[List[Any]]) -> List[str]:
+        """
+        Volcar filas en el Treeview reutilizando items existentes
+        
+        Args:
+            items: Items actuales, en orden
+            rows: Filas a mostrar
+            
+        Returns:
+            List[str]: Items que muestran las filas, en orden
+        """
+        tree = self.tree
+        for item, row_data in zip(items, rows):
+            tree.item(item, values=row_data)
+        
+        if len(items) > len(rows):
+            tree.delete(*items[len(rows):])
+            items = items[:len(rows)]
+        else:
+            for row_data in rows[len(items):]:
+                items.append(tree.insert('', 'end', values=row_data))
+        return items
+    
+    def _render_window(self) -> None:
+        """Mostrar la ventana visible del modo virtual"""
+        total = self._row_count()
+        visible = self._visible_rows
+        self._first_row = max(0, min(self._first_row, total - visible))
+        
+        rows = self._get_rows(self._first_row, visible)
+        self._row_items = self._fill_items(self._row_items, rows)
+        
+        # Reaplicar selección según posición en los datos, no en el item
+        first = self._first_row
+        selected = [item for pos, item in enumerate(self._row_items)
+                    if first + pos in self._selected_positions]
+        self.tree.selection_set(selected)
+        
+        if total > 0:
+            self.v_scrollbar.set(first / total, min(1.0, (first + visible) / total))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+        
+        # Avisar al acercarse al final (carga de la siguiente página)
+        if self.scroll_end_callback and total > 0 and first + 2 * visible >= total:
+            self.scroll_end_callback()
+    
+    def _scroll_rows(self, delta: int) -> str:
+        """
+        Desplazar la ventana virtual
+        
+        Args:
+            delta: Filas a desplazar (negativo hacia arriba)
+        """
+        first = self._first_row
+        self._first_row = max(0, min(first + delta, self._row_count() - self._visible_rows))
+        if self._first_row != first:
+            self._render_window()
+        return 'break'
+    
+    def _sync_virtual_selection(self) -> bool:
+        """
+        Actualizar posiciones seleccionadas desde los items visibles
+        
+        Returns:
+            bool: True si la selección cambió
+        """
+        selected_items = set(self.tree.selection())
+        previous = set(self._selected_positions)
+        for pos, item in enumerate(self._row_items):
+            if item in selected_items:
+                self._selected_positions.add(self._first_row + pos)
+            else:
+                self._selected_positions.discard(self._first_row + pos)
+        return self._selected_positions != previous
+    
     def _update_pagination_info(self) -> None:
         """Actualizar información de paginación"""
         if hasattr(self, 'page_info_var'):
-            if self.total_pages > 0:
-                info_text = f"Página {self.current_page + 1} de {self.total_pages} ({len(self.filtered_data)} registros)"
+            if self.virtual:
+                info_text = f"{self._row_count()} registros"
+            elif self.total_pages > 0:
+                info_text = f"Página {self.current_page + 1} de {self.total_pages} ({self._row_count()} registros)"
             else:
                 info_text = "Sin datos"
             self.page_info_var.set(info_text)
@@ -448,6 +865,16 @@ class DataGrid(ttk.Frame):
     def _clear_search(self) -> None:
         """Limpiar búsqueda"""
         self.search_var.set('')
+        self._apply_current_filter()
+    
+    def _cancel_scheduled_filter(self) -> None:
+        """Cancelar filtro pendiente del debounce"""
+        if self._search_after_id is not None:
+            try:
+                self.after_cancel(self._search_after_id)
+            except tk.TclError:
+                pass
+            self._search_after_id = None
     
     def _sort_by_column(self, col_id: str) -> None:
         """
@@ -460,13 +887,19 @@ class DataGrid(ttk.Frame):
             # Encontrar índice de columna
             col_index = next(i for i, (id_, _, _) in enumerate(self.columns) if id_ == col_id)
             
-            # Ordenar datos filtrados
-            reverse = getattr(self, f'_sort_{col_id}_reverse', False)
-            self.filtered_data.sort(key=lambda row: str(row[col_index]), reverse=reverse)
+            # Ordenar vista con claves cacheadas por columna
+            reverse = self._sort_reverse.get(col_id, False)
+            self._sort_state = (col_index, reverse)
+            
+            if self.data_source is not None:
+                self._reset_source()
+            else:
+                self._apply_sort()
             
             # Alternar dirección para próximo sort
-            setattr(self, f'_sort_{col_id}_reverse', not reverse)
+            self._sort_reverse[col_id] = not reverse
             
+            self._reset_position()
             self._update_display()
             
         except Exception as e:
@@ -475,12 +908,82 @@ class DataGrid(ttk.Frame):
     # ========== EVENT HANDLERS ==========
     
     def _on_search_changed(self, *args) -> None:
-        """Handler para cambio en búsqueda"""
-        self._apply_current_filter()
+        """Handler para cambio en búsqueda (con debounce)"""
+        self._cancel_scheduled_filter()
+        if self.search_delay_ms > 0:
+            self._search_after_id = self.after(self.search_delay_ms, self._apply_current_filter)
+        else:
+            self._apply_current_filter()
+    
+    def _on_tree_configure(self, event) -> None:
+        """Handler redimensionado: recalcular filas visibles del modo virtual"""
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or self.DEFAULT_ROW_HEIGHT)
+        except (ValueError, tk.TclError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        
+        visible = max(1, (event.height - self.HEADER_HEIGHT) // row_height)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render_window()
+    
+    def _on_virtual_scroll(self, *args) -> None:
+        """Handler de la scrollbar vertical en modo virtual"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            target = int(float(args[1]) * self._row_count())
+            self._scroll_rows(target - self._first_row)
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                amount *= self._visible_rows
+            self._scroll_rows(amount)
+    
+    def _on_virtual_click(self, event) -> None:
+        """Handler click en modo virtual: un click simple descarta la selección fuera de la ventana"""
+        if not event.state & 0x0005:  # Ni Shift ni Control
+            self._selected_positions.clear()
+    
+    def _on_mouse_wheel(self, event) -> str:
+        """Handler rueda del mouse en modo virtual"""
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+    
+    def _on_virtual_key(self, delta: int) -> str:
+        """
+        Handler de navegación con teclado en modo virtual
+        
+        Args:
+            delta: Filas a mover el foco
+        """
+        total = self._row_count()
+        if total == 0:
+            return 'break'
+        
+        focus = self.tree.focus()
+        current = self._first_row + (self._row_items.index(focus) if focus in self._row_items else 0)
+        target = max(0, min(current + delta, total - 1))
+        
+        # Desplazar la ventana lo justo para que el destino sea visible
+        if target < self._first_row:
+            self._first_row = target
+        elif target >= self._first_row + self._visible_rows:
+            self._first_row = target - self._visible_rows + 1
+        
+        self._selected_positions = {target}
+        self._render_window()
+        
+        item = self._row_items[target - self._first_row]
+        self.tree.focus(item)
+        self.tree.see(item)
+        return 'break'
     
     def _on_row_select(self, event) -> None:
         """Handler para selección de fila"""
         try:
+            # En modo virtual, ignorar eventos producidos al repintar la ventana
+            if self.virtual and not self._sync_virtual_selection():
+                return
             if self.row_select_callback:
                 selected_rows = self.get_selected_rows()
                 self.row_select_callback(selected_rows)
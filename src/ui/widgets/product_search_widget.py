@@ -13,6 +13,7 @@ import logging
 
 from utils.logger import get_logger
 from ui.shared.event_bus_tkinter import get_event_bus_tkinter, EventBusTkinter, EventData
+from ui.shared.incremental_search import IncrementalSearch
 from ui.shared.events import (
     EventTypes, EventSources,
     create_product_selected_event_data, create_search_request_event_data
@@ -27,6 +28,7 @@ class ProductSearchWidget(ttk.Frame):
     - Búsqueda por ID o nombre
     - Soporte código de barras
     - Validación en tiempo real
+    - Búsqueda incremental con debounce en hilo de trabajo
     - Comunicación via Event Bus (elimina dependencias circulares)
     
     REFACTORIZACIÓN:
@@ -34,6 +36,15 @@ class ProductSearchWidget(ttk.Frame):
     - Integración con Event Bus
     - Publisher de eventos estándar
     """
+    
+    # Espera tras la última tecla antes de consultar
+    SEARCH_DELAY_MS = 200
+    
+    # Longitud mínima para buscar por nombre mientras se escribe
+    MIN_SEARCH_LENGTH = 2
+    
+    # LIMIT aplicado por ProductService.search_products
+    SEARCH_RESULT_LIMIT = 20
 
     def __init__(self, parent: tk.Widget, product_service, event_bus: Optional[EventBusTkinter] = None, **kwargs):
         """
@@ -62,10 +73,30 @@ class ProductSearchWidget(ttk.Frame):
         self.on_search_completed: Optional[Callable] = None
         self.on_focus_quantity: Optional[Callable] = None
         
+        # Servicio del hilo de búsqueda, sobre la conexión de solo lectura de ese hilo
+        self._worker_service = None
+        
+        # Búsqueda incremental: consultas fuera del hilo de tkinter, con conexión propia
+        self._search_engine = IncrementalSearch(
+            self,
+            search_func=self._run_search,
+            on_results=self._on_search_results,
+            on_error=self._on_search_error,
+            match_func=self._matches_term,
+            delay_ms=self.SEARCH_DELAY_MS,
+            result_limit=self.SEARCH_RESULT_LIMIT,
+            reusable_modes={"partial"},
+            name="ProductSearchWorker",
+            db_path=getattr(getattr(product_service, 'db', None), 'db_path', None)
+        )
+        
         # Crear interfaz
         self._create_interface()
         self._setup_bindings()
         
+        # Stock y precio notificados: actualizar resultados en memoria sin volver a buscar
+        self._event_bus.register(EventTypes.PRODUCT_CHANGED, self._on_product_changed, weak=True)
+        
         self.logger.info("ProductSearchWidget inicializado con Event Bus")
 
     def _create_interface(self):
@@ -139,32 +170,92 @@ class ProductSearchWidget(ttk.Frame):
         self.search_var.trace("w", self._on_search_change)
 
     def _perform_search(self):
-        """Ejecutar búsqueda de productos"""
+        """Ejecutar búsqueda de productos (Enter o botón, sin debounce)"""
         search_term = self.search_var.get().strip()
         
         if not search_term:
             return
+        
+        self._search_engine.search_now(search_term, "partial")
+
+    def _run_search(self, search_term: str, mode: str, db=None) -> List[Dict]:
+        """
+        Consultar productos (se ejecuta en el hilo de trabajo)
+        
+        Args:
+            search_term: Término de búsqueda
+            mode: "code" para código de barras/ID, "partial" para nombre
+            db: Conexión de solo lectura del hilo de trabajo (None: servicio compartido)
             
+        Returns:
+            List[Dict]: Productos normalizados
+        """
+        service = self._get_worker_service(db)
+        if mode == "code":
+            results = service.buscar_por_codigo(search_term)
+        else:
+            results = service.search_products(search_term)
+        return [self._normalize_product(product) for product in results or []]
+
+    def _get_worker_service(self, db):
+        """
+        Obtener el ProductService del hilo de trabajo para su conexión
+        
+        Args:
+            db: Conexión del hilo de trabajo o None
+            
+        Returns:
+            ProductService sobre esa conexión, o el servicio del widget sin ella
+        """
+        if db is None:
+            return self.product_service
+        if self._worker_service is None or self._worker_service.db is not db:
+            from services.product_service import ProductService
+            self._worker_service = ProductService(db)
+        return self._worker_service
+
+    @staticmethod
+    def _matches_term(product: Dict, term_lower: str) -> bool:
+        """Criterio en memoria equivalente al LIKE de search_products"""
+        return term_lower in str(product.get('nombre') or '').lower()
+
+    def _on_search_results(self, search_term: str, mode: str, results: List[Dict], info: Dict):
+        """
+        Recibir resultados vigentes en el hilo de tkinter
+        
+        Args:
+            search_term: Término buscado
+            mode: Modo de búsqueda
+            results: Productos encontrados
+            info: duration_ms y from_cache
+        """
         try:
-            # Publicar evento de solicitud de búsqueda
-            self._publish_search_request_event(search_term, "partial")
+            # Publicar eventos solo para búsquedas efectivamente entregadas
+            self._publish_search_request_event(search_term, "exact" if mode == "code" else "partial")
             
-            results = self.product_service.search_products(search_term)
             self._update_results_optimized(results)
             
-            # Publicar evento de resultados de búsqueda
-            self._publish_search_result_event(search_term, results)
+            self._publish_search_result_event(search_term, results, info.get('duration_ms', 0))
             
             # BACKWARD COMPATIBILITY: Ejecutar callback si existe
             if self.on_search_completed:
                 self.on_search_completed(results)
-                
-            self.logger.info(f"Búsqueda completada: {len(results)} productos")
+            
+            self.logger.debug(
+                f"Búsqueda '{search_term}' completada: {len(results)} productos "
+                f"en {info.get('duration_ms', 0):.1f} ms"
+                f"{' (en memoria)' if info.get('from_cache') else ''}"
+            )
             
         except Exception as e:
             self.logger.error(f"Error en búsqueda: {e}")
             self._update_results_optimized([])
 
+    def _on_search_error(self, search_term: str, error: Exception):
+        """Manejar error de búsqueda en el hilo de tkinter"""
+        self.logger.error(f"Error en búsqueda '{search_term}': {error}")
+        self._update_results_optimized([])
+
     def on_enter_code(self, code: str):
         """Procesar código introducido (manual o por lector)"""
         try:
@@ -198,12 +289,22 @@ class ProductSearchWidget(ttk.Frame):
         Convierte objetos Producto a diccionarios para compatibilidad
         
         Args:
-            product: Objeto Producto o diccionario
+            product: ProductoFila, objeto Producto o diccionario
             
         Returns:
             Dict: Producto normalizado como diccionario
         """
         try:
+            # Fila compacta de search_products: un solo dict, sin pasos intermedios
+            if hasattr(product, '_fields'):
+                normalized = product.to_dict()
+                normalized['id'] = normalized['id_producto']
+                return normalized
+            
+            # Ya normalizado (resultados de _search_products o de la caché)
+            if isinstance(product, dict) and 'id' in product and 'id_producto' in product:
+                return product
+            
             # Si ya es diccionario, usar directamente
             if isinstance(product, dict):
                 # Normalizar claves para compatibilidad
@@ -268,10 +369,9 @@ class ProductSearchWidget(ttk.Frame):
         CORRECCIÓN CRÍTICA: Normaliza productos para compatibilidad Dict/Object
         
         Args:
-            results: Lista de productos encontrados (Dict o objetos Producto)
+            results: Lista de productos encontrados (Dict, ProductoFila u objetos Producto)
         """
-        self.logger.info(f"DEBUGGING _update_results_optimized:")
-        self.logger.info(f"  - results count: {len(results)}")
+        self.logger.debug(f"_update_results_optimized: {len(results)} resultados")
         
         # CORRECCIÓN CRÍTICA: Normalizar productos para compatibilidad
         normalized_results = []
@@ -296,25 +396,27 @@ class ProductSearchWidget(ttk.Frame):
                 text="No se encontraron productos",
                 foreground="red"
             )
-            self.logger.info(f"  - Sin resultados, selected_product = None")
+            self.logger.debug("Sin resultados, selected_product = None")
             return
         
-        # Agregar resultados al listbox
+        # Agregar resultados al listbox en una sola llamada
+        display_texts = []
         for product in normalized_results:
             display_text = f"{product['id']} - {product['nombre']}"
             if 'stock' in product:
                 display_text += f" (Stock: {product['stock']})"
-            self.results_listbox.insert(tk.END, display_text)
+            display_texts.append(display_text)
+        self.results_listbox.insert(tk.END, *display_texts)
         
         # OPTIMIZACIÓN: Selección automática para resultado único
         if len(normalized_results) == 1:
-            self.logger.info(f"  - Un solo resultado: iniciando auto-selección")
+            self.logger.debug("Un solo resultado: iniciando auto-selección")
             
             # Un solo resultado: selección automática INMEDIATA
             self.results_listbox.selection_set(0)
             self.selected_product = normalized_results[0]
             
-            self.logger.info(f"  - selected_product asignado: {self.selected_product}")
+            self.logger.debug(f"selected_product asignado: {self.selected_product}")
             
             # Actualizar label
             self.selected_label.config(
@@ -334,7 +436,7 @@ class ProductSearchWidget(ttk.Frame):
                 text=f"Encontrados {len(normalized_results)} productos - seleccione uno",
                 foreground="orange"
             )
-            self.logger.info(f"  - Múltiples resultados, selected_product = None")
+            self.logger.debug("Múltiples resultados, selected_product = None")
 
     def _on_selection_change(self, event):
         """Manejar cambio de selección"""
@@ -378,12 +480,61 @@ class ProductSearchWidget(ttk.Frame):
                 self.on_product_selected(self.selected_product, double_click=True)
 
     def _on_search_change(self, *args):
-        """Manejar cambios en campo de búsqueda"""
-        search_term = self.search_var.get()
+        """
+        Manejar cambios en campo de búsqueda
+        
+        Solo programa la búsqueda (debounce); la consulta corre en el hilo
+        de trabajo, así cada tecla cuesta un after() en el hilo de tkinter.
+        """
+        search_term = self.search_var.get().strip()
+        
+        if not search_term:
+            self._search_engine.cancel()
+            return
         
         # Auto-búsqueda si es código numérico (código de barras/ID)
-        if search_term.isdigit() and len(search_term) >= 3:
-            self.on_enter_code(search_term)
+        if search_term.isdigit():
+            if len(search_term) >= 3:
+                self._search_engine.schedule(search_term, "code")
+        elif len(search_term) >= self.MIN_SEARCH_LENGTH:
+            self._search_engine.schedule(search_term, "partial")
+
+    def _on_product_changed(self, event_data: EventData):
+        """
+        Aplicar un cambio notificado de producto a los resultados mostrados y en caché
+        
+        Args:
+            event_data: Evento PRODUCT_CHANGED (id_producto, stock, precio, activo)
+        """
+        cambio = event_data.data
+        id_producto = cambio.get('id_producto')
+        if cambio.get('tipo') == 'eliminado':
+            valores = {'activo': False}
+        else:
+            valores = {campo: cambio[campo] for campo in ('stock', 'precio', 'activo') if campo in cambio}
+        
+        def aplicar(product: Dict) -> bool:
+            if product.get('id', product.get('id_producto')) != id_producto:
+                return False
+            product.update(valores)
+            return True
+        
+        self._search_engine.update_cached(aplicar)
+        try:
+            seleccion = self.results_listbox.curselection()
+            for index, product in enumerate(self.current_results):
+                if aplicar(product) and 'stock' in product:
+                    self.results_listbox.delete(index)
+                    self.results_listbox.insert(
+                        index, f"{product['id']} - {product['nombre']} (Stock: {product['stock']})"
+                    )
+                    if index in seleccion:
+                        self.results_listbox.selection_set(index)
+            if self.selected_product is not None:
+                aplicar(self.selected_product)
+        except tk.TclError:
+            # Widget destruido con el evento en cola
+            pass
 
     # ==================== EVENT BUS INTEGRATION ====================
 
@@ -439,24 +590,24 @@ class ProductSearchWidget(ttk.Frame):
         except Exception as e:
             self.logger.error(f"Error publicando evento search_request: {e}")
 
-    def _publish_search_result_event(self, search_term: str, results: List[Dict]):
+    def _publish_search_result_event(self, search_term: str, results: List[Dict],
+                                     duration_ms: float = 0):
         """
         Publicar evento de resultados de búsqueda
         
         Args:
             search_term: Término que se buscó
             results: Resultados encontrados
+            duration_ms: Duración de la búsqueda
         """
         try:
-            import time
-            
             self._event_bus.publish(
                 EventTypes.PRODUCT_SEARCH_RESULT,
                 {
                     "search_term": search_term,
                     "results": results,
                     "total_results": len(results),
-                    "search_duration_ms": 0,  # Placeholder
+                    "search_duration_ms": duration_ms,
                     "search_source": EventSources.PRODUCT_SEARCH_WIDGET
                 },
                 EventSources.PRODUCT_SEARCH_WIDGET
@@ -569,6 +720,10 @@ class ProductSearchWidget(ttk.Frame):
     def cleanup(self):
         """Limpiar recursos del widget"""
         try:
+            self._search_engine.stop()
+            
+            self._event_bus.unregister(EventTypes.PRODUCT_CHANGED, self._on_product_changed)
+            
             # Desregistrar listeners si se registraron
             if hasattr(self, '_event_listeners_registered'):
                 self._event_bus.unregister(
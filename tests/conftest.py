@@ -0,0 +1,14 @@
+"""
+Configuración común de pytest.
+
+Los módulos de la aplicación se importan como en main.py: con src/ y la
+raíz del proyecto en sys.path (p.ej. 'from db.database import ...').
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for ruta in (ROOT_DIR, os.path.join(ROOT_DIR, 'src')):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
@@ -0,0 +1,118 @@
+"""
+Tests del archivado de períodos cerrados.
+
+Se registran entradas con los servicios reales, se fechan en 2024 y se
+archivan. El historial de movimientos sin fecha de inicio debe seguir
+incluyendo los archivados (vista histórica) y el conteo debe ser exacto
+aunque los IDs tengan huecos o no sigan el orden de las fechas. El
+registro de cambios no debe conservar lo archivado.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from db.database import initialize_database
+from services.archive_service import ArchiveService
+from services.movement_service import MovementService
+from services.sync_service import SyncService
+
+
+MOVIMIENTOS = 300
+CORTE = date(2024, 3, 1)
+
+
+def crear_archivada(ruta: str, registro: bool):
+    """Base con MOVIMIENTOS entradas de enero de 2024 ya archivadas: (db, servicio de movimientos)."""
+    db = initialize_database(ruta)
+    db.set_change_logging(registro)
+    conn = db.get_connection()
+    conn.execute(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, precio, tasa_impuesto) "
+        "VALUES ('Producto archivado', 1, 0, 1, 2, 7)"
+    )
+    conn.commit()
+
+    movimientos = MovementService(db)
+    for _ in range(MOVIMIENTOS):
+        movimientos.create_entrada_inventario(1, 1, 'archivo', Decimal('1.5'))
+    conn.execute("UPDATE movimientos SET fecha_movimiento = '2024-01-15 10:00:00'")
+    conn.commit()
+
+    resultado = ArchiveService(db).archivar_hasta(CORTE)
+    assert resultado['movimientos'] == MOVIMIENTOS
+    return db, movimientos
+
+
+@pytest.fixture
+def archivada(tmp_path):
+    db, movimientos = crear_archivada(str(tmp_path / 'archivo.db'), registro=False)
+    yield db, movimientos
+    db.close()
+
+
+@pytest.fixture
+def archivada_con_registro(tmp_path):
+    db, movimientos = crear_archivada(str(tmp_path / 'archivo.db'), registro=True)
+    yield db, movimientos
+    db.close()
+
+
+def test_historial_sin_fecha_incluye_archivados(archivada):
+    db, movimientos = archivada
+
+    assert db.get_connection().execute("SELECT COUNT(*) FROM movimientos").fetchone()[0] == 0
+    pagina = movimientos.get_movements_page({}, page_size=MOVIMIENTOS + 1)
+    assert len(pagina['movements']) == MOVIMIENTOS
+    assert pagina['next_cursor'] is None
+
+
+def test_conteo_exacto_con_huecos_de_ids(archivada):
+    db, movimientos = archivada
+
+    # Movimientos nuevos tras el archivado y uno con ID nuevo y fecha antigua (como los sincronizados)
+    for _ in range(5):
+        movimientos.create_entrada_inventario(1, 1, 'archivo', Decimal('1.5'))
+    conn = db.get_connection()
+    conn.execute(
+        "INSERT INTO movimientos (id_producto, tipo_movimiento, cantidad, responsable, fecha_movimiento) "
+        "VALUES (1, 'AJUSTE', 1, 'sync', '2024-04-02 09:00:00')"
+    )
+    conn.commit()
+
+    assert movimientos.count_movements({}) == MOVIMIENTOS + 6
+    desde = {'start_date': datetime(2024, 4, 1)}
+    assert movimientos.count_movements(desde) == 6
+
+
+def test_sin_sincronizacion_no_hay_registro_de_cambios(archivada):
+    db, _ = archivada
+
+    assert db.get_connection().execute("SELECT COUNT(*) FROM cambios").fetchone()[0] == 0
+
+
+def test_archivado_descarta_cambios_de_filas_archivadas(archivada_con_registro):
+    db, _ = archivada_con_registro
+    conn = db.get_connection()
+
+    tablas = dict(conn.execute("SELECT tabla, COUNT(*) FROM cambios GROUP BY tabla").fetchall())
+    assert 'movimientos' not in tablas
+    # Queda el INSERT del producto; sus UPDATE de stock no se registran
+    assert tablas['productos'] == 1
+
+
+def test_compactar_elimina_lo_entregado_a_todos_los_pares(archivada_con_registro):
+    db, _ = archivada_con_registro
+    conn = db.get_connection()
+    version = conn.execute("SELECT MAX(id_cambio) FROM cambios").fetchone()[0]
+    conn.executemany(
+        "INSERT INTO sync_pares (nodo, entregado_hasta) VALUES (?, ?)",
+        [('par-a', version), ('par-b', version - 1)]
+    )
+    conn.commit()
+
+    SyncService(db).compactar()
+    # Solo queda el último cambio, que par-b todavía no recibió
+    restantes = [fila[0] for fila in conn.execute("SELECT id_cambio FROM cambios").fetchall()]
+    assert restantes == [version]
@@ -0,0 +1,161 @@
+"""
+Tests del costeo incremental contra una reconstrucción completa.
+
+Una secuencia aleatoria con semilla fija de entradas (individuales y por
+lote, con y sin costo), ventas y ajustes se ejecuta con los servicios
+reales. El estado guardado (costo promedio, capas abiertas y costo de cada
+venta) debe coincidir con CostService.reconstruir, que recorre todo el
+historial de movimientos, y el costo total del reporte de rentabilidad
+con el costo de venta reconstruido.
+"""
+
+import random
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from db.database import initialize_database
+from services.cost_service import CostService
+from services.movement_service import MovementService
+from services.report_service import ReportService
+from services.sales_service import SalesService
+
+
+PRODUCTOS = 30
+OPERACIONES = 2000
+SEMILLA = 42
+
+
+def simular(db, productos: int, operaciones: int, metodo: str) -> int:
+    """Ejecutar operaciones aleatorias de inventario; devuelve líneas de venta registradas."""
+    conn = db.get_connection()
+    rng = random.Random(SEMILLA)
+
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, precio, tasa_impuesto) "
+        "VALUES (?, 1, 0, ?, ?, 7)",
+        [(f"Producto {i + 1}", round(rng.uniform(1, 20), 2), round(rng.uniform(25, 60), 2))
+         for i in range(productos)]
+    )
+    conn.commit()
+
+    cost_service = CostService(db, metodo)
+    movimientos = MovementService(db, cost_service)
+    ventas = SalesService(db, cost_service=cost_service)
+    stock = {i + 1: 0 for i in range(productos)}
+    venta = ventas.create_sale('verificacion')
+    lineas_venta = 0
+
+    for _ in range(operaciones):
+        id_producto = rng.randint(1, productos)
+        operacion = rng.random()
+
+        if operacion < 0.25 or stock[id_producto] == 0:
+            cantidad = rng.randint(1, 40)
+            costo = None if rng.random() < 0.1 else Decimal(str(round(rng.uniform(1, 20), 4)))
+            movimientos.create_entrada_inventario(id_producto, cantidad, 'verificacion', costo)
+            stock[id_producto] += cantidad
+        elif operacion < 0.30:
+            lote = [{'id_producto': rng.randint(1, productos), 'cantidad': rng.randint(1, 20),
+                     'costo_unitario': round(rng.uniform(1, 20), 2)} for _ in range(rng.randint(2, 8))]
+            movimientos.create_bulk_entry_movements(lote, 'verificacion', 'Lote de verificación')
+            for linea in lote:
+                stock[linea['id_producto']] += linea['cantidad']
+        elif operacion < 0.38:
+            cantidad = rng.randint(-min(stock[id_producto], 5), 5) or 1
+            movimientos.create_ajuste_inventario(id_producto, cantidad, 'verificacion', 'Conteo')
+            stock[id_producto] += cantidad
+        else:
+            cantidad = rng.randint(1, stock[id_producto])
+            ventas.add_product_to_sale(venta.id_venta, id_producto, cantidad)
+            stock[id_producto] -= cantidad
+            lineas_venta += 1
+            if lineas_venta % 20 == 0:
+                venta = ventas.create_sale('verificacion')
+
+    return lineas_venta
+
+
+@pytest.fixture(params=CostService.METODOS)
+def simulacion(request, tmp_path):
+    """Base con la secuencia aleatoria aplicada: (db, método, líneas de venta)."""
+    metodo = request.param
+    db = initialize_database(str(tmp_path / 'costeo.db'))
+    lineas = simular(db, PRODUCTOS, OPERACIONES, metodo)
+    yield db, metodo, lineas
+    db.close()
+
+
+def test_estado_incremental_coincide_con_reconstruccion(simulacion):
+    db, metodo, lineas = simulacion
+
+    assert lineas > 0
+    assert CostService(db, metodo).verificar() == []
+
+
+def test_costo_del_reporte_coincide_con_reconstruccion(simulacion):
+    db, metodo, lineas = simulacion
+
+    reconstruido = CostService(db, metodo).reconstruir()
+    reporte = ReportService(db).generate_profitability_report(date(2000, 1, 1), date.today())
+
+    # Costo de venta esperado: costo unitario reconstruido * cantidad de cada VENTA
+    cantidades = dict(db.get_connection().execute(
+        "SELECT id_movimiento, cantidad FROM movimientos WHERE tipo_movimiento = 'VENTA'"
+    ).fetchall())
+    costo_esperado = sum(
+        costo * cantidades[id_movimiento]
+        for producto in reconstruido.values()
+        for id_movimiento, costo in producto['ventas'].items()
+    )
+    costo_reporte = Decimal(str(reporte['totals']['total_costos']))
+
+    # Tolerancia: redondeo de costo_total por línea frente a unitario * cantidad
+    assert abs(costo_reporte - costo_esperado) <= Decimal('0.0001') * lineas + Decimal('0.01')
+
+
+def test_mas_vendidos_coincide_con_rentabilidad(simulacion):
+    db, metodo, lineas = simulacion
+    desde, hasta = date(2000, 1, 1), date.today()
+    servicio = ReportService(db)
+
+    rentabilidad = servicio.generate_profitability_report(desde, hasta)
+    mas_vendidos = servicio.generate_top_selling_products_report(desde, hasta, top_n=PRODUCTOS)
+
+    # Ambos reportes valoran las ventas con los montos de cada línea
+    ingresos = sum(Decimal(str(item['ingresos_generados'])) for item in mas_vendidos['data'])
+    costos = sum(Decimal(str(item['costo_total'])) for item in mas_vendidos['data'])
+    assert ingresos == Decimal(str(rentabilidad['totals']['total_ingresos']))
+    assert abs(costos - Decimal(str(rentabilidad['totals']['total_costos']))) <= Decimal('0.01') * PRODUCTOS
+
+
+def test_ventas_y_entradas_no_cambian_versiones_de_catalogo(tmp_path):
+    db = initialize_database(str(tmp_path / 'versiones.db'))
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO productos (nombre, id_categoria, stock, costo, precio, tasa_impuesto) "
+        "VALUES (?, 1, 0, 5, 10, 7)",
+        [(f"Producto {i + 1}",) for i in range(3)]
+    )
+    conn.commit()
+    antes = db.get_catalog_versions()
+
+    movimientos = MovementService(db)
+    ventas = SalesService(db)
+    venta = ventas.create_sale('verificacion')
+    for id_producto in (1, 2, 3):
+        movimientos.create_entrada_inventario(id_producto, 10, 'verificacion', Decimal('4.5'))
+        ventas.add_product_to_sale(venta.id_venta, id_producto, 2)
+
+    despues = db.get_catalog_versions()
+    assert {c: despues[c] for c in ('productos', 'categorias')} == {c: antes[c] for c in ('productos', 'categorias')}
+    assert 'movimientos' not in despues and 'capas_costo' not in despues
+
+    # El sello de fecha que acompaña al stock no cuenta aunque cambie de segundo
+    conn.execute("UPDATE productos SET stock = stock + 1, fecha_modificacion = '2000-01-01 00:00:00'")
+    assert db.get_catalog_versions()['productos'] == antes['productos']
+
+    conn.execute("UPDATE productos SET precio = 12 WHERE id_producto = 1")
+    assert db.get_catalog_versions()['productos'] == antes['productos'] + 1
+    db.close()
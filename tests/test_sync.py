@@ -0,0 +1,52 @@
+"""
+Tests del protocolo de sincronización entre dos terminales en el mismo proceso.
+
+Pedir cambios (GET /sync/changes) solo lee; lo que el par aplicó queda
+registrado cuando lo confirma (POST /sync/ack), al final de sincronizar.
+"""
+
+import pytest
+
+from db.database import initialize_database
+from services.sync_service import SyncService
+
+
+@pytest.fixture
+def terminales(tmp_path):
+    """Dos bases con registro de cambios y clientes en A: (sync A, sync B)."""
+    db_a = initialize_database(str(tmp_path / 'a.db'))
+    db_b = initialize_database(str(tmp_path / 'b.db'))
+    for db in (db_a, db_b):
+        db.set_change_logging(True)
+    conn = db_a.get_connection()
+    conn.executemany("INSERT INTO clientes (nombre, ruc) VALUES (?, ?)",
+                     [(f"Cliente {i}", f"RUC-{i}") for i in range(5)])
+    conn.commit()
+    yield SyncService(db_a), SyncService(db_b)
+    db_a.close()
+    db_b.close()
+
+
+def pares(servicio: SyncService):
+    conn = servicio.db.get_connection()
+    return {fila[0]: fila[1] for fila in conn.execute("SELECT nodo, entregado_hasta FROM sync_pares")}
+
+
+def test_obtener_cambios_no_escribe(terminales):
+    sync_a, sync_b = terminales
+
+    respuesta = sync_a.obtener_cambios(0, 100, sync_b.nodo_local())
+    assert respuesta['cambios']
+    assert pares(sync_a) == {}
+
+
+def test_sincronizar_confirma_lo_aplicado(terminales):
+    sync_a, sync_b = terminales
+
+    resumen = sync_b.sincronizar(sync_a)
+    assert resumen['aplicados'] > 0
+    assert pares(sync_a) == {sync_b.nodo_local(): resumen['hasta']}
+
+    # Todo lo entregado al único par se elimina al compactar
+    sync_a.compactar()
+    assert sync_a.db.get_connection().execute("SELECT COUNT(*) FROM cambios").fetchone()[0] == 0
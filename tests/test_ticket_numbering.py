@@ -0,0 +1,93 @@
+"""
+Tests de concurrencia de TicketNumberingService.
+
+Varios threads comparten una conexión (serializados por el lock de la
+clase) y varios procesos usan conexiones propias, donde la exclusión la
+da BEGIN IMMEDIATE ... RETURNING. En ambos casos no debe repetirse
+ningún número.
+"""
+
+import multiprocessing
+import threading
+
+import pytest
+
+from db.database import DatabaseConnection, initialize_database
+from services.ticket_numbering_service import TicketNumberingService
+
+
+THREADS = 16
+PROCESOS = 4
+NUMEROS_POR_WORKER = 50
+
+
+@pytest.fixture
+def ruta_db(tmp_path):
+    """Base de datos inicializada en un directorio temporal."""
+    ruta = str(tmp_path / 'tickets.db')
+    initialize_database(ruta).close()
+    return ruta
+
+
+def _asignar_en_proceso(ruta: str, cantidad: int, cola) -> None:
+    """Worker de proceso: conexión propia y numeración sin bloques."""
+    db = DatabaseConnection(ruta)
+    try:
+        servicio = TicketNumberingService(db)
+        cola.put([servicio.siguiente_numero('VENTA') for _ in range(cantidad)])
+    finally:
+        db.close()
+
+
+def test_sin_duplicados_con_16_threads(ruta_db):
+    db = DatabaseConnection(ruta_db)
+    servicio = TicketNumberingService(db)
+    numeros = []
+    errores = []
+    lock = threading.Lock()
+
+    def trabajar():
+        try:
+            propios = [servicio.siguiente_numero('VENTA') for _ in range(NUMEROS_POR_WORKER)]
+            with lock:
+                numeros.extend(propios)
+        except Exception as e:  # pragma: no cover - se reporta abajo
+            errores.append(e)
+
+    threads = [threading.Thread(target=trabajar) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.close()
+
+    assert not errores
+    assert len(numeros) == THREADS * NUMEROS_POR_WORKER
+    assert len(set(numeros)) == len(numeros)
+
+
+@pytest.mark.slow
+def test_sin_duplicados_entre_procesos(ruta_db):
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    procesos = [
+        contexto.Process(target=_asignar_en_proceso, args=(ruta_db, NUMEROS_POR_WORKER, cola))
+        for _ in range(PROCESOS)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    numeros = []
+    for _ in procesos:
+        numeros.extend(cola.get(timeout=120))
+    for proceso in procesos:
+        proceso.join(timeout=30)
+        assert proceso.exitcode == 0
+
+    assert len(numeros) == PROCESOS * NUMEROS_POR_WORKER
+    assert len(set(numeros)) == len(numeros)
+
+    db = DatabaseConnection(ruta_db)
+    try:
+        assert TicketNumberingService(db).obtener_ultimo_numero('VENTA') == len(numeros)
+    finally:
+        db.close()